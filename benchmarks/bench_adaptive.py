@@ -0,0 +1,146 @@
+"""
+Fixed versus load-adaptive input resolution through a traffic surge.
+
+Frames arrive at ``--fps`` with a surge to ``--surge-fps`` in the middle
+third of the run. A single worker classifies them in arrival order; the
+simulation advances a virtual clock by each frame's measured
+classification time, so queueing is reproduced without sleeping. The
+benchmark reports end-to-end latency (arrival to result), queue depth,
+frames over the SLO and recall, for a fixed 640 input and for
+``AdaptiveResolutionController``, plus the controller's per-resolution
+accuracy-versus-latency statistics.
+
+Usage:
+    python -m benchmarks.bench_adaptive --frames 600
+    python -m benchmarks.bench_adaptive --fps 40 --surge-fps 150 --slo-ms 100
+"""
+
+import argparse
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.common import environment, latency_summary, save_results
+from benchmarks.synthetic import TinyDetector, match_truth, synthetic_stream
+from src.vision.adaptive import AdaptiveResolutionController
+from src.vision.plastic_classifier import PlasticClassifier
+
+MODES = ("fixed", "adaptive")
+
+
+def arrival_times(frames: int, fps: float, surge_fps: float) -> np.ndarray:
+    """Arrival time of every frame, with a surge in the middle third."""
+    gaps = np.full(frames, 1.0 / fps)
+    gaps[frames // 3:2 * frames // 3] = 1.0 / surge_fps
+    return np.cumsum(gaps) - gaps[0]
+
+
+def run_mode(
+    classifier: PlasticClassifier,
+    controller: Optional[AdaptiveResolutionController],
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Push the arrival schedule through one worker on a virtual clock."""
+    arrivals = arrival_times(args.frames, args.fps, args.surge_fps)
+    frames = synthetic_stream(
+        seed=args.seed, width=args.width, height=args.height, items=args.items
+    )
+    clock = 0.0
+    end_to_end, depths = [], []
+    found, total, counts = Counter(), Counter(), Counter()
+    for i, arrival in enumerate(arrivals):
+        image, truth = next(frames)
+        clock = max(clock, arrival)
+        depth = int(np.searchsorted(arrivals, clock, side="right")) - i - 1
+        depths.append(depth)
+
+        start = time.perf_counter()
+        if controller is None:
+            detections = classifier.classify_plastic(image)
+        else:
+            detections = controller.classify(image, queue_depth=depth)
+        clock += time.perf_counter() - start
+        end_to_end.append(clock - arrival)
+
+        matched, _ = match_truth(detections, truth)
+        counts[classifier.input_size] += 1
+        found[classifier.input_size] += sum(matched)
+        total[classifier.input_size] += len(truth)
+
+    slo = args.slo_ms / 1000
+    return {
+        "end_to_end": latency_summary(end_to_end),
+        "over_slo": sum(t > slo for t in end_to_end) / args.frames,
+        "max_queue": max(depths),
+        "throughput_fps": args.frames / clock,
+        "recall": sum(found.values()) / max(sum(total.values()), 1),
+        "frames_per_resolution": dict(sorted(counts.items())),
+        "recall_per_resolution": {
+            size: found[size] / max(total[size], 1) for size in sorted(total)
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--fps", type=float, default=40.0)
+    parser.add_argument("--surge-fps", type=float, default=120.0)
+    parser.add_argument("--slo-ms", type=float, default=100.0)
+    parser.add_argument("--resolutions", type=int, nargs="+",
+                        default=[320, 480, 640])
+    parser.add_argument("--hold-frames", type=int, default=15)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "adaptive",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    classifier = PlasticClassifier(model=TinyDetector())
+    classifier.warmup(input_sizes=args.resolutions, runs=3)
+    for mode in MODES:
+        classifier.input_size = max(args.resolutions)
+        controller = None
+        if mode == "adaptive":
+            controller = AdaptiveResolutionController(
+                classifier,
+                resolutions=args.resolutions,
+                latency_slo_ms=args.slo_ms,
+                hold_frames=args.hold_frames,
+                audit_interval=25,
+            )
+        results[mode] = run_mode(classifier, controller, args)
+        if controller is not None:
+            results[mode]["controller"] = controller.report()
+
+    path = save_results("adaptive", results, args.output)
+    for mode in MODES:
+        row = results[mode]
+        print(
+            f"{mode:>8}: p95 {row['end_to_end']['p95_ms']:.0f} ms, "
+            f"over SLO {row['over_slo']:.1%}, max queue {row['max_queue']}, "
+            f"recall {row['recall']:.3f}, "
+            f"frames {json.dumps(row['frames_per_resolution'])}"
+        )
+    print(json.dumps(results["adaptive"]["controller"]["resolutions"], indent=2))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Auth throughput benchmark under concurrent requests.
+
+Token verification: ``get_current_user`` over a pool of tokens, with and
+without the verified-claims cache.
+
+Password verification: concurrent logins running bcrypt inline on the
+event loop versus in the dedicated password executor. The event-loop lag
+column shows how long other coroutines were starved.
+
+Usage:
+    python -m benchmarks.bench_auth --requests 20000 --logins 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, Dict
+
+from src.common import security
+from src.common.security import (
+    create_access_token,
+    get_current_user,
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+
+
+async def _run(
+    tasks: int,
+    concurrency: int,
+    call: Callable[[int], Awaitable]
+) -> Dict[str, float]:
+    """Run ``tasks`` calls with bounded concurrency and measure loop lag."""
+    semaphore = asyncio.Semaphore(concurrency)
+    max_lag = 0.0
+    done = False
+
+    async def probe() -> None:
+        nonlocal max_lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.001)
+
+    async def worker(i: int) -> None:
+        async with semaphore:
+            await call(i)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(tasks)))
+    elapsed = time.perf_counter() - start
+    done = True
+    await probe_task
+    return {
+        "requests_per_sec": tasks / elapsed,
+        "max_loop_lag_ms": max_lag * 1000,
+    }
+
+
+async def main_async(requests: int, logins: int, users: int) -> Dict:
+    """Run all scenarios."""
+    tokens = [create_access_token({"sub": f"user{i}"}) for i in range(users)]
+    results = {}
+
+    async def token_call(i: int) -> None:
+        await get_current_user(tokens[i % users])
+
+    security.token_cache.maxsize = 0
+    results["token_uncached"] = await _run(requests, 64, token_call)
+    security.token_cache.maxsize = security.settings.TOKEN_CACHE_SIZE
+    security.token_cache.clear()
+    results["token_cached"] = await _run(requests, 64, token_call)
+
+    hashed = get_password_hash("correct horse battery staple")
+
+    async def inline_login(i: int) -> None:
+        verify_password("correct horse battery staple", hashed)
+
+    async def offloaded_login(i: int) -> None:
+        await verify_password_async("correct horse battery staple", hashed)
+
+    results["login_inline"] = await _run(logins, logins, inline_login)
+    results["login_executor"] = await _run(logins, logins, offloaded_login)
+    return results
+
+
+def main() -> None:
+    """Parse arguments and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--logins", type=int, default=16)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+    results = asyncio.run(main_async(args.requests, args.logins, args.users))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
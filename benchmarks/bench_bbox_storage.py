@@ -0,0 +1,137 @@
+"""
+Benchmark bounding box storage: legacy JSON column vs four float columns.
+
+Measures bulk insert speed, full-scan read speed (including building the
+``[x1, y1, x2, y2]`` lists) and on-disk size of a SQLite database.
+
+Usage:
+    python -m benchmarks.bench_bbox_storage --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List
+
+import numpy as np
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    insert,
+    select,
+)
+
+from src.database.models import Base, PlasticDetection
+
+CHUNK_SIZE = 50000
+
+
+def _legacy_table(metadata: MetaData) -> Table:
+    """Detection table as it was before the float-column migration."""
+    return Table(
+        "plastic_detections",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("batch_id", Integer),
+        Column("plastic_type", String, nullable=False),
+        Column("confidence", Float, nullable=False),
+        Column("bbox", JSON),
+        Column("contamination_level", Float),
+        Column("timestamp", DateTime),
+    )
+
+
+def _rows(count: int, columnar: bool) -> List[Dict[str, Any]]:
+    """Generate synthetic detection rows."""
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 600, size=(count, 2))
+    sizes = rng.uniform(10, 200, size=(count, 2))
+    boxes = np.hstack([corners, corners + sizes]).tolist()
+    now = datetime.utcnow()
+    rows = []
+    for i, box in enumerate(boxes):
+        row = {
+            "batch_id": i // 100,
+            "plastic_type": "PET",
+            "confidence": 0.9,
+            "contamination_level": 0.1,
+            "timestamp": now,
+        }
+        if columnar:
+            row.update(zip(("bbox_x1", "bbox_y1", "bbox_x2", "bbox_y2"), box))
+        else:
+            row["bbox"] = box
+        rows.append(row)
+    return rows
+
+
+def run(count: int, columnar: bool) -> Dict[str, float]:
+    """Run the benchmark for one storage layout."""
+    if columnar:
+        metadata = Base.metadata
+        table = PlasticDetection.__table__
+    else:
+        metadata = MetaData()
+        table = _legacy_table(metadata)
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        engine = create_engine(f"sqlite:///{path}")
+        metadata.create_all(engine)
+        rows = _rows(count, columnar)
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            for i in range(0, count, CHUNK_SIZE):
+                conn.execute(insert(table), rows[i:i + CHUNK_SIZE])
+        insert_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with engine.connect() as conn:
+            if columnar:
+                stmt = select(
+                    table.c.bbox_x1, table.c.bbox_y1,
+                    table.c.bbox_x2, table.c.bbox_y2,
+                )
+                boxes = [list(r) for r in conn.execute(stmt)]
+            else:
+                boxes = [r[0] for r in conn.execute(select(table.c.bbox))]
+        read_time = time.perf_counter() - start
+        assert len(boxes) == count
+        engine.dispose()
+
+        return {
+            "insert_rows_per_sec": count / insert_time,
+            "read_rows_per_sec": count / read_time,
+            "size_mb": os.path.getsize(path) / 1e6,
+        }
+    finally:
+        os.remove(path)
+
+
+def main() -> None:
+    """Run both layouts and print a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    results = {
+        "json": run(args.rows, columnar=False),
+        "columns": run(args.rows, columnar=True),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Event bus throughput on the local backend.
+
+``--events`` detections events (one processed batch each, with
+``--detections`` detections) are published to the detections topic while
+a consumer group of ``--consumers`` members reads, deduplicates and
+commits them. Each run is repeated for every ``--batch-sizes`` value:
+a batch size of 1 sends every event on its own, larger sizes append
+batches of events under one lock acquisition.
+
+Reported per batch size: produce rate (events/s until the producer has
+flushed), end-to-end rate (until every event is handled) and the
+publish-to-handle latency of the events.
+
+Usage:
+    python -m benchmarks.bench_events --events 20000 --consumers 2
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import environment, latency_summary, save_results
+from src.common import events
+from src.common.events import Deduplicator, LocalEventBus, handle_events
+
+
+def payload(i: int, detections: int) -> Dict[str, Any]:
+    """A detections event as published by the API."""
+    return {
+        "message": f"Processing {detections} plastic items",
+        "batch_id": f"batch-{i:08d}",
+        "facility_id": f"facility_{i % 8:03d}",
+        "timestamp": datetime.utcnow().isoformat(),
+        "detections": [
+            {
+                "plastic_type": "PET",
+                "confidence": 0.91,
+                "bbox": [10.0 * d, 20.0, 10.0 * d + 40.0, 60.0],
+                "contamination_level": 0.12,
+            }
+            for d in range(detections)
+        ],
+    }
+
+
+def run(batch_size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """Publish and consume every event with one produce batch size."""
+    bus = LocalEventBus(
+        partitions=args.partitions,
+        batch_size=batch_size,
+        linger_ms=args.linger_ms if batch_size > 1 else 0,
+    )
+    payloads = [payload(i, args.detections) for i in range(args.events)]
+    latencies: List[float] = []
+    handled = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def handler(event: events.Event) -> None:
+        latency = time.time() - event.timestamp
+        with lock:
+            latencies.append(latency)
+            handled[0] += 1
+            if handled[0] == args.events:
+                done.set()
+
+    def consume(consumer: events.Consumer) -> None:
+        dedup = Deduplicator()
+        while not done.is_set():
+            handle_events(consumer, handler, dedup, timeout=0.05)
+        consumer.close()
+
+    consumers = [
+        threading.Thread(
+            target=consume,
+            args=(bus.consumer([events.DETECTIONS], "storage"),),
+        )
+        for _ in range(args.consumers)
+    ]
+    for thread in consumers:
+        thread.start()
+
+    producer = bus.producer()
+    start = time.perf_counter()
+    for item in payloads:
+        producer.send(events.DETECTIONS, item, key=item["facility_id"])
+    producer.flush()
+    produced = time.perf_counter() - start
+    done.wait(args.timeout)
+    elapsed = time.perf_counter() - start
+    producer.close()
+    for thread in consumers:
+        thread.join()
+
+    return {
+        "produce_events_per_s": args.events / produced,
+        "end_to_end_events_per_s": handled[0] / elapsed,
+        "handled": handled[0],
+        "latency": latency_summary(latencies),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--detections", type=int, default=10,
+                        help="Detections per event")
+    parser.add_argument("--consumers", type=int, default=2)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 500])
+    parser.add_argument("--linger-ms", type=float, default=5)
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Seconds to wait for consumers per run")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "benchmark": "events",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+        "runs": {},
+    }
+    for batch_size in args.batch_sizes:
+        results["runs"][str(batch_size)] = run(batch_size, args)
+
+    path = save_results("events", results, args.output)
+    print(json.dumps(results["runs"], indent=2))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark detection export: streaming cursor vs loading the full result.
+
+Each mode runs in a fresh process so its peak RSS is measured in isolation.
+
+Usage:
+    python -m benchmarks.bench_export --rows 1000000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from src.database import queries
+from src.database.models import Base, Batch, Facility, PlasticDetection
+
+CHUNK_SIZE = 50000
+
+
+def populate(url: str, count: int) -> None:
+    """Fill the database with synthetic detections."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(0)
+    start = datetime(2026, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(Facility), [{"name": "F", "location": "L"}])
+        conn.execute(
+            insert(Batch),
+            [
+                {"batch_id": f"B{i}", "facility_id": 1}
+                for i in range(count // 100 + 1)
+            ],
+        )
+        for offset in range(0, count, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, count - offset)
+            boxes = rng.uniform(0, 640, size=(n, 4)).tolist()
+            conn.execute(
+                insert(PlasticDetection.__table__),
+                [
+                    {
+                        "batch_id": (offset + i) // 100 + 1,
+                        "plastic_type": "PET",
+                        "confidence": 0.9,
+                        "bbox_x1": b[0],
+                        "bbox_y1": b[1],
+                        "bbox_x2": b[2],
+                        "bbox_y2": b[3],
+                        "contamination_level": 0.1,
+                        "timestamp": start + timedelta(seconds=offset + i),
+                    }
+                    for i, b in enumerate(boxes)
+                ],
+            )
+    engine.dispose()
+
+
+def _run_mode(url: str, mode: str, results: Dict[str, Dict]) -> None:
+    """Export every detection in one mode and record the measurements."""
+    engine = create_engine(url)
+    rows = 0
+    written = 0
+    start = time.perf_counter()
+    with Session(engine) as db:
+        if mode == "stream":
+            for chunk in queries.export_ndjson(db):
+                written += len(chunk)
+                rows += chunk.count(b"\n")
+        else:
+            detections = db.query(PlasticDetection).all()
+            body = "\n".join(
+                json.dumps({
+                    "id": d.id,
+                    "batch_id": d.batch_id,
+                    "plastic_type": d.plastic_type,
+                    "confidence": d.confidence,
+                    "bbox": d.bbox,
+                    "contamination_level": d.contamination_level,
+                    "timestamp": d.timestamp.isoformat(),
+                })
+                for d in detections
+            )
+            written = len(body)
+            rows = len(detections)
+    elapsed = time.perf_counter() - start
+    results[mode] = {
+        "rows": rows,
+        "rows_per_sec": rows / elapsed,
+        "bytes": written,
+        "peak_rss_mb": resource.getrusage(
+            resource.RUSAGE_SELF
+        ).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    """Populate a database and compare both export modes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    url = f"sqlite:///{path}"
+    try:
+        populate(url, args.rows)
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Manager() as manager:
+            results = manager.dict()
+            for mode in ("stream", "load_all"):
+                proc = ctx.Process(target=_run_mode, args=(url, mode, results))
+                proc.start()
+                proc.join()
+            print(json.dumps(dict(results), indent=2))
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Motion-gated versus ungated classification on a synthetic conveyor stream.
+
+A share of the frames shows the empty belt. Each frame is classified and
+scored for contamination, first with every frame going through inference
+and then with the motion gate (optionally restricted to a belt ROI). The
+benchmark reports the fraction of frames skipped, CPU and wall time per
+frame, and recall, which shows whether the gate lost any items.
+
+Usage:
+    python -m benchmarks.bench_gating --frames 300 --empty-fraction 0.6
+    python -m benchmarks.bench_gating --roi 0 120 1280 600
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from benchmarks.common import environment, latency_summary, save_results
+from benchmarks.synthetic import TinyDetector, match_truth, synthetic_frame
+from src.vision.gating import MotionGate
+from src.vision.plastic_classifier import PlasticClassifier
+
+MODES = ("ungated", "gated")
+
+
+def conveyor_stream(args: argparse.Namespace) -> Iterator[Any]:
+    """Reproducible stream mixing empty-belt and loaded frames."""
+    rng = np.random.default_rng(args.seed)
+    for _ in range(args.frames):
+        items = 0 if rng.random() < args.empty_fraction else args.items
+        yield synthetic_frame(rng, args.width, args.height, items)
+
+
+def _in_roi(item: Dict[str, Any], roi: Optional[List[int]]) -> bool:
+    """Whether an item's centre lies inside the ROI."""
+    if roi is None:
+        return True
+    x1, y1, x2, y2 = item["bbox"]
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    return roi[0] <= cx < roi[2] and roi[1] <= cy < roi[3]
+
+
+def run_mode(
+    classifier: PlasticClassifier,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Classify the stream and collect timing, gating and recall figures."""
+    skipped = 0
+    if classifier.gate is not None:
+        active_regions = classifier.gate.active_regions
+
+        def counting(image: np.ndarray) -> List[Any]:
+            nonlocal skipped
+            regions = active_regions(image)
+            skipped += not regions
+            return regions
+
+        classifier.gate.active_regions = counting
+
+    cpu_times, wall_times = [], []
+    found = total = 0
+    for image, truth in conveyor_stream(args):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        detections = classifier.classify_plastic(image)
+        for detection in detections:
+            detection["contamination_level"] = (
+                classifier.get_contamination_level(image, detection["bbox"])
+            )
+        cpu_times.append(time.process_time() - cpu_start)
+        wall_times.append(time.perf_counter() - wall_start)
+
+        truth = [item for item in truth if _in_roi(item, args.roi)]
+        matched, _ = match_truth(detections, truth)
+        found += sum(matched)
+        total += len(truth)
+
+    return {
+        "skipped_fraction": skipped / args.frames,
+        "cpu_ms_per_frame": sum(cpu_times) / args.frames * 1000,
+        "latency": latency_summary(wall_times),
+        "recall": found / max(total, 1),
+        "items": total,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--empty-fraction", type=float, default=0.6)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--roi", type=int, nargs=4,
+                        metavar=("X1", "Y1", "X2", "Y2"),
+                        help="Belt region; items outside it are not scored")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    classifier = PlasticClassifier(model=TinyDetector())
+    results = {
+        "benchmark": "gating",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    for mode in MODES:
+        classifier.gate = None
+        if mode == "gated":
+            # Calibrate on the empty belt, as on installation
+            classifier.gate = MotionGate(rois=[args.roi] if args.roi else None)
+            empty, _ = synthetic_frame(
+                np.random.default_rng(args.seed + 1), args.width, args.height, 0
+            )
+            classifier.gate.set_background(empty)
+        results[mode] = run_mode(classifier, args)
+
+    results["cpu_savings"] = 1 - (
+        results["gated"]["cpu_ms_per_frame"]
+        / results["ungated"]["cpu_ms_per_frame"]
+    )
+
+    path = save_results("gating", results, args.output)
+    for mode in MODES:
+        summary = {k: v for k, v in results[mode].items() if k != "latency"}
+        print(f"{mode:>8}: {json.dumps(summary)}")
+    print(f"CPU savings: {results['cpu_savings']:.1%}")
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
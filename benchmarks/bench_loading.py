@@ -0,0 +1,197 @@
+"""
+Private versus memory-mapped loading of model weights and frames.
+
+Weights: ``--workers`` processes each load the same synthetic model of
+about ``--model-mb`` MB, either privately (``torch.load``) or memory-
+mapped (``src.vision.weights``), run one forward pass and report their
+memory while all are alive. PSS divides shared pages among the workers,
+so the PSS sum is the host memory the workers really use.
+
+Frames: one pass over a folder of JPEG files (decode + resize per file)
+versus one pass over the same frames packed into a
+``PackedFrameStore``.
+
+Usage:
+    python -m benchmarks.bench_loading --workers 4 --model-mb 200
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+import torch
+from torch import nn
+
+from benchmarks.common import environment, process_memory_mb, save_results
+from benchmarks.synthetic import synthetic_frame
+from src.vision.dataset import PackedFrameStore, pack_images
+from src.vision.plastic_classifier import list_images
+from src.vision.weights import export_state_dict, load_state_dict_mmap
+
+LAYER = 1024
+
+
+def build_model(size_mb: int) -> nn.Module:
+    """A stack of linear layers holding about ``size_mb`` MB of weights."""
+    layers = max(1, int(size_mb * 1e6 // (LAYER * LAYER * 4)))
+    return nn.Sequential(*[nn.Linear(LAYER, LAYER) for _ in range(layers)])
+
+
+def _worker(
+    path: str,
+    size_mb: int,
+    mmap: bool,
+    loaded: Any,
+    done: Any,
+    results: Any
+) -> None:
+    """Load the weights, touch them and report memory once all are loaded."""
+    start = time.perf_counter()
+    with torch.device("meta"):
+        model = build_model(size_mb)
+    if mmap:
+        state = load_state_dict_mmap(Path(path))
+    else:
+        state = torch.load(path, weights_only=True)
+    model.load_state_dict(state, assign=True)
+    del state
+    with torch.no_grad():
+        model(torch.zeros(1, LAYER))
+    load_s = time.perf_counter() - start
+
+    loaded.wait()
+    results.put({"load_s": load_s, **process_memory_mb()})
+    done.wait()
+
+
+def measure_weights(path: Path, args: argparse.Namespace, mmap: bool) -> Dict:
+    """Run the workers for one loading mode."""
+    ctx = mp.get_context("spawn")
+    loaded = ctx.Barrier(args.workers)
+    done = ctx.Barrier(args.workers + 1)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(
+            target=_worker,
+            args=(str(path), args.model_mb, mmap, loaded, done, results),
+        )
+        for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    reports = [results.get() for _ in workers]
+    done.wait()
+    for worker in workers:
+        worker.join()
+
+    return {
+        "workers": args.workers,
+        "load_s_mean": float(np.mean([r["load_s"] for r in reports])),
+        "rss_mb_per_worker": float(np.mean([r.get("rss_mb", 0) for r in reports])),
+        "private_mb_per_worker": float(
+            np.mean([r.get("private_mb", 0) for r in reports])
+        ),
+        "pss_mb_total": float(sum(r.get("pss_mb", 0) for r in reports)),
+    }
+
+
+def _growth(before: Dict[str, float], after: Dict[str, float]) -> Dict:
+    """RSS and anonymous memory added between two measurements."""
+    return {
+        f"{key}_growth": after.get(key, 0.0) - before.get(key, 0.0)
+        for key in ("rss_mb", "anonymous_mb")
+    }
+
+
+def measure_frames(folder: Path, store_dir: Path, size: int) -> Dict[str, Any]:
+    """
+    Time one pass over the JPEG folder and over the packed store.
+
+    Mapped frames count towards RSS but are clean page cache pages that
+    other readers share; anonymous growth is the memory a reader adds.
+    """
+    results = {}
+
+    paths = list_images(folder)
+    before = process_memory_mb()
+    start = time.perf_counter()
+    for path in paths:
+        image = cv2.resize(cv2.imread(str(path)), (size, size))
+        float(image.mean())
+    elapsed = time.perf_counter() - start
+    results["folder"] = {
+        "frames_per_s": len(paths) / elapsed,
+        **_growth(before, process_memory_mb()),
+    }
+
+    before = process_memory_mb()
+    start = time.perf_counter()
+    store = PackedFrameStore(store_dir)
+    for frame in store:
+        float(frame.mean())
+    elapsed = time.perf_counter() - start
+    results["packed"] = {
+        "frames_per_s": len(store) / elapsed,
+        **_growth(before, process_memory_mb()),
+        "store_mb": (store_dir / "frames.npy").stat().st_size / 1e6,
+    }
+    results["speedup"] = (
+        results["packed"]["frames_per_s"] / results["folder"]["frames_per_s"]
+    )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--model-mb", type=int, default=200)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--size", type=int, default=640,
+                        help="Side of the packed frames")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "loading",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        weights = export_state_dict(build_model(args.model_mb), tmp / "weights.pt")
+        results["weights"] = {
+            "private": measure_weights(weights, args, mmap=False),
+            "mmap": measure_weights(weights, args, mmap=True),
+        }
+
+        folder = tmp / "frames"
+        folder.mkdir()
+        rng = np.random.default_rng(args.seed)
+        for i in range(args.frames):
+            image, _ = synthetic_frame(rng, args.width, args.height)
+            cv2.imwrite(str(folder / f"frame{i:05d}.jpg"), image)
+        pack_images(list_images(folder), tmp / "packed", args.size, args.size)
+        results["frames"] = measure_frames(folder, tmp / "packed", args.size)
+
+    path = save_results("loading", results, args.output)
+    print(json.dumps({k: results[k] for k in ("weights", "frames")}, indent=2))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
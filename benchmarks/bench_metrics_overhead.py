@@ -0,0 +1,130 @@
+"""
+Measure the overhead of Prometheus instrumentation on hot paths.
+
+Runs the same workload in two subprocesses, with ``ENABLE_METRICS`` on and
+off, and reports the per-call difference for:
+
+- a classifier frame (stub model, postprocess + contamination)
+- an ASGI request through ``MetricsMiddleware`` to a trivial app
+
+Usage:
+    python -m benchmarks.bench_metrics_overhead
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict
+from unittest.mock import patch
+
+import numpy as np
+
+
+class _StubPredictions:
+    """Minimal stand-in for YOLO results."""
+
+    def __init__(self, boxes: np.ndarray):
+        self.xyxy = [boxes]
+
+
+class _StubModel:
+    """Model returning fixed boxes instantly."""
+
+    names = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS", "OTHER"]
+
+    def __init__(self, detections: int):
+        rng = np.random.default_rng(0)
+        xy = rng.uniform(0, 500, size=(detections, 2))
+        self.boxes = np.hstack([
+            xy, xy + 60,
+            np.full((detections, 1), 0.95),
+            rng.integers(0, 7, size=(detections, 1)),
+        ])
+
+    def __call__(self, image: np.ndarray) -> _StubPredictions:
+        return _StubPredictions(self.boxes)
+
+
+def measure(frames: int, requests: int, detections: int) -> Dict[str, float]:
+    """Time the workload in the current process."""
+    from src.common.metrics import MetricsMiddleware
+    from src.vision.plastic_classifier import PlasticClassifier
+
+    with patch.object(
+        PlasticClassifier, "_load_model", return_value=_StubModel(detections)
+    ):
+        classifier = PlasticClassifier()
+    image = np.random.default_rng(0).integers(
+        0, 255, size=(640, 640, 3), dtype=np.uint8
+    )
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for detection in classifier.classify_plastic(image):
+            classifier.get_contamination_level(image, detection["bbox"])
+    frame_us = (time.perf_counter() - start) / frames * 1e6
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    async def receive():
+        return {"type": "http.request"}
+
+    wrapped = MetricsMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/health"}
+
+    async def run(asgi) -> float:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await asgi(dict(scope), receive, send)
+        return (time.perf_counter() - start) / requests * 1e6
+
+    from src.common.config import settings
+    target = wrapped if settings.ENABLE_METRICS else app
+    request_us = asyncio.run(run(target))
+    return {"frame_us": frame_us, "request_us": request_us}
+
+
+def main() -> None:
+    """Run the workload with metrics on and off and print the overhead."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--detections", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.frames, args.requests, args.detections)))
+        return
+
+    results = {}
+    for enabled in ("true", "false"):
+        env = dict(os.environ, ENABLE_METRICS=enabled)
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_metrics_overhead",
+             "--child", "--frames", str(args.frames),
+             "--requests", str(args.requests),
+             "--detections", str(args.detections)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results["enabled" if enabled == "true" else "disabled"] = json.loads(
+            output.strip().splitlines()[-1]
+        )
+    results["overhead"] = {
+        key: results["enabled"][key] - results["disabled"][key]
+        for key in results["enabled"]
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
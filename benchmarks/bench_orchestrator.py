@@ -0,0 +1,166 @@
+"""
+Multi-camera serving: a classifier per line vs one shared, scheduled model.
+
+Camera threads submit synthetic frames at ``--fps`` (one value per
+stream) for ``--seconds``. Two setups serve them:
+
+- ``per-line``: every stream has its own classifier, model copy and
+  inference thread, as when each line runs its own vision process
+- ``shared``: one classifier serves every stream through a
+  ``StreamOrchestrator`` with ``--workers`` inference threads, and
+  streams are weighted by ``--weights``
+
+Reported per setup: model copies and their weight memory, and per stream
+the processed frame rate, dropped frames, p50/p99 latency, SLO attainment
+and share of model time.
+
+Usage:
+    python -m benchmarks.bench_orchestrator --fps 30 30 10 --weights 2 1 1
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.common import environment, save_results
+from benchmarks.synthetic import TinyDetector, synthetic_frame
+from src.vision.orchestrator import StreamOrchestrator
+from src.vision.plastic_classifier import PlasticClassifier
+
+SETUPS = ("per-line", "shared")
+
+
+def weights_mb(model: Any) -> float:
+    """Parameter memory of a model in MB."""
+    return sum(p.numel() * p.element_size() for p in model.parameters()) / 2**20
+
+
+def run_cameras(
+    orchestrators: List[StreamOrchestrator],
+    frames: List[np.ndarray],
+    args: argparse.Namespace
+) -> None:
+    """Submit frames from one thread per stream at its frame rate."""
+    def camera(i: int) -> None:
+        orchestrator = orchestrators[i % len(orchestrators)]
+        interval = 1 / args.fps[i]
+        next_frame = time.perf_counter()
+        deadline = next_frame + args.seconds
+        n = 0
+        while next_frame < deadline:
+            orchestrator.submit(f"line-{i}", frames[n % len(frames)], frame_id=n)
+            n += 1
+            next_frame += interval
+            time.sleep(max(0.0, next_frame - time.perf_counter()))
+
+    cameras = [
+        threading.Thread(target=camera, args=(i,)) for i in range(len(args.fps))
+    ]
+    for thread in cameras:
+        thread.start()
+    for thread in cameras:
+        thread.join()
+
+
+def run_setup(
+    setup: str,
+    frames: List[np.ndarray],
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Serve every stream with one setup and collect per-stream stats."""
+    streams = range(len(args.fps))
+    if setup == "per-line":
+        models = [TinyDetector(seed=args.seed) for _ in streams]
+        orchestrators = [
+            StreamOrchestrator(PlasticClassifier(model=model), workers=1)
+            for model in models
+        ]
+        for i, orchestrator in zip(streams, orchestrators):
+            orchestrator.add_stream(
+                f"line-{i}", args.facility, slo_ms=args.slo_ms
+            )
+    else:
+        models = [TinyDetector(seed=args.seed)]
+        orchestrators = [
+            StreamOrchestrator(PlasticClassifier(model=models[0]), args.workers)
+        ]
+        for i in streams:
+            orchestrators[0].add_stream(
+                f"line-{i}", args.facility, weight=args.weights[i],
+                slo_ms=args.slo_ms,
+            )
+
+    for orchestrator in orchestrators:
+        orchestrator.start()
+    run_cameras(orchestrators, frames, args)
+    for orchestrator in orchestrators:
+        orchestrator.stop()
+
+    stats = [s for o in orchestrators for s in o.stats()["streams"]]
+    busy = sum(s["busy_s"] for s in stats)
+    return {
+        "model_copies": len(models),
+        "weights_mb": sum(weights_mb(model) for model in models),
+        "streams": {
+            s["stream_id"]: {
+                "offered_fps": args.fps[int(s["stream_id"].split("-")[1])],
+                "processed_fps": s["processed"] / args.seconds,
+                "dropped": s["dropped"],
+                "p50_ms": s["latency_ms"]["p50"],
+                "p99_ms": s["latency_ms"]["p99"],
+                "slo_attainment": s["slo_attainment"],
+                "model_share": s["busy_s"] / busy if busy else None,
+            }
+            for s in stats
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fps", type=float, nargs="+", default=[30, 30, 10],
+                        help="Frame rate of each stream")
+    parser.add_argument("--weights", type=float, nargs="+",
+                        help="Scheduling weight of each stream (default 1)")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Shared inference threads")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--slo-ms", type=float, default=100.0)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--facility", default="facility_001")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    args.weights = args.weights or [1.0] * len(args.fps)
+    if len(args.weights) != len(args.fps):
+        parser.error("--weights needs one value per --fps value")
+
+    rng = np.random.default_rng(args.seed)
+    frames = [synthetic_frame(rng, args.width, args.height)[0] for _ in range(8)]
+    results: Dict[str, Any] = {
+        "benchmark": "orchestrator",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    for setup in SETUPS:
+        results[setup] = run_setup(setup, frames, args)
+
+    path = save_results("orchestrator", results, args.output)
+    print(json.dumps({setup: results[setup] for setup in SETUPS}, indent=2))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
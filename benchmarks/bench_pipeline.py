@@ -0,0 +1,220 @@
+"""
+End-to-end pipeline benchmark on synthetic data.
+
+Drives the full path for every frame:
+
+    synthetic frame -> PlasticClassifier (TinyDetector stand-in)
+    -> contamination scoring -> MultiArmController -> SQLite persistence
+
+and reports throughput, p50/p95/p99 latency per stage and per frame, and
+peak Python allocations per stage (measured in a separate tracemalloc
+pass so it does not distort the timings). Results are saved as JSON and
+can be compared with an earlier run.
+
+Usage:
+    python -m benchmarks.bench_pipeline --frames 500
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from benchmarks.common import (
+    compare_results,
+    environment,
+    latency_summary,
+    peak_rss_mb,
+    save_results,
+)
+from benchmarks.synthetic import TinyDetector, synthetic_stream
+from src.database.models import Base, Facility
+from src.database.persistence import save_detections
+from src.robotics.robot_controller import MultiArmController
+from src.vision.plastic_classifier import PlasticClassifier
+
+STAGES = ("generate", "classify", "contamination", "sort", "persist")
+
+
+class Pipeline:
+    """The production pipeline wired to offline stand-ins."""
+
+    def __init__(self, args: argparse.Namespace, db_url: str):
+        self.frames = synthetic_stream(
+            seed=args.seed, width=args.width, height=args.height, items=args.items
+        )
+        self.classifier = PlasticClassifier(model=TinyDetector())
+        self.controller = MultiArmController()
+        self.controller.pick_duration = args.pick_ms / 1000
+        self.controller.reset()
+        self.loop = asyncio.new_event_loop()
+
+        self.engine = create_engine(db_url)
+        Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        facility = Facility(name="Benchmark", location="Synthetic")
+        self.db.add(facility)
+        self.db.commit()
+        self.facility_id = facility.id
+
+    def run_frame(self, stage: Any) -> int:
+        """Process one frame, wrapping each stage in ``stage(name)``."""
+        with stage("generate"):
+            image, _ = next(self.frames)
+        with stage("classify"):
+            detections = self.classifier.classify_plastic(image)
+        with stage("contamination"):
+            for detection in detections:
+                detection["contamination_level"] = (
+                    self.classifier.get_contamination_level(
+                        image, detection["bbox"]
+                    )
+                )
+        with stage("sort"):
+            if detections:
+                self.loop.run_until_complete(
+                    self.controller.pick_and_sort(detections)
+                )
+        with stage("persist"):
+            save_detections(
+                self.db,
+                uuid.uuid4().hex,
+                detections,
+                facility_id=self.facility_id,
+            )
+        return len(detections)
+
+    def close(self) -> None:
+        """Release resources."""
+        self.db.close()
+        self.engine.dispose()
+        self.controller.executor.shutdown()
+        self.loop.close()
+
+
+def measure_latency(pipeline: Pipeline, frames: int, warmup: int) -> Dict:
+    """Time every stage of every frame."""
+    samples: Dict[str, List[float]] = {name: [] for name in STAGES}
+
+    @contextmanager
+    def stage(name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        yield
+        samples[name].append(time.perf_counter() - start)
+
+    @contextmanager
+    def untimed(name: str) -> Iterator[None]:
+        yield
+
+    for _ in range(warmup):
+        pipeline.run_frame(untimed)
+
+    frame_times = []
+    detections = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        detections += pipeline.run_frame(stage)
+        frame_times.append(time.perf_counter() - frame_start)
+    elapsed = time.perf_counter() - start
+
+    stages = {}
+    for name in STAGES:
+        stages[name] = latency_summary(samples[name])
+        stages[name]["throughput_fps"] = frames / sum(samples[name])
+    return {
+        "throughput_fps": frames / elapsed,
+        "detections_per_sec": detections / elapsed,
+        "frame": latency_summary(frame_times),
+        "stages": stages,
+    }
+
+
+def measure_memory(pipeline: Pipeline, frames: int) -> Dict[str, float]:
+    """Peak traced Python allocations per stage, in KB."""
+    peaks = {name: 0.0 for name in STAGES}
+
+    @contextmanager
+    def stage(name: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        yield
+        peak = tracemalloc.get_traced_memory()[1] - base
+        peaks[name] = max(peaks[name], peak / 1024)
+
+    tracemalloc.start()
+    try:
+        for _ in range(frames):
+            pipeline.run_frame(stage)
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--memory-frames", type=int, default=20)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--pick-ms", type=float, default=0.0,
+                        help="Simulated pick duration per item")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path,
+                        help="Earlier results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    pipeline = Pipeline(args, f"sqlite:///{db_path}")
+    try:
+        results = {
+            "benchmark": "pipeline",
+            "timestamp": datetime.utcnow().isoformat(),
+            "config": {
+                key: value for key, value in vars(args).items()
+                if key not in ("output", "compare")
+            },
+            "environment": environment(),
+        }
+        results.update(measure_latency(pipeline, args.frames, args.warmup))
+        peaks = measure_memory(pipeline, args.memory_frames)
+        for name in STAGES:
+            results["stages"][name]["peak_alloc_kb"] = peaks[name]
+        results["peak_rss_mb"] = peak_rss_mb()
+    finally:
+        pipeline.close()
+        os.remove(db_path)
+
+    path = save_results("pipeline", results, args.output)
+    print(json.dumps({k: results[k] for k in ("throughput_fps", "frame")}))
+    for name in STAGES:
+        print(f"{name:>14}: {json.dumps(results['stages'][name])}")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nCompared with {args.compare}:")
+        for line in compare_results(results, baseline):
+            print(f"  {line}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
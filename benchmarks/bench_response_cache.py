@@ -0,0 +1,278 @@
+"""
+Dashboard polling load test for the read-endpoint response cache.
+
+``--dashboards`` clients each poll the batch list, a facility's
+detections and the facility's processing metrics every ``--interval``
+seconds, revalidating with the ETag of their previous response. Meanwhile
+a writer stores a new batch every ``--write-interval`` seconds and a
+metrics row every ``--metrics-interval`` seconds, invalidating the
+cached responses as the pipeline would.
+
+Each cache setup is run against the same SQLite database:
+
+- ``uncached``: every poll queries the database (ETags still apply)
+- ``memory``: in-process LRU cache
+- ``redis``: Redis at ``--redis-url``, skipped when unreachable
+
+Reported per setup: polls per second, response latency percentiles,
+cache hit rate, share of 304 responses and database queries per poll.
+
+Usage:
+    python -m benchmarks.bench_response_cache --dashboards 20 --seconds 10
+"""
+
+import argparse
+import json
+import logging
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import environment, latency_summary, save_results
+from src.api.main import app
+from src.api.routes import get_response_cache, get_session_factory
+from src.common import cache
+from src.common.cache import Entry, MemoryCache, RedisCache, ResponseCache
+from src.common.config import settings
+from src.database.models import Base, Batch, Facility, PlasticDetection
+from src.database.persistence import save_detections, save_processing_metrics
+
+SETUPS = ("uncached", "memory", "redis")
+DETECTION = {"plastic_type": "PET", "confidence": 0.9, "bbox": [0, 0, 10, 10]}
+
+
+class CountingCache(ResponseCache):
+    """Counts lookups and hits of a wrapped cache."""
+
+    def __init__(self, inner: ResponseCache):
+        self.inner = inner
+        self.lookups = 0
+        self.hits = 0
+
+    def lookup(
+        self,
+        key: str,
+        namespaces: Sequence[str]
+    ) -> Tuple[Optional[Entry], Optional[List[int]]]:
+        entry, generations = self.inner.lookup(key, namespaces)
+        self.lookups += 1
+        self.hits += entry is not None
+        return entry, generations
+
+    def store(
+        self,
+        key: str,
+        generations: List[int],
+        entry: Entry,
+        ttl: float
+    ) -> None:
+        self.inner.store(key, generations, entry, ttl)
+
+    def invalidate(self, *namespaces: str) -> None:
+        self.inner.invalidate(*namespaces)
+
+
+def populate(url: str, batches: int, items: int) -> None:
+    """Fill the database with a facility and its batches."""
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Facility), [{"name": "F", "location": "L"}])
+        conn.execute(
+            insert(Batch),
+            [{"batch_id": f"B{i}", "facility_id": 1} for i in range(batches)],
+        )
+        conn.execute(
+            insert(PlasticDetection.__table__),
+            [
+                {
+                    "batch_id": i // items + 1, "plastic_type": "PET",
+                    "confidence": 0.9, "bbox_x1": 0, "bbox_y1": 0,
+                    "bbox_x2": 10, "bbox_y2": 10,
+                }
+                for i in range(batches * items)
+            ],
+        )
+    engine.dispose()
+
+
+def run_setup(
+    setup: str,
+    url: str,
+    args: argparse.Namespace
+) -> Optional[Dict[str, Any]]:
+    """Poll the endpoints with one cache setup while batches are written."""
+    if setup == "redis":
+        try:
+            backend: Optional[ResponseCache] = RedisCache.from_url(args.redis_url)
+        except Exception as e:
+            print(f"Skipping redis: {e}")
+            return None
+    else:
+        backend = MemoryCache() if setup == "memory" else None
+    counting = CountingCache(backend) if backend is not None else None
+
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    queries = 0
+
+    def count_query(*_: Any) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    factory = sessionmaker(bind=engine)
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    app.dependency_overrides[get_response_cache] = lambda: counting
+
+    prefix = settings.API_V1_PREFIX
+    paths = [
+        f"{prefix}/batches?limit=50",
+        f"{prefix}/detections?facility_id=1&limit=100",
+        f"{prefix}/facilities/1/metrics?limit=20",
+    ]
+    latencies: List[float] = []
+    statuses: List[int] = []
+    lock = threading.Lock()
+    stop = threading.Event()
+    start = time.perf_counter()
+    deadline = start + args.seconds
+
+    def dashboard(i: int) -> None:
+        client = TestClient(app)
+        etags: Dict[str, str] = {}
+        next_poll = start + args.interval * i / args.dashboards
+        while next_poll < deadline:
+            time.sleep(max(0.0, next_poll - time.perf_counter()))
+            for path in paths:
+                headers = {"If-None-Match": etags[path]} if path in etags else {}
+                sent = time.perf_counter()
+                response = client.get(path, headers=headers)
+                elapsed = time.perf_counter() - sent
+                etags[path] = response.headers["etag"]
+                with lock:
+                    latencies.append(elapsed)
+                    statuses.append(response.status_code)
+            next_poll += args.interval
+
+    def writer() -> None:
+        n = 0
+        last_metrics = time.perf_counter()
+        while not stop.wait(args.write_interval):
+            with factory() as db:
+                save_detections(
+                    db, f"{setup}-{n}", [DETECTION] * args.items, facility_id=1
+                )
+                if time.perf_counter() - last_metrics >= args.metrics_interval:
+                    snapshot = {
+                        "facility_id": "1", "throughput": 100.0,
+                        "accuracy": 0.9, "uptime": 1.0, "batches": 1,
+                    }
+                    save_processing_metrics(db, [snapshot])
+                    last_metrics = time.perf_counter()
+            n += 1
+
+    # Writes invalidate through the process-wide cache
+    shared, cache._cache = cache._cache, backend
+    configured, settings.RESPONSE_CACHE_BACKEND = (
+        settings.RESPONSE_CACHE_BACKEND, None if backend is None else setup
+    )
+    threads = [
+        threading.Thread(target=dashboard, args=(i,))
+        for i in range(args.dashboards)
+    ]
+    writer_thread = threading.Thread(target=writer)
+    try:
+        writer_thread.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        stop.set()
+        writer_thread.join()
+        cache._cache = shared
+        settings.RESPONSE_CACHE_BACKEND = configured
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "polls_per_s": len(latencies) / elapsed,
+        "latency": latency_summary(latencies),
+        "hit_rate": (
+            counting.hits / counting.lookups
+            if counting is not None and counting.lookups else None
+        ),
+        "not_modified": statuses.count(304) / len(statuses) if statuses else None,
+        "errors": sum(status >= 400 for status in statuses),
+        "db_queries_per_poll": queries / len(latencies) if latencies else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the load test and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dashboards", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="Seconds between polls of a dashboard")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-interval", type=float, default=1.0,
+                        help="Seconds between stored batches")
+    parser.add_argument("--metrics-interval", type=float,
+                        default=settings.METRICS_EXPORT_INTERVAL,
+                        help="Seconds between stored metrics rows")
+    parser.add_argument("--batches", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=20,
+                        help="Detections per batch")
+    parser.add_argument("--setups", nargs="+", choices=SETUPS,
+                        default=list(SETUPS))
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request
+
+    results: Dict[str, Any] = {
+        "benchmark": "response_cache",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+        "setups": {},
+    }
+    for setup in args.setups:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{tmp}/bench.db"
+            populate(url, args.batches, args.items)
+            run = run_setup(setup, url, args)
+        if run is not None:
+            results["setups"][setup] = run
+
+    path = save_results("response_cache", results, args.output)
+    print(json.dumps(
+        {
+            setup: {
+                "polls_per_s": run["polls_per_s"],
+                "p50_ms": run["latency"].get("p50_ms"),
+                "p99_ms": run["latency"].get("p99_ms"),
+                "hit_rate": run["hit_rate"],
+                "not_modified": run["not_modified"],
+                "db_queries_per_poll": run["db_queries_per_poll"],
+            }
+            for setup, run in results["setups"].items()
+        },
+        indent=2,
+    ))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
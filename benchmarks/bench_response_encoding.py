@@ -0,0 +1,81 @@
+"""
+Microbenchmark of ``ProcessBatchResponse`` encoding versus detection count.
+
+Compares the validated path (Pydantic model + ``jsonable_encoder`` +
+stdlib JSON, as FastAPI does for ``response_model``) with the direct
+``FastJSONResponse`` path used by ``/process-batch``.
+
+Usage:
+    python -m benchmarks.bench_response_encoding
+"""
+
+import argparse
+import json
+import random
+import timeit
+from datetime import datetime
+from typing import Any, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src.api.responses import FastJSONResponse, build_batch_response
+from src.api.schemas import ProcessBatchResponse
+
+PLASTIC_TYPES = ["PET", "HDPE", "PVC", "LDPE", "PP", "PS", "OTHER"]
+
+
+def _detections(count: int) -> List[Dict[str, Any]]:
+    """Generate classifier-style detections."""
+    rng = random.Random(0)
+    detections = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 600), rng.uniform(0, 600)
+        detections.append({
+            "plastic_type": rng.choice(PLASTIC_TYPES),
+            "confidence": rng.uniform(0.85, 1.0),
+            "bbox": [x, y, x + 40.0, y + 40.0],
+            "contamination_level": rng.random(),
+        })
+    return detections
+
+
+def validated(payload: Dict[str, Any]) -> bytes:
+    """Encode through response-model validation and stdlib JSON."""
+    model = ProcessBatchResponse(**payload)
+    return JSONResponse(jsonable_encoder(model)).body
+
+
+def direct(payload: Dict[str, Any]) -> bytes:
+    """Encode classifier output directly."""
+    return FastJSONResponse(payload).body
+
+
+def main() -> None:
+    """Time both paths for increasing detection counts."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[1, 10, 100, 500, 1000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for count in args.counts:
+        payload = build_batch_response(
+            _detections(count), "batch_001", "facility_001", datetime.utcnow()
+        )
+        number = max(1, 2000 // count)
+        row = {"detections": count}
+        for name, func in (("validated", validated), ("direct", direct)):
+            best = min(timeit.repeat(
+                lambda: func(payload), number=number, repeat=args.repeat
+            ))
+            row[f"{name}_us"] = best / number * 1e6
+        row["speedup"] = row["validated_us"] / row["direct_us"]
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Robot control service load test.
+
+A robot control server runs locally with ``--pick-ms`` simulated picks
+and ``--arms`` arm workers. Pick commands are sent to it in two ways:
+
+- ``connect-per-command``: a new connection and stream for every
+  command, as a client without a persistent stream would (limited to
+  ``--connect-commands`` commands)
+- ``window-<n>``: one persistent stream, with up to ``n`` commands
+  unacknowledged, for every ``--windows`` value
+
+Reported per mode: commands per second and the command round-trip
+latency seen by the client (send to acknowledgement).
+
+Usage:
+    python -m benchmarks.bench_robot_control --commands 5000 --windows 1 8 32
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import environment, latency_summary, save_results
+from src.common.config import settings
+from src.robotics.control_service import RobotControlClient, RobotControlServer
+
+DETECTION = {"plastic_type": "PET", "confidence": 0.93, "bbox": [120, 80, 180, 150]}
+
+
+def run_window(target: str, window: int, commands: int) -> Dict[str, Any]:
+    """Pipeline commands over one stream with a command window."""
+    latencies: List[float] = []
+    with RobotControlClient(target, window=window) as client:
+        start = time.perf_counter()
+        futures = []
+        for _ in range(commands):
+            sent = time.perf_counter()
+            future = client.submit(DETECTION)
+            future.add_done_callback(
+                lambda _, sent=sent: latencies.append(time.perf_counter() - sent)
+            )
+            futures.append(future)
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return {
+        "commands_per_s": commands / elapsed,
+        "latency": latency_summary(latencies),
+    }
+
+
+def run_connect_per_command(target: str, commands: int) -> Dict[str, Any]:
+    """Open a new connection for every command."""
+    latencies: List[float] = []
+    start = time.perf_counter()
+    for _ in range(commands):
+        sent = time.perf_counter()
+        with RobotControlClient(target, window=1) as client:
+            client.submit(DETECTION).result()
+        latencies.append(time.perf_counter() - sent)
+    elapsed = time.perf_counter() - start
+    return {
+        "commands_per_s": commands / elapsed,
+        "latency": latency_summary(latencies),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the load test and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=5000)
+    parser.add_argument("--connect-commands", type=int, default=200,
+                        help="Commands sent with a connection each")
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--pick-ms", type=float, default=0.0,
+                        help="Simulated pick duration")
+    parser.add_argument("--arms", type=int, default=4)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {
+        "benchmark": "robot_control",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+        "modes": {},
+    }
+
+    pick_duration, max_workers = settings.ROBOT_PICK_DURATION, settings.MAX_WORKERS
+    settings.ROBOT_PICK_DURATION = args.pick_ms / 1000
+    settings.MAX_WORKERS = args.arms
+    server = RobotControlServer(port=0).start()
+    try:
+        target = f"localhost:{server.port}"
+        results["modes"]["connect-per-command"] = run_connect_per_command(
+            target, args.connect_commands
+        )
+        for window in args.windows:
+            results["modes"][f"window-{window}"] = run_window(
+                target, window, args.commands
+            )
+    finally:
+        server.stop()
+        settings.ROBOT_PICK_DURATION = pick_duration
+        settings.MAX_WORKERS = max_workers
+
+    path = save_results("robot_control", results, args.output)
+    print(json.dumps(
+        {
+            mode: {
+                "commands_per_s": run["commands_per_s"],
+                "p50_ms": run["latency"]["p50_ms"],
+                "p99_ms": run["latency"]["p99_ms"],
+            }
+            for mode, run in results["modes"].items()
+        },
+        indent=2,
+    ))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
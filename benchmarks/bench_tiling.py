@@ -0,0 +1,117 @@
+"""
+Tiled versus resized inference on wide, high-resolution conveyor frames.
+
+Runs ``PlasticClassifier`` with the ``TinyDetector`` stand-in on synthetic
+frames full of small items, once resizing each frame to the model input
+and once with tiled inference, and reports throughput, recall (overall and
+for small items) and false positives.
+
+Usage:
+    python -m benchmarks.bench_tiling --frames 50
+    python -m benchmarks.bench_tiling --width 1920 --height 1080 --overlap 96
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.common import environment, latency_summary, save_results
+from benchmarks.synthetic import TinyDetector, match_truth, synthetic_frame
+from src.vision.plastic_classifier import PlasticClassifier
+
+MODES = ("resize", "tiled")
+
+
+def run_mode(
+    classifier: PlasticClassifier,
+    frames: List[Any],
+    small: int
+) -> Dict[str, Any]:
+    """Classify every frame and score the detections against the truth."""
+    times = []
+    found = small_found = small_total = total = false_positives = 0
+    for image, truth in frames:
+        start = time.perf_counter()
+        detections = classifier.classify_plastic(image)
+        times.append(time.perf_counter() - start)
+
+        matched, fp = match_truth(detections, truth)
+        false_positives += fp
+        total += len(truth)
+        found += sum(matched)
+        for item, hit in zip(truth, matched):
+            x1, y1, x2, y2 = item["bbox"]
+            if min(x2 - x1, y2 - y1) < small:
+                small_total += 1
+                small_found += hit
+
+    return {
+        "throughput_fps": len(frames) / sum(times),
+        "latency": latency_summary(times),
+        "recall": found / max(total, 1),
+        "small_recall": small_found / max(small_total, 1),
+        "false_positives": false_positives,
+        "items": total,
+        "small_items": small_total,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--width", type=int, default=3840)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--items", type=int, default=40)
+    parser.add_argument("--min-size", type=int, default=12)
+    parser.add_argument("--max-size", type=int, default=64)
+    parser.add_argument("--small", type=int, default=32,
+                        help="Items with a shorter side are counted as small")
+    parser.add_argument("--tile-size", type=int, default=640)
+    parser.add_argument("--overlap", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(args.seed)
+    frames = [
+        synthetic_frame(
+            rng, args.width, args.height, args.items,
+            args.min_size, args.max_size
+        )
+        for _ in range(args.frames)
+    ]
+
+    classifier = PlasticClassifier(model=TinyDetector(input_size=args.tile_size))
+    classifier.tile_size = args.tile_size
+    classifier.tile_overlap = args.overlap
+
+    results = {
+        "benchmark": "tiling",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    for mode in MODES:
+        classifier.tiled = mode == "tiled"
+        # One untimed frame so allocator warm-up is not attributed to a mode
+        classifier.classify_plastic(frames[0][0])
+        results[mode] = run_mode(classifier, frames, args.small)
+
+    path = save_results("tiling", results, args.output)
+    for mode in MODES:
+        summary = {k: v for k, v in results[mode].items() if k != "latency"}
+        print(f"{mode:>7}: {json.dumps(summary)}")
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
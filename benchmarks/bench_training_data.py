@@ -0,0 +1,136 @@
+"""
+Training data loading throughput in samples per second.
+
+A synthetic labelled dataset (JPEG frames plus YOLO label files) is
+loaded for ``--epochs`` epochs in three ways:
+
+- ``folder-serial``: decode, resize and augment in the training process
+- ``folder-workers``: the same, in ``--workers`` loader processes
+- ``cached-workers``: decode and resize once into a packed cache, then
+  read memory-mapped frames and augment in ``--workers`` processes
+
+The first epoch includes worker start-up; the last one shows the steady
+state. The one-off cache build time is reported separately.
+
+Usage:
+    python -m benchmarks.bench_training_data --images 256 --workers 4
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from benchmarks.common import environment, save_results
+from benchmarks.synthetic import PLASTIC_TYPES, synthetic_frame
+from src.vision.training_data import build_cache, make_loader
+
+MODES = ("folder-serial", "folder-workers", "cached-workers")
+
+
+def write_dataset(folder: Path, args: argparse.Namespace) -> Path:
+    """Write synthetic frames and YOLO labels to ``images``/``labels``."""
+    images, labels = folder / "images", folder / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir()
+    rng = np.random.default_rng(args.seed)
+    for i in range(args.images):
+        image, truth = synthetic_frame(rng, args.width, args.height)
+        cv2.imwrite(str(images / f"frame{i:05d}.jpg"), image)
+        rows = []
+        for item in truth:
+            x1, y1, x2, y2 = item["bbox"]
+            rows.append(
+                f"{PLASTIC_TYPES.index(item['plastic_type'])} "
+                f"{(x1 + x2) / 2 / args.width:.6f} "
+                f"{(y1 + y2) / 2 / args.height:.6f} "
+                f"{(x2 - x1) / args.width:.6f} {(y2 - y1) / args.height:.6f}"
+            )
+        (labels / f"frame{i:05d}.txt").write_text("\n".join(rows))
+    return images
+
+
+def run_mode(
+    mode: str,
+    images: Path,
+    cache_dir: Path,
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Iterate the loader for every epoch and time each one."""
+    loader = make_loader(
+        images,
+        batch_size=args.batch_size,
+        workers=0 if mode == "folder-serial" else args.workers,
+        image_size=args.size,
+        cache=mode == "cached-workers",
+        cache_dir=cache_dir,
+        seed=args.seed,
+    )
+    epochs = []
+    for _ in range(args.epochs):
+        samples = 0
+        start = time.perf_counter()
+        for batch, _ in loader:
+            samples += len(batch)
+        epochs.append(samples / (time.perf_counter() - start))
+    return {
+        "samples_per_s_first_epoch": epochs[0],
+        "samples_per_s": epochs[-1],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the benchmark and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=256)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--size", type=int, default=640,
+                        help="Training image side")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args(argv)
+
+    results = {
+        "benchmark": "training_data",
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "environment": environment(),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        images = write_dataset(Path(tmp) / "dataset", args)
+        cache_dir = Path(tmp) / "cache"
+
+        start = time.perf_counter()
+        build_cache(images, args.size, cache_dir)
+        results["cache_build_s"] = time.perf_counter() - start
+
+        for mode in MODES:
+            results[mode] = run_mode(mode, images, cache_dir, args)
+    results["speedup"] = (
+        results["cached-workers"]["samples_per_s"]
+        / results["folder-serial"]["samples_per_s"]
+    )
+
+    path = save_results("training_data", results, args.output)
+    print(json.dumps(
+        {key: results[key] for key in (*MODES, "cache_build_s", "speedup")},
+        indent=2,
+    ))
+    print(f"Results saved to {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
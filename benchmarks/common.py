@@ -0,0 +1,151 @@
+"""
+Shared helpers for benchmark result reporting.
+"""
+
+import json
+import os
+import platform
+import resource
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize latencies given in seconds.
+
+    Args:
+        samples: Latency samples in seconds
+
+    Returns:
+        Count, mean and p50/p95/p99/max in milliseconds
+    """
+    if not samples:
+        return {"count": 0}
+    ms = np.asarray(samples, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(ms.max()),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def process_memory_mb() -> Dict[str, float]:
+    """
+    Current memory of this process from ``/proc/self/smaps_rollup``.
+
+    Returns:
+        RSS, PSS (shared pages divided among the processes mapping them),
+        shared, private and anonymous (heap, not file-backed) memory in MB;
+        empty where ``/proc`` is missing
+    """
+    fields = {
+        "Rss": "rss_mb",
+        "Pss": "pss_mb",
+        "Shared_Clean": "shared_mb",
+        "Shared_Dirty": "shared_mb",
+        "Private_Clean": "private_mb",
+        "Private_Dirty": "private_mb",
+        "Anonymous": "anonymous_mb",
+    }
+    usage: Dict[str, float] = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in fields:
+                    key = fields[name]
+                    usage[key] = usage.get(key, 0.0) + int(rest.split()[0]) / 1024
+    except OSError:  # pragma: no cover - non-Linux
+        pass
+    return usage
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine the benchmark ran on."""
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        import torch
+
+        info["torch"] = torch.__version__
+        info["torch_threads"] = torch.get_num_threads()
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+    return info
+
+
+def save_results(
+    name: str,
+    results: Dict[str, Any],
+    output: Optional[Path] = None
+) -> Path:
+    """
+    Write results as JSON, by default to ``benchmarks/results``.
+
+    Args:
+        name: Benchmark name used in the default file name
+        results: JSON-serializable results
+        output: Explicit output path
+
+    Returns:
+        Path of the written file
+    """
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"{name}-{stamp}.json"
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    return output
+
+
+def compare_results(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    prefix: str = ""
+) -> List[str]:
+    """
+    Compare numeric fields of two result documents.
+
+    Args:
+        current: Results of this run
+        baseline: Results of an earlier run
+        prefix: Key path prefix used in recursion
+
+    Returns:
+        Lines of ``key: baseline -> current (change %)``
+    """
+    lines = []
+    for key, value in current.items():
+        if key not in baseline or key in ("config", "environment"):
+            continue
+        path = f"{prefix}{key}"
+        old = baseline[key]
+        if isinstance(value, dict) and isinstance(old, dict):
+            lines += compare_results(value, old, f"{path}.")
+        elif (
+            isinstance(value, (int, float))
+            and isinstance(old, (int, float))
+            and not isinstance(value, bool)
+        ):
+            change = (value - old) / old * 100 if old else float("inf")
+            lines.append(f"{path}: {old:.3f} -> {value:.3f} ({change:+.1f}%)")
+    return lines
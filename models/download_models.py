@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 
+import argparse
 import hashlib
+import json
+import mmap
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import requests
 from tqdm import tqdm
@@ -11,93 +16,235 @@ import yaml
 # Constants
 MODELS_DIR = Path(__file__).parent
 CONFIG_FILE = MODELS_DIR / "model_config.yml"
-CHUNK_SIZE = 8192
+HASH_CACHE_FILE = ".hash_cache.json"  # sidecar next to the models
+CHUNK_SIZE = 64 * 1024  # bytes per streamed write; at most this is lost on a drop
+HASH_BLOCK_SIZE = 16 * 1024 * 1024  # bytes hashed per update
+MAX_WORKERS = 4  # concurrent downloads
+RETRIES = 3  # attempts per file, each resuming where the last stopped
+RETRY_DELAY = 1.0  # seconds, multiplied by the attempt number
+TIMEOUT = 30  # seconds to connect / between received bytes
+
+
+def _update_hash(sha256_hash, file_path):
+    """Feed a file into a hash through a read-only memory map."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return sha256_hash
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for start in range(0, len(view), HASH_BLOCK_SIZE):
+                    sha256_hash.update(view[start:start + HASH_BLOCK_SIZE])
+            finally:
+                view.release()
+    return sha256_hash
+
 
 def calculate_sha256(file_path):
     """Calculate SHA256 hash of a file."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+    return _update_hash(hashlib.sha256(), file_path).hexdigest()
+
 
-def download_file(url, local_path, expected_hash=None):
-    """Download a file with progress bar and optional hash verification."""
+def load_hash_cache(models_dir):
+    """Load the sidecar cache of verified hashes, keyed by file name."""
     try:
-        response = requests.get(url, stream=True)
+        return json.loads((Path(models_dir) / HASH_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_hash_cache(models_dir, cache):
+    """Write the sidecar hash cache atomically."""
+    path = Path(models_dir) / HASH_CACHE_FILE
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(cache, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def _file_key(file_path):
+    """Size and modification time identifying a file's current contents."""
+    stat = Path(file_path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def cached_sha256(file_path, cache):
+    """
+    SHA256 of a file, hashed only if it changed since it was last hashed.
+
+    The cache entry is keyed by file name and is valid while the file's
+    size and modification time are unchanged.
+    """
+    file_path = Path(file_path)
+    key = _file_key(file_path)
+    entry = cache.get(file_path.name)
+    if entry and all(entry.get(k) == v for k, v in key.items()):
+        return entry["sha256"]
+
+    digest = calculate_sha256(file_path)
+    cache[file_path.name] = {**key, "sha256": digest}
+    return digest
+
+
+def _fetch(session, url, part_path, position):
+    """
+    Stream a URL into a partial file, resuming from its current size.
+
+    Bytes already on disk are hashed once; streamed data is hashed as it
+    arrives, so the complete file is never read back.
+
+    Returns:
+        SHA256 of the complete file, or None if it must be restarted
+    """
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with session.get(url, stream=True, headers=headers, timeout=TIMEOUT) as response:
+        if response.status_code == 416:
+            # Range starts at the end: the partial file is already complete
+            content_range = response.headers.get("content-range", "")
+            if content_range == f"bytes */{offset}":
+                return calculate_sha256(part_path)
+            part_path.unlink()
+            return None
         response.raise_for_status()
-        
-        total_size = int(response.headers.get('content-length', 0))
-        
-        with open(local_path, 'wb') as f, tqdm(
-            desc=local_path.name,
+
+        sha256_hash = hashlib.sha256()
+        if offset and response.status_code == 206:
+            _update_hash(sha256_hash, part_path)
+        else:
+            # Fresh download, or the server ignored the range
+            offset = 0
+        total_size = offset + int(response.headers.get('content-length', 0))
+
+        with open(part_path, "ab" if offset else "wb") as f, tqdm(
+            desc=part_path.name[:-len(".part")],
+            initial=offset,
             total=total_size,
             unit='iB',
             unit_scale=True,
             unit_divisor=1024,
+            position=position,
+            leave=False,
         ) as pbar:
             for data in response.iter_content(CHUNK_SIZE):
                 size = f.write(data)
+                sha256_hash.update(data)
                 pbar.update(size)
-        
-        if expected_hash:
-            actual_hash = calculate_sha256(local_path)
-            if actual_hash != expected_hash:
-                print(f"❌ Hash mismatch for {local_path}")
-                print(f"Expected: {expected_hash}")
-                print(f"Got: {actual_hash}")
-                os.remove(local_path)
-                return False
+    return sha256_hash.hexdigest()
+
+
+def download_file(url, local_path, expected_hash=None, cache=None, position=0):
+    """
+    Download a file with progress bar and optional hash verification.
+
+    Data goes to ``<name>.part``. A failed transfer is retried with an
+    HTTP Range request for the missing bytes, and a ``.part`` file left by
+    an earlier run is resumed the same way. The file is renamed into place
+    only once complete and verified.
+    """
+    local_path = Path(local_path)
+    part_path = local_path.with_name(local_path.name + ".part")
+    try:
+        actual_hash = None
+        with requests.Session() as session:
+            for attempt in range(RETRIES):
+                if attempt:
+                    time.sleep(RETRY_DELAY * attempt)
+                try:
+                    actual_hash = _fetch(session, url, part_path, position)
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as e:
+                    print(f"⚠️ {local_path.name}: {e}, resuming "
+                          f"(attempt {attempt + 1}/{RETRIES})")
+                    continue
+                if actual_hash:
+                    break
+        if not actual_hash:
+            print(f"❌ Giving up on {url} after {RETRIES} attempts")
+            return False
+
+        if expected_hash and actual_hash != expected_hash:
+            print(f"❌ Hash mismatch for {local_path}")
+            print(f"Expected: {expected_hash}")
+            print(f"Got: {actual_hash}")
+            os.remove(part_path)
+            return False
+
+        os.replace(part_path, local_path)
+        if cache is not None:
+            cache[local_path.name] = {**_file_key(local_path), "sha256": actual_hash}
         return True
     except Exception as e:
         print(f"❌ Error downloading {url}: {e}")
-        if local_path.exists():
-            os.remove(local_path)
         return False
 
-def main():
+
+def ensure_model(model_name, model_info, models_dir, cache, position=0):
+    """Verify a model if present, and download it if missing or corrupt."""
+    model_path = Path(models_dir) / model_name
+
+    if model_path.exists():
+        if 'sha256' in model_info:
+            current_hash = cached_sha256(model_path, cache)
+            if current_hash == model_info['sha256']:
+                print(f"✅ {model_name} already exists and hash matches")
+                return True
+        else:
+            print(f"⚠️ {model_name} exists but no hash to verify")
+            return True
+
+    print(f"📥 Downloading {model_name}...")
+    return download_file(
+        model_info['url'],
+        model_path,
+        model_info.get('sha256'),
+        cache,
+        position,
+    )
+
+
+def main(argv=None):
     """Main function to download and verify models."""
-    if not CONFIG_FILE.exists():
-        print(f"❌ Config file not found: {CONFIG_FILE}")
+    parser = argparse.ArgumentParser(description="Download and verify models")
+    parser.add_argument("--config", type=Path, default=CONFIG_FILE)
+    parser.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="Concurrent downloads")
+    args = parser.parse_args(argv)
+
+    if not args.config.exists():
+        print(f"❌ Config file not found: {args.config}")
         sys.exit(1)
-    
-    with open(CONFIG_FILE) as f:
+
+    with open(args.config) as f:
         config = yaml.safe_load(f)
-    
+
     models_to_download = config.get('models', {})
     if not models_to_download:
         print("❌ No models specified in config file")
         sys.exit(1)
-    
+
     print("🔄 Starting model downloads...")
-    success = True
-    
-    for model_name, model_info in models_to_download.items():
-        model_path = MODELS_DIR / model_name
-        
-        if model_path.exists():
-            if 'sha256' in model_info:
-                current_hash = calculate_sha256(model_path)
-                if current_hash == model_info['sha256']:
-                    print(f"✅ {model_name} already exists and hash matches")
-                    continue
-            else:
-                print(f"⚠️ {model_name} exists but no hash to verify")
-                continue
-        
-        print(f"\n📥 Downloading {model_name}...")
-        if not download_file(
-            model_info['url'],
-            model_path,
-            model_info.get('sha256')
-        ):
-            success = False
-    
-    if success:
+    args.models_dir.mkdir(parents=True, exist_ok=True)
+    cache = load_hash_cache(args.models_dir)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        results = list(pool.map(
+            lambda item: ensure_model(
+                item[1][0], item[1][1], args.models_dir, cache, item[0]
+            ),
+            enumerate(models_to_download.items()),
+        ))
+    # Drop entries for files that no longer exist
+    cache = {
+        name: entry for name, entry in cache.items()
+        if (args.models_dir / name).exists()
+    }
+    save_hash_cache(args.models_dir, cache)
+
+    if all(results):
         print("\n✅ All models downloaded and verified successfully!")
     else:
         print("\n❌ Some downloads failed. Please check the errors above.")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
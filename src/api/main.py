@@ -2,14 +2,18 @@
 Main FastAPI application module.
 """
 
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import logging
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, Optional
 
+from src.common import aggregation, metrics
 from src.common.config import settings
-from src.api.routes import router as api_router
+from src.api.routes import get_classifier, router as api_router
 
 # Configure logging
 logging.basicConfig(
@@ -18,10 +22,92 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+class ReadinessState:
+    """Tracks whether the service has finished warming up."""
+
+    def __init__(self):
+        """Initialize as not ready."""
+        self.reset()
+
+    def reset(self) -> None:
+        """Return to the not-ready state."""
+        self.ready = False
+        self.error: Optional[str] = None
+        self.warmup: Optional[Dict[str, Any]] = None
+
+    @property
+    def status(self) -> str:
+        """Short readiness status."""
+        if self.ready:
+            return "ready"
+        return "failed" if self.error else "starting"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Readiness fields reported by the health endpoints."""
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "warmup": self.warmup,
+        }
+
+
+readiness = ReadinessState()
+
+
+def load_classifier() -> Dict[str, Any]:
+    """Build the shared classifier and run the warm-up inferences."""
+    return get_classifier().warmup()
+
+
+async def warm_up() -> None:
+    """Load and warm up the classifier, then mark the service ready."""
+    try:
+        readiness.warmup = await run_in_threadpool(load_classifier)
+        readiness.ready = True
+    except Exception as e:
+        logger.error(f"Classifier warm-up failed: {e}")
+        readiness.error = str(e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Warm up the classifier in the background when ``PRELOAD_MODEL`` is set.
+
+    The server starts accepting requests immediately so liveness checks
+    pass while the model loads; ``/ready`` reports ready once warm-up ends.
+    Without preloading the classifier is built lazily and the service is
+    ready at once. With ``AGGREGATION_ENABLED`` the live facility stats
+    aggregator consumes the event bus until shutdown; it does not write
+    ``ProcessingMetrics``, which the standalone aggregator does.
+    """
+    readiness.reset()
+    task = None
+    if settings.PRELOAD_MODEL:
+        logger.info("Preloading classifier")
+        task = asyncio.create_task(warm_up())
+    else:
+        readiness.ready = True
+    aggregator = None
+    if settings.AGGREGATION_ENABLED:
+        if settings.EVENT_BUS_BACKEND == "local" and not settings.PUBLISH_EVENTS:
+            logger.warning(
+                "Live facility stats need PUBLISH_EVENTS with the local event bus"
+            )
+        aggregator = aggregation.shared_aggregator().start(interval=0)
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+    if aggregator is not None:
+        aggregator.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,6 +119,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route request latency
+if settings.ENABLE_METRICS:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -45,13 +135,35 @@ async def root() -> Dict[str, Any]:
 
 @app.get("/health")
 async def health_check() -> Dict[str, Any]:
-    """Health check endpoint."""
+    """Liveness endpoint, including warm-up and inference latency."""
     return {
         "status": "healthy",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        **readiness.to_dict()
     }
 
 
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """Readiness endpoint, 503 until the classifier has warmed up."""
+    return JSONResponse(
+        status_code=200 if readiness.ready else 503,
+        content={
+            "status": readiness.status,
+            **readiness.to_dict()
+        }
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint() -> Response:
+    """Prometheus metrics endpoint."""
+    return Response(
+        content=metrics.render_latest(),
+        media_type=metrics.CONTENT_TYPE_LATEST
+    )
+
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Global HTTP exception handler."""
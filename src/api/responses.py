@@ -0,0 +1,145 @@
+"""
+Fast response encoding for high-volume API endpoints.
+
+Detections produced by ``PlasticClassifier`` are already well-formed, so
+they are serialized directly with orjson instead of being re-validated
+through the Pydantic schemas. Without orjson the stdlib encoder is used.
+
+Polled read endpoints go through ``cached_response``, which serves the
+encoded body from the response cache and answers conditional requests
+with 304 Not Modified.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from src.common import metrics
+from src.common.cache import ResponseCache, etag_for
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Encode types the stdlib JSON encoder does not handle."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        # numpy scalars and arrays, without importing numpy here
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(
+            content,
+            default=_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(
+        content,
+        default=_default,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that skips validation and encodes with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        """Render content to bytes."""
+        return dumps(content)
+
+
+def build_batch_response(
+    detections: List[Dict[str, Any]],
+    batch_id: str,
+    facility_id: str,
+    timestamp: datetime
+) -> Dict[str, Any]:
+    """
+    Build a ``ProcessBatchResponse`` payload from classifier output.
+
+    Args:
+        detections: Detections as returned by ``classify_plastic``
+        batch_id: Batch identifier
+        facility_id: Facility identifier
+        timestamp: Processing timestamp
+
+    Returns:
+        Payload matching the ``ProcessBatchResponse`` schema
+    """
+    return {
+        "message": f"Processing {len(detections)} plastic items",
+        "batch_id": batch_id,
+        "detections": detections,
+        "timestamp": timestamp,
+        "facility_id": facility_id,
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def cached_response(
+    request: Request,
+    cache: Optional[ResponseCache],
+    namespaces: Sequence[str],
+    build: Callable[[], Any],
+    ttl: float
+) -> Response:
+    """
+    Serve a JSON response from the cache, building it on a miss.
+
+    Responses carry an ETag and ``Cache-Control: no-cache``, so clients
+    revalidate every poll and get an empty 304 while the data is
+    unchanged.
+
+    Args:
+        request: Incoming request; its path and query form the cache key
+        cache: Response cache, or None to always build
+        namespaces: Cache namespaces the response depends on
+        build: Returns the JSON-serializable content
+        ttl: Seconds the cached response is served
+
+    Returns:
+        The response, or 304 Not Modified
+    """
+    key = request.url.path
+    if request.query_params:
+        key += "?" + urlencode(sorted(request.query_params.multi_items()))
+
+    entry = generations = None
+    if cache is not None:
+        entry, generations = cache.lookup(key, namespaces)
+    if entry is not None:
+        metrics.RESPONSE_CACHE_HITS.inc()
+    else:
+        body = dumps(build())
+        entry = (etag_for(body), body)
+        if cache is not None:
+            metrics.RESPONSE_CACHE_MISSES.inc()
+            if generations is not None:
+                cache.store(key, generations, entry, ttl)
+
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        metrics.RESPONSE_NOT_MODIFIED.inc()
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,447 @@
+"""
+API routes for AI Circo Recycling System.
+"""
+
+import base64
+import binascii
+import uuid
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Optional,
+)
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.api.responses import (
+    FastJSONResponse,
+    build_batch_response,
+    cached_response,
+)
+from src.api.schemas import (
+    BatchPage,
+    DetectionPage,
+    LiveFacilityStats,
+    ModelActivateRequest,
+    ModelStatus,
+    ProcessBatchRequest,
+    ProcessBatchResponse,
+    ProcessingMetricsRecord,
+)
+from src.common import aggregation, cache, events
+from src.common.config import settings
+from src.common.security import get_current_user
+from src.common.tracing import tracer
+from src.database import queries
+from src.database.connection import SessionLocal
+
+if TYPE_CHECKING:
+    import numpy as np
+
+router = APIRouter()
+
+_model_manager = None
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def get_session_factory() -> Callable[[], Session]:
+    """Return the factory used to open database sessions."""
+    return SessionLocal
+
+
+def get_session(
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+) -> Generator[Session, None, None]:
+    """Yield a request-scoped database session."""
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_model_manager() -> Any:
+    """
+    Return the shared model manager, loading the served model on first use.
+
+    The vision stack (torch, OpenCV) is imported here rather than at module
+    level so the API starts without it; set ``PRELOAD_MODEL`` to load the
+    model during startup instead of on the first request.
+    """
+    global _model_manager
+    if _model_manager is None:
+        from src.vision.registry import ModelManager
+
+        _model_manager = ModelManager.from_settings()
+    return _model_manager
+
+
+def get_classifier() -> Any:
+    """
+    Return the shared plastic classifier.
+
+    This is the model manager, which forwards each call to the model
+    version active when the call starts.
+    """
+    return get_model_manager()
+
+
+def get_response_cache() -> Optional[cache.ResponseCache]:
+    """Return the process-wide response cache, or None when disabled."""
+    return cache.response_cache()
+
+
+def get_aggregator() -> aggregation.FacilityAggregator:
+    """Return the process-wide live statistics aggregator."""
+    return aggregation.shared_aggregator()
+
+
+def decode_image(image_data: str) -> "np.ndarray":
+    """
+    Decode a base64 (optionally data-URL) encoded image.
+
+    Args:
+        image_data: Encoded image
+
+    Returns:
+        Decoded BGR image
+
+    Raises:
+        ValueError: If the data is not a decodable image
+    """
+    import cv2
+    import numpy as np
+
+    if image_data.startswith("data:"):
+        image_data = image_data.split(",", 1)[-1]
+    try:
+        raw = base64.b64decode(image_data, validate=True)
+    except binascii.Error as e:
+        raise ValueError("Image data is not valid base64") from e
+    image = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Image data could not be decoded")
+    return image
+
+
+def _bad_cursor(e: ValueError) -> HTTPException:
+    """Build the error returned for malformed cursors."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=str(e)
+    )
+
+
+@router.post(
+    "/process-batch",
+    response_model=ProcessBatchResponse,
+    response_class=FastJSONResponse,
+)
+def process_batch(
+    request: ProcessBatchRequest,
+    classifier: Any = Depends(get_classifier)
+) -> FastJSONResponse:
+    """Classify the plastic items in one conveyor image."""
+    batch_id = request.batch_id or uuid.uuid4().hex
+    with tracer.frame(batch_id):
+        try:
+            with tracer.span("decode"):
+                image = decode_image(request.image_data)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        detections = classifier.classify_plastic(image)
+        for detection in detections:
+            detection["contamination_level"] = (
+                classifier.get_contamination_level(image, detection["bbox"])
+            )
+
+    response = build_batch_response(
+        detections,
+        batch_id=batch_id,
+        facility_id=request.facility_id,
+        timestamp=datetime.utcnow(),
+    )
+    if settings.PUBLISH_EVENTS:
+        # Robot control and persistence consume this asynchronously
+        events.publish(events.DETECTIONS, response, key=request.facility_id)
+
+    # Classifier output already matches the schema, so it is encoded
+    # directly instead of being re-validated by the response model.
+    return FastJSONResponse(response)
+
+
+@router.get("/batches", response_model=BatchPage)
+def list_batches(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    facility_id: Optional[int] = None,
+    db: Session = Depends(get_session),
+    response_cache: Optional[cache.ResponseCache] = Depends(get_response_cache)
+) -> Response:
+    """List batches using cursor pagination."""
+    def build() -> Dict[str, Any]:
+        try:
+            items, next_cursor = queries.list_batches(
+                db, limit=limit, cursor=cursor, facility_id=facility_id
+            )
+        except ValueError as e:
+            raise _bad_cursor(e)
+        return BatchPage.model_validate(
+            {"items": items, "next_cursor": next_cursor}, from_attributes=True
+        ).model_dump(mode="json")
+
+    return cached_response(
+        request, response_cache, [cache.BATCHES], build,
+        settings.RESPONSE_CACHE_TTL,
+    )
+
+
+@router.get("/detections", response_model=DetectionPage)
+def list_detections(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    batch_id: Optional[int] = None,
+    facility_id: Optional[int] = None,
+    plastic_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: Session = Depends(get_session),
+    response_cache: Optional[cache.ResponseCache] = Depends(get_response_cache)
+) -> Response:
+    """List detections using cursor pagination."""
+    def build() -> Dict[str, Any]:
+        try:
+            items, next_cursor = queries.list_detections(
+                db,
+                limit=limit,
+                cursor=cursor,
+                batch_id=batch_id,
+                facility_id=facility_id,
+                plastic_type=plastic_type,
+                since=since,
+                until=until,
+            )
+        except ValueError as e:
+            raise _bad_cursor(e)
+        return DetectionPage(
+            items=items, next_cursor=next_cursor
+        ).model_dump(mode="json")
+
+    return cached_response(
+        request, response_cache, [cache.BATCHES], build,
+        settings.RESPONSE_CACHE_TTL,
+    )
+
+
+@router.get(
+    "/facilities/{facility_id}/metrics",
+    response_model=List[ProcessingMetricsRecord],
+)
+def list_processing_metrics(
+    request: Request,
+    facility_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_session),
+    response_cache: Optional[cache.ResponseCache] = Depends(get_response_cache)
+) -> Response:
+    """A facility's most recent processing metrics, newest first."""
+    def build() -> List[Dict[str, Any]]:
+        rows = queries.list_processing_metrics(
+            db, facility_id, limit=limit, since=since
+        )
+        return [
+            ProcessingMetricsRecord.model_validate(row).model_dump(mode="json")
+            for row in rows
+        ]
+
+    # New rows arrive every METRICS_EXPORT_INTERVAL at most
+    return cached_response(
+        request, response_cache, [cache.METRICS], build,
+        settings.METRICS_EXPORT_INTERVAL,
+    )
+
+
+@router.get("/detections/export")
+def export_detections(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    batch_id: Optional[int] = None,
+    facility_id: Optional[int] = None,
+    plastic_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_factory: Callable[[], Session] = Depends(get_session_factory)
+) -> StreamingResponse:
+    """Stream all matching detections as NDJSON or CSV."""
+    filters = {
+        "batch_id": batch_id,
+        "facility_id": facility_id,
+        "plastic_type": plastic_type,
+        "since": since,
+        "until": until,
+    }
+    exporter = queries.export_csv if format == "csv" else queries.export_ndjson
+
+    def stream() -> Iterator[bytes]:
+        # The session must outlive the handler, so it is owned here.
+        db = session_factory()
+        try:
+            yield from exporter(db, **filters)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f"attachment; filename=detections.{format}"
+        },
+    )
+
+
+@router.get("/stats/live", response_model=List[LiveFacilityStats])
+def live_stats(
+    aggregator: aggregation.FacilityAggregator = Depends(get_aggregator)
+) -> List[Dict[str, Any]]:
+    """Live statistics of every facility, from memory."""
+    return aggregator.snapshot()
+
+
+@router.get(
+    "/facilities/{facility_id}/stats/live",
+    response_model=LiveFacilityStats,
+)
+def facility_live_stats(
+    facility_id: str,
+    aggregator: aggregation.FacilityAggregator = Depends(get_aggregator)
+) -> Dict[str, Any]:
+    """Live statistics of one facility, from memory."""
+    snapshot = aggregator.snapshot(facility_id)
+    if not snapshot:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No recent events from facility {facility_id}"
+        )
+    return snapshot[0]
+
+
+def _model_status(manager: Any) -> Dict[str, Any]:
+    """Served model state plus the registered versions."""
+    return {
+        **manager.status(),
+        "versions": [entry.to_dict() for entry in manager.registry.versions()],
+    }
+
+
+@router.get("/models", response_model=ModelStatus)
+def get_models(
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Show the served model version and the registered versions."""
+    return _model_status(manager)
+
+
+@router.post(
+    "/models/activate",
+    response_model=ModelStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def activate_model(
+    request: ModelActivateRequest,
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Load, verify and warm up a version in the background, then swap it in.
+
+    Frames keep being classified by the current version until the swap;
+    poll ``GET /models`` for the outcome.
+    """
+    try:
+        manager.load_async(request.version)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _model_status(manager)
+
+
+@router.post("/models/rollback", response_model=ModelStatus)
+def rollback_model(
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Switch back to the previously served version."""
+    try:
+        manager.rollback()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return _model_status(manager)
+
+
+@router.get("/models/shadow")
+def get_shadow(
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Report on the candidate model running in shadow."""
+    if manager.shadow is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No shadow evaluation running"
+        )
+    return manager.shadow.report()
+
+
+@router.post("/models/shadow", status_code=status.HTTP_202_ACCEPTED)
+def start_shadow(
+    request: ModelActivateRequest,
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Load a candidate version in the background and evaluate it in shadow.
+
+    A sampled fraction of live frames is classified again by the candidate
+    and compared with production; its detections are never used for
+    sorting.
+    """
+    try:
+        manager.start_shadow(request.version)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return {"status": "loading", "candidate": request.version}
+
+
+@router.delete("/models/shadow")
+def stop_shadow(
+    manager: Any = Depends(get_model_manager),
+    user: Dict[str, Any] = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """Stop shadow evaluation and return its final report."""
+    report = manager.stop_shadow()
+    if report is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No shadow evaluation running"
+        )
+    return report
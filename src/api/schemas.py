@@ -162,6 +162,173 @@ class ProcessingMetricsResponse(ProcessingMetricsCreate):
     timestamp: datetime = Field(..., description="Recording timestamp")
 
 
+class ProcessingMetricsRecord(BaseModel):
+    """Schema for stored processing metrics."""
+
+    id: int = Field(..., description="Metrics record ID")
+    facility_id: int = Field(..., description="Facility ID")
+    timestamp: datetime = Field(..., description="Recording timestamp")
+    throughput: Optional[float] = Field(
+        None,
+        description="Items processed per minute"
+    )
+    accuracy: Optional[float] = Field(
+        None,
+        description="Detection accuracy (0-1)"
+    )
+    uptime: Optional[float] = Field(
+        None,
+        description="System uptime percentage (0-1)"
+    )
+    energy_consumption: Optional[float] = Field(
+        None,
+        description="Energy consumption in kWh, if measured"
+    )
+    maintenance_status: Optional[str] = Field(
+        None,
+        description="System maintenance status"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class LiveFacilityStats(BaseModel):
+    """Schema for live statistics of a facility over a sliding window."""
+
+    facility_id: str = Field(..., description="Processing facility identifier")
+    window_s: float = Field(..., description="Window length in seconds")
+    batches: int = Field(..., description="Batches classified in the window")
+    items: int = Field(..., description="Items detected in the window")
+    plastic_types: Dict[str, int] = Field(
+        ...,
+        description="Items detected per plastic type"
+    )
+    throughput: float = Field(..., description="Items processed per minute")
+    accuracy: Optional[float] = Field(
+        None,
+        description="Mean detection confidence (0-1)"
+    )
+    uptime: float = Field(
+        ...,
+        description="Fraction of the window with batches processed (0-1)"
+    )
+    sorts: int = Field(..., description="Pick commands completed in the window")
+    sort_success_rate: Optional[float] = Field(
+        None,
+        description="Fraction of pick commands that succeeded"
+    )
+    sort_latency_ms: Optional[float] = Field(
+        None,
+        description="Mean pick command latency"
+    )
+    last_event: Optional[datetime] = Field(
+        None,
+        description="Time of the latest event"
+    )
+
+
+class BatchRecord(BaseModel):
+    """Schema for a stored processing batch."""
+
+    id: int = Field(..., description="Batch database ID")
+    batch_id: str = Field(
+        ...,
+        description="Unique batch identifier",
+        example="batch_001"
+    )
+    facility_id: Optional[int] = Field(None, description="Facility ID")
+    timestamp: datetime = Field(..., description="Batch timestamp")
+    total_items: Optional[int] = Field(None, description="Items in the batch")
+    total_weight: Optional[float] = Field(
+        None,
+        description="Batch weight in kg"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class DetectionRecord(BaseModel):
+    """Schema for a stored plastic detection."""
+
+    id: int = Field(..., description="Detection ID")
+    batch_id: Optional[int] = Field(None, description="Batch database ID")
+    plastic_type: str = Field(..., description="Type of plastic detected")
+    confidence: float = Field(..., description="Detection confidence score")
+    bbox: Optional[List[float]] = Field(
+        None,
+        description="Bounding box coordinates [x1, y1, x2, y2]"
+    )
+    contamination_level: Optional[float] = Field(
+        None,
+        description="Estimated contamination level (0-1)"
+    )
+    timestamp: datetime = Field(..., description="Detection timestamp")
+
+
+class BatchPage(BaseModel):
+    """Schema for a page of batches."""
+
+    items: List[BatchRecord] = Field(..., description="Batches on this page")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, null on the last page"
+    )
+
+
+class DetectionPage(BaseModel):
+    """Schema for a page of detections."""
+
+    items: List[DetectionRecord] = Field(
+        ...,
+        description="Detections on this page"
+    )
+    next_cursor: Optional[str] = Field(
+        None,
+        description="Cursor for the next page, null on the last page"
+    )
+
+
+class ModelVersionRecord(BaseModel):
+    """Schema for a registered model version."""
+
+    name: str = Field(..., description="Checkpoint file name")
+    version: Optional[str] = Field(None, description="Version string")
+    sha256: Optional[str] = Field(None, description="Registered checkpoint hash")
+    description: Optional[str] = Field(None, description="Model description")
+    available: bool = Field(..., description="Whether the checkpoint is on disk")
+
+
+class ModelStatus(BaseModel):
+    """Schema for the served model and the registry."""
+
+    active: Optional[str] = Field(None, description="Version serving traffic")
+    previous: List[str] = Field(
+        ...,
+        description="Loaded versions available for rollback, oldest first"
+    )
+    loading: Optional[str] = Field(None, description="Version being loaded")
+    error: Optional[str] = Field(None, description="Last load failure")
+    swaps: int = Field(..., description="Swaps and rollbacks so far")
+    shadow: Optional[str] = Field(
+        None,
+        description="Candidate version evaluated in shadow"
+    )
+    versions: List[ModelVersionRecord] = Field(
+        ...,
+        description="Registered versions"
+    )
+
+
+class ModelActivateRequest(BaseModel):
+    """Schema for switching the served model version."""
+
+    version: str = Field(
+        ...,
+        description="Registered version string or checkpoint file name",
+        example="11.0.0"
+    )
+
+
 class ErrorResponse(BaseModel):
     """Schema for error responses."""
 
@@ -0,0 +1,419 @@
+"""
+Live per-facility statistics from the event bus.
+
+A ``FacilityAggregator`` consumes the detections and sort-results topics
+and keeps, per facility, sliding-window counters of items (overall and
+per plastic type), batches, detection confidence and sort outcomes. The
+live stats API reads them from memory, and every
+``METRICS_EXPORT_INTERVAL`` seconds a ``ProcessingMetrics`` row is
+written per facility, so nothing computes throughput by querying raw
+detections.
+
+Windows are ring buffers of fixed-width time buckets holding a count and
+a sum, with running totals of both. Recording an event touches one
+bucket; buckets that slide out of the window are cleared and subtracted
+from the totals as time moves past them, so updates and reads cost O(1)
+amortized whatever the event rate.
+
+Events are placed by their creation timestamp, not their arrival, so a
+redelivery after a consumer restart lands where it belongs or is ignored
+when older than the window.
+
+Every aggregator consumes in its own consumer group, named after
+``AGGREGATION_GROUP`` and ``AGGREGATION_REPLICA_ID`` (the host name by
+default), so each API replica running one (with ``AGGREGATION_ENABLED``)
+sees the events of every facility rather than the share of partitions a
+common group would assign it. Set the replica id to something that
+survives restarts, such as the StatefulSet pod name, so a restarted
+replica resumes its group instead of leaving an abandoned one behind. A
+new group starts at the latest events: the windows only cover the last
+few minutes, so replaying the retained topic would be wasted work. API replicas only
+serve the windows from memory; run one standalone aggregator,
+``python -m src.common.aggregation``, to write the ``ProcessingMetrics``
+rows, since every replica would otherwise write the same ones.
+"""
+
+import logging
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.common import events
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def consumer_group() -> str:
+    """Consumer group of this process's aggregator, unique per replica."""
+    replica = settings.AGGREGATION_REPLICA_ID or socket.gethostname()
+    return f"{settings.AGGREGATION_GROUP}-{replica}"
+
+
+class SlidingWindow:
+    """Count and sum of values over a sliding time window."""
+
+    __slots__ = (
+        "bucket_s", "size", "counts", "sums", "head", "count", "total", "active"
+    )
+
+    def __init__(self, window_s: float, bucket_s: float = 1.0):
+        """
+        Initialize an empty window.
+
+        Args:
+            window_s: Window length in seconds
+            bucket_s: Bucket width in seconds, the window's resolution
+        """
+        self.bucket_s = bucket_s
+        self.size = max(1, round(window_s / bucket_s))
+        self.counts = [0] * self.size
+        self.sums = [0.0] * self.size
+        self.head: Optional[int] = None  # newest bucket number
+        self.count = 0
+        self.total = 0.0
+        self.active = 0  # buckets with a non-zero count
+
+    def bucket(self, at: float) -> int:
+        """Bucket number of an epoch time."""
+        return int(at // self.bucket_s)
+
+    def advance(self, bucket: int) -> None:
+        """Slide the window so that ``bucket`` is its newest bucket."""
+        if self.head is None:
+            self.head = bucket
+            return
+        steps = min(bucket - self.head, self.size)
+        for step in range(1, steps + 1):
+            slot = (self.head + step) % self.size
+            if self.counts[slot]:
+                self.count -= self.counts[slot]
+                self.total -= self.sums[slot]
+                self.active -= 1
+                self.counts[slot] = 0
+                self.sums[slot] = 0.0
+        if bucket > self.head:
+            self.head = bucket
+        if not self.count:
+            self.total = 0.0  # drop accumulated rounding error
+
+    def add(self, at: float, count: int = 1, value: float = 0.0) -> bool:
+        """
+        Record ``count`` occurrences whose values add up to ``value``.
+
+        Args:
+            at: Epoch time of the occurrences
+            count: Occurrences
+            value: Sum of their values, e.g. confidences
+
+        Returns:
+            False if ``at`` is older than the window and was ignored
+        """
+        bucket = self.bucket(at)
+        self.advance(bucket)
+        if bucket <= self.head - self.size:
+            return False
+        slot = bucket % self.size
+        if count and not self.counts[slot]:
+            self.active += 1
+        self.counts[slot] += count
+        self.sums[slot] += value
+        self.count += count
+        self.total += value
+        return True
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Mean value per occurrence in the window."""
+        return self.total / self.count if self.count else None
+
+
+class FacilityStats:
+    """Sliding windows of one facility."""
+
+    def __init__(self, facility_id: str, window_s: float, bucket_s: float):
+        """
+        Initialize empty windows.
+
+        Args:
+            facility_id: Facility identifier used by the API
+            window_s: Window length in seconds
+            bucket_s: Bucket width in seconds
+        """
+        self.facility_id = facility_id
+        self.window_s = window_s
+        self.bucket_s = bucket_s
+        self.items = SlidingWindow(window_s, bucket_s)  # values: confidences
+        self.batches = SlidingWindow(window_s, bucket_s)
+        self.types: Dict[str, SlidingWindow] = {}
+        self.sorts = SlidingWindow(window_s, bucket_s)  # values: 1 if sorted
+        self.sort_latency = SlidingWindow(window_s, bucket_s)  # values: ms
+        self.first_bucket: Optional[int] = None
+        self.last_event: Optional[float] = None
+
+    def _seen(self, at: float) -> None:
+        bucket = self.items.bucket(at)
+        if self.first_bucket is None or bucket < self.first_bucket:
+            self.first_bucket = bucket
+        if self.last_event is None or at > self.last_event:
+            self.last_event = at
+
+    def add_batch(self, at: float, detections: List[Dict[str, Any]]) -> None:
+        """Record a classified batch and its detections."""
+        if not self.batches.add(at):
+            return
+        self._seen(at)
+        confidence = 0.0
+        per_type: Dict[str, int] = {}
+        for detection in detections:
+            confidence += detection.get("confidence", 0.0)
+            plastic_type = detection.get("plastic_type", "unknown")
+            per_type[plastic_type] = per_type.get(plastic_type, 0) + 1
+        self.items.add(at, len(detections), confidence)
+        for plastic_type, n in per_type.items():
+            window = self.types.get(plastic_type)
+            if window is None:
+                window = self.types[plastic_type] = SlidingWindow(
+                    self.window_s, self.bucket_s
+                )
+            window.add(at, n)
+
+    def add_sort(self, at: float, ok: bool, latency_ms: Optional[float]) -> None:
+        """Record the outcome of one pick command."""
+        if not self.sorts.add(at, 1, 1.0 if ok else 0.0):
+            return
+        self._seen(at)
+        if latency_ms is not None:
+            self.sort_latency.add(at, 1, latency_ms)
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        """
+        Statistics over the window ending at ``now``.
+
+        Throughput and uptime are taken over the part of the window since
+        the facility's first event, so a facility that just started is
+        not diluted by time it was not running. Accuracy is the mean
+        confidence of the detections, as ground truth is not known online.
+        """
+        bucket = self.items.bucket(now)
+        windows = [self.items, self.batches, self.sorts, self.sort_latency]
+        for window in windows + list(self.types.values()):
+            window.advance(bucket)
+        elapsed = 0
+        if self.first_bucket is not None:
+            elapsed = min(max(bucket - self.first_bucket + 1, 1), self.items.size)
+        minutes = elapsed * self.bucket_s / 60
+        return {
+            "facility_id": self.facility_id,
+            "window_s": self.items.size * self.bucket_s,
+            "batches": self.batches.count,
+            "items": self.items.count,
+            "plastic_types": {
+                plastic_type: window.count
+                for plastic_type, window in sorted(self.types.items())
+                if window.count
+            },
+            "throughput": self.items.count / minutes if minutes else 0.0,
+            "accuracy": self.items.mean,
+            "uptime": self.batches.active / elapsed if elapsed else 0.0,
+            "sorts": self.sorts.count,
+            "sort_success_rate": self.sorts.mean,
+            "sort_latency_ms": self.sort_latency.mean,
+            "last_event": (
+                datetime.utcfromtimestamp(self.last_event)
+                if self.last_event is not None else None
+            ),
+        }
+
+
+class FacilityAggregator:
+    """Consumes detection and sort events into per-facility windows."""
+
+    def __init__(
+        self,
+        window_s: Optional[float] = None,
+        bucket_s: Optional[float] = None
+    ):
+        """
+        Initialize the aggregator; call ``start`` to consume the bus.
+
+        Args:
+            window_s: Window length in seconds, defaults to
+                ``settings.AGGREGATION_WINDOW``
+            bucket_s: Bucket width in seconds, defaults to
+                ``settings.AGGREGATION_BUCKET``
+        """
+        self.window_s = window_s or settings.AGGREGATION_WINDOW
+        self.bucket_s = bucket_s or settings.AGGREGATION_BUCKET
+        self.facilities: Dict[str, FacilityStats] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _facility(self, facility_id: str) -> FacilityStats:
+        stats = self.facilities.get(facility_id)
+        if stats is None:
+            stats = self.facilities[facility_id] = FacilityStats(
+                facility_id, self.window_s, self.bucket_s
+            )
+        return stats
+
+    def handle(self, event: events.Event) -> None:
+        """Record one event; events of other topics are ignored."""
+        payload = event.payload
+        facility_id = payload.get("facility_id")
+        if facility_id is None:
+            return
+        facility_id = str(facility_id)
+        with self._lock:
+            if event.topic == events.DETECTIONS:
+                self._facility(facility_id).add_batch(
+                    event.timestamp, payload.get("detections", [])
+                )
+            elif event.topic == events.SORT_RESULTS:
+                self._facility(facility_id).add_sort(
+                    event.timestamp, bool(payload.get("ok")),
+                    payload.get("latency_ms"),
+                )
+
+    def snapshot(
+        self,
+        facility_id: Optional[str] = None,
+        now: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Current statistics of every facility, or of one.
+
+        Args:
+            facility_id: Only report this facility
+            now: Epoch time the windows end at, defaults to now
+
+        Returns:
+            One snapshot per facility, ordered by facility id
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if facility_id is not None:
+                stats = self.facilities.get(facility_id)
+                return [stats.snapshot(now)] if stats is not None else []
+            return [
+                self.facilities[key].snapshot(now)
+                for key in sorted(self.facilities)
+            ]
+
+    def persist(
+        self,
+        session_factory: Callable[[], Session],
+        now: Optional[float] = None
+    ) -> int:
+        """
+        Write a ``ProcessingMetrics`` row per facility with recent activity.
+
+        Facilities whose API identifier has no database id are skipped.
+
+        Args:
+            session_factory: Opens the database session
+            now: Epoch time the windows end at, defaults to now
+
+        Returns:
+            Rows written
+        """
+        from src.database.persistence import save_processing_metrics
+
+        snapshots = [s for s in self.snapshot(now=now) if s["batches"] or s["sorts"]]
+        if not snapshots:
+            return 0
+        timestamp = datetime.utcfromtimestamp(time.time() if now is None else now)
+        with session_factory() as db:
+            return save_processing_metrics(db, snapshots, timestamp)
+
+    def start(
+        self,
+        bus: Optional[events.EventBus] = None,
+        session_factory: Optional[Callable[[], Session]] = None,
+        interval: Optional[float] = None
+    ) -> "FacilityAggregator":
+        """
+        Consume the event bus and persist metrics in background threads.
+
+        Args:
+            bus: Event bus, defaults to the process-wide one
+            session_factory: Opens database sessions, defaults to
+                ``SessionLocal``
+            interval: Seconds between persisted rows, defaults to
+                ``settings.METRICS_EXPORT_INTERVAL``; 0 disables them
+        """
+        if session_factory is None:
+            from src.database.connection import SessionLocal
+
+            session_factory = SessionLocal
+        interval = settings.METRICS_EXPORT_INTERVAL if interval is None else interval
+        bus = bus or events.get_event_bus()
+        consumer = bus.consumer(
+            [events.DETECTIONS, events.SORT_RESULTS],
+            consumer_group(),
+            offset_reset="latest",
+        )
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(
+                target=events.run_consumer,
+                args=(consumer, self.handle, self._stop),
+                name="aggregation-consumer",
+                daemon=True,
+            )
+        ]
+        if interval:
+            self._threads.append(threading.Thread(
+                target=self._persist_loop,
+                args=(session_factory, interval),
+                name="aggregation-persist",
+                daemon=True,
+            ))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def _persist_loop(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float
+    ) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.persist(session_factory)
+            except Exception as e:
+                logger.error(f"Persisting processing metrics failed: {e}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop consuming and persisting."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+_shared: Optional[FacilityAggregator] = None
+_shared_lock = threading.Lock()
+
+
+def shared_aggregator() -> FacilityAggregator:
+    """Process-wide aggregator configured from ``settings``."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FacilityAggregator()
+        return _shared
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    aggregator = shared_aggregator().start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        aggregator.stop()
@@ -0,0 +1,288 @@
+"""
+Response cache for read-heavy API endpoints.
+
+Dashboards poll the batch, detection and metrics endpoints every few
+seconds while the data behind them changes on a known cadence (new
+batches as they are processed, metrics every
+``METRICS_EXPORT_INTERVAL``). Encoded responses are cached per URL so a
+poll costs a cache lookup instead of a database query.
+
+Invalidation uses generations: every cached response belongs to one or
+more namespaces (``BATCHES``, ``METRICS``), and writers bump a
+namespace's generation counter instead of deleting keys. An entry stores
+the generations it was built at and is stale once any of them moved, so
+a write invalidates every page and filter of a namespace at once. The
+generations read before building a response are the ones stored with
+it, so a write that races with the build still invalidates the entry.
+
+Two backends share one interface:
+
+- ``RedisCache`` keeps entries and generations in the Redis server at
+  ``REDIS_URL``, shared by every API replica and by the event consumers
+  that write batches. A lookup is one ``MGET`` of the generations and
+  the entry. Redis errors are treated as misses, so an outage degrades
+  to uncached responses rather than failures.
+- ``MemoryCache`` is a bounded LRU in the process, used when Redis is
+  not configured or unreachable. Writes in other processes do not reach
+  its generations, so there entries go stale only when their TTL ends.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.common import metrics
+from src.common.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Namespaces invalidated by writes
+BATCHES = "batches"  # batches and their detections
+METRICS = "metrics"  # processing metrics
+
+# (etag, body) of a cached response
+Entry = Tuple[str, bytes]
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag of an encoded response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache(ABC):
+    """Cache of encoded responses invalidated by namespace generations."""
+
+    @abstractmethod
+    def lookup(
+        self,
+        key: str,
+        namespaces: Sequence[str]
+    ) -> Tuple[Optional[Entry], Optional[List[int]]]:
+        """
+        Fetch a response and the current generations of its namespaces.
+
+        Args:
+            key: Cache key of the response
+            namespaces: Namespaces the response depends on
+
+        Returns:
+            The entry if cached and current (else None), and the
+            generations to store a rebuilt entry with (None if the
+            backend failed and nothing should be stored)
+        """
+
+    @abstractmethod
+    def store(
+        self,
+        key: str,
+        generations: List[int],
+        entry: Entry,
+        ttl: float
+    ) -> None:
+        """Cache a response built at ``generations`` for ``ttl`` seconds."""
+
+    @abstractmethod
+    def invalidate(self, *namespaces: str) -> None:
+        """Make every cached response of the namespaces stale."""
+
+
+class MemoryCache(ResponseCache):
+    """Bounded LRU of responses in this process."""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached responses, defaults to
+                ``settings.RESPONSE_CACHE_SIZE``
+        """
+        self.maxsize = maxsize or settings.RESPONSE_CACHE_SIZE
+        self._entries: "OrderedDict[str, Tuple[float, List[int], Entry]]" = (
+            OrderedDict()
+        )
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def lookup(
+        self,
+        key: str,
+        namespaces: Sequence[str]
+    ) -> Tuple[Optional[Entry], Optional[List[int]]]:
+        with self._lock:
+            generations = [self._generations.get(ns, 0) for ns in namespaces]
+            item = self._entries.get(key)
+            if item is None:
+                return None, generations
+            expires, built_at, entry = item
+            if expires < time.monotonic() or built_at != generations:
+                del self._entries[key]
+                return None, generations
+            self._entries.move_to_end(key)
+            return entry, generations
+
+    def store(
+        self,
+        key: str,
+        generations: List[int],
+        entry: Entry,
+        ttl: float
+    ) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, generations, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *namespaces: str) -> None:
+        with self._lock:
+            for ns in namespaces:
+                self._generations[ns] = self._generations.get(ns, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache(ResponseCache):
+    """Responses and generations shared through Redis."""
+
+    PREFIX = "response-cache:"
+
+    def __init__(self, client: Any):
+        """
+        Initialize the cache.
+
+        Args:
+            client: ``redis.Redis`` client, returning bytes
+        """
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = None) -> "RedisCache":
+        """
+        Connect to the Redis server at ``url``.
+
+        Args:
+            url: Server URL, defaults to ``settings.REDIS_URL``
+
+        Raises:
+            RuntimeError: If the ``redis`` package is not installed
+            redis.RedisError: If the server is unreachable
+        """
+        if redis is None:
+            raise RuntimeError("The redis package is not installed")
+        timeout = settings.RESPONSE_CACHE_TIMEOUT
+        client = redis.Redis.from_url(
+            url or settings.REDIS_URL,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        client.ping()
+        return cls(client)
+
+    def _generation_key(self, namespace: str) -> str:
+        return f"{self.PREFIX}gen:{namespace}"
+
+    def lookup(
+        self,
+        key: str,
+        namespaces: Sequence[str]
+    ) -> Tuple[Optional[Entry], Optional[List[int]]]:
+        keys = [self._generation_key(ns) for ns in namespaces]
+        try:
+            *raw_generations, value = self.client.mget(
+                keys + [self.PREFIX + key]
+            )
+        except Exception as e:
+            metrics.RESPONSE_CACHE_ERRORS.inc()
+            logger.warning(f"Response cache lookup failed: {e}")
+            return None, None
+        generations = [int(g) if g is not None else 0 for g in raw_generations]
+        if value is None:
+            return None, generations
+        # Stored as "<generations>\n<etag>\n<body>"
+        built_at, etag, body = value.split(b"\n", 2)
+        if built_at.decode() != ",".join(map(str, generations)):
+            return None, generations
+        return (etag.decode(), body), generations
+
+    def store(
+        self,
+        key: str,
+        generations: List[int],
+        entry: Entry,
+        ttl: float
+    ) -> None:
+        etag, body = entry
+        value = b"\n".join([
+            ",".join(map(str, generations)).encode(), etag.encode(), body
+        ])
+        try:
+            self.client.set(self.PREFIX + key, value, px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            metrics.RESPONSE_CACHE_ERRORS.inc()
+            logger.warning(f"Response cache store failed: {e}")
+
+    def invalidate(self, *namespaces: str) -> None:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for ns in namespaces:
+                pipe.incr(self._generation_key(ns))
+            pipe.execute()
+        except Exception as e:
+            # Entries of the namespaces stay served until their TTL ends
+            metrics.RESPONSE_CACHE_ERRORS.inc()
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def response_cache() -> Optional[ResponseCache]:
+    """
+    Process-wide response cache for ``settings.RESPONSE_CACHE_BACKEND``.
+
+    The Redis backend falls back to an in-memory cache when the server
+    cannot be reached at first use.
+
+    Returns:
+        The cache, or None when caching is disabled
+    """
+    global _cache
+    backend = settings.RESPONSE_CACHE_BACKEND
+    if backend is None:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            if backend == "redis":
+                try:
+                    _cache = RedisCache.from_url()
+                except Exception as e:
+                    logger.warning(
+                        f"Redis response cache unavailable, caching in memory: {e}"
+                    )
+                    _cache = MemoryCache()
+            elif backend == "memory":
+                _cache = MemoryCache()
+            else:
+                raise ValueError(f"Unknown response cache backend: {backend}")
+        return _cache
+
+
+def invalidate(*namespaces: str) -> None:
+    """Invalidate namespaces in the process-wide cache, if enabled."""
+    cache = response_cache()
+    if cache is not None:
+        cache.invalidate(*namespaces)
@@ -20,6 +20,9 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL: int = 60  # seconds
+    PASSWORD_HASH_WORKERS: int = 2
     SSL_KEYFILE: Optional[Path] = None
     SSL_CERTFILE: Optional[Path] = None
     ALLOWED_HOSTS: List[str] = ["*"]
@@ -27,25 +30,106 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./recycling.db")
+    PARTITION_INTERVAL: str = "month"  # "day" or "month"
+    PARTITION_PREMAKE: int = 2  # future partitions created ahead of time
+    DATA_RETENTION_DAYS: int = 90
+    ARCHIVE_DIR: Path = Path("archive")
 
     # Redis Cache
     REDIS_URL: str = "redis://localhost:6379"
+    RESPONSE_CACHE_BACKEND: Optional[str] = "redis"  # "redis", "memory" or None
+    RESPONSE_CACHE_TTL: int = 15  # seconds a cached read response is served
+    RESPONSE_CACHE_SIZE: int = 1024  # responses kept by the in-memory fallback
+    RESPONSE_CACHE_TIMEOUT: float = 0.1  # seconds per Redis call
 
     # Kafka Settings
     KAFKA_BOOTSTRAP_SERVERS: List[str] = ["localhost:9092"]
 
+    # Event Bus
+    EVENT_BUS_BACKEND: str = "local"  # "local" (in-process) or "kafka"
+    PUBLISH_EVENTS: bool = False  # publish detections from the API
+    EVENT_PARTITIONS: int = 4  # per topic on the local backend
+    EVENT_BATCH_SIZE: int = 500  # events per produce batch and per poll
+    EVENT_BATCH_BYTES: int = 256 * 1024  # Kafka producer batch size
+    EVENT_LINGER_MS: float = 5  # wait for a produce batch to fill
+    EVENT_COMPRESSION: Optional[str] = "gzip"  # Kafka batch compression
+    EVENT_DEDUP_WINDOW: int = 100_000  # event ids remembered by consumers
+    EVENT_RETENTION: int = 100_000  # local events kept per partition
+
     # Vision System
     MODEL_PATH: Path = Path("models/plastic_yolo11.pt")
+    MODEL_REGISTRY_PATH: Path = Path("models/model_config.yml")
+    MODEL_VERSION: Optional[str] = None  # registry version; None serves MODEL_PATH
+    MODEL_ROLLBACK_DEPTH: int = 1  # previous versions kept loaded for instant rollback
+    SHADOW_MODEL_VERSION: Optional[str] = None  # candidate evaluated on live frames
+    SHADOW_SAMPLE_RATE: float = 0.1  # fraction of frames sent to the candidate
+    SHADOW_CPU_BUDGET: float = 0.25  # max fraction of time the shadow worker infers
+    SHADOW_QUEUE_SIZE: int = 4  # sampled frames waiting; more are dropped
+    PRELOAD_MODEL: bool = False  # build and warm up the classifier at API startup
+    WARMUP_INPUT_SIZES: List[int] = [640]  # square frame sides used for warm-up
+    WARMUP_BATCH_SIZES: List[int] = [1]
+    WARMUP_RUNS: int = 5  # timed calls per shape after the first
     CONFIDENCE_THRESHOLD: float = 0.85
+    MODEL_INPUT_SIZE: int = 640  # pixels, frames are resized to this side
+    MODEL_MMAP: bool = False  # share memory-mapped weights between workers
+    MODEL_MMAP_PATH: Path = Path("models/plastic_yolo11.state.pt")
+    QUANTIZATION_MODE: Optional[str] = None  # None, "dynamic" or "static" INT8
+    QUANTIZED_MODEL_PATH: Path = Path("models/plastic_yolo11_int8.pt")
+    QUANTIZE_MODULE: str = "model.model"  # submodule of the hub model to quantize
+    QUANTIZATION_BACKEND: str = "x86"  # "qnnpack" on ARM edge boxes
+    TRAIN_BATCH_SIZE: int = 16
+    TRAIN_IMAGE_SIZE: int = 640  # pixels, training frames are resized to this side
+    TRAIN_WORKERS: int = 4  # decode/augment processes per data loader
+    TRAIN_PREFETCH: int = 2  # batches each loader worker prepares ahead
+    TRAIN_CACHE_DIR: Path = Path("data/cache")  # pre-resized packed training images
+    CAPTURE_ENABLED: bool = False  # save near-miss frames for labelling
+    CAPTURE_DIR: Path = Path("data/captures")
+    CAPTURE_MIN_CONFIDENCE: float = 0.5  # near-miss floor, below CONFIDENCE_THRESHOLD
+    CAPTURE_MAX_BYTES: int = 2 * 1024**3  # oldest captures are evicted beyond this
+    CAPTURE_QUEUE_SIZE: int = 16  # frames waiting for the writer; more are dropped
+    CAPTURE_JPEG_QUALITY: int = 90
+    CAPTURE_DEDUP_DISTANCE: int = 6  # hash bits; closer frames are duplicates
+    CAPTURE_DEDUP_WINDOW: int = 512  # recent captures compared for duplicates
+    ORCHESTRATOR_WORKERS: int = 2  # inference threads shared by all camera streams
+    STREAM_QUEUE_SIZE: int = 2  # frames waiting per stream; the oldest is dropped
+    TILED_INFERENCE: bool = False  # split frames larger than TILE_SIZE into tiles
+    TILE_SIZE: int = 640  # pixels, matches the model input
+    TILE_OVERLAP: int = 128  # pixels, should exceed the largest item
+    TILE_MERGE_THRESHOLD: float = 0.5  # intersection over smaller box
+    MOTION_GATE_ENABLED: bool = False  # skip inference on empty belt frames
+    BELT_ROIS: List[List[int]] = []  # [x1, y1, x2, y2] pixels, empty = whole frame
+    MOTION_GATE_SCALE: float = 0.125  # downscale factor before differencing
+    MOTION_GATE_THRESHOLD: float = 25.0  # per-channel change marking occupancy
+    MOTION_GATE_MIN_AREA: float = 256.0  # changed frame pixels activating an ROI
+    MOTION_GATE_ALPHA: float = 0.05  # background learning rate
+    ADAPTIVE_RESOLUTION_ENABLED: bool = False  # lower the input size under load
+    ADAPTIVE_RESOLUTIONS: List[int] = [320, 480, 640]  # input sizes under load
+    LATENCY_SLO_MS: float = 100.0  # per-frame classification budget
+    ADAPTIVE_QUEUE_HIGH: int = 8  # queued frames that force a lower resolution
+    ADAPTIVE_QUEUE_LOW: int = 2  # queued frames that allow a higher resolution
+    ADAPTIVE_HOLD_FRAMES: int = 30  # minimum frames between switches
+    ADAPTIVE_AUDIT_INTERVAL: int = 50  # frames between full-resolution audits, 0 = off
 
     # Robot Control
     ROBOT_CONTROL_PORT: int = 50051
+    ROBOT_CONTROL_HOST: str = "localhost"  # robot control server used by clients
+    ROBOT_CONTROL_WINDOW: int = 32  # unacknowledged pick commands per client
+    ROBOT_CONTROL_MAX_STREAMS: int = 16  # concurrent client streams per server
     EMERGENCY_STOP_TIMEOUT: float = 1.0  # seconds
+    ROBOT_PICK_DURATION: float = 0.5  # seconds per simulated pick
 
     # Monitoring
     ENABLE_METRICS: bool = True
     METRICS_PORT: int = 9090
     METRICS_EXPORT_INTERVAL: int = 15  # seconds
+    AGGREGATION_ENABLED: bool = False  # live facility stats in the API process
+    AGGREGATION_WINDOW: int = 300  # seconds covered by live facility stats
+    AGGREGATION_BUCKET: float = 1.0  # seconds, resolution of the window
+    AGGREGATION_GROUP: str = "aggregation"  # consumer group prefix, + replica id
+    AGGREGATION_REPLICA_ID: str = ""  # stable per replica, e.g. pod name; "" = hostname
+    TRACE_ENABLED: bool = False
+    TRACE_SAMPLE_RATE: float = 0.01  # fraction of frames traced
+    TRACE_BUFFER_SIZE: int = 1000  # frame traces kept in memory
 
     # Blockchain
     BLOCKCHAIN_NETWORK: str = "testnet"
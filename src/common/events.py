@@ -0,0 +1,814 @@
+"""
+Event bus decoupling vision, robot control and persistence.
+
+Stages publish events to topics instead of calling each other: the API
+publishes detections, robot control publishes sort results and any stage
+can publish metrics. Consumers read a topic as part of a consumer group;
+the topic's partitions are spread over the group's members, so a stage
+scales out by starting more consumers in the same group.
+
+Two backends share one interface:
+
+- ``KafkaEventBus`` produces batched, compressed record batches to the
+  brokers in ``KAFKA_BOOTSTRAP_SERVERS`` (requires ``kafka-python``).
+- ``LocalEventBus`` keeps partitioned logs in memory, for a single
+  process, tests and development. It batches produce calls the same way
+  but does not compress, since records never leave the process. Events
+  every consumer group has committed are dropped, and a partition keeps
+  at most about ``EVENT_RETENTION`` events: when a group falls further
+  behind (or a topic has no consumers), its oldest unread events are
+  lost and it resumes from the oldest one kept.
+
+Delivery is at-least-once: consumers commit offsets only after handling
+the events, and after a failure or rebalance the uncommitted events are
+delivered again. Every event carries a unique id, which ``run_consumer``
+uses to skip the events it has already handled.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.common import metrics
+from src.common.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import kafka
+except ImportError:  # pragma: no cover - optional dependency
+    kafka = None
+
+logger = logging.getLogger(__name__)
+
+DETECTIONS = "detections"
+SORT_RESULTS = "sort-results"
+METRICS = "metrics"
+TOPICS = (DETECTIONS, SORT_RESULTS, METRICS)
+
+# Where a group without a committed offset starts reading a partition
+OFFSET_RESETS = ("earliest", "latest")
+
+TopicPartition = Tuple[str, int]
+
+
+class Event:
+    """One record on a topic."""
+
+    __slots__ = ("topic", "payload", "key", "id", "timestamp", "partition", "offset")
+
+    def __init__(
+        self,
+        topic: str,
+        payload: Any,
+        key: Optional[str] = None,
+        id: Optional[str] = None,
+        timestamp: Optional[float] = None,
+        partition: Optional[int] = None,
+        offset: Optional[int] = None
+    ):
+        """
+        Initialize the event.
+
+        Args:
+            topic: Topic the event belongs to
+            payload: JSON-serializable content
+            key: Partitioning key; events with the same key stay in order
+            id: Unique event id, generated when omitted
+            timestamp: Creation time (epoch seconds), defaults to now
+            partition: Partition the event was read from
+            offset: Offset of the event in its partition
+        """
+        self.topic = topic
+        self.payload = payload
+        self.key = key
+        self.id = id or uuid.uuid4().hex
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.partition = partition
+        self.offset = offset
+
+    def __repr__(self) -> str:
+        return (
+            f"Event({self.topic}[{self.partition}]@{self.offset}, id={self.id})"
+        )
+
+
+def _default(obj: Any) -> Any:
+    """Encode types the JSON encoder does not handle."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_event(event: Event) -> bytes:
+    """
+    Serialize an event's id, timestamp and payload.
+
+    Encoding dominates the cost of publishing, so orjson is used when
+    installed; the stdlib encoder produces the same JSON otherwise.
+    """
+    data = {"id": event.id, "ts": event.timestamp, "payload": event.payload}
+    if orjson is not None:
+        return orjson.dumps(
+            data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(data, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def decode_event(
+    topic: str,
+    value: bytes,
+    key: Optional[str] = None,
+    partition: Optional[int] = None,
+    offset: Optional[int] = None
+) -> Event:
+    """Deserialize an event read from a topic."""
+    data = orjson.loads(value) if orjson is not None else json.loads(value)
+    return Event(
+        topic, data["payload"], key, data["id"], data["ts"], partition, offset
+    )
+
+
+def partition_for(key: Optional[str], partitions: int, fallback: int) -> int:
+    """Partition of a key; keyless events use ``fallback``."""
+    if key is None:
+        return fallback % partitions
+    return zlib.crc32(key.encode("utf-8")) % partitions
+
+
+class Producer(ABC):
+    """Publishes events to topics."""
+
+    @abstractmethod
+    def send(self, topic: str, payload: Any, key: Optional[str] = None) -> str:
+        """
+        Queue an event for publishing; batches are sent in the background.
+
+        Args:
+            topic: Destination topic
+            payload: JSON-serializable content
+            key: Partitioning key; events with the same key stay in order
+
+        Returns:
+            The event id
+        """
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Block until every queued event has been published."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flush and release the producer."""
+
+
+class Consumer(ABC):
+    """Reads events from topics as a member of a consumer group."""
+
+    @abstractmethod
+    def poll(
+        self,
+        timeout: float = 1.0,
+        max_records: Optional[int] = None
+    ) -> List[Event]:
+        """
+        Read the next events from the assigned partitions.
+
+        Args:
+            timeout: Seconds to wait when no event is available
+            max_records: Maximum events returned
+
+        Returns:
+            Events in offset order per partition, empty on timeout
+        """
+
+    @abstractmethod
+    def commit(self) -> None:
+        """Commit the position after the events returned so far."""
+
+    @abstractmethod
+    def rewind(self) -> None:
+        """Move back to the last committed position, to read events again."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Leave the group; uncommitted events go to the remaining members."""
+
+
+class EventBus(ABC):
+    """Creates producers and consumers for one backend."""
+
+    @abstractmethod
+    def producer(self) -> Producer:
+        """Create a producer."""
+
+    @abstractmethod
+    def consumer(
+        self,
+        topics: Iterable[str],
+        group: str,
+        offset_reset: str = "earliest"
+    ) -> Consumer:
+        """
+        Create a consumer and join a consumer group.
+
+        Args:
+            topics: Topics to read
+            group: Consumer group; each event is handled by one member
+            offset_reset: Where to start in partitions the group has no
+                committed offset for: ``"earliest"`` retained event or
+                ``"latest"``, i.e. only events produced from now on
+
+        Raises:
+            ValueError: If ``offset_reset`` is not one of ``OFFSET_RESETS``
+        """
+
+
+def _check_offset_reset(offset_reset: str) -> None:
+    """Reject an ``offset_reset`` the backends do not know."""
+    if offset_reset not in OFFSET_RESETS:
+        raise ValueError(
+            f"Unknown offset reset {offset_reset!r}, expected one of {OFFSET_RESETS}"
+        )
+
+
+class _LocalProducer(Producer):
+    """Buffers events and appends them to the local logs in batches."""
+
+    def __init__(self, bus: "LocalEventBus", batch_size: int, linger_s: float):
+        self.bus = bus
+        self.batch_size = batch_size
+        self.linger_s = linger_s
+        self._buffer: List[Tuple[str, int, Optional[str], bytes]] = []
+        self._sequence = count()
+        self._ready = threading.Condition()
+        self._sending = False
+        self._flushing = 0
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="event-producer", daemon=True
+        )
+        self._thread.start()
+
+    def send(self, topic: str, payload: Any, key: Optional[str] = None) -> str:
+        event = Event(topic, payload, key)
+        partition = partition_for(key, self.bus.partitions, next(self._sequence))
+        record = (topic, partition, key, encode_event(event))
+        with self._ready:
+            if self._closed:
+                raise RuntimeError("Producer is closed")
+            self._buffer.append(record)
+            if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+                self._ready.notify_all()
+        return event.id
+
+    def _run(self) -> None:
+        """Sender loop: wait for a full batch or the linger time, then append."""
+        while True:
+            with self._ready:
+                while not self._buffer and not self._closed:
+                    self._ready.wait()
+                if not self._buffer:
+                    return
+                deadline = time.monotonic() + self.linger_s
+                while (
+                    len(self._buffer) < self.batch_size
+                    and not (self._closed or self._flushing)
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+                batch, self._buffer = self._buffer, []
+                self._sending = True
+            self.bus._append(batch)
+            with self._ready:
+                self._sending = False
+                self._ready.notify_all()
+
+    def flush(self) -> None:
+        with self._ready:
+            # Makes the sender send without waiting for the linger time
+            self._flushing += 1
+            self._ready.notify_all()
+            while self._buffer or self._sending:
+                self._ready.wait()
+            self._flushing -= 1
+
+    def close(self) -> None:
+        self.flush()
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        self._thread.join()
+
+
+class _LocalConsumer(Consumer):
+    """Consumer group member reading the local logs."""
+
+    def __init__(
+        self,
+        bus: "LocalEventBus",
+        topics: Tuple[str, ...],
+        group: str,
+        offset_reset: str
+    ):
+        self.bus = bus
+        self.topics = topics
+        self.group = group
+        self.offset_reset = offset_reset
+        # Set by the bus on every rebalance: assigned partition -> next offset
+        self.positions: Dict[TopicPartition, int] = {}
+        self.polls = 0  # rotates the partition read first
+
+    def poll(
+        self,
+        timeout: float = 1.0,
+        max_records: Optional[int] = None
+    ) -> List[Event]:
+        return self.bus._poll(self, timeout, max_records or settings.EVENT_BATCH_SIZE)
+
+    def commit(self) -> None:
+        self.bus._commit(self)
+
+    def rewind(self) -> None:
+        self.bus._rewind(self)
+
+    def close(self) -> None:
+        self.bus._leave(self)
+
+
+class LocalEventBus(EventBus):
+    """In-process event bus with partitioned logs and consumer groups."""
+
+    def __init__(
+        self,
+        partitions: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        linger_ms: Optional[float] = None,
+        retention: Optional[int] = None
+    ):
+        """
+        Initialize the bus.
+
+        Args:
+            partitions: Partitions per topic, the most consumers a group
+                can spread a topic over; defaults to
+                ``settings.EVENT_PARTITIONS``
+            batch_size: Events per produce batch, defaults to
+                ``settings.EVENT_BATCH_SIZE``
+            linger_ms: Time a producer waits for a batch to fill, defaults
+                to ``settings.EVENT_LINGER_MS``
+            retention: Events kept per partition regardless of commits,
+                defaults to ``settings.EVENT_RETENTION``
+        """
+        self.partitions = partitions or settings.EVENT_PARTITIONS
+        self.batch_size = batch_size or settings.EVENT_BATCH_SIZE
+        self.linger_ms = settings.EVENT_LINGER_MS if linger_ms is None else linger_ms
+        self.retention = retention or settings.EVENT_RETENTION
+        # One condition guards logs, offsets and membership; consumers
+        # wait on it for new records
+        self._changed = threading.Condition()
+        self._logs: Dict[str, List[List[Tuple[Optional[str], bytes]]]] = {}
+        # Offset of the first event kept in each partition's log
+        self._bases: Dict[str, List[int]] = {}
+        self._committed: Dict[str, Dict[TopicPartition, int]] = {}
+        self._members: Dict[str, List[_LocalConsumer]] = {}
+
+    def _log(self, topic: str) -> List[List[Tuple[Optional[str], bytes]]]:
+        if topic not in self._logs:
+            self._logs[topic] = [[] for _ in range(self.partitions)]
+            self._bases[topic] = [0] * self.partitions
+        return self._logs[topic]
+
+    def _trim(self, topic: str, partition: int, offset: int) -> None:
+        """Drop the events of a partition before ``offset``."""
+        base = self._bases[topic][partition]
+        if offset > base:
+            del self._logs[topic][partition][:offset - base]
+            self._bases[topic][partition] = offset
+
+    def producer(self) -> Producer:
+        return _LocalProducer(self, self.batch_size, self.linger_ms / 1000)
+
+    def consumer(
+        self,
+        topics: Iterable[str],
+        group: str,
+        offset_reset: str = "earliest"
+    ) -> Consumer:
+        _check_offset_reset(offset_reset)
+        consumer = _LocalConsumer(self, tuple(topics), group, offset_reset)
+        with self._changed:
+            self._members.setdefault(group, []).append(consumer)
+            self._rebalance(group)
+        return consumer
+
+    def end_offsets(self, topic: str) -> List[int]:
+        """Offset after the last event in each partition of a topic."""
+        with self._changed:
+            logs = self._log(topic)
+            return [base + len(log) for base, log in zip(self._bases[topic], logs)]
+
+    def retained(self, topic: str) -> List[int]:
+        """Number of events held in memory for each partition of a topic."""
+        with self._changed:
+            return [len(log) for log in self._log(topic)]
+
+    def committed(self, group: str, topic: str) -> List[int]:
+        """Committed offset of a group in each partition of a topic."""
+        with self._changed:
+            offsets = self._committed.get(group, {})
+            return [offsets.get((topic, p), 0) for p in range(self.partitions)]
+
+    def _append(self, batch: List[Tuple[str, int, Optional[str], bytes]]) -> None:
+        """Append a produce batch under a single lock acquisition."""
+        # Logs are cut back in steps of a tenth of the retention, so the
+        # front of a list is not shifted on every append
+        limit = self.retention + max(1, self.retention // 10)
+        with self._changed:
+            for topic, partition, key, value in batch:
+                log = self._log(topic)[partition]
+                log.append((key, value))
+                if len(log) > limit:
+                    base = self._bases[topic][partition]
+                    self._trim(topic, partition, base + len(log) - self.retention)
+            self._changed.notify_all()
+        metrics.EVENTS_PRODUCED.inc(len(batch))
+
+    def _rebalance(self, group: str) -> None:
+        """Spread the group's partitions over its members, round-robin."""
+        members = self._members.get(group, [])
+        committed = self._committed.setdefault(group, {})
+        topics = sorted({topic for member in members for topic in member.topics})
+        for member in members:
+            member.positions = {}
+        for topic in topics:
+            subscribed = [m for m in members if topic in m.topics]
+            logs = self._log(topic)
+            for partition in range(self.partitions):
+                owner = subscribed[partition % len(subscribed)]
+                if (topic, partition) not in committed and (
+                    owner.offset_reset == "latest"
+                ):
+                    # Held as the group's start so a rewind returns here
+                    committed[(topic, partition)] = (
+                        self._bases[topic][partition] + len(logs[partition])
+                    )
+                owner.positions[(topic, partition)] = committed.get(
+                    (topic, partition), 0
+                )
+        self._changed.notify_all()
+
+    def _leave(self, consumer: _LocalConsumer) -> None:
+        with self._changed:
+            members = self._members.get(consumer.group, [])
+            if consumer in members:
+                members.remove(consumer)
+                self._rebalance(consumer.group)
+
+    def _poll(
+        self,
+        consumer: _LocalConsumer,
+        timeout: float,
+        max_records: int
+    ) -> List[Event]:
+        deadline = time.monotonic() + timeout
+        records: List[Tuple[str, int, int, Optional[str], bytes]] = []
+        with self._changed:
+            while True:
+                assigned = list(consumer.positions.items())
+                if assigned:
+                    first = consumer.polls % len(assigned)
+                    assigned = assigned[first:] + assigned[:first]
+                consumer.polls += 1
+                for (topic, partition), position in assigned:
+                    log = self._log(topic)[partition]
+                    # Events before the base were dropped by retention
+                    base = self._bases[topic][partition]
+                    position = max(position, base)
+                    end = min(base + len(log), position + max_records - len(records))
+                    records.extend(
+                        (topic, partition, offset, *log[offset - base])
+                        for offset in range(position, end)
+                    )
+                    consumer.positions[(topic, partition)] = max(position, end)
+                    if len(records) >= max_records:
+                        break
+                remaining = deadline - time.monotonic()
+                if records or remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        # Decoded outside the lock so producers are not held up
+        return [
+            decode_event(topic, value, key, partition, offset)
+            for topic, partition, offset, key, value in records
+        ]
+
+    def _commit(self, consumer: _LocalConsumer) -> None:
+        with self._changed:
+            # Only partitions still assigned: after a rebalance another
+            # member owns the rest and reads them from the last commit
+            self._committed.setdefault(consumer.group, {}).update(consumer.positions)
+            for topic, partition in consumer.positions:
+                self._trim(topic, partition, self._low_watermark(topic, partition))
+
+    def _low_watermark(self, topic: str, partition: int) -> int:
+        """Lowest committed offset of the groups reading a partition."""
+        groups = {
+            group for group, members in self._members.items()
+            if any(topic in member.topics for member in members)
+        }
+        groups.update(
+            group for group, offsets in self._committed.items()
+            if (topic, partition) in offsets
+        )
+        return min(
+            self._committed.get(group, {}).get((topic, partition), 0)
+            for group in groups
+        )
+
+    def _rewind(self, consumer: _LocalConsumer) -> None:
+        with self._changed:
+            committed = self._committed.get(consumer.group, {})
+            for tp in consumer.positions:
+                consumer.positions[tp] = committed.get(tp, 0)
+
+
+class _KafkaProducer(Producer):
+    """``kafka-python`` producer with batching and compression."""
+
+    def __init__(self, servers: List[str]):
+        self._producer = kafka.KafkaProducer(
+            bootstrap_servers=servers,
+            acks="all",
+            compression_type=settings.EVENT_COMPRESSION,
+            batch_size=settings.EVENT_BATCH_BYTES,
+            linger_ms=settings.EVENT_LINGER_MS,
+        )
+
+    def send(self, topic: str, payload: Any, key: Optional[str] = None) -> str:
+        event = Event(topic, payload, key)
+        self._producer.send(
+            topic,
+            value=encode_event(event),
+            key=key.encode("utf-8") if key is not None else None,
+        )
+        metrics.EVENTS_PRODUCED.inc()
+        return event.id
+
+    def flush(self) -> None:
+        self._producer.flush()
+
+    def close(self) -> None:
+        self._producer.close()
+
+
+class _KafkaConsumer(Consumer):
+    """``kafka-python`` consumer committing offsets manually."""
+
+    def __init__(
+        self,
+        servers: List[str],
+        topics: Tuple[str, ...],
+        group: str,
+        offset_reset: str
+    ):
+        self._consumer = kafka.KafkaConsumer(
+            *topics,
+            bootstrap_servers=servers,
+            group_id=group,
+            enable_auto_commit=False,
+            auto_offset_reset=offset_reset,
+            max_poll_records=settings.EVENT_BATCH_SIZE,
+        )
+        self.offset_reset = offset_reset
+        # First offset read per partition, where a rewind before the
+        # first commit returns to
+        self._started: Dict[Any, int] = {}
+
+    def poll(
+        self,
+        timeout: float = 1.0,
+        max_records: Optional[int] = None
+    ) -> List[Event]:
+        batches = self._consumer.poll(
+            timeout_ms=int(timeout * 1000), max_records=max_records
+        )
+        for tp, records in batches.items():
+            if records:
+                self._started.setdefault(tp, records[0].offset)
+        return [
+            decode_event(
+                record.topic,
+                record.value,
+                record.key.decode("utf-8") if record.key is not None else None,
+                record.partition,
+                record.offset,
+            )
+            for records in batches.values()
+            for record in records
+        ]
+
+    def commit(self) -> None:
+        self._consumer.commit()
+
+    def rewind(self) -> None:
+        for tp in self._consumer.assignment():
+            offset = self._consumer.committed(tp)
+            if offset is None:
+                offset = self._started.get(tp)
+            if offset is not None:
+                self._consumer.seek(tp, offset)
+            elif self.offset_reset == "earliest":
+                self._consumer.seek_to_beginning(tp)
+            else:
+                self._consumer.seek_to_end(tp)
+
+    def close(self) -> None:
+        self._consumer.close(autocommit=False)
+
+
+class KafkaEventBus(EventBus):
+    """Event bus on Kafka (or a Kafka-compatible broker such as Redpanda)."""
+
+    def __init__(self, bootstrap_servers: Optional[List[str]] = None):
+        """
+        Initialize the bus.
+
+        Args:
+            bootstrap_servers: Brokers, defaults to
+                ``settings.KAFKA_BOOTSTRAP_SERVERS``
+
+        Raises:
+            RuntimeError: If ``kafka-python`` is not installed
+        """
+        if kafka is None:
+            raise RuntimeError("The Kafka event bus requires kafka-python")
+        self.servers = list(bootstrap_servers or settings.KAFKA_BOOTSTRAP_SERVERS)
+
+    def producer(self) -> Producer:
+        return _KafkaProducer(self.servers)
+
+    def consumer(
+        self,
+        topics: Iterable[str],
+        group: str,
+        offset_reset: str = "earliest"
+    ) -> Consumer:
+        _check_offset_reset(offset_reset)
+        return _KafkaConsumer(self.servers, tuple(topics), group, offset_reset)
+
+
+class Deduplicator:
+    """Remembers the ids of recently handled events."""
+
+    def __init__(self, window: Optional[int] = None):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            window: Event ids remembered, defaults to
+                ``settings.EVENT_DEDUP_WINDOW``; redeliveries arrive within
+                one uncommitted batch, so this only needs to cover a few
+        """
+        self.window = window or settings.EVENT_DEDUP_WINDOW
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._seen
+
+    def add(self, event_id: str) -> None:
+        """Record a handled event."""
+        self._seen[event_id] = None
+        if len(self._seen) > self.window:
+            self._seen.popitem(last=False)
+
+
+def handle_events(
+    consumer: Consumer,
+    handler: Callable[[Event], None],
+    dedup: Optional[Deduplicator] = None,
+    timeout: float = 1.0
+) -> int:
+    """
+    Poll once, handle the events and commit.
+
+    When the handler fails the consumer is rewound to its last commit, so
+    the events are delivered again; those handled before the failure are
+    then skipped by ``dedup``.
+
+    Args:
+        consumer: Consumer to read from
+        handler: Called once per new event
+        dedup: Ids of events already handled
+        timeout: Seconds to wait for events
+
+    Returns:
+        Number of events handled
+
+    Raises:
+        Exception: Whatever the handler raised, after rewinding
+    """
+    dedup = dedup if dedup is not None else Deduplicator()
+    handled = 0
+    try:
+        for event in consumer.poll(timeout):
+            if event.id in dedup:
+                metrics.EVENTS_DUPLICATE.inc()
+                continue
+            handler(event)
+            dedup.add(event.id)
+            handled += 1
+            metrics.EVENTS_HANDLED.inc()
+    except Exception:
+        metrics.EVENTS_FAILED.inc()
+        consumer.rewind()
+        raise
+    consumer.commit()
+    return handled
+
+
+def run_consumer(
+    consumer: Consumer,
+    handler: Callable[[Event], None],
+    stop: threading.Event,
+    dedup: Optional[Deduplicator] = None,
+    retry_delay: float = 1.0
+) -> None:
+    """
+    Handle events until ``stop`` is set, then leave the group.
+
+    Args:
+        consumer: Consumer to read from
+        handler: Called once per new event; should itself be idempotent
+            for redeliveries older than the dedup window (e.g. after a
+            restart)
+        stop: Set to stop the loop
+        dedup: Ids of events already handled
+        retry_delay: Seconds to wait after a handler failure
+    """
+    dedup = dedup if dedup is not None else Deduplicator()
+    try:
+        while not stop.is_set():
+            try:
+                handle_events(consumer, handler, dedup, timeout=0.1)
+            except Exception as e:
+                logger.error(f"Event handling failed, retrying: {e}")
+                stop.wait(retry_delay)
+    finally:
+        consumer.close()
+
+
+_bus: Optional[EventBus] = None
+_producer: Optional[Producer] = None
+_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> EventBus:
+    """Process-wide event bus for ``settings.EVENT_BUS_BACKEND``."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            backend = settings.EVENT_BUS_BACKEND
+            if backend == "kafka":
+                _bus = KafkaEventBus()
+            elif backend == "local":
+                _bus = LocalEventBus()
+            else:
+                raise ValueError(f"Unknown event bus backend: {backend}")
+        return _bus
+
+
+def publish(topic: str, payload: Any, key: Optional[str] = None) -> str:
+    """
+    Publish an event with the process-wide producer.
+
+    Args:
+        topic: Destination topic
+        payload: JSON-serializable content
+        key: Partitioning key
+
+    Returns:
+        The event id
+    """
+    global _producer
+    if _producer is None:
+        bus = get_event_bus()
+        with _bus_lock:
+            if _producer is None:
+                _producer = bus.producer()
+    return _producer.send(topic, payload, key)
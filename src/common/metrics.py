@@ -0,0 +1,283 @@
+"""
+Prometheus metrics for AI Circo Recycling System.
+
+Metrics are created once at import time and their label children are
+resolved up front, so hot paths only pay for a single observation. With
+``ENABLE_METRICS`` disabled every metric is a no-op stand-in.
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Millisecond-scale buckets for per-frame stages and requests
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+
+class _NoopMetric:
+    """Stand-in accepting the metric API and recording nothing."""
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopMetric":
+        return self
+
+    def observe(self, value: float) -> None:
+        pass
+
+    def inc(self, value: float = 1) -> None:
+        pass
+
+    def dec(self, value: float = 1) -> None:
+        pass
+
+    def set(self, value: float) -> None:
+        pass
+
+    def time(self) -> nullcontext:
+        return nullcontext()
+
+
+class _NoopMetrics:
+    """Stand-in for this module whose metrics all record nothing."""
+
+    def __getattr__(self, name: str) -> _NoopMetric:
+        return _NoopMetric()
+
+
+# Given to components whose work must not show in the shared metrics,
+# e.g. a shadow model evaluated next to production
+NOOP_METRICS: Any = _NoopMetrics()
+
+
+def _metric(cls: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Create a metric, or a no-op when metrics are disabled."""
+    if not settings.ENABLE_METRICS:
+        return _NoopMetric()
+    return cls(*args, **kwargs)
+
+
+# Vision
+VISION_STAGE_LATENCY = _metric(
+    Histogram,
+    "vision_stage_latency_seconds",
+    "Latency of each per-frame vision stage",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+PREPROCESS_LATENCY = VISION_STAGE_LATENCY.labels(stage="preprocess")
+INFERENCE_LATENCY = VISION_STAGE_LATENCY.labels(stage="inference")
+POSTPROCESS_LATENCY = VISION_STAGE_LATENCY.labels(stage="postprocess")
+CONTAMINATION_LATENCY = VISION_STAGE_LATENCY.labels(stage="contamination")
+GATE_LATENCY = VISION_STAGE_LATENCY.labels(stage="gate")
+VISION_INPUT_RESOLUTION = _metric(
+    Gauge,
+    "vision_input_resolution_pixels",
+    "Current classifier input size chosen by the adaptive controller",
+)
+FRAMES_SKIPPED = _metric(
+    Counter,
+    "vision_frames_skipped_total",
+    "Frames skipped by the motion gate without inference",
+)
+DETECTIONS_PER_FRAME = _metric(
+    Histogram,
+    "vision_detections_per_frame",
+    "Number of detections above threshold per frame",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+MODEL_SWAPS = _metric(
+    Counter,
+    "vision_model_swaps_total",
+    "Model version changes by outcome",
+    ["action"],
+)
+SHADOW_FRAMES = _metric(
+    Counter,
+    "vision_shadow_frames_total",
+    "Sampled frames sent to the shadow model, by outcome",
+    ["outcome"],
+)
+SHADOW_EVALUATED = SHADOW_FRAMES.labels(outcome="evaluated")
+SHADOW_DROPPED = SHADOW_FRAMES.labels(outcome="dropped")
+SHADOW_FAILED = SHADOW_FRAMES.labels(outcome="failed")
+SHADOW_LATENCY = _metric(
+    Histogram,
+    "vision_shadow_latency_seconds",
+    "Shadow model classification latency per frame",
+    buckets=LATENCY_BUCKETS,
+)
+SHADOW_AGREEMENT = _metric(
+    Histogram,
+    "vision_shadow_agreement_ratio",
+    "Fraction of production detections matched by the shadow model",
+    buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0),
+)
+CAPTURE_FRAMES = _metric(
+    Counter,
+    "vision_capture_frames_total",
+    "Near-miss frames offered for active-learning capture, by outcome",
+    ["outcome"],
+)
+CAPTURE_SAVED = CAPTURE_FRAMES.labels(outcome="captured")
+CAPTURE_DUPLICATES = CAPTURE_FRAMES.labels(outcome="duplicate")
+CAPTURE_DROPPED = CAPTURE_FRAMES.labels(outcome="dropped")
+CAPTURE_EVICTED = CAPTURE_FRAMES.labels(outcome="evicted")
+CAPTURE_FAILED = CAPTURE_FRAMES.labels(outcome="failed")
+CAPTURE_STORE_BYTES = _metric(
+    Gauge,
+    "vision_capture_store_bytes",
+    "Disk space used by captured frames",
+)
+STREAM_FRAMES = _metric(
+    Counter,
+    "vision_stream_frames_total",
+    "Camera stream frames by outcome (processed, dropped, slo_violation)",
+    ["facility_id", "stream", "outcome"],
+)
+STREAM_LATENCY = _metric(
+    Histogram,
+    "vision_stream_latency_seconds",
+    "Camera stream frame latency from submit to result",
+    ["facility_id", "stream"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Event bus
+EVENTS_PRODUCED = _metric(
+    Counter,
+    "events_produced_total",
+    "Events published to the event bus",
+)
+EVENTS_CONSUMED = _metric(
+    Counter,
+    "events_consumed_total",
+    "Events read from the event bus, by outcome",
+    ["outcome"],
+)
+EVENTS_HANDLED = EVENTS_CONSUMED.labels(outcome="handled")
+EVENTS_DUPLICATE = EVENTS_CONSUMED.labels(outcome="duplicate")
+EVENTS_FAILED = EVENTS_CONSUMED.labels(outcome="failed")
+
+# Robotics
+ROBOT_ARM_BUSY = _metric(
+    Counter,
+    "robot_arm_busy_seconds_total",
+    "Time each arm spent sorting items",
+    ["arm"],
+)
+ROBOT_QUEUE_DEPTH = _metric(
+    Gauge,
+    "robot_queue_depth",
+    "Sort tasks submitted but not yet started",
+)
+ROBOT_PICK_LATENCY = _metric(
+    Histogram,
+    "robot_pick_latency_seconds",
+    "Time from submitting a sort task to its completion",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# API
+API_REQUEST_LATENCY = _metric(
+    Histogram,
+    "api_request_latency_seconds",
+    "HTTP request latency per route",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_CACHE = _metric(
+    Counter,
+    "api_response_cache_total",
+    "Cacheable API responses, by cache outcome",
+    ["outcome"],
+)
+RESPONSE_CACHE_HITS = RESPONSE_CACHE.labels(outcome="hit")
+RESPONSE_CACHE_MISSES = RESPONSE_CACHE.labels(outcome="miss")
+RESPONSE_CACHE_ERRORS = RESPONSE_CACHE.labels(outcome="error")
+RESPONSE_NOT_MODIFIED = _metric(
+    Counter,
+    "api_responses_not_modified_total",
+    "Conditional API requests answered with 304 Not Modified",
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route request latency."""
+
+    def __init__(self, app: Callable):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: Wrapped ASGI application
+        """
+        self.app = app
+        # Children are cached per (method, route, status) to skip the
+        # label lookup on repeat requests.
+        self._children: Dict[tuple, Any] = {}
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Dict) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            key = (
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+            )
+            child = self._children.get(key)
+            if child is None:
+                child = API_REQUEST_LATENCY.labels(
+                    method=key[0], route=key[1], status=str(key[2])
+                )
+                self._children[key] = child
+            child.observe(time.perf_counter() - start)
+
+
+def render_latest() -> bytes:
+    """Render all registered metrics in the Prometheus text format."""
+    return generate_latest()
+
+
+def start_metrics_server() -> bool:
+    """
+    Serve metrics on ``METRICS_PORT`` for services without an HTTP API.
+
+    Returns:
+        True if the server was started
+    """
+    if not settings.ENABLE_METRICS:
+        return False
+    start_http_server(settings.METRICS_PORT)
+    logger.info(f"Serving metrics on port {settings.METRICS_PORT}")
+    return True
+
@@ -0,0 +1,153 @@
+"""
+Profiling helpers for offline performance investigation.
+
+Two modes are supported: deterministic profiling with ``cProfile`` and a
+lightweight in-process sampling profiler that periodically captures the
+profiled thread's stack. The sampler writes collapsed stacks that can be
+fed directly to flamegraph tools.
+"""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+
+class SamplingProfiler:
+    """Periodically samples the stack of one thread."""
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """
+        Start sampling.
+
+        Args:
+            thread_id: Thread to sample, defaults to the calling thread
+        """
+        self._target = thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Sampling loop."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.samples[self._stack(frame)] += 1
+
+    @staticmethod
+    def _stack(frame: Any) -> Tuple[str, ...]:
+        """Root-first tuple of ``function (file:line)`` entries."""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(
+                f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+            )
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def report(self, top: int = 30) -> str:
+        """
+        Build a text report of the hottest functions and stacks.
+
+        Args:
+            top: Number of functions listed in the summary
+
+        Returns:
+            Report text; collapsed stacks follow the summary
+        """
+        total = sum(self.samples.values())
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.samples.items():
+            own[stack[-1]] += count
+            for entry in set(stack):
+                inclusive[entry] += count
+
+        lines = [f"{total} samples at {self.interval * 1000:.1f} ms interval", ""]
+        lines.append(f"{'self %':>8} {'total %':>8}  function")
+        for entry, count in own.most_common(top):
+            lines.append(
+                f"{100 * count / total:8.1f} "
+                f"{100 * inclusive[entry] / total:8.1f}  {entry}"
+            )
+        lines += ["", "# collapsed stacks"]
+        for stack, count in self.samples.most_common():
+            lines.append(f"{';'.join(stack)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def profile_call(
+    func: Callable[[], Any],
+    mode: str,
+    report_path: Path,
+    interval: float = 0.005
+) -> Any:
+    """
+    Run ``func`` under a profiler and write a report.
+
+    Args:
+        func: Zero-argument callable to profile
+        mode: ``"cprofile"`` or ``"sampling"``
+        report_path: Text report destination; cProfile also writes the
+            raw stats next to it with a ``.prof`` suffix
+        interval: Sampling interval for the sampling profiler
+
+    Returns:
+        Return value of ``func``
+    """
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func)
+        profiler.dump_stats(report_path.with_suffix(".prof"))
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats("cumulative").print_stats(40)
+        report_path.write_text(stream.getvalue())
+        return result
+
+    if mode == "sampling":
+        sampler = SamplingProfiler(interval)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            result = func()
+        finally:
+            sampler.stop()
+        elapsed = time.perf_counter() - start
+        report_path.write_text(
+            f"wall time {elapsed:.3f} s\n" + sampler.report()
+        )
+        return result
+
+    raise ValueError(f"Unknown profiling mode: {mode}")
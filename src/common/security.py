@@ -2,9 +2,15 @@
 Security module for AI Circo Recycling System.
 """
 
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from fastapi import HTTPException, status
+from typing import Optional, Dict, Any, Tuple
+from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from passlib.context import CryptContext
@@ -15,6 +21,13 @@ from src.common.config import settings
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt releases the GIL, so a small dedicated pool keeps hashing off the
+# event loop and bounds how many hashes run at once.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/token"
@@ -32,6 +45,69 @@ class TokenData(BaseModel):
     username: Optional[str] = None
 
 
+class TokenCache:
+    """Bounded LRU cache of verified token claims with per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached tokens
+            ttl: Maximum seconds a verification result is reused
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token: str) -> str:
+        """Cache key for a token, so raw tokens are not kept in memory."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return cached claims if present and not expired."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, claims = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        """Cache claims until the token expires or the TTL elapses."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl
+        if "exp" in claims:
+            expires_at = min(expires_at, float(claims["exp"]))
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify password against hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -42,6 +118,25 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> bool:
+    """Verify password against hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate password hash without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, get_password_hash, password
+    )
+
+
 def create_access_token(
     data: Dict[str, Any],
     expires_delta: Optional[timedelta] = None
@@ -61,7 +156,33 @@ def create_access_token(
     return encoded_jwt
 
 
-async def get_current_user(token: str = oauth2_scheme) -> Dict[str, Any]:
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT and return its claims, reusing recent verifications.
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        Verified token claims
+
+    Raises:
+        jwt.JWTError: If the token is invalid or expired
+    """
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(
+            token,
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM]
+        )
+        token_cache.put(token, claims)
+    return claims
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme)
+) -> Dict[str, Any]:
     """Get current user from token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -69,11 +190,7 @@ async def get_current_user(token: str = oauth2_scheme) -> Dict[str, Any]:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
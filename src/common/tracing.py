@@ -0,0 +1,225 @@
+"""
+Per-frame stage tracing for the vision pipeline.
+
+A frame trace is opened around the processing of one frame with
+``tracer.frame()``; code inside it wraps each stage in ``tracer.span()``.
+Spans outside a sampled frame are no-ops, so the stage hooks can stay in
+the hot path permanently. Completed traces are kept in a bounded buffer
+and can be exported as Chrome trace-event JSON (``chrome://tracing`` or
+Perfetto).
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.common.config import settings
+
+_NULL_SPAN = nullcontext()
+
+
+class Span:
+    """A timed stage inside a frame trace."""
+
+    __slots__ = ("name", "start_ns", "duration_ns", "thread_id")
+
+    def __init__(self, name: str, start_ns: int, duration_ns: int):
+        self.name = name
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.thread_id = threading.get_ident()
+
+
+class FrameTrace:
+    """Timing record of all stages of a single frame."""
+
+    def __init__(self, frame_id: Any):
+        """
+        Initialize the trace.
+
+        Args:
+            frame_id: Identifier of the traced frame
+        """
+        self.frame_id = frame_id
+        self.start_ns = time.perf_counter_ns()
+        self.duration_ns = 0
+        self.thread_id = threading.get_ident()
+        self.spans: List[Span] = []
+
+    def finish(self) -> None:
+        """Mark the end of the frame."""
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+
+    def stage_totals(self) -> Dict[str, float]:
+        """Total milliseconds spent per stage name."""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ns / 1e6
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary record of the frame."""
+        return {
+            "frame_id": self.frame_id,
+            "total_ms": self.duration_ns / 1e6,
+            "stages": self.stage_totals(),
+        }
+
+
+_current_frame: ContextVar[Optional[FrameTrace]] = ContextVar(
+    "current_frame_trace", default=None
+)
+
+
+class _SpanContext:
+    """Context manager timing one span into the active frame."""
+
+    __slots__ = ("trace", "name", "start_ns")
+
+    def __init__(self, trace: FrameTrace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self) -> "_SpanContext":
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.trace.spans.append(Span(
+            self.name, self.start_ns, time.perf_counter_ns() - self.start_ns
+        ))
+
+
+class Tracer:
+    """Samples frames and collects their stage spans."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        sample_rate: float = 1.0,
+        buffer_size: int = 1000
+    ):
+        """
+        Initialize the tracer.
+
+        Args:
+            enabled: Whether frames are traced at all
+            sample_rate: Fraction of frames traced (0-1)
+            buffer_size: Number of completed traces kept
+        """
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.traces: deque = deque(maxlen=buffer_size)
+
+    @contextmanager
+    def frame(self, frame_id: Any = None) -> Iterator[Optional[FrameTrace]]:
+        """
+        Trace one frame if it is sampled.
+
+        Args:
+            frame_id: Identifier recorded with the trace
+
+        Yields:
+            The active trace, or None if the frame is not sampled
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = FrameTrace(frame_id)
+        token = _current_frame.set(trace)
+        try:
+            yield trace
+        finally:
+            trace.finish()
+            _current_frame.reset(token)
+            self.traces.append(trace)
+
+    def span(self, name: str) -> Any:
+        """
+        Time a stage of the current frame.
+
+        Args:
+            name: Stage name, e.g. ``"inference"``
+
+        Returns:
+            Context manager; a shared no-op when no frame is traced
+        """
+        trace = _current_frame.get()
+        if trace is None:
+            return _NULL_SPAN
+        return _SpanContext(trace, name)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Summary records of the buffered traces, oldest first."""
+        return [trace.to_dict() for trace in list(self.traces)]
+
+    def chrome_events(self) -> List[Dict[str, Any]]:
+        """Buffered traces as Chrome trace-event ``X`` events."""
+        pid = os.getpid()
+        events = []
+        for trace in list(self.traces):
+            events.append({
+                "name": f"frame {trace.frame_id}",
+                "cat": "frame",
+                "ph": "X",
+                "ts": trace.start_ns / 1000,
+                "dur": trace.duration_ns / 1000,
+                "pid": pid,
+                "tid": trace.thread_id,
+                "args": {"frame_id": str(trace.frame_id)},
+            })
+            for span in trace.spans:
+                events.append({
+                    "name": span.name,
+                    "cat": "stage",
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": span.duration_ns / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                })
+        return events
+
+    def export_chrome_trace(self, path: Path) -> Path:
+        """
+        Write buffered traces as Chrome trace-event JSON.
+
+        Args:
+            path: Output file
+
+        Returns:
+            The written path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(
+                {"traceEvents": self.chrome_events(), "displayTimeUnit": "ms"},
+                f
+            )
+        return path
+
+
+class _NullTracer(Tracer):
+    """Tracer whose spans never record, even inside a traced frame."""
+
+    def span(self, name: str) -> Any:
+        return _NULL_SPAN
+
+
+# Given to components whose work must not appear in frame traces
+null_tracer = _NullTracer()
+
+# Create global tracer instance
+tracer = Tracer(
+    enabled=settings.TRACE_ENABLED,
+    sample_rate=settings.TRACE_SAMPLE_RATE,
+    buffer_size=settings.TRACE_BUFFER_SIZE,
+)
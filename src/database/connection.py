@@ -4,11 +4,11 @@ Database connection module for AI Circo Recycling System.
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
 from contextlib import contextmanager
 from typing import Generator
 
 from src.common.config import settings
+from src.database.models import Base
 
 # Create SQLAlchemy engine
 engine = create_engine(settings.DATABASE_URL)
@@ -16,9 +16,6 @@ engine = create_engine(settings.DATABASE_URL)
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Create base class for models
-Base = declarative_base()
-
 
 @contextmanager
 def get_db() -> Generator:
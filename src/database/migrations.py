@@ -0,0 +1,134 @@
+"""
+Schema migrations for existing AI Circo Recycling databases.
+"""
+
+import json
+import logging
+from typing import Any, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+BBOX_COLUMNS = ("bbox_x1", "bbox_y1", "bbox_x2", "bbox_y2")
+
+
+def parse_legacy_bbox(value: Any) -> Optional[List[float]]:
+    """Decode a legacy JSON bbox (list or x1/y1/x2/y2 mapping)."""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        value = json.loads(value)
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return [float(value[k]) for k in ("x1", "y1", "x2", "y2")]
+    return [float(v) for v in value]
+
+
+def migrate_bbox_columns(
+    engine: Engine,
+    table_name: str = "plastic_detections",
+    chunk_size: int = 10000,
+    drop_json: bool = True
+) -> int:
+    """
+    Move the legacy JSON ``bbox`` column into four float columns.
+
+    The table's SQLite period tables (``plastic_detections_p*``) are
+    migrated too, so rotation can keep copying rows into them. On
+    PostgreSQL, changes to the partitioned parent reach its partitions.
+
+    The migration is idempotent: it adds the missing float columns,
+    backfills them in id-ordered chunks and finally drops the JSON column.
+
+    Args:
+        engine: Engine of the database to migrate
+        table_name: Detection table name
+        chunk_size: Rows converted per transaction
+        drop_json: Whether to drop the JSON column afterwards
+
+    Returns:
+        Number of rows converted
+    """
+    from src.database.partitioning import PartitionManager
+
+    tables = [table_name]
+    if engine.dialect.name != "postgresql":
+        manager = PartitionManager(engine, tables=(table_name,))
+        tables += [name for _, name in manager.list_partitions(table_name)]
+    return sum(
+        _migrate_table(engine, name, chunk_size, drop_json) for name in tables
+    )
+
+
+def _migrate_table(
+    engine: Engine,
+    table_name: str,
+    chunk_size: int,
+    drop_json: bool
+) -> int:
+    """Migrate the bbox column of a single table."""
+    columns = {c["name"] for c in inspect(engine).get_columns(table_name)}
+    if "bbox" not in columns:
+        logger.info(f"{table_name} already uses bbox float columns")
+        return 0
+
+    quote = engine.dialect.identifier_preparer.quote
+    table = quote(table_name)
+    with engine.begin() as conn:
+        for name in BBOX_COLUMNS:
+            if name not in columns:
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD COLUMN {name} FLOAT"
+                ))
+
+    update = text(
+        f"UPDATE {table} SET bbox_x1 = :x1, bbox_y1 = :y1, "
+        f"bbox_x2 = :x2, bbox_y2 = :y2 WHERE id = :row_id"
+    )
+
+    converted = 0
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, bbox FROM {table} "
+                    f"WHERE id > :last_id ORDER BY id LIMIT :limit"
+                ),
+                {"last_id": last_id, "limit": chunk_size},
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row_id, value in rows:
+                bbox = parse_legacy_bbox(value)
+                if bbox is not None:
+                    x1, y1, x2, y2 = bbox
+                    params.append(
+                        {"row_id": row_id, "x1": x1, "y1": y1,
+                         "x2": x2, "y2": y2}
+                    )
+            if params:
+                conn.execute(update, params)
+            converted += len(params)
+            last_id = rows[-1][0]
+
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {quote('ix_' + table_name + '_bbox')} "
+            f"ON {table} (bbox_x1, bbox_y1)"
+        ))
+        if drop_json:
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN bbox"))
+
+    logger.info(f"Migrated {converted} bounding boxes in {table_name}")
+    return converted
+
+
+if __name__ == "__main__":
+    from src.database.connection import engine
+
+    migrate_bbox_columns(engine)
@@ -2,10 +2,13 @@
 Database models for AI Circo Recycling System.
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index
+from sqlalchemy import and_, tuple_
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from typing import Any, List, Optional
 
 
 Base = declarative_base()
@@ -47,12 +50,69 @@ class PlasticDetection(Base):
     batch_id = Column(Integer, ForeignKey("batches.id"))
     plastic_type = Column(String, nullable=False)
     confidence = Column(Float, nullable=False)
-    bbox = Column(JSON)  # Bounding box coordinates
+    # Bounding box coordinates, stored as plain columns so they can be
+    # indexed and read without JSON decoding
+    bbox_x1 = Column(Float)
+    bbox_y1 = Column(Float)
+    bbox_x2 = Column(Float)
+    bbox_y2 = Column(Float)
     contamination_level = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
     batch = relationship("Batch", back_populates="detections")
 
+    __table_args__ = (
+        Index("ix_plastic_detections_bbox", "bbox_x1", "bbox_y1"),
+        # Rows are rotated out of the SQLite table into period tables, so
+        # ids must not be reused once the table is empty
+        {"sqlite_autoincrement": True},
+    )
+
+    @hybrid_property
+    def bbox(self) -> Optional[List[float]]:
+        """Bounding box as [x1, y1, x2, y2]."""
+        if self.bbox_x1 is None:
+            return None
+        return [self.bbox_x1, self.bbox_y1, self.bbox_x2, self.bbox_y2]
+
+    @bbox.inplace.setter
+    def _bbox_setter(self, value: Any) -> None:
+        """Set the bounding box from a list or an x1/y1/x2/y2 mapping."""
+        if value is None:
+            x1 = y1 = x2 = y2 = None
+        elif isinstance(value, dict):
+            x1, y1, x2, y2 = (
+                float(value[k]) for k in ("x1", "y1", "x2", "y2")
+            )
+        else:
+            x1, y1, x2, y2 = (float(v) for v in value)
+        self.bbox_x1, self.bbox_y1 = x1, y1
+        self.bbox_x2, self.bbox_y2 = x2, y2
+
+    @bbox.inplace.expression
+    @classmethod
+    def _bbox_expression(cls):
+        """SQL expression selecting the four bbox columns."""
+        return tuple_(cls.bbox_x1, cls.bbox_y1, cls.bbox_x2, cls.bbox_y2)
+
+    @classmethod
+    def bbox_overlaps(cls, x1: float, y1: float, x2: float, y2: float):
+        """
+        Filter for detections whose bbox intersects a region.
+
+        Args:
+            x1, y1, x2, y2: Region corners in image coordinates
+
+        Returns:
+            SQL boolean expression
+        """
+        return and_(
+            cls.bbox_x1 < x2,
+            cls.bbox_x2 > x1,
+            cls.bbox_y1 < y2,
+            cls.bbox_y2 > y1,
+        )
+
 
 class ProcessingMetrics(Base):
     """System performance metrics model"""
@@ -68,3 +128,5 @@ class ProcessingMetrics(Base):
     maintenance_status = Column(String)
 
     facility = relationship("Facility")
+
+    __table_args__ = {"sqlite_autoincrement": True}  # see PlasticDetection
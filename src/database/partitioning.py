@@ -0,0 +1,682 @@
+"""
+Time-based partitioning, retention and archival for high-volume tables.
+
+On PostgreSQL the partitioned tables are created as native
+``PARTITION BY RANGE (timestamp)`` parents with one child per period.
+SQLite has no partitioning, so the base table holds the current period
+and older rows are rotated into per-period tables
+(e.g. ``plastic_detections_p2026_10``).
+
+Expired partitions are exported to compressed columnar files (Parquet when
+``pyarrow`` is installed, NPZ otherwise) and dropped. ``ArchiveReader``
+queries live and archived periods through a single call.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import (
+    JSON,
+    DateTime,
+    Float,
+    ForeignKeyConstraint,
+    Integer,
+    MetaData,
+    Table,
+    and_,
+    delete,
+    func,
+    inspect,
+    insert,
+    select,
+    text,
+)
+from sqlalchemy.engine import Engine
+
+from src.common import cache
+from src.common.config import settings
+from src.database.migrations import BBOX_COLUMNS, parse_legacy_bbox
+from src.database.models import Base
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+PARTITIONED_TABLES = ("plastic_detections", "processing_metrics")
+TIME_COLUMN = "timestamp"
+
+_LABEL_FORMATS = {"day": "%Y_%m_%d", "month": "%Y_%m"}
+
+
+def period_start(ts: datetime, interval: str) -> datetime:
+    """Return the start of the period containing ``ts``."""
+    if interval == "day":
+        return datetime(ts.year, ts.month, ts.day)
+    if interval == "month":
+        return datetime(ts.year, ts.month, 1)
+    raise ValueError(f"Unsupported partition interval: {interval}")
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    """Return the start of the period following ``start``."""
+    if interval == "day":
+        return start + timedelta(days=1)
+    if start.month == 12:
+        return datetime(start.year + 1, 1, 1)
+    return datetime(start.year, start.month + 1, 1)
+
+
+def partition_name(table_name: str, start: datetime, interval: str) -> str:
+    """Name of the partition of ``table_name`` holding the given period."""
+    return f"{table_name}_p{start.strftime(_LABEL_FORMATS[interval])}"
+
+
+def parse_partition_name(
+    table_name: str,
+    name: str,
+    interval: str
+) -> Optional[datetime]:
+    """Return the period start encoded in a partition name, if any."""
+    prefix = f"{table_name}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        return datetime.strptime(name[len(prefix):], _LABEL_FORMATS[interval])
+    except ValueError:
+        return None
+
+
+class PartitionManager:
+    """Creates, rotates and expires time partitions."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        metadata: MetaData = Base.metadata,
+        interval: Optional[str] = None,
+        retention_days: Optional[int] = None,
+        archive_dir: Optional[Path] = None,
+        tables: Sequence[str] = PARTITIONED_TABLES,
+    ):
+        """
+        Initialize the partition manager.
+
+        Args:
+            engine: SQLAlchemy engine of the detection database
+            metadata: Metadata holding the partitioned table definitions
+            interval: Partition period, ``"day"`` or ``"month"``
+            retention_days: Age after which partitions are archived
+            archive_dir: Directory receiving the archive files
+            tables: Names of the tables to partition
+        """
+        self.engine = engine
+        self.metadata = metadata
+        self.interval = interval or settings.PARTITION_INTERVAL
+        self.retention_days = (
+            settings.DATA_RETENTION_DAYS
+            if retention_days is None else retention_days
+        )
+        self.archive_dir = Path(archive_dir or settings.ARCHIVE_DIR)
+        self.tables = tuple(tables)
+        if self.interval not in _LABEL_FORMATS:
+            raise ValueError(f"Unsupported partition interval: {self.interval}")
+
+        # Private copy of the schema so per-period tables can be added
+        # without touching the ORM metadata.
+        self._schema = MetaData()
+        for table in self.metadata.sorted_tables:
+            table.to_metadata(self._schema)
+
+    @property
+    def is_postgres(self) -> bool:
+        """Whether the engine supports native partitioning."""
+        return self.engine.dialect.name == "postgresql"
+
+    def partition_table(self, table_name: str, start: datetime) -> Table:
+        """Table object for the partition of ``table_name`` at ``start``."""
+        name = partition_name(table_name, start, self.interval)
+        if name in self._schema.tables:
+            return self._schema.tables[name]
+        partition = self._schema.tables[table_name].to_metadata(
+            self._schema, name=name
+        )
+        # Index names are global in SQLite, so prefix the copied ones.
+        for index in partition.indexes:
+            index.name = f"{name}_{index.name}"
+        return partition
+
+    def install(self) -> None:
+        """
+        Create the partitioned tables and the upcoming partitions.
+
+        On PostgreSQL this must run before ``Base.metadata.create_all`` so
+        the parents are created as partitioned tables; existing plain
+        tables are left untouched.
+        """
+        if self.is_postgres:
+            self._create_postgres_parents()
+        self.metadata.create_all(self.engine)
+        if not self.is_postgres:
+            self._check_sqlite_autoincrement()
+        self.ensure_partitions()
+
+    def _check_sqlite_autoincrement(self) -> None:
+        """Warn about base tables that may reuse ids once rotated empty."""
+        with self.engine.connect() as conn:
+            for table_name in self.tables:
+                sql = conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE name = :name"),
+                    {"name": table_name},
+                ).scalar()
+                if sql and "AUTOINCREMENT" not in sql.upper():
+                    logger.warning(
+                        f"{table_name} was created without AUTOINCREMENT; ids "
+                        f"can repeat after rotation empties it"
+                    )
+
+    def ensure_partitions(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Create partitions for the current period and the next few.
+
+        SQLite period tables are created lazily by ``rotate``, so only
+        the names are returned there.
+
+        Args:
+            now: Reference time, defaults to the current UTC time
+
+        Returns:
+            Names of the current and upcoming partitions
+        """
+        start = period_start(now or datetime.utcnow(), self.interval)
+        names = []
+        for _ in range(settings.PARTITION_PREMAKE + 1):
+            end = next_period(start, self.interval)
+            for table_name in self.tables:
+                if self.is_postgres:
+                    names.append(
+                        self._create_postgres_partition(table_name, start, end)
+                    )
+                else:
+                    names.append(
+                        partition_name(table_name, start, self.interval)
+                    )
+            start = end
+        return names
+
+    def list_partitions(self, table_name: str) -> List[Tuple[datetime, str]]:
+        """
+        List the period partitions of a table, oldest first.
+
+        Args:
+            table_name: Partitioned table name
+
+        Returns:
+            ``(period_start, partition_name)`` pairs
+        """
+        if self.is_postgres:
+            with self.engine.connect() as conn:
+                names = conn.execute(
+                    text(
+                        "SELECT c.relname FROM pg_inherits i "
+                        "JOIN pg_class c ON c.oid = i.inhrelid "
+                        "JOIN pg_class p ON p.oid = i.inhparent "
+                        "WHERE p.relname = :parent"
+                    ),
+                    {"parent": table_name},
+                ).scalars().all()
+        else:
+            names = inspect(self.engine).get_table_names()
+
+        partitions = []
+        for name in names:
+            start = parse_partition_name(table_name, name, self.interval)
+            if start is not None:
+                partitions.append((start, name))
+        return sorted(partitions)
+
+    def rotate(self, now: Optional[datetime] = None) -> int:
+        """
+        Move rows of past periods out of the SQLite base tables.
+
+        PostgreSQL routes rows on insert, so this is a no-op there.
+
+        Args:
+            now: Reference time, defaults to the current UTC time
+
+        Returns:
+            Number of rows moved
+        """
+        if self.is_postgres:
+            return 0
+
+        current = period_start(now or datetime.utcnow(), self.interval)
+        moved = 0
+        for table_name in self.tables:
+            base = self._schema.tables[table_name]
+            ts = base.c[TIME_COLUMN]
+            with self.engine.begin() as conn:
+                oldest = conn.execute(
+                    select(func.min(ts)).where(ts < current)
+                ).scalar()
+                if oldest is None:
+                    continue
+                start = period_start(oldest, self.interval)
+                while start < current:
+                    end = next_period(start, self.interval)
+                    window = and_(ts >= start, ts < end)
+                    count = conn.execute(
+                        select(func.count()).select_from(base).where(window)
+                    ).scalar()
+                    if count:
+                        target = self.partition_table(table_name, start)
+                        target.create(conn, checkfirst=True)
+                        conn.execute(
+                            insert(target).from_select(
+                                [c.name for c in base.columns],
+                                select(base).where(window),
+                            )
+                        )
+                        conn.execute(delete(base).where(window))
+                        moved += count
+                    start = end
+        if moved:
+            logger.info(f"Rotated {moved} rows into period partitions")
+            # Listings read the base tables, which just lost these rows
+            cache.invalidate(cache.BATCHES, cache.METRICS)
+        return moved
+
+    def apply_retention(self, now: Optional[datetime] = None) -> List[Path]:
+        """
+        Archive and drop partitions older than the retention period.
+
+        Upcoming partitions are created first, so on PostgreSQL a
+        scheduled retention run also keeps rows out of the DEFAULT
+        partition.
+
+        Args:
+            now: Reference time, defaults to the current UTC time
+
+        Returns:
+            Paths of the archive files written
+        """
+        now = now or datetime.utcnow()
+        self.ensure_partitions(now)
+        self.rotate(now)
+        cutoff = now - timedelta(days=self.retention_days)
+
+        archived = []
+        for table_name in self.tables:
+            for start, name in self.list_partitions(table_name):
+                if next_period(start, self.interval) > cutoff:
+                    continue
+                archived.append(self._archive_partition(table_name, start, name))
+        return archived
+
+    def _archive_partition(
+        self,
+        table_name: str,
+        start: datetime,
+        name: str
+    ) -> Path:
+        """
+        Export one partition to the archive and drop it.
+
+        A period archived before (late rows were rotated into it
+        afterwards) is merged with its existing archive file, which is
+        replaced atomically.
+        """
+        partition = self.partition_table(table_name, start)
+        quote = self.engine.dialect.identifier_preparer.quote
+        target = self.archive_dir / table_name / name
+        with self.engine.begin() as conn:
+            if self.is_postgres:
+                conn.execute(text(
+                    f"ALTER TABLE {quote(table_name)} "
+                    f"DETACH PARTITION {quote(name)}"
+                ))
+            rows = [dict(r) for r in conn.execute(select(partition)).mappings()]
+            previous = [
+                p for p in (target.with_suffix(".parquet"), target.with_suffix(".npz"))
+                if p.exists()
+            ]
+            if previous:
+                # Rows already archived by an interrupted earlier pass are
+                # taken from the table
+                keys = [c.name for c in partition.primary_key.columns]
+                fresh = {tuple(row[k] for k in keys) for row in rows}
+                merged = [
+                    row for p in previous for row in read_archive(p, partition)
+                    if tuple(row[k] for k in keys) not in fresh
+                ]
+                rows = merged + rows
+            staged = write_archive(target.parent / ".staging" / name, partition, rows)
+            path = target.with_suffix(staged.suffix)
+            os.replace(staged, path)
+            for old in previous:
+                if old != path:
+                    old.unlink()
+            partition.drop(conn)
+        logger.info(f"Archived {len(rows)} rows from {name} to {path}")
+        return path
+
+    def _create_postgres_parents(self) -> None:
+        """Create partitioned parent tables that do not exist yet."""
+        schema = MetaData()
+        existing = set(inspect(self.engine).get_table_names())
+        for table in self.metadata.sorted_tables:
+            if table.name not in self.tables:
+                table.to_metadata(schema)
+                continue
+            columns = []
+            for column in table.columns:
+                column = column._copy()
+                if column.name == TIME_COLUMN:
+                    # The partition key must be part of the primary key.
+                    column.primary_key = True
+                    column.nullable = False
+                elif column.primary_key:
+                    column.autoincrement = True
+                columns.append(column)
+            foreign_keys = [
+                ForeignKeyConstraint([fk.parent.name], [fk.target_fullname])
+                for fk in table.foreign_keys
+            ]
+            Table(
+                table.name,
+                schema,
+                *columns,
+                *foreign_keys,
+                postgresql_partition_by=f"RANGE ({TIME_COLUMN})",
+            )
+        missing = [
+            t for t in schema.sorted_tables
+            if t.name in self.tables and t.name not in existing
+        ]
+        if missing:
+            schema.create_all(self.engine, tables=missing)
+            quote = self.engine.dialect.identifier_preparer.quote
+            with self.engine.begin() as conn:
+                for table in missing:
+                    conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS "
+                        f"{quote(table.name + '_default')} "
+                        f"PARTITION OF {quote(table.name)} DEFAULT"
+                    ))
+
+    def _create_postgres_partition(
+        self,
+        table_name: str,
+        start: datetime,
+        end: datetime
+    ) -> str:
+        """
+        Create a single range partition if missing.
+
+        Rows of the period written before the partition existed sit in
+        the DEFAULT partition, and PostgreSQL refuses to create a range
+        partition overlapping them. They are moved into a plain table
+        which is then attached as the partition, in one transaction.
+        """
+        name = partition_name(table_name, start, self.interval)
+        default = f"{table_name}_default"
+        quote = self.engine.dialect.identifier_preparer.quote
+        bounds = (
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        window = {"start": start, "end": end}
+        with self.engine.begin() as conn:
+            exists = text("SELECT to_regclass(:name) IS NOT NULL")
+            if conn.execute(exists, {"name": quote(name)}).scalar():
+                return name
+            stuck = conn.execute(exists, {"name": quote(default)}).scalar() and (
+                conn.execute(
+                    text(
+                        f"SELECT EXISTS (SELECT 1 FROM {quote(default)} "
+                        f"WHERE {quote(TIME_COLUMN)} >= :start "
+                        f"AND {quote(TIME_COLUMN)} < :end)"
+                    ),
+                    window,
+                ).scalar()
+            )
+            if not stuck:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {quote(name)} "
+                    f"PARTITION OF {quote(table_name)} {bounds}"
+                ))
+                return name
+
+            conn.execute(text(
+                f"CREATE TABLE {quote(name)} (LIKE {quote(table_name)} "
+                f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            ))
+            moved = conn.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM {quote(default)} "
+                    f"WHERE {quote(TIME_COLUMN)} >= :start "
+                    f"AND {quote(TIME_COLUMN)} < :end RETURNING *) "
+                    f"INSERT INTO {quote(name)} SELECT * FROM moved"
+                ),
+                window,
+            ).rowcount
+            conn.execute(text(
+                f"ALTER TABLE {quote(table_name)} ATTACH PARTITION {quote(name)} "
+                f"{bounds}"
+            ))
+        logger.warning(f"Moved {moved} rows from {default} into {name}")
+        return name
+
+
+def write_archive(
+    path: Path,
+    table: Table,
+    rows: Sequence[Dict[str, Any]]
+) -> Path:
+    """
+    Write rows to a compressed columnar archive file.
+
+    Args:
+        path: Target path without extension
+        table: Table describing the row columns
+        rows: Rows as column-name mappings
+
+    Returns:
+        Path of the written file
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    columns = {c.name: [row[c.name] for row in rows] for c in table.columns}
+
+    if pa is not None:
+        for column in table.columns:
+            if isinstance(column.type, JSON):
+                columns[column.name] = [
+                    None if v is None else json.dumps(v)
+                    for v in columns[column.name]
+                ]
+        target = path.with_suffix(".parquet")
+        pq.write_table(pa.table(columns), target, compression="zstd")
+        return target
+
+    arrays = {}
+    for column in table.columns:
+        values = columns[column.name]
+        if isinstance(column.type, DateTime):
+            arrays[column.name] = np.array(values, dtype="datetime64[us]")
+        elif isinstance(column.type, Integer) and None not in values:
+            arrays[column.name] = np.array(values, dtype=np.int64)
+        elif isinstance(column.type, (Integer, Float)):
+            arrays[column.name] = np.array(
+                [np.nan if v is None else v for v in values], dtype=np.float64
+            )
+        elif isinstance(column.type, JSON):
+            arrays[column.name] = np.array(
+                ["" if v is None else json.dumps(v) for v in values], dtype=str
+            )
+        else:
+            arrays[column.name] = np.array(
+                ["" if v is None else str(v) for v in values], dtype=str
+            )
+    target = path.with_suffix(".npz")
+    np.savez_compressed(target, **arrays)
+    return target
+
+
+def read_archive(path: Path, table: Table) -> List[Dict[str, Any]]:
+    """
+    Read rows back from an archive file written by ``write_archive``.
+
+    Archives written before the bbox migration hold a JSON ``bbox``
+    column; it is split into the four ``bbox_*`` float columns.
+
+    Args:
+        path: Archive file (``.parquet`` or ``.npz``)
+        table: Table describing the row columns
+
+    Returns:
+        Rows as dictionaries with the original Python types
+    """
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet archives")
+        columns = pq.read_table(path).to_pydict()
+    else:
+        with np.load(path) as data:
+            columns = {}
+            if "bbox" in data.files and "bbox" not in table.c:
+                columns["bbox"] = [v or None for v in data["bbox"].tolist()]
+            for column in table.columns:
+                if column.name not in data.files:
+                    continue
+                array = data[column.name]
+                if isinstance(column.type, DateTime):
+                    columns[column.name] = array.astype(
+                        "datetime64[us]"
+                    ).tolist()
+                elif array.dtype.kind == "f":
+                    columns[column.name] = [
+                        None if np.isnan(v) else v for v in array.tolist()
+                    ]
+                    if isinstance(column.type, Integer):
+                        columns[column.name] = [
+                            None if v is None else int(v)
+                            for v in columns[column.name]
+                        ]
+                elif array.dtype.kind == "U":
+                    columns[column.name] = [v or None for v in array.tolist()]
+                else:
+                    columns[column.name] = array.tolist()
+
+    for column in table.columns:
+        if isinstance(column.type, JSON) and column.name in columns:
+            columns[column.name] = [
+                None if v is None else json.loads(v)
+                for v in columns[column.name]
+            ]
+    if "bbox" in columns and "bbox" not in table.c:
+        # Archived before bboxes moved to float columns
+        boxes = [parse_legacy_bbox(v) for v in columns.pop("bbox")]
+        for i, name in enumerate(BBOX_COLUMNS):
+            columns[name] = [None if b is None else b[i] for b in boxes]
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+class ArchiveReader:
+    """Queries live partitions and archived periods as one table."""
+
+    def __init__(self, manager: PartitionManager):
+        """
+        Initialize the reader.
+
+        Args:
+            manager: Partition manager owning the tables and archive
+        """
+        self.manager = manager
+
+    def query(
+        self,
+        table_name: str,
+        start: datetime,
+        end: datetime,
+        **filters: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Read rows with ``start <= timestamp < end`` from all storage tiers.
+
+        Args:
+            table_name: Partitioned table name
+            start: Inclusive lower time bound
+            end: Exclusive upper time bound
+            **filters: Column equality filters, e.g. ``batch_id=3``
+
+        Returns:
+            Matching rows ordered by timestamp
+        """
+        manager = self.manager
+        base = manager._schema.tables[table_name]
+        sources = [base]
+        if not manager.is_postgres:
+            sources += [
+                manager.partition_table(table_name, p_start)
+                for p_start, _ in manager.list_partitions(table_name)
+                if p_start < end
+                and next_period(p_start, manager.interval) > start
+            ]
+
+        rows = []
+        with manager.engine.connect() as conn:
+            for source in sources:
+                ts = source.c[TIME_COLUMN]
+                stmt = select(source).where(ts >= start, ts < end)
+                for column, value in filters.items():
+                    stmt = stmt.where(source.c[column] == value)
+                rows.extend(dict(r) for r in conn.execute(stmt).mappings())
+
+        for path in self._archive_files(table_name, start, end):
+            for row in read_archive(path, base):
+                ts = row[TIME_COLUMN]
+                if ts is None or not start <= ts < end:
+                    continue
+                if all(row.get(k) == v for k, v in filters.items()):
+                    rows.append(row)
+
+        rows.sort(key=lambda r: r[TIME_COLUMN] or datetime.min)
+        return rows
+
+    def _archive_files(
+        self,
+        table_name: str,
+        start: datetime,
+        end: datetime
+    ) -> List[Path]:
+        """Archive files whose period overlaps the requested range."""
+        manager = self.manager
+        directory = manager.archive_dir / table_name
+        if not directory.exists():
+            return []
+        files = []
+        for path in sorted(directory.iterdir()):
+            p_start = parse_partition_name(table_name, path.stem, manager.interval)
+            if p_start is None or path.suffix not in (".parquet", ".npz"):
+                continue
+            if p_start < end and next_period(p_start, manager.interval) > start:
+                files.append(path)
+        return files
+
+
+if __name__ == "__main__":
+    from src.database.connection import engine
+
+    manager = PartitionManager(engine)
+    manager.install()
+    for archive in manager.apply_retention():
+        print(f"Archived partition to {archive}")
@@ -0,0 +1,159 @@
+"""
+Write path for classification results.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.common import cache
+from src.database.models import Batch, PlasticDetection, ProcessingMetrics
+
+
+def facility_db_id(facility_id: Any) -> Optional[int]:
+    """
+    Database id of a facility identified as in the API.
+
+    The API identifies facilities by string, the database by integer id;
+    only numeric identifiers map to a database facility.
+    """
+    facility_id = str(facility_id or "")
+    return int(facility_id) if facility_id.isdigit() else None
+
+
+def save_detections(
+    db: Session,
+    batch_id: str,
+    detections: List[Dict[str, Any]],
+    facility_id: Optional[int] = None,
+    timestamp: Optional[datetime] = None
+) -> Batch:
+    """
+    Persist one processed batch and its detections.
+
+    Detections are written with a single executemany insert instead of
+    one ORM object per row.
+
+    Args:
+        db: Database session
+        batch_id: Unique batch identifier
+        detections: Detections as returned by ``classify_plastic``,
+            optionally with ``contamination_level``
+        facility_id: Facility that processed the batch
+        timestamp: Processing time, defaults to now
+
+    Returns:
+        The stored batch
+    """
+    timestamp = timestamp or datetime.utcnow()
+    batch = Batch(
+        batch_id=batch_id,
+        facility_id=facility_id,
+        timestamp=timestamp,
+        total_items=len(detections),
+    )
+    db.add(batch)
+    db.flush()
+
+    if detections:
+        rows = []
+        for detection in detections:
+            x1, y1, x2, y2 = detection["bbox"]
+            rows.append({
+                "batch_id": batch.id,
+                "plastic_type": detection["plastic_type"],
+                "confidence": detection["confidence"],
+                "bbox_x1": x1,
+                "bbox_y1": y1,
+                "bbox_x2": x2,
+                "bbox_y2": y2,
+                "contamination_level": detection.get("contamination_level"),
+                "timestamp": timestamp,
+            })
+        db.execute(insert(PlasticDetection.__table__), rows)
+
+    db.commit()
+    cache.invalidate(cache.BATCHES)
+    return batch
+
+
+def save_detection_event(
+    db: Session,
+    payload: Dict[str, Any]
+) -> Optional[Batch]:
+    """
+    Persist a batch published on the detections topic.
+
+    Event delivery is at-least-once, so the same batch can arrive again
+    (for example after a consumer restart); a batch whose ``batch_id`` is
+    already stored is skipped.
+
+    Args:
+        db: Database session
+        payload: Event payload in the ``ProcessBatchResponse`` format
+
+    Returns:
+        The stored batch, or None if it was stored before
+    """
+    batch_id = payload["batch_id"]
+    if db.query(Batch.id).filter(Batch.batch_id == batch_id).first():
+        return None
+
+    timestamp = payload.get("timestamp")
+    try:
+        return save_detections(
+            db,
+            batch_id,
+            payload["detections"],
+            facility_id=facility_db_id(payload.get("facility_id")),
+            timestamp=datetime.fromisoformat(timestamp) if timestamp else None,
+        )
+    except IntegrityError:
+        # Stored concurrently by another consumer
+        db.rollback()
+        return None
+
+
+def save_processing_metrics(
+    db: Session,
+    snapshots: List[Dict[str, Any]],
+    timestamp: Optional[datetime] = None
+) -> int:
+    """
+    Persist live facility statistics as ``ProcessingMetrics`` rows.
+
+    Energy consumption is not measured by the pipeline and is left empty.
+
+    Args:
+        db: Database session
+        snapshots: Facility snapshots from ``FacilityAggregator.snapshot``
+        timestamp: Recording time, defaults to now
+
+    Returns:
+        Rows written; facilities without a database id are skipped
+    """
+    timestamp = timestamp or datetime.utcnow()
+    rows = []
+    for snapshot in snapshots:
+        facility_id = facility_db_id(snapshot["facility_id"])
+        if facility_id is None:
+            continue
+        rows.append({
+            "facility_id": facility_id,
+            "timestamp": timestamp,
+            "throughput": snapshot["throughput"],
+            "accuracy": snapshot["accuracy"],
+            "uptime": snapshot["uptime"],
+            "energy_consumption": None,
+            "maintenance_status": (
+                "operational" if snapshot["batches"] else "idle"
+            ),
+        })
+    if rows:
+        db.execute(insert(ProcessingMetrics.__table__), rows)
+        db.commit()
+        cache.invalidate(cache.METRICS)
+    return len(rows)
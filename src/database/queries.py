@@ -0,0 +1,348 @@
+"""
+Read queries for stored batches, detections and processing metrics.
+
+Listing uses keyset (cursor) pagination on the primary key, so every page
+costs the same regardless of depth. Exports stream rows through a
+server-side cursor in fixed-size chunks and never materialize the result.
+
+On SQLite, ``PartitionManager.rotate`` moves past periods of detections
+into ``plastic_detections_p*`` tables; detection queries read those
+together with the base table (PostgreSQL partitions are read through
+the parent table).
+"""
+
+import base64
+import binascii
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Select, TableClause, column, select, table, text, union_all
+from sqlalchemy.orm import Session
+
+from src.common.config import settings
+from src.database.models import Batch, PlasticDetection, ProcessingMetrics
+from src.database.partitioning import next_period, parse_partition_name
+
+EXPORT_CHUNK_SIZE = 1000
+
+DETECTION_COLUMNS = (
+    PlasticDetection.id,
+    PlasticDetection.batch_id,
+    PlasticDetection.plastic_type,
+    PlasticDetection.confidence,
+    PlasticDetection.bbox_x1,
+    PlasticDetection.bbox_y1,
+    PlasticDetection.bbox_x2,
+    PlasticDetection.bbox_y2,
+    PlasticDetection.contamination_level,
+    PlasticDetection.timestamp,
+)
+
+CSV_FIELDS = [column.key for column in DETECTION_COLUMNS]
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque cursor."""
+    raw = json.dumps({"id": last_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> int:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Opaque cursor, or None for the first page
+
+    Returns:
+        Primary key after which the next page starts
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def _page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].id)
+
+
+def list_batches(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    facility_id: Optional[int] = None
+) -> Tuple[List[Batch], Optional[str]]:
+    """
+    Fetch one page of batches ordered by id.
+
+    Args:
+        db: Database session
+        limit: Maximum number of batches to return
+        cursor: Cursor returned by the previous page
+        facility_id: Optional facility filter
+
+    Returns:
+        Batches on the page and the cursor of the next page (or None)
+    """
+    stmt = select(Batch).where(Batch.id > decode_cursor(cursor))
+    if facility_id is not None:
+        stmt = stmt.where(Batch.facility_id == facility_id)
+    stmt = stmt.order_by(Batch.id).limit(limit + 1)
+    return _page(list(db.scalars(stmt)), limit)
+
+
+def list_processing_metrics(
+    db: Session,
+    facility_id: int,
+    limit: int = 100,
+    since: Optional[datetime] = None
+) -> List[ProcessingMetrics]:
+    """
+    Fetch a facility's most recent processing metrics, newest first.
+
+    Args:
+        db: Database session
+        facility_id: Facility the metrics belong to
+        limit: Maximum number of rows to return
+        since: Only rows recorded at or after this time
+
+    Returns:
+        Metrics rows
+    """
+    stmt = select(ProcessingMetrics).where(
+        ProcessingMetrics.facility_id == facility_id
+    )
+    if since is not None:
+        stmt = stmt.where(ProcessingMetrics.timestamp >= since)
+    stmt = stmt.order_by(
+        ProcessingMetrics.timestamp.desc(), ProcessingMetrics.id.desc()
+    ).limit(limit)
+    return list(db.scalars(stmt))
+
+
+def detection_tables(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None
+) -> List[Any]:
+    """
+    Tables holding detections in the given time range.
+
+    Args:
+        db: Database session
+        since: Inclusive lower timestamp bound
+        until: Exclusive upper timestamp bound
+
+    Returns:
+        The detections table, followed on SQLite by the period tables
+        overlapping the range
+    """
+    base = PlasticDetection.__table__
+    if db.get_bind().dialect.name != "sqlite":
+        return [base]
+    names = db.execute(
+        text("SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :p"),
+        {"p": f"{base.name}_p%"},
+    ).scalars()
+    interval = settings.PARTITION_INTERVAL
+    tables: List[Any] = [base]
+    for name in sorted(names):
+        start = parse_partition_name(base.name, name, interval)
+        if start is None:
+            continue
+        if until is not None and start >= until:
+            continue
+        if since is not None and next_period(start, interval) <= since:
+            continue
+        tables.append(_period_table(name))
+    return tables
+
+
+def _period_table(name: str) -> TableClause:
+    """Lightweight table construct for a period copy of the detections."""
+    return table(
+        name, *(column(c.name, c.type) for c in PlasticDetection.__table__.columns)
+    )
+
+
+def detection_query(
+    db: Session,
+    batch_id: Optional[int] = None,
+    facility_id: Optional[int] = None,
+    plastic_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after_id: int = 0,
+    limit: Optional[int] = None
+) -> Select:
+    """
+    Build the filtered detection select shared by listing and export.
+
+    Filters, the keyset bound and the limit are applied to each table
+    before the tables are combined with UNION ALL, so each one is read
+    through its own indexes.
+
+    Args:
+        db: Database session
+        batch_id: Database id of the batch
+        facility_id: Facility owning the batch
+        plastic_type: Plastic type label
+        since: Inclusive lower timestamp bound
+        until: Exclusive upper timestamp bound
+        after_id: Only detections with a greater id
+        limit: Maximum number of rows
+
+    Returns:
+        Select over ``DETECTION_COLUMNS`` ordered by id
+    """
+    selects = []
+    for source in detection_tables(db, since, until):
+        c = source.c
+        stmt = select(*(c[col.key] for col in DETECTION_COLUMNS)).select_from(source)
+        if facility_id is not None:
+            stmt = stmt.join(Batch, Batch.id == c.batch_id).where(
+                Batch.facility_id == facility_id
+            )
+        if batch_id is not None:
+            stmt = stmt.where(c.batch_id == batch_id)
+        if plastic_type is not None:
+            stmt = stmt.where(c.plastic_type == plastic_type)
+        if since is not None:
+            stmt = stmt.where(c.timestamp >= since)
+        if until is not None:
+            stmt = stmt.where(c.timestamp < until)
+        if after_id:
+            stmt = stmt.where(c.id > after_id)
+        if limit is not None:
+            stmt = stmt.order_by(c.id).limit(limit)
+        selects.append(stmt)
+
+    if len(selects) == 1:
+        stmt = selects[0]
+        return stmt if limit is not None else stmt.order_by(stmt.selected_columns.id)
+    # SQLite does not allow ORDER BY or LIMIT on the members of a compound
+    # select, so each member reads from its own subquery
+    combined = union_all(*(
+        select(*sub.c) for sub in (stmt.subquery() for stmt in selects)
+    )).subquery("detections")
+    stmt = select(*combined.c).order_by(combined.c.id)
+    return stmt.limit(limit) if limit is not None else stmt
+
+
+def detection_record(row: Any) -> Dict[str, Any]:
+    """Convert a detection row to its API representation."""
+    bbox = None
+    if row.bbox_x1 is not None:
+        bbox = [row.bbox_x1, row.bbox_y1, row.bbox_x2, row.bbox_y2]
+    return {
+        "id": row.id,
+        "batch_id": row.batch_id,
+        "plastic_type": row.plastic_type,
+        "confidence": row.confidence,
+        "bbox": bbox,
+        "contamination_level": row.contamination_level,
+        "timestamp": row.timestamp,
+    }
+
+
+def list_detections(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    **filters: Any
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch one page of detections ordered by id.
+
+    Args:
+        db: Database session
+        limit: Maximum number of detections to return
+        cursor: Cursor returned by the previous page
+        **filters: Filters accepted by ``detection_query``
+
+    Returns:
+        Detection records on the page and the next cursor (or None)
+    """
+    stmt = detection_query(
+        db, after_id=decode_cursor(cursor), limit=limit + 1, **filters
+    )
+    rows, next_cursor = _page(list(db.execute(stmt)), limit)
+    return [detection_record(row) for row in rows], next_cursor
+
+
+def _iter_rows(db: Session, stmt: Select) -> Iterator[Any]:
+    """Yield rows from a server-side cursor in fixed-size chunks."""
+    result = db.execute(
+        stmt.execution_options(
+            stream_results=True,
+            yield_per=EXPORT_CHUNK_SIZE,
+        )
+    )
+    try:
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        result.close()
+
+
+def export_ndjson(db: Session, **filters: Any) -> Iterator[bytes]:
+    """
+    Stream detections as newline-delimited JSON.
+
+    Args:
+        db: Database session, kept open until the iterator is exhausted
+        **filters: Filters accepted by ``detection_query``
+
+    Yields:
+        Encoded chunks of NDJSON lines
+    """
+    buffer = []
+    for row in _iter_rows(db, detection_query(db, **filters)):
+        record = detection_record(row)
+        if record["timestamp"] is not None:
+            record["timestamp"] = record["timestamp"].isoformat()
+        buffer.append(json.dumps(record))
+        if len(buffer) >= EXPORT_CHUNK_SIZE:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode()
+
+
+def export_csv(db: Session, **filters: Any) -> Iterator[bytes]:
+    """
+    Stream detections as CSV with a header row.
+
+    Args:
+        db: Database session, kept open until the iterator is exhausted
+        **filters: Filters accepted by ``detection_query``
+
+    Yields:
+        Encoded chunks of CSV lines
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    rows = 0
+    for row in _iter_rows(db, detection_query(db, **filters)):
+        writer.writerow(row)
+        rows += 1
+        if rows % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
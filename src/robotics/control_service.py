@@ -0,0 +1,360 @@
+"""
+gRPC robot control service.
+
+Exposes ``MultiArmController`` to vision nodes on other hosts. A vision
+node opens one bidirectional ``robotics.RobotControl/Sort`` stream and
+keeps it open: it writes pick commands and reads an acknowledgement for
+each one as its pick completes, so commands pay no connection or call
+set-up cost. Acknowledgements arrive in completion order, matched to
+their command by id.
+
+``RobotControlClient`` pipelines commands over the stream with a window:
+at most ``window`` commands are unacknowledged at a time, so a slow robot
+cell pushes back on the vision node instead of building an unbounded
+backlog.
+
+Messages are JSON objects, so the service needs no generated code:
+
+- command: ``{"id": int, "detection": {"plastic_type", "confidence",
+  "bbox", ...}}``
+- acknowledgement: ``{"id": int, "ok": bool, "error": str | None,
+  "latency_ms": float}``, latency measured on the server from receipt
+  to the end of the pick
+
+With ``PUBLISH_EVENTS`` set every outcome is also published on the
+sort-results topic, keyed by the detection's ``facility_id`` when the
+vision node includes one.
+
+Run the server with ``python -m src.robotics.control_service``.
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import count
+from typing import Any, Dict, Iterator, List, Optional
+
+import grpc
+
+from src.common import events
+from src.common.config import settings
+from src.robotics.robot_controller import MultiArmController
+
+logger = logging.getLogger(__name__)
+
+SERVICE = "robotics.RobotControl"
+SORT_METHOD = f"/{SERVICE}/Sort"
+
+_END = object()
+
+
+class SortError(RuntimeError):
+    """A pick command was acknowledged as failed."""
+
+
+def _serialize(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8")
+
+
+def _deserialize(data: bytes) -> Dict[str, Any]:
+    return json.loads(data)
+
+
+class RobotControlServicer:
+    """Runs the pick commands of ``Sort`` streams on a controller."""
+
+    def __init__(self, controller: MultiArmController):
+        """
+        Initialize the servicer.
+
+        Args:
+            controller: Controller executing the picks
+        """
+        self.controller = controller
+
+    def sort(
+        self,
+        commands: Iterator[Dict[str, Any]],
+        context: grpc.ServicerContext
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Handle one ``Sort`` stream.
+
+        Commands are read on a separate thread and queued on the arms as
+        they arrive; acknowledgements are yielded as picks complete.
+        """
+        acks: "queue.Queue" = queue.Queue()
+
+        def read() -> None:
+            submitted = 0
+            try:
+                for command in commands:
+                    self._dispatch(command, acks)
+                    submitted += 1
+            except Exception as e:
+                # The client cancelled or the connection dropped
+                logger.warning(f"Sort stream ended: {e}")
+            finally:
+                acks.put((_END, submitted))
+
+        threading.Thread(target=read, name="sort-stream", daemon=True).start()
+
+        sent, expected = 0, None
+        while expected is None or sent < expected:
+            ack = acks.get()
+            if isinstance(ack, tuple) and ack[0] is _END:
+                expected = ack[1]
+                continue
+            sent += 1
+            yield ack
+
+    def _dispatch(self, command: Dict[str, Any], acks: "queue.Queue") -> None:
+        """Queue a command on the arms; its acknowledgement goes to ``acks``."""
+        received = time.perf_counter()
+        command_id = command.get("id")
+        detection = command.get("detection")
+        if not isinstance(detection, dict):
+            acks.put(self._ack(command_id, received, "Command has no detection"))
+            return
+
+        def done(future: Future) -> None:
+            error = future.exception()
+            ack = self._ack(command_id, received, str(error) if error else None)
+            acks.put(ack)
+            if settings.PUBLISH_EVENTS:
+                facility_id = detection.get("facility_id")
+                events.publish(
+                    events.SORT_RESULTS,
+                    {
+                        **ack,
+                        "plastic_type": detection.get("plastic_type"),
+                        "facility_id": facility_id,
+                    },
+                    key=None if facility_id is None else str(facility_id),
+                )
+
+        self.controller.submit(detection).add_done_callback(done)
+
+    @staticmethod
+    def _ack(
+        command_id: Any,
+        received: float,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        return {
+            "id": command_id,
+            "ok": error is None,
+            "error": error,
+            "latency_ms": (time.perf_counter() - received) * 1000,
+        }
+
+
+class RobotControlServer:
+    """gRPC server for the robot control service."""
+
+    def __init__(
+        self,
+        controller: Optional[MultiArmController] = None,
+        port: Optional[int] = None,
+        max_streams: Optional[int] = None
+    ):
+        """
+        Initialize the server; call ``start`` to serve.
+
+        Args:
+            controller: Controller executing the picks, a new one by default
+            port: Port to listen on, defaults to ``settings.ROBOT_CONTROL_PORT``;
+                0 picks a free port
+            max_streams: Concurrent ``Sort`` streams, defaults to
+                ``settings.ROBOT_CONTROL_MAX_STREAMS``
+        """
+        self.controller = controller or MultiArmController()
+        self.servicer = RobotControlServicer(self.controller)
+        self._server = grpc.server(
+            ThreadPoolExecutor(
+                max_workers=max_streams or settings.ROBOT_CONTROL_MAX_STREAMS,
+                thread_name_prefix="robot-control",
+            )
+        )
+        self._server.add_generic_rpc_handlers((
+            grpc.method_handlers_generic_handler(SERVICE, {
+                "Sort": grpc.stream_stream_rpc_method_handler(
+                    self.servicer.sort,
+                    request_deserializer=_deserialize,
+                    response_serializer=_serialize,
+                ),
+            }),
+        ))
+        port = settings.ROBOT_CONTROL_PORT if port is None else port
+        self.port = self._server.add_insecure_port(f"[::]:{port}")
+
+    def start(self) -> "RobotControlServer":
+        """Start serving."""
+        self._server.start()
+        logger.info(f"Robot control service listening on port {self.port}")
+        return self
+
+    def stop(self, grace: Optional[float] = 1.0) -> None:
+        """Stop serving, letting open streams finish for ``grace`` seconds."""
+        self._server.stop(grace).wait()
+
+    def wait(self) -> None:
+        """Block until the server stops."""
+        self._server.wait_for_termination()
+
+
+class RobotControlClient:
+    """Sends pick commands to a robot control server over one stream."""
+
+    def __init__(
+        self,
+        target: Optional[str] = None,
+        window: Optional[int] = None
+    ):
+        """
+        Connect and open the ``Sort`` stream.
+
+        Args:
+            target: ``host:port`` of the server, defaults to
+                ``settings.ROBOT_CONTROL_HOST`` and ``ROBOT_CONTROL_PORT``
+            window: Unacknowledged commands allowed, defaults to
+                ``settings.ROBOT_CONTROL_WINDOW``
+        """
+        self.target = target or (
+            f"{settings.ROBOT_CONTROL_HOST}:{settings.ROBOT_CONTROL_PORT}"
+        )
+        self.window = window or settings.ROBOT_CONTROL_WINDOW
+        self._slots = threading.Semaphore(self.window)
+        self._commands: "queue.Queue" = queue.Queue()
+        self._pending: Dict[int, Future] = {}
+        self._ids = count()
+        self._lock = threading.Lock()  # guards _pending and _error
+        self._error: Optional[Exception] = None
+
+        self._channel = grpc.insecure_channel(self.target)
+        sort = self._channel.stream_stream(
+            SORT_METHOD,
+            request_serializer=_serialize,
+            response_deserializer=_deserialize,
+        )
+        self._acks = sort(self._command_stream())
+        self._reader = threading.Thread(
+            target=self._read_acks, name="sort-acks", daemon=True
+        )
+        self._reader.start()
+
+    def __enter__(self) -> "RobotControlClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _command_stream(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            command = self._commands.get()
+            if command is None:
+                return
+            yield command
+
+    def _read_acks(self) -> None:
+        """Resolve command futures from acknowledgements."""
+        error: Exception = ConnectionError("Sort stream closed")
+        try:
+            for ack in self._acks:
+                with self._lock:
+                    future = self._pending.pop(ack["id"], None)
+                self._slots.release()
+                if future is None:
+                    continue
+                if ack["ok"]:
+                    future.set_result(ack)
+                else:
+                    future.set_exception(SortError(ack["error"]))
+        except grpc.RpcError as e:
+            error = ConnectionError(f"Sort stream failed: {e.code()}")
+        finally:
+            with self._lock:
+                self._error = error
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(error)
+
+    def submit(
+        self,
+        detection: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> Future:
+        """
+        Send a pick command, waiting while the window is full.
+
+        Args:
+            detection: Plastic detection to pick
+            timeout: Seconds to wait for a free window slot
+
+        Returns:
+            Future resolved with the acknowledgement, or failed with
+            ``SortError`` when the pick failed
+
+        Raises:
+            TimeoutError: If no window slot freed up in time
+            ConnectionError: If the stream is closed
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No free slot in the command window")
+        with self._lock:
+            if self._error is not None:
+                self._slots.release()
+                raise self._error
+            command_id = next(self._ids)
+            future: Future = Future()
+            self._pending[command_id] = future
+        self._commands.put({"id": command_id, "detection": detection})
+        return future
+
+    def sort(self, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Pick detections and wait for all acknowledgements.
+
+        Returns:
+            Acknowledgements in the order of ``detections``
+
+        Raises:
+            SortError: If a pick failed
+        """
+        futures = [self.submit(detection) for detection in detections]
+        return [future.result() for future in futures]
+
+    async def pick_and_sort(self, detections: List[Dict[str, Any]]) -> bool:
+        """
+        Remote counterpart of ``MultiArmController.pick_and_sort``.
+
+        Returns:
+            True if every item was sorted
+        """
+        if not detections:
+            logger.warning("No detections to process")
+            return False
+        try:
+            # submit() blocks while the window is full
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.sort, detections
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Sorting failed: {e}")
+            return False
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Finish the stream after outstanding acknowledgements arrive."""
+        self._commands.put(None)
+        self._reader.join(timeout)
+        self._channel.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    RobotControlServer().start().wait()
@@ -5,10 +5,11 @@ Robot control module for AI Circo Recycling System.
 import logging
 from typing import List, Dict, Any
 import time
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 import threading
 from queue import Queue
 
+from src.common import metrics
 from src.common.config import settings
 
 logger = logging.getLogger(__name__)
@@ -20,7 +21,11 @@ class MultiArmController:
     def __init__(self):
         """Initialize the controller."""
         self.max_workers = settings.MAX_WORKERS
-        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.pick_duration = settings.ROBOT_PICK_DURATION
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="arm"
+        )
         self.task_queue = Queue()
         self.running = False
         self.emergency_stop = False
@@ -42,13 +47,7 @@ class MultiArmController:
                 return False
 
             # Submit sorting tasks
-            futures = []
-            for detection in detections:
-                future = self.executor.submit(
-                    self._sort_item,
-                    detection
-                )
-                futures.append(future)
+            futures = [self.submit(detection) for detection in detections]
 
             # Wait for completion
             for future in futures:
@@ -60,6 +59,42 @@ class MultiArmController:
             logger.error(f"Sorting failed: {e}")
             return False
 
+    def submit(self, detection: Dict[str, Any]) -> Future:
+        """
+        Queue one item for the next free arm.
+
+        Args:
+            detection: Plastic detection data
+
+        Returns:
+            Future resolved when the item is sorted, or failed with the
+            sorting error
+        """
+        metrics.ROBOT_QUEUE_DEPTH.inc()
+        return self.executor.submit(
+            self._run_sort_task,
+            detection,
+            time.perf_counter()
+        )
+
+    def _run_sort_task(
+        self,
+        detection: Dict[str, Any],
+        submitted_at: float
+    ) -> None:
+        """
+        Run one sort task on an arm worker and record its metrics.
+
+        Args:
+            detection: Plastic detection data
+            submitted_at: ``time.perf_counter()`` value at submission
+        """
+        metrics.ROBOT_QUEUE_DEPTH.dec()
+        try:
+            self._sort_item(detection)
+        finally:
+            metrics.ROBOT_PICK_LATENCY.observe(time.perf_counter() - submitted_at)
+
     def _sort_item(self, detection: Dict[str, Any]) -> None:
         """
         Sort a single plastic item.
@@ -69,16 +104,23 @@ class MultiArmController:
         """
         try:
             with self.lock:
-                if self.emergency_stop:
-                    raise Exception("Emergency stop activated")
-
-                # Simulate sorting delay
-                time.sleep(0.5)
-
-                logger.info(
-                    f"Sorted {detection['plastic_type']} "
-                    f"(confidence: {detection['confidence']:.2f})"
-                )
+                # Busy time starts once the arm is ours, not while waiting
+                started = time.perf_counter()
+                try:
+                    if self.emergency_stop:
+                        raise Exception("Emergency stop activated")
+
+                    # Simulate sorting delay
+                    time.sleep(self.pick_duration)
+
+                    logger.info(
+                        f"Sorted {detection['plastic_type']} "
+                        f"(confidence: {detection['confidence']:.2f})"
+                    )
+                finally:
+                    metrics.ROBOT_ARM_BUSY.labels(
+                        arm=threading.current_thread().name
+                    ).inc(time.perf_counter() - started)
 
         except Exception as e:
             logger.error(f"Item sorting failed: {e}")
@@ -0,0 +1,241 @@
+"""
+Load-adaptive input resolution for the plastic classifier.
+
+Under peak load it is better to detect at a lower resolution than to fall
+behind the belt. ``AdaptiveResolutionController`` wraps a
+``PlasticClassifier`` or ``ModelManager`` and picks the input size of each
+frame from a ladder of resolutions, stepping down when the frame queue or
+the recent latency breaks the SLO and stepping back up once both have
+recovered. Separate high/low queue thresholds and a minimum dwell time
+between switches provide hysteresis so the resolution does not flap.
+
+The size is passed with each call rather than set on the classifier, so
+a shared classifier and model swaps are unaffected; the controller's own
+state is locked, as ``StreamOrchestrator`` workers call it concurrently.
+
+Latency, detections and (optionally) agreement with a full-resolution
+reference are tracked per resolution, giving live accuracy-versus-latency
+figures for each rung of the ladder. Audits call ``detect`` so they do
+not count as served frames or feed the motion gate and sample capture.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.common import metrics
+from src.common.config import settings
+from src.vision.evaluation import detection_agreement
+
+logger = logging.getLogger(__name__)
+
+
+class ResolutionStats:
+    """Rolling latency and accuracy figures for one input resolution."""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize the statistics.
+
+        Args:
+            window: Number of recent frames kept for latency percentiles
+        """
+        self.frames = 0
+        self.detections = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.agreements: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency_ms: float, detections: int) -> None:
+        """Record one classified frame."""
+        self.frames += 1
+        self.detections += detections
+        self.latencies.append(latency_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary of the recorded frames."""
+        latencies = np.asarray(self.latencies)
+        return {
+            "frames": self.frames,
+            "mean_ms": float(latencies.mean()) if latencies.size else None,
+            "p95_ms": (
+                float(np.percentile(latencies, 95)) if latencies.size else None
+            ),
+            "detections_per_frame": self.detections / max(self.frames, 1),
+            "agreement": (
+                float(np.mean(self.agreements)) if self.agreements else None
+            ),
+            "audits": len(self.agreements),
+        }
+
+
+class AdaptiveResolutionController:
+    """Switches classifier input resolution based on queue depth and latency."""
+
+    def __init__(
+        self,
+        classifier: Any,
+        resolutions: Optional[Sequence[int]] = None,
+        latency_slo_ms: Optional[float] = None,
+        queue_high: Optional[int] = None,
+        queue_low: Optional[int] = None,
+        hold_frames: Optional[int] = None,
+        audit_interval: Optional[int] = None,
+        window: int = 20
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            classifier: Classifier with ``classify_plastic`` and ``detect``
+                taking an ``input_size``, e.g. ``PlasticClassifier`` or
+                ``ModelManager``
+            resolutions: Candidate input sizes, defaults to
+                ``settings.ADAPTIVE_RESOLUTIONS``
+            latency_slo_ms: Per-frame latency budget, defaults to
+                ``settings.LATENCY_SLO_MS``
+            queue_high: Queue depth that forces a step down
+            queue_low: Queue depth at or below which a step up is allowed
+            hold_frames: Minimum frames between two switches
+            audit_interval: Frames between full-resolution audits while
+                the queue is short; 0 disables audits
+            window: Recent frames used for the latency decision
+        """
+        self.classifier = classifier
+        self._lock = threading.Lock()  # guards the ladder and statistics
+        self.resolutions = sorted(resolutions or settings.ADAPTIVE_RESOLUTIONS)
+        self.latency_slo_ms = latency_slo_ms or settings.LATENCY_SLO_MS
+        self.queue_high = (
+            settings.ADAPTIVE_QUEUE_HIGH if queue_high is None else queue_high
+        )
+        self.queue_low = (
+            settings.ADAPTIVE_QUEUE_LOW if queue_low is None else queue_low
+        )
+        self.hold_frames = (
+            settings.ADAPTIVE_HOLD_FRAMES if hold_frames is None else hold_frames
+        )
+        self.audit_interval = (
+            settings.ADAPTIVE_AUDIT_INTERVAL
+            if audit_interval is None else audit_interval
+        )
+        self.recent: Deque[float] = deque(maxlen=window)
+        self.stats = {size: ResolutionStats() for size in self.resolutions}
+        self.switches = 0
+        self.frames = 0
+        self._since_switch = 0
+        self.level = len(self.resolutions) - 1
+        metrics.VISION_INPUT_RESOLUTION.set(self.resolution)
+
+    @property
+    def resolution(self) -> int:
+        """Current input resolution."""
+        return self.resolutions[self.level]
+
+    def _switch(self, step: int, reason: str) -> None:
+        """Move ``step`` rungs along the resolution ladder."""
+        old = self.resolution
+        self.level += step
+        self.switches += 1
+        self._since_switch = 0
+        self.recent.clear()
+        metrics.VISION_INPUT_RESOLUTION.set(self.resolution)
+        logger.info(f"Input resolution {old} -> {self.resolution} ({reason})")
+
+    def update(self, queue_depth: int) -> int:
+        """
+        Choose the resolution for the next frame.
+
+        Args:
+            queue_depth: Frames waiting to be classified
+
+        Returns:
+            Input resolution to use
+        """
+        with self._lock:
+            return self._update(queue_depth)
+
+    def _update(self, queue_depth: int) -> int:
+        """``update`` with the lock held."""
+        if self._since_switch < self.hold_frames:
+            return self.resolution
+
+        p95 = float(np.percentile(self.recent, 95)) if self.recent else 0.0
+        if self.level > 0 and (
+            queue_depth >= self.queue_high or p95 > self.latency_slo_ms
+        ):
+            self._switch(-1, f"queue {queue_depth}, p95 {p95:.1f} ms")
+        elif (
+            self.level < len(self.resolutions) - 1
+            and queue_depth <= self.queue_low
+        ):
+            # Only step up if the higher resolution is expected to fit the SLO
+            higher = self.stats[self.resolutions[self.level + 1]]
+            expected = higher.to_dict()["p95_ms"]
+            if expected is None or expected <= self.latency_slo_ms:
+                self._switch(1, f"queue {queue_depth}, p95 {p95:.1f} ms")
+        return self.resolution
+
+    def classify(
+        self,
+        image: np.ndarray,
+        queue_depth: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify a frame at the resolution the current load allows.
+
+        Args:
+            image: Input frame
+            queue_depth: Frames waiting behind this one
+
+        Returns:
+            Detections from ``PlasticClassifier.classify_plastic``
+        """
+        resolution = self.update(queue_depth)
+        start = time.perf_counter()
+        detections = self.classifier.classify_plastic(image, resolution)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.recent.append(latency_ms)
+            self.stats[resolution].record(latency_ms, len(detections))
+            self.frames += 1
+            self._since_switch += 1
+            audit = (
+                self.audit_interval
+                and self.frames % self.audit_interval == 0
+                and resolution != self.resolutions[-1]
+                and queue_depth <= self.queue_low
+            )
+        if audit:
+            self._audit(image, detections, resolution)
+        return detections
+
+    def _audit(
+        self,
+        image: np.ndarray,
+        detections: List[Dict[str, Any]],
+        resolution: int
+    ) -> None:
+        """Compare a frame's detections with a full-resolution pass."""
+        try:
+            reference = self.classifier.detect(image, self.resolutions[-1])
+        except Exception as e:
+            logger.error(f"Full-resolution audit failed: {e}")
+            return
+        agreement = detection_agreement(detections, reference)
+        with self._lock:
+            self.stats[resolution].agreements.append(agreement)
+
+    def report(self) -> Dict[str, Any]:
+        """Current resolution, switch count and per-resolution statistics."""
+        with self._lock:
+            return {
+                "resolution": self.resolution,
+                "switches": self.switches,
+                "resolutions": {
+                    size: stats.to_dict() for size, stats in self.stats.items()
+                },
+            }
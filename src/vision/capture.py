@@ -0,0 +1,325 @@
+"""
+Active-learning capture of frames with near-miss detections.
+
+Frames whose best prediction falls just under ``CONFIDENCE_THRESHOLD`` are
+the ones the model is least sure about, and the most useful to label for
+retraining. ``SampleCapture.offer`` runs on the inference path and only
+checks the predictions and enqueues the frame; a background writer
+deduplicates frames by perceptual hash, JPEG-encodes them and stores them
+with their raw predictions in a size-bounded directory, evicting the
+oldest captures first.
+
+Each capture is ``<timestamp>_<hash>.jpg`` plus a ``.json`` sidecar with
+every prediction (class, confidence, box) at or above the capture floor.
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.common import metrics
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stem of a capture: "<%Y%m%dT%H%M%S><microseconds>_<64-bit hash in hex>"
+CAPTURE_STEM = re.compile(r"\d{8}T\d{12}_(?P<hash>[0-9a-f]{16})")
+
+
+def frame_hash(image: np.ndarray) -> int:
+    """
+    64-bit difference hash of a frame.
+
+    Nearly identical frames (the same items on the belt, small lighting
+    changes) differ in only a few bits.
+    """
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+class SampleCapture:
+    """Background writer storing low-confidence frames for labelling."""
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        min_confidence: Optional[float] = None,
+        confidence_threshold: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        jpeg_quality: Optional[int] = None,
+        dedup_distance: Optional[int] = None,
+        dedup_window: Optional[int] = None
+    ):
+        """
+        Initialize the capture store; call ``start`` to run the writer.
+
+        Args:
+            directory: Capture directory, defaults to ``settings.CAPTURE_DIR``
+            min_confidence: Lower end of the near-miss band, defaults to
+                ``settings.CAPTURE_MIN_CONFIDENCE``
+            confidence_threshold: Upper end of the band (exclusive),
+                defaults to ``settings.CONFIDENCE_THRESHOLD``
+            max_bytes: Store size bound, defaults to
+                ``settings.CAPTURE_MAX_BYTES``
+            queue_size: Frames waiting for the writer, defaults to
+                ``settings.CAPTURE_QUEUE_SIZE``
+            jpeg_quality: JPEG quality, defaults to
+                ``settings.CAPTURE_JPEG_QUALITY``
+            dedup_distance: Maximum hash bit difference of duplicates,
+                defaults to ``settings.CAPTURE_DEDUP_DISTANCE``
+            dedup_window: Recent captures compared for duplicates,
+                defaults to ``settings.CAPTURE_DEDUP_WINDOW``
+        """
+        self.directory = Path(directory or settings.CAPTURE_DIR)
+        self.min_confidence = (
+            settings.CAPTURE_MIN_CONFIDENCE
+            if min_confidence is None else min_confidence
+        )
+        self.confidence_threshold = (
+            settings.CONFIDENCE_THRESHOLD
+            if confidence_threshold is None else confidence_threshold
+        )
+        self.max_bytes = max_bytes or settings.CAPTURE_MAX_BYTES
+        self.jpeg_quality = jpeg_quality or settings.CAPTURE_JPEG_QUALITY
+        self.dedup_distance = (
+            settings.CAPTURE_DEDUP_DISTANCE
+            if dedup_distance is None else dedup_distance
+        )
+        self._queue: "queue.Queue" = queue.Queue(
+            maxsize=queue_size or settings.CAPTURE_QUEUE_SIZE
+        )
+        self._lock = threading.Lock()  # guards the queue and the counts
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.recent: Deque[int] = deque(
+            maxlen=dedup_window or settings.CAPTURE_DEDUP_WINDOW
+        )
+        self.files: Deque[Tuple[str, int]] = deque()  # (stem, bytes), oldest first
+        self.total_bytes = 0
+        self.counts = {
+            "offered": 0, "captured": 0, "duplicate": 0,
+            "dropped": 0, "evicted": 0, "failed": 0,
+        }
+        self._load_index()
+
+    @classmethod
+    def from_settings(cls) -> "SampleCapture":
+        """Create and start a capture store configured from ``settings``."""
+        return cls().start()
+
+    def _load_index(self) -> None:
+        """Pick up captures left by earlier runs, oldest first."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for partial in self.directory.glob("*.tmp"):
+            partial.unlink()
+        for image in sorted(self.directory.glob("*.jpg")):
+            match = CAPTURE_STEM.fullmatch(image.stem)
+            if match is None:
+                logger.warning(f"Ignoring {image.name} in the capture store")
+                continue
+            size = image.stat().st_size
+            sidecar = image.with_suffix(".json")
+            if sidecar.exists():
+                size += sidecar.stat().st_size
+            self.files.append((image.stem, size))
+            self.total_bytes += size
+            self.recent.append(int(match["hash"], 16))
+        metrics.CAPTURE_STORE_BYTES.set(self.total_bytes)
+
+    def start(self) -> "SampleCapture":
+        """Start the background writer."""
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sample-capture", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write the frames already queued, then stop the writer."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def offer(
+        self,
+        image: np.ndarray,
+        rows: np.ndarray,
+        class_names: Sequence[str]
+    ) -> bool:
+        """
+        Queue a frame if any prediction falls in the near-miss band.
+
+        Called on the inference path: it never encodes or blocks, and
+        frames are dropped when the writer is behind. The frame is
+        referenced, not copied, so it must not be modified afterwards.
+
+        Args:
+            image: Classified frame
+            rows: ``(N, 6)`` raw predictions ``x1, y1, x2, y2, conf, cls``
+            class_names: Class name per class index
+
+        Returns:
+            Whether the frame was queued
+        """
+        confidence = rows[:, 4]
+        if not np.any(
+            (confidence >= self.min_confidence)
+            & (confidence < self.confidence_threshold)
+        ):
+            return False
+
+        with self._lock:
+            self.counts["offered"] += 1
+            try:
+                self._queue.put_nowait(
+                    (image, rows.copy(), class_names, time.time())
+                )
+            except queue.Full:
+                self.counts["dropped"] += 1
+                metrics.CAPTURE_DROPPED.inc()
+                return False
+        return True
+
+    def _run(self) -> None:
+        """Writer loop; drains the queue before exiting."""
+        while not (self._stop.is_set() and self._queue.empty()):
+            try:
+                item = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                self._write(*item)
+            except Exception as e:
+                self._count("failed")
+                metrics.CAPTURE_FAILED.inc()
+                logger.error(f"Sample capture failed: {e}")
+
+    def _count(self, outcome: str) -> None:
+        """Increment a count from the writer thread."""
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def _is_duplicate(self, digest: int) -> bool:
+        """Whether a recent capture has a nearly identical hash."""
+        return any(
+            bin(digest ^ other).count("1") <= self.dedup_distance
+            for other in self.recent
+        )
+
+    def _write(
+        self,
+        image: np.ndarray,
+        rows: np.ndarray,
+        class_names: Sequence[str],
+        timestamp: float
+    ) -> None:
+        """Deduplicate, encode and store one frame."""
+        digest = frame_hash(image)
+        if self._is_duplicate(digest):
+            self._count("duplicate")
+            metrics.CAPTURE_DUPLICATES.inc()
+            return
+
+        ok, encoded = cv2.imencode(
+            ".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+        )
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        predictions = [
+            {
+                "plastic_type": (
+                    class_names[int(cls)] if int(cls) < len(class_names)
+                    else str(int(cls))
+                ),
+                "confidence": float(conf),
+                "bbox": [float(x1), float(y1), float(x2), float(y2)],
+            }
+            for x1, y1, x2, y2, conf, cls in rows.tolist()
+            if conf >= self.min_confidence
+        ]
+        sidecar = json.dumps({
+            "timestamp": timestamp,
+            "shape": list(image.shape),
+            "confidence_threshold": self.confidence_threshold,
+            "predictions": predictions,
+        }).encode()
+
+        # Names sort by capture time, which is the eviction order
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(timestamp))
+        stem = f"{stamp}{int(timestamp * 1e6) % 10**6:06d}_{digest:016x}"
+        self._save(self.directory / f"{stem}.json", sidecar)
+        self._save(self.directory / f"{stem}.jpg", encoded.tobytes())
+
+        size = len(sidecar) + encoded.size
+        self.files.append((stem, size))
+        self.total_bytes += size
+        self.recent.append(digest)
+        self._count("captured")
+        metrics.CAPTURE_SAVED.inc()
+        self._evict()
+
+    @staticmethod
+    def _save(path: Path, data: bytes) -> None:
+        """Write a file atomically, so readers never see partial captures."""
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _evict(self) -> None:
+        """Delete the oldest captures until the store fits its bound."""
+        while self.total_bytes > self.max_bytes and len(self.files) > 1:
+            stem, size = self.files.popleft()
+            for suffix in (".jpg", ".json"):
+                try:
+                    (self.directory / f"{stem}{suffix}").unlink()
+                except FileNotFoundError:
+                    pass
+            self.total_bytes -= size
+            self._count("evicted")
+            metrics.CAPTURE_EVICTED.inc()
+        metrics.CAPTURE_STORE_BYTES.set(self.total_bytes)
+
+    def report(self) -> Dict[str, Any]:
+        """Capture counts and store size."""
+        with self._lock:
+            counts = dict(self.counts)
+        return {
+            **counts,
+            "stored": len(self.files),
+            "store_bytes": self.total_bytes,
+            "queued": self._queue.qsize(),
+        }
+
+
+_shared: Optional[SampleCapture] = None
+_shared_lock = threading.Lock()
+
+
+def shared_capture() -> SampleCapture:
+    """
+    Process-wide capture store configured from ``settings``.
+
+    Every classifier in the process (for example the versions a
+    ``ModelManager`` keeps loaded) writes through the same store, so its
+    size accounting covers the whole directory.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SampleCapture.from_settings()
+        return _shared
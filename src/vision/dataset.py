@@ -0,0 +1,175 @@
+"""
+Packed, memory-mapped frame store.
+
+Reading an image folder decodes every file on every pass. A packed store
+decodes each image once, resizes it to a fixed size and writes all frames
+into one uint8 ``frames.npy`` array, next to an ``index.json`` with the
+frame shape, source file names and optional per-frame labels. Readers map
+the array, so frames are zero-copy views served from the page cache and
+shared between processes.
+
+Usage:
+    python -m src.vision.dataset pack --images data/frames --output data/packed
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FRAMES_FILE = "frames.npy"
+INDEX_FILE = "index.json"
+
+
+class PackedFrameStore:
+    """Read-only view of a packed frame store."""
+
+    def __init__(self, path: Path):
+        """
+        Open a packed store.
+
+        Args:
+            path: Store directory written by :func:`pack_images`
+        """
+        self.path = Path(path)
+        self.index: Dict[str, Any] = json.loads(
+            (self.path / INDEX_FILE).read_text()
+        )
+        self.frames: np.ndarray = np.load(self.path / FRAMES_FILE, mmap_mode="r")
+
+    @staticmethod
+    def is_store(path: Path) -> bool:
+        """Whether a path is a packed store directory."""
+        path = Path(path)
+        return (path / INDEX_FILE).exists() and (path / FRAMES_FILE).exists()
+
+    @property
+    def shape(self) -> Sequence[int]:
+        """Shape of one frame, ``(height, width, 3)``."""
+        return self.frames.shape[1:]
+
+    def __len__(self) -> int:
+        return self.frames.shape[0]
+
+    def __getitem__(self, i: int) -> np.ndarray:
+        """Frame ``i`` as a read-only view into the mapped file."""
+        return self.frames[i]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for i in range(len(self)):
+            yield self.frames[i]
+
+    def label(self, i: int) -> Any:
+        """Label stored for frame ``i``, or None."""
+        labels = self.index.get("labels")
+        return labels[i] if labels else None
+
+    def batches(self, batch_size: int) -> Iterator[np.ndarray]:
+        """
+        Iterate over contiguous ``(B, H, W, 3)`` batches.
+
+        Args:
+            batch_size: Frames per batch; the last batch may be smaller
+
+        Returns:
+            Iterator of views into the mapped file
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.frames[start:start + batch_size]
+
+
+def pack_images(
+    paths: Sequence[Path],
+    output: Path,
+    width: int = 640,
+    height: int = 640,
+    labels: Optional[Sequence[Any]] = None
+) -> PackedFrameStore:
+    """
+    Decode, resize and pack images into a store.
+
+    Unreadable images are skipped with a warning.
+
+    Args:
+        paths: Image files
+        output: Store directory to create
+        width: Frame width in the store
+        height: Frame height in the store
+        labels: Optional JSON-serializable label per image
+
+    Returns:
+        The packed store, opened for reading
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    frames = np.lib.format.open_memmap(
+        output / FRAMES_FILE,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(len(paths), height, width, 3),
+    )
+
+    files: List[str] = []
+    kept_labels: List[Any] = []
+    for i, path in enumerate(paths):
+        image = cv2.imread(str(path))
+        if image is None:
+            logger.warning(f"Could not read image: {path}")
+            continue
+        if image.shape[:2] != (height, width):
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+        frames[len(files)] = image
+        files.append(Path(path).name)
+        if labels is not None:
+            kept_labels.append(labels[i])
+    frames.flush()
+    del frames
+
+    if len(files) < len(paths):
+        # Drop the slots of skipped images
+        packed = np.load(output / FRAMES_FILE, mmap_mode="r")[:len(files)].copy()
+        np.save(output / FRAMES_FILE, packed)
+
+    (output / INDEX_FILE).write_text(json.dumps({
+        "count": len(files),
+        "height": height,
+        "width": width,
+        "files": files,
+        "labels": kept_labels if labels is not None else None,
+    }))
+    logger.info(f"Packed {len(files)} frames of {width}x{height} into {output}")
+    return PackedFrameStore(output)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Pack an image folder into a memory-mapped frame store.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv``
+    """
+    from src.vision.plastic_classifier import list_images
+
+    parser = argparse.ArgumentParser(description="Packed frame store tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="Pack an image folder")
+    pack.add_argument("--images", type=Path, required=True)
+    pack.add_argument("--output", type=Path, required=True)
+    pack.add_argument("--width", type=int, default=640)
+    pack.add_argument("--height", type=int, default=640)
+    args = parser.parse_args(argv)
+
+    store = pack_images(
+        list_images(args.images), args.output, args.width, args.height
+    )
+    print(f"Packed {len(store)} frames into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
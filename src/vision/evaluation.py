@@ -0,0 +1,174 @@
+"""
+Detection agreement metrics.
+
+Used to compare a cheaper inference configuration (lower resolution,
+quantized model) or a candidate model against a reference one, whose
+detections are treated as ground truth.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+
+def box_iou(a: Sequence[float], b: Sequence[float]) -> float:
+    """Intersection over union of two ``x1, y1, x2, y2`` boxes."""
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare_detections(
+    references: List[List[Dict[str, Any]]],
+    candidates: List[List[Dict[str, Any]]],
+    iou_threshold: float = 0.5
+) -> Dict[str, float]:
+    """
+    Score candidate detections against reference detections.
+
+    Detections are matched greedily by confidence to an unmatched
+    reference of the same plastic type with IoU at or above the threshold.
+
+    Args:
+        references: Reference detections per image
+        candidates: Candidate detections per image
+        iou_threshold: Minimum IoU for a match
+
+    Returns:
+        IoU match rate (recall), precision, mean IoU of matches and mAP@0.5
+        (mean over plastic types of the all-point interpolated average
+        precision), all relative to the reference
+    """
+    scored: Dict[str, List[Any]] = {}
+    positives: Dict[str, int] = {}
+    matched_ious = []
+    total_candidates = 0
+    for reference, candidate in zip(references, candidates):
+        for ref in reference:
+            plastic_type = ref["plastic_type"]
+            positives[plastic_type] = positives.get(plastic_type, 0) + 1
+        used = [False] * len(reference)
+        total_candidates += len(candidate)
+        for det in sorted(candidate, key=lambda d: -d["confidence"]):
+            best, best_iou = None, iou_threshold
+            for i, ref in enumerate(reference):
+                if used[i] or ref["plastic_type"] != det["plastic_type"]:
+                    continue
+                iou = box_iou(det["bbox"], ref["bbox"])
+                if iou >= best_iou:
+                    best, best_iou = i, iou
+            hit = best is not None
+            if hit:
+                used[best] = True
+                matched_ious.append(best_iou)
+            scored.setdefault(det["plastic_type"], []).append(
+                (det["confidence"], hit)
+            )
+
+    average_precisions = []
+    for plastic_type, count in positives.items():
+        hits = sorted(scored.get(plastic_type, []), key=lambda s: -s[0])
+        tp = np.cumsum([hit for _, hit in hits], dtype=np.float64)
+        precision = tp / np.arange(1, len(hits) + 1) if hits else np.zeros(0)
+        recall = tp / count if hits else np.zeros(0)
+        # All-point interpolation: precision envelope summed over recall steps
+        padded = np.concatenate([precision, [0.0]])
+        envelope = np.maximum.accumulate(padded[::-1])[::-1]
+        steps = np.diff(np.concatenate([[0.0], recall]))
+        average_precisions.append(float(np.sum(steps * envelope[:-1])))
+
+    total_references = sum(positives.values())
+    return {
+        "iou_match_rate": (
+            len(matched_ious) / total_references if total_references else 1.0
+        ),
+        "precision": (
+            len(matched_ious) / total_candidates if total_candidates else 1.0
+        ),
+        "mean_iou": float(np.mean(matched_ious)) if matched_ious else 0.0,
+        "map50": (
+            float(np.mean(average_precisions)) if average_precisions else 1.0
+        ),
+    }
+
+
+def detection_agreement(
+    detections: List[Dict[str, Any]],
+    reference: List[Dict[str, Any]],
+    iou_threshold: float = 0.5
+) -> float:
+    """
+    Fraction of reference detections matched by type and IoU.
+
+    Args:
+        detections: Detections to score
+        reference: Detections taken as ground truth
+        iou_threshold: Minimum IoU for a match
+
+    Returns:
+        Recall against the reference, 1.0 when the reference is empty
+    """
+    if not reference:
+        return 1.0
+    unused = list(detections)
+    matched = 0
+    for ref in reference:
+        for i, det in enumerate(unused):
+            if det["plastic_type"] != ref["plastic_type"]:
+                continue
+            if box_iou(det["bbox"], ref["bbox"]) >= iou_threshold:
+                matched += 1
+                del unused[i]
+                break
+    return matched / len(reference)
+
+
+def box_agreement(
+    detections: List[Dict[str, Any]],
+    reference: List[Dict[str, Any]],
+    iou_threshold: float = 0.5
+) -> Dict[str, Any]:
+    """
+    Match detections to reference detections by IoU alone, ignoring type.
+
+    Separates localization from classification: two models can find the
+    same items yet disagree on their plastic type.
+
+    Args:
+        detections: Detections to score
+        reference: Detections taken as ground truth
+        iou_threshold: Minimum IoU for a match
+
+    Returns:
+        Box match rate against the reference (1.0 when it is empty), the
+        fraction of matched boxes with the same plastic type (None without
+        matches), mean IoU of matches and the number of matches
+    """
+    pairs = sorted(
+        (
+            (box_iou(det["bbox"], ref["bbox"]), i, j)
+            for i, det in enumerate(detections)
+            for j, ref in enumerate(reference)
+        ),
+        reverse=True,
+    )
+    used_det, used_ref = set(), set()
+    ious, same_type = [], 0
+    for iou, i, j in pairs:
+        if iou < iou_threshold:
+            break
+        if i in used_det or j in used_ref:
+            continue
+        used_det.add(i)
+        used_ref.add(j)
+        ious.append(iou)
+        same_type += detections[i]["plastic_type"] == reference[j]["plastic_type"]
+
+    return {
+        "box_match_rate": len(ious) / len(reference) if reference else 1.0,
+        "class_agreement": same_type / len(ious) if ious else None,
+        "mean_iou": float(np.mean(ious)) if ious else None,
+        "matches": len(ious),
+    }
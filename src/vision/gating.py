@@ -0,0 +1,126 @@
+"""
+Motion and occupancy gate for conveyor frames.
+
+Most of a conveyor frame is static belt or machinery. The gate compares a
+small copy of each frame with a running-average background of the empty
+belt and reports which belt regions of interest (ROIs) contain
+anything. Frames with no occupied ROI skip inference entirely, and
+inference on the rest is restricted to the occupied ROIs.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+Region = Tuple[int, int, int, int]
+
+
+class MotionGate:
+    """Background-subtraction occupancy gate on downscaled frames."""
+
+    def __init__(
+        self,
+        rois: Optional[Sequence[Sequence[int]]] = None,
+        scale: float = 0.125,
+        threshold: float = 25.0,
+        min_area: float = 256.0,
+        alpha: float = 0.05
+    ):
+        """
+        Initialize the gate.
+
+        Args:
+            rois: Belt regions ``[x1, y1, x2, y2]`` in frame pixels; the
+                whole frame when empty
+            scale: Downscale factor applied before differencing
+            threshold: Per-channel difference marking a pixel as occupied
+            min_area: Occupied area, in frame pixels, that makes an ROI
+                active
+            alpha: Background learning rate per frame
+        """
+        self.rois: List[Region] = [tuple(map(int, roi)) for roi in rois or []]
+        self.scale = scale
+        self.threshold = threshold
+        self.min_area = min_area
+        self.alpha = alpha
+        self.background: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_settings(cls) -> "MotionGate":
+        """Create a gate configured from ``settings``."""
+        return cls(
+            rois=settings.BELT_ROIS,
+            scale=settings.MOTION_GATE_SCALE,
+            threshold=settings.MOTION_GATE_THRESHOLD,
+            min_area=settings.MOTION_GATE_MIN_AREA,
+            alpha=settings.MOTION_GATE_ALPHA,
+        )
+
+    def _small(self, image: np.ndarray) -> np.ndarray:
+        """Downscaled float32 copy of a frame."""
+        small = cv2.resize(
+            image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA
+        )
+        return small.astype(np.float32)
+
+    def set_background(self, image: np.ndarray) -> None:
+        """
+        Calibrate the background from a frame of the empty belt.
+
+        Args:
+            image: Frame showing no items
+        """
+        self.background = self._small(image)
+
+    def reset(self) -> None:
+        """Forget the background; the next frame is used to initialize it."""
+        self.background = None
+
+    def active_regions(self, image: np.ndarray) -> List[Region]:
+        """
+        Find the regions of interest that contain items.
+
+        The first frame initializes the background and is reported fully
+        active, since nothing is known about it yet. The background then
+        follows slow changes (lighting, belt wear) at rate ``alpha``.
+
+        Args:
+            image: Input frame
+
+        Returns:
+            Occupied ROIs in frame pixels, empty when inference can be
+            skipped
+        """
+        height, width = image.shape[:2]
+        rois = self.rois or [(0, 0, width, height)]
+        small = self._small(image)
+
+        if self.background is None or self.background.shape != small.shape:
+            self.background = small
+            return list(rois)
+
+        # Colour is compared per channel: a coloured item can have the same
+        # brightness as the grey belt
+        diff = cv2.absdiff(small, self.background)
+        if diff.ndim == 3:
+            diff = diff.max(axis=2)
+        mask = diff > self.threshold
+        cv2.accumulateWeighted(small, self.background, self.alpha)
+
+        # Each downscaled pixel stands for 1 / scale**2 frame pixels
+        min_pixels = self.min_area * self.scale ** 2
+        return [
+            roi for roi in rois
+            if np.count_nonzero(mask[self._scaled(roi)]) >= min_pixels
+        ]
+
+    def _scaled(self, roi: Region) -> Tuple[slice, slice]:
+        """Slices selecting an ROI in the downscaled frame."""
+        x1, y1, x2, y2 = (int(v * self.scale) for v in roi)
+        return slice(y1, max(y2, y1 + 1)), slice(x1, max(x2, x1 + 1))
@@ -0,0 +1,391 @@
+"""
+Multi-camera orchestration over a shared model.
+
+One vision process serves every camera stream of a facility (or several
+facilities) instead of running a classifier and model copy per line. A
+``StreamOrchestrator`` owns a small pool of inference workers sharing
+one classifier, typically the ``ModelManager``, and schedules the
+streams' frames onto it.
+
+Scheduling is weighted fair (stride scheduling): each stream accumulates
+virtual time equal to the inference time it used divided by its weight,
+and a free worker always serves the waiting stream with the least
+virtual time. Streams therefore share model time in proportion to their
+weights whatever their frame rates, and a stream that was idle does not
+bank credit to starve the others when it resumes.
+
+Each stream keeps a short frame queue; when it is full the oldest frame
+is dropped, since a fresh frame is worth more to the sorter than a stale
+one. Latency (submit to result) is checked against a per-stream SLO and
+reported per stream, tagged with the stream's facility.
+
+With an ``AdaptiveResolutionController`` the workers classify through it,
+passing the number of frames waiting across all streams as the load.
+
+The shared classifier should not use a motion gate: its background
+model would mix the belts of all streams.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.common import metrics
+from src.common.config import settings
+from src.vision.adaptive import AdaptiveResolutionController
+
+logger = logging.getLogger(__name__)
+
+ResultCallback = Callable[[str, Any, List[Dict[str, Any]]], None]
+
+
+class CameraStream:
+    """Queue, scheduling state and statistics of one camera stream."""
+
+    def __init__(
+        self,
+        stream_id: str,
+        facility_id: str,
+        weight: float = 1.0,
+        slo_ms: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        on_result: Optional[ResultCallback] = None,
+        window: int = 500
+    ):
+        """
+        Initialize the stream.
+
+        Args:
+            stream_id: Unique stream name, e.g. ``"line-2/cam-1"``
+            facility_id: Facility the stream belongs to
+            weight: Share of model time relative to other streams
+            slo_ms: Submit-to-result latency target, defaults to
+                ``settings.LATENCY_SLO_MS``
+            queue_size: Frames waiting; older frames are dropped beyond
+                this, defaults to ``settings.STREAM_QUEUE_SIZE``
+            on_result: Called with ``(stream_id, frame_id, detections)``
+                for every classified frame, on a worker thread
+            window: Recent frames kept for latency percentiles
+        """
+        if weight <= 0:
+            raise ValueError("Stream weight must be positive")
+        self.stream_id = stream_id
+        self.facility_id = facility_id
+        self.weight = weight
+        self.slo_ms = slo_ms or settings.LATENCY_SLO_MS
+        self.on_result = on_result
+        self.frames: Deque[Tuple[Any, np.ndarray, float, Future]] = deque(
+            maxlen=queue_size or settings.STREAM_QUEUE_SIZE
+        )
+        self.virtual_time = 0.0
+
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.failed = 0
+        self.slo_violations = 0
+        self.busy_s = 0.0
+        self.latencies: Deque[float] = deque(maxlen=window)
+
+        labels = {"facility_id": facility_id, "stream": stream_id}
+        self._processed_metric = metrics.STREAM_FRAMES.labels(
+            outcome="processed", **labels
+        )
+        self._dropped_metric = metrics.STREAM_FRAMES.labels(
+            outcome="dropped", **labels
+        )
+        self._violation_metric = metrics.STREAM_FRAMES.labels(
+            outcome="slo_violation", **labels
+        )
+        self._latency_metric = metrics.STREAM_LATENCY.labels(**labels)
+
+    def record(self, latency_s: float, busy_s: float) -> None:
+        """Record one classified frame."""
+        self.processed += 1
+        self.busy_s += busy_s
+        self.latencies.append(latency_s * 1000)
+        self._processed_metric.inc()
+        self._latency_metric.observe(latency_s)
+        if latency_s * 1000 > self.slo_ms:
+            self.slo_violations += 1
+            self._violation_metric.inc()
+
+    def stats(self) -> Dict[str, Any]:
+        """Frame counts, latency percentiles and SLO attainment."""
+        latencies = np.asarray(self.latencies)
+        p50, p95, p99 = (
+            np.percentile(latencies, [50, 95, 99]) if latencies.size
+            else (None, None, None)
+        )
+        return {
+            "stream_id": self.stream_id,
+            "facility_id": self.facility_id,
+            "weight": self.weight,
+            "slo_ms": self.slo_ms,
+            "submitted": self.submitted,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "queued": len(self.frames),
+            "latency_ms": {
+                "p50": None if p50 is None else float(p50),
+                "p95": None if p95 is None else float(p95),
+                "p99": None if p99 is None else float(p99),
+            },
+            "slo_attainment": (
+                1 - self.slo_violations / self.processed if self.processed else None
+            ),
+            "busy_s": self.busy_s,
+        }
+
+
+class StreamOrchestrator:
+    """Schedules frames from many camera streams onto a shared classifier."""
+
+    def __init__(
+        self,
+        classifier: Any,
+        workers: Optional[int] = None,
+        adaptive: Optional[AdaptiveResolutionController] = None
+    ):
+        """
+        Initialize the orchestrator; call ``start`` to run the workers.
+
+        Args:
+            classifier: Shared classifier with ``classify_plastic``, safe
+                to call from several threads (``PlasticClassifier`` and
+                ``ModelManager`` are)
+            workers: Inference threads, defaults to
+                ``settings.ORCHESTRATOR_WORKERS``
+            adaptive: Controller wrapping ``classifier`` that picks each
+                frame's input resolution from the queued frames
+        """
+        self.classifier = classifier
+        self.adaptive = adaptive
+        self.workers = workers or settings.ORCHESTRATOR_WORKERS
+        self.streams: Dict[str, CameraStream] = {}
+        self._ready = threading.Condition()  # guards streams and their queues
+        self._stop = False
+        self._threads: List[threading.Thread] = []
+        self.started: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls) -> "StreamOrchestrator":
+        """Create and start an orchestrator over the shared model manager."""
+        from src.vision.registry import ModelManager
+
+        if settings.MOTION_GATE_ENABLED:
+            logger.warning(
+                "The motion gate is shared by all streams; disable "
+                "MOTION_GATE_ENABLED for multi-camera orchestration"
+            )
+        manager = ModelManager.from_settings()
+        adaptive = (
+            AdaptiveResolutionController(manager)
+            if settings.ADAPTIVE_RESOLUTION_ENABLED else None
+        )
+        return cls(manager, adaptive=adaptive).start()
+
+    def add_stream(
+        self,
+        stream_id: str,
+        facility_id: str,
+        weight: float = 1.0,
+        slo_ms: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        on_result: Optional[ResultCallback] = None
+    ) -> CameraStream:
+        """
+        Register a camera stream.
+
+        Args:
+            stream_id: Unique stream name
+            facility_id: Facility the stream belongs to
+            weight: Share of model time relative to other streams
+            slo_ms: Latency target, defaults to ``settings.LATENCY_SLO_MS``
+            queue_size: Frames waiting, defaults to
+                ``settings.STREAM_QUEUE_SIZE``
+            on_result: Called for every classified frame
+
+        Returns:
+            The stream
+
+        Raises:
+            ValueError: If the stream is already registered
+        """
+        stream = CameraStream(
+            stream_id, facility_id, weight, slo_ms, queue_size, on_result
+        )
+        with self._ready:
+            if stream_id in self.streams:
+                raise ValueError(f"Stream already registered: {stream_id}")
+            # Start level with the busiest stream rather than with credit
+            stream.virtual_time = self._virtual_now()
+            self.streams[stream_id] = stream
+        return stream
+
+    def remove_stream(self, stream_id: str) -> None:
+        """Unregister a stream; its waiting frames are cancelled."""
+        with self._ready:
+            stream = self.streams.pop(stream_id)
+            for _, _, _, future in stream.frames:
+                future.cancel()
+            stream.frames.clear()
+
+    def start(self) -> "StreamOrchestrator":
+        """Start the inference workers."""
+        self._stop = False
+        self.started = time.monotonic()
+        self._threads = [
+            threading.Thread(
+                target=self._run, name=f"orchestrator-{i}", daemon=True
+            )
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the workers after their current frame and cancel waiting frames."""
+        with self._ready:
+            self._stop = True
+            self._ready.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        with self._ready:
+            for stream in self.streams.values():
+                for _, _, _, future in stream.frames:
+                    future.cancel()
+                stream.frames.clear()
+
+    def submit(
+        self,
+        stream_id: str,
+        image: np.ndarray,
+        frame_id: Any = None
+    ) -> Future:
+        """
+        Queue a frame of a stream; never blocks.
+
+        When the stream's queue is full its oldest frame is dropped and
+        that frame's future cancelled.
+
+        Args:
+            stream_id: Registered stream the frame comes from
+            image: Frame to classify; referenced, not copied
+            frame_id: Identifier passed back with the result
+
+        Returns:
+            Future resolved with the frame's detections
+        """
+        future: Future = Future()
+        with self._ready:
+            stream = self.streams[stream_id]
+            stream.submitted += 1
+            if not stream.frames:
+                # A stream returning from idle starts level with the
+                # waiting streams instead of using up banked credit
+                stream.virtual_time = max(stream.virtual_time, self._virtual_now())
+            if len(stream.frames) == stream.frames.maxlen:
+                _, _, _, stale = stream.frames.popleft()
+                stale.cancel()
+                stream.dropped += 1
+                stream._dropped_metric.inc()
+            stream.frames.append((frame_id, image, time.perf_counter(), future))
+            self._ready.notify()
+        return future
+
+    def _virtual_now(self) -> float:
+        """Least virtual time among streams with waiting frames."""
+        waiting = [s.virtual_time for s in self.streams.values() if s.frames]
+        if waiting:
+            return min(waiting)
+        return max((s.virtual_time for s in self.streams.values()), default=0.0)
+
+    def _next(
+        self
+    ) -> Optional[Tuple[CameraStream, Any, np.ndarray, float, Future, int]]:
+        """
+        Wait for the next frame of the stream with the least virtual time.
+
+        Returns:
+            The stream, frame id, frame, submit time, future and the number
+            of frames still waiting across streams; None once stopped
+        """
+        with self._ready:
+            while not self._stop:
+                waiting = [s for s in self.streams.values() if s.frames]
+                if waiting:
+                    stream = min(waiting, key=lambda s: s.virtual_time)
+                    frame_id, image, submitted, future = stream.frames.popleft()
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    queued = sum(len(s.frames) for s in self.streams.values())
+                    return stream, frame_id, image, submitted, future, queued
+                self._ready.wait()
+            return None
+
+    def _run(self) -> None:
+        """Worker loop: classify the scheduled frame and charge its stream."""
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            stream, frame_id, image, submitted, future, queued = item
+            start = time.perf_counter()
+            try:
+                if self.adaptive is not None:
+                    detections = self.adaptive.classify(image, queued)
+                else:
+                    detections = self.classifier.classify_plastic(image)
+            except Exception as e:
+                stream.failed += 1
+                logger.error(f"Classification failed on {stream.stream_id}: {e}")
+                future.set_exception(e)
+                detections = None
+            finished = time.perf_counter()
+
+            with self._ready:
+                stream.virtual_time += (finished - start) / stream.weight
+                if detections is not None:
+                    stream.record(finished - submitted, finished - start)
+            if detections is None:
+                continue
+            future.set_result(detections)
+            if stream.on_result is not None:
+                try:
+                    stream.on_result(stream.stream_id, frame_id, detections)
+                except Exception as e:
+                    logger.error(
+                        f"Result callback failed on {stream.stream_id}: {e}"
+                    )
+
+    def stats(self, facility_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Per-stream statistics and each stream's share of model time.
+
+        Args:
+            facility_id: Only report this facility's streams
+
+        Returns:
+            ``{"streams": [...], "workers": n}``, plus ``"resolution"``
+            with the adaptive controller's report when one is used
+        """
+        with self._ready:
+            streams = [
+                stream.stats() for stream in self.streams.values()
+                if facility_id is None or stream.facility_id == facility_id
+            ]
+        busy = sum(stream["busy_s"] for stream in streams)
+        for stream in streams:
+            stream["model_share"] = stream["busy_s"] / busy if busy else None
+        result = {"streams": streams, "workers": self.workers}
+        if self.adaptive is not None:
+            result["resolution"] = self.adaptive.report()
+        return result
@@ -1,37 +1,183 @@
 """
 Vision system for plastic classification.
+
+``torch`` is imported only when a model is loaded or trained, so modules
+that merely reference the classifier start quickly.
 """
 
 import cv2
 import numpy as np
-import torch
+import time
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple, Union
 import logging
 
+from src.common import metrics
 from src.common.config import settings
+from src.common.tracing import null_tracer, tracer
+from src.vision.capture import SampleCapture, shared_capture
+from src.vision.gating import MotionGate
+from src.vision.tiling import make_tiles, merge_detections, merge_tile_detections
+
+if TYPE_CHECKING:
+    import torch
 
 logger = logging.getLogger(__name__)
 
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def _to_numpy(pred: Any) -> np.ndarray:
+    """Convert a model output tensor (or array) to a numpy array."""
+    if hasattr(pred, "cpu"):
+        pred = pred.cpu()
+    return np.asarray(pred)
+
+
+def letterbox(
+    image: np.ndarray,
+    size: int
+) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Fit a frame into a ``size`` square, keeping its aspect ratio.
+
+    The frame is resized so its longer side is ``size`` and centred on a
+    grey (114) background, the model's training-time letterbox.
+
+    Args:
+        image: Input frame
+        size: Side of the square model input
+
+    Returns:
+        The square input, the scale applied and the ``(x, y)`` padding
+        before the frame
+    """
+    height, width = image.shape[:2]
+    scale = size / max(height, width)
+    if scale != 1:
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        image = cv2.resize(
+            image,
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            interpolation=interpolation,
+        )
+    height, width = image.shape[:2]
+    pad_x = (size - width) // 2
+    pad_y = (size - height) // 2
+    if width != size or height != size:
+        image = cv2.copyMakeBorder(
+            image, pad_y, size - height - pad_y, pad_x, size - width - pad_x,
+            cv2.BORDER_CONSTANT, value=(114, 114, 114),
+        )
+    return image, scale, (pad_x, pad_y)
+
+
+def unletterbox(
+    rows: np.ndarray,
+    scale: float,
+    pad: Tuple[int, int],
+    shape: Tuple[int, ...]
+) -> np.ndarray:
+    """
+    Map detections on a letterboxed input back to the original frame.
+
+    Args:
+        rows: ``(N, 6)`` detections ``x1, y1, x2, y2, conf, cls``
+        scale: Scale returned by :func:`letterbox`
+        pad: Padding returned by :func:`letterbox`
+        shape: Shape of the original frame
+
+    Returns:
+        Detections in frame pixels, clipped to the frame
+    """
+    rows = np.array(rows, dtype=np.float32).reshape(-1, 6)
+    rows[:, [0, 2]] = ((rows[:, [0, 2]] - pad[0]) / scale).clip(0, shape[1])
+    rows[:, [1, 3]] = ((rows[:, [1, 3]] - pad[1]) / scale).clip(0, shape[0])
+    return rows
+
 
 class PlasticClassifier:
     """AI vision system for plastic classification."""
 
-    def __init__(self):
-        """Initialize the classifier."""
-        self.model = self._load_model()
+    def __init__(
+        self,
+        model: Optional["torch.nn.Module"] = None,
+        model_path: Optional[Path] = None
+    ):
+        """
+        Initialize the classifier.
+
+        Args:
+            model: Detection model to use instead of loading one
+            model_path: Checkpoint to load, defaults to ``settings.MODEL_PATH``
+        """
+        self.model_path = Path(model_path or settings.MODEL_PATH)
         self.confidence_threshold = settings.CONFIDENCE_THRESHOLD
+        self.input_size = settings.MODEL_INPUT_SIZE
+        self.tiled = settings.TILED_INFERENCE
+        self.tile_size = settings.TILE_SIZE
+        self.tile_overlap = settings.TILE_OVERLAP
+        self.tile_merge_threshold = settings.TILE_MERGE_THRESHOLD
+        self.gate = (
+            MotionGate.from_settings() if settings.MOTION_GATE_ENABLED else None
+        )
+        self.capture: Optional[SampleCapture] = (
+            shared_capture() if settings.CAPTURE_ENABLED else None
+        )
+        # Replaced by no-ops in ``silence``
+        self.metrics: Any = metrics
+        self.tracer: Any = tracer
+        self.model = model if model is not None else self._load_model()
         self.class_names = self._load_class_names()
 
-    def _load_model(self) -> torch.nn.Module:
+    def silence(self) -> None:
+        """
+        Keep this classifier out of shared metrics, traces and captures.
+
+        For a second model classifying the same frames as production,
+        whose latency and detections must not be mixed into production's.
+        """
+        self.metrics = metrics.NOOP_METRICS
+        self.tracer = null_tracer
+        self.capture = None
+
+    @property
+    def min_confidence(self) -> float:
+        """
+        Lowest confidence kept from the model.
+
+        With capture enabled, predictions down to the capture floor are
+        kept so near-miss frames can be recognised; only those at or above
+        ``confidence_threshold`` become detections.
+        """
+        if self.capture is None:
+            return self.confidence_threshold
+        return min(self.capture.min_confidence, self.confidence_threshold)
+
+    def _load_model(self) -> "torch.nn.Module":
         """Load the YOLO model."""
+        import torch
+
         try:
             model = torch.hub.load(
                 'ultralytics/yolov5',
                 'custom',
-                path=str(settings.MODEL_PATH)
+                path=str(self.model_path)
             )
-            model.conf = self.confidence_threshold
+            model.conf = self.min_confidence
+            if settings.MODEL_MMAP:
+                from src.vision.weights import mmap_weights
+
+                # Other checkpoints (registry versions) get their own export
+                mmap_path = (
+                    None if self.model_path == settings.MODEL_PATH
+                    else self.model_path.with_suffix(".state.pt")
+                )
+                model = mmap_weights(model, mmap_path, source=self.model_path)
+            if settings.QUANTIZATION_MODE:
+                from src.vision.quantization import apply_quantization
+
+                model = apply_quantization(model, settings.QUANTIZATION_MODE)
             return model
         except Exception as e:
             logger.error(f"Failed to load model: {e}")
@@ -45,102 +191,291 @@ class PlasticClassifier:
             logger.error(f"Failed to load class names: {e}")
             return []
 
-    def classify_plastic(self, image: np.ndarray) -> List[Dict[str, Any]]:
+    def warmup(
+        self,
+        input_sizes: Optional[List[int]] = None,
+        batch_sizes: Optional[List[int]] = None,
+        runs: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run dummy inferences at every input and batch size before serving.
+
+        The first call at each shape pays lazy initialization and allocator
+        warm-up; the following ``runs`` calls measure steady-state latency.
+        Batches larger than one are passed as a list of frames, and the
+        model runs at the frame size.
+
+        Args:
+            input_sizes: Square frame sides, defaults to
+                ``settings.WARMUP_INPUT_SIZES``
+            batch_sizes: Frames per call, defaults to
+                ``settings.WARMUP_BATCH_SIZES``
+            runs: Timed calls per shape after the first, defaults to
+                ``settings.WARMUP_RUNS``
+
+        Returns:
+            Total warm-up time, first-call and steady-state latency of the
+            first configured shape, and per-shape timings, in milliseconds
+        """
+        input_sizes = input_sizes or settings.WARMUP_INPUT_SIZES
+        batch_sizes = batch_sizes or settings.WARMUP_BATCH_SIZES
+        runs = settings.WARMUP_RUNS if runs is None else runs
+
+        shapes = []
+        start = time.perf_counter()
+        for size in input_sizes:
+            frame = np.zeros((size, size, 3), dtype=np.uint8)
+            for batch_size in batch_sizes:
+                batch = frame if batch_size == 1 else [frame] * batch_size
+
+                call_start = time.perf_counter()
+                self.model(batch, size=size)
+                first_ms = (time.perf_counter() - call_start) * 1000
+
+                timings = []
+                for _ in range(runs):
+                    call_start = time.perf_counter()
+                    self.model(batch, size=size)
+                    timings.append((time.perf_counter() - call_start) * 1000)
+
+                shapes.append({
+                    "input_size": size,
+                    "batch_size": batch_size,
+                    "first_ms": first_ms,
+                    "steady_ms": float(np.median(timings)) if timings else first_ms,
+                })
+
+        stats = {
+            "warmup_ms": (time.perf_counter() - start) * 1000,
+            "first_inference_ms": shapes[0]["first_ms"],
+            "steady_state_ms": shapes[0]["steady_ms"],
+            "shapes": shapes,
+        }
+        logger.info(
+            f"Classifier warmed up in {stats['warmup_ms']:.0f} ms, "
+            f"steady-state inference {stats['steady_state_ms']:.1f} ms"
+        )
+        return stats
+
+    def classify_plastic(
+        self,
+        image: np.ndarray,
+        input_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Classify plastic items in image.
 
         Args:
             image: Input image as numpy array
+            input_size: Model input size for this frame, defaults to
+                ``input_size``
 
         Returns:
             List of detections with plastic type and confidence
         """
         try:
-            # Run inference
-            predictions = self.model(image)
+            # Skip empty belt frames and restrict inference to occupied ROIs
+            regions = None
+            if self.gate is not None:
+                with self.metrics.GATE_LATENCY.time(), self.tracer.span("gate"):
+                    regions = self.gate.active_regions(image)
+                if not regions:
+                    self.metrics.FRAMES_SKIPPED.inc()
+                    self.metrics.DETECTIONS_PER_FRAME.observe(0)
+                    return []
+
+            if regions is None:
+                rows = self._predict(image, input_size)
+            else:
+                parts = []
+                for x1, y1, x2, y2 in regions:
+                    part = self._predict(image[y1:y2, x1:x2], input_size).copy()
+                    part[:, [0, 2]] += x1
+                    part[:, [1, 3]] += y1
+                    parts.append(part)
+                rows = parts[0] if len(parts) == 1 else merge_detections(
+                    np.concatenate(parts), self.tile_merge_threshold
+                )
 
             # Process detections
-            detections = []
-            for pred in predictions.xyxy[0]:
-                x1, y1, x2, y2, conf, cls = pred.tolist()
-                if conf >= self.confidence_threshold:
-                    detections.append({
-                        "plastic_type": self.class_names[int(cls)],
-                        "confidence": float(conf),
-                        "bbox": [float(x1), float(y1), float(x2), float(y2)]
-                    })
+            with self.metrics.POSTPROCESS_LATENCY.time(), \
+                    self.tracer.span("postprocess"):
+                detections = self._to_detections(rows)
 
+            self.metrics.DETECTIONS_PER_FRAME.observe(len(detections))
+            if self.capture is not None:
+                self.capture.offer(image, rows, self.class_names)
             return detections
 
         except Exception as e:
             logger.error(f"Classification failed: {e}")
             return []
 
-    def get_contamination_level(
+    def detect(
         self,
         image: np.ndarray,
-        bbox: List[float]
-    ) -> float:
+        input_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
-        Estimate contamination level of plastic item.
+        Run the model on a whole frame and nothing else.
+
+        Unlike ``classify_plastic`` this bypasses the motion gate and
+        sample capture and records no metrics or traces, so a second look
+        at a frame, e.g. a full-resolution audit, leaves no trace in the
+        serving statistics or the gate's background model.
 
         Args:
-            image: Input image
-            bbox: Bounding box coordinates [x1, y1, x2, y2]
+            image: Input frame
+            input_size: Model input size, defaults to ``input_size``
 
         Returns:
-            Contamination level (0-1)
+            Detections as returned by ``classify_plastic``
         """
-        try:
-            x1, y1, x2, y2 = map(int, bbox)
-            roi = image[y1:y2, x1:x2]
+        return self._to_detections(self._predict(image, input_size, record=False))
+
+    def _to_detections(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Detections above the confidence threshold from prediction rows."""
+        detections = []
+        for pred in rows:
+            x1, y1, x2, y2, conf, cls = pred.tolist()
+            if conf >= self.confidence_threshold:
+                detections.append({
+                    "plastic_type": self.class_names[int(cls)],
+                    "confidence": float(conf),
+                    "bbox": [float(x1), float(y1), float(x2), float(y2)]
+                })
+        return detections
+
+    def _instruments(self, record: bool) -> Tuple[Any, Any]:
+        """This classifier's metrics and tracer, or no-ops if not recording."""
+        if record:
+            return self.metrics, self.tracer
+        return metrics.NOOP_METRICS, null_tracer
+
+    def _predict(
+        self,
+        image: np.ndarray,
+        input_size: Optional[int] = None,
+        record: bool = True
+    ) -> np.ndarray:
+        """
+        Run the model on one frame or region.
 
-            # Convert to grayscale
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        Args:
+            image: Frame or region to run inference on
+            input_size: Model input size, defaults to ``input_size``
+            record: Record stage latencies and spans
 
-            # Calculate contamination metrics
-            blur = cv2.GaussianBlur(gray, (5, 5), 0)
-            edges = cv2.Canny(blur, 50, 150)
+        Returns:
+            ``(N, 6)`` array of ``x1, y1, x2, y2, conf, cls`` in image pixels
+        """
+        # Read once so a concurrent change cannot split preprocessing and
+        # inference across two sizes
+        size = input_size or self.input_size
+        m, t = self._instruments(record)
+        inputs, boxes, offsets = self._prepare_input(image, size, record)
+
+        with m.INFERENCE_LATENCY.time(), t.span("inference"):
+            predictions = self.model(inputs, size=size)
+
+        if offsets is None:
+            scale, pad, shape = boxes[0]
+            return unletterbox(_to_numpy(predictions.xyxy[0]), scale, pad, shape)
+        with m.POSTPROCESS_LATENCY.time(), t.span("postprocess"):
+            return merge_tile_detections(
+                [
+                    unletterbox(_to_numpy(pred), scale, pad, shape)
+                    for pred, (scale, pad, shape) in zip(predictions.xyxy, boxes)
+                ],
+                offsets,
+                self.min_confidence,
+                self.tile_merge_threshold
+            )
 
-            # Estimate contamination based on edge density
-            edge_density = np.sum(edges > 0) / float(edges.size)
+    def _prepare_input(
+        self,
+        image: np.ndarray,
+        input_size: Optional[int] = None,
+        record: bool = True
+    ) -> Tuple[
+        Union[np.ndarray, List[np.ndarray]],
+        List[Tuple[float, Tuple[int, int], Tuple[int, ...]]],
+        Optional[np.ndarray],
+    ]:
+        """
+        Build the model input for a frame or region.
 
-            return float(edge_density)
+        Frames larger than the model input are tiled so small items keep
+        their resolution. The frame, or each tile, is then letterboxed to
+        ``input_size``, so the model receives inputs at its own size.
 
-        except Exception as e:
-            logger.error(f"Contamination analysis failed: {e}")
-            return 0.0
+        Args:
+            image: Frame or region to run inference on
+            input_size: Model input size, defaults to ``input_size``
+            record: Record the stage latency and span
+
+        Returns:
+            The letterboxed frame or tiles, the ``(scale, pad, shape)`` of
+            each to map detections back, and the tile offsets (None when
+            not tiled)
 
-    def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
+        Raises:
+            ValueError: If the image is empty
         """
-        Preprocess image for optimal detection
+        if image is None or image.size == 0:
+            raise ValueError("Invalid input image")
+
+        size = input_size or self.input_size
+        m, t = self._instruments(record)
+        with m.PREPROCESS_LATENCY.time(), t.span("preprocess"):
+            offsets = None
+            parts = [image]
+            if self.tiled and max(image.shape[:2]) > self.tile_size:
+                parts, offsets = make_tiles(image, self.tile_size, self.tile_overlap)
+            inputs = []
+            boxes = []
+            for part in parts:
+                boxed, scale, pad = letterbox(part, size)
+                inputs.append(boxed)
+                boxes.append((scale, pad, part.shape))
+        return (inputs if offsets is not None else inputs[0]), boxes, offsets
+
+    def get_contamination_level(
+        self,
+        image: np.ndarray,
+        bbox: List[float]
+    ) -> float:
+        """
+        Estimate contamination level of plastic item.
 
         Args:
             image: Input image
+            bbox: Bounding box coordinates [x1, y1, x2, y2]
 
         Returns:
-            Preprocessed image
+            Contamination level (0-1)
         """
         try:
-            # Input validation
-            if image is None or image.size == 0:
-                raise ValueError("Invalid input image")
+            with self.metrics.CONTAMINATION_LATENCY.time(), \
+                    self.tracer.span("contamination"):
+                x1, y1, x2, y2 = map(int, bbox)
+                roi = image[y1:y2, x1:x2]
 
-            # Resize to model input size
-            image = cv2.resize(image, (640, 640))
+                # Convert to grayscale
+                gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
 
-            # Normalize pixel values
-            image = image.astype(np.float32) / 255.0
+                # Calculate contamination metrics
+                blur = cv2.GaussianBlur(gray, (5, 5), 0)
+                edges = cv2.Canny(blur, 50, 150)
 
-            # Color space conversion if needed
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                # Estimate contamination based on edge density
+                edge_density = np.sum(edges > 0) / float(edges.size)
 
-            return image
+            return float(edge_density)
 
         except Exception as e:
-            logger.error(f"Image preprocessing failed: {e}")
-            raise
+            logger.error(f"Contamination analysis failed: {e}")
+            return 0.0
 
     def _assess_contamination(self, image: np.ndarray, bbox: List[float]) -> float:
         """
@@ -169,17 +504,37 @@ class PlasticClassifier:
             logger.error(f"Contamination assessment failed: {e}")
             return 0.0
 
-    def train_model(self, train_data_path: str, epochs: int = 100) -> bool:
+    def train_model(
+        self,
+        train_data_path: str,
+        epochs: int = 100,
+        batch_size: Optional[int] = None,
+        image_size: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> bool:
         """
         Train or fine-tune the model on custom data
 
+        The trainer's own data loading is used, with its on-disk image
+        cache and ``workers`` loader processes. The packed cache and
+        loader in ``src.vision.training_data`` are not used here; they
+        serve custom training loops and the training data benchmark.
+
         Args:
             train_data_path: Path to training data directory
             epochs: Number of training epochs
+            batch_size: Samples per batch, defaults to
+                ``settings.TRAIN_BATCH_SIZE``
+            image_size: Training image side, defaults to
+                ``settings.TRAIN_IMAGE_SIZE``
+            workers: Data loading processes, defaults to
+                ``settings.TRAIN_WORKERS``
 
         Returns:
             Training success status
         """
+        import torch
+
         try:
             # Validate training data path
             if not Path(train_data_path).exists():
@@ -191,8 +546,10 @@ class PlasticClassifier:
             training_args = {
                 "data": train_data_path,
                 "epochs": epochs,
-                "imgsz": 640,
-                "batch": 16,
+                "imgsz": image_size or settings.TRAIN_IMAGE_SIZE,
+                "batch": batch_size or settings.TRAIN_BATCH_SIZE,
+                "workers": settings.TRAIN_WORKERS if workers is None else workers,
+                "cache": "disk",
                 "device": "cuda:0" if torch.cuda.is_available() else "cpu",
             }
 
@@ -200,8 +557,18 @@ class PlasticClassifier:
             logger.info(f"Starting model training for {epochs} epochs...")
             results = self.model.train(**training_args)
 
-            # Save trained model
-            self.model.save("models/plastic_yolo11_trained.pt")
+            # Save trained model and register it as a candidate version
+            models_dir = settings.MODEL_REGISTRY_PATH.parent
+            trained_path = models_dir / "plastic_yolo11_trained.pt"
+            self.model.save(str(trained_path))
+
+            from src.vision.registry import ModelRegistry
+
+            ModelRegistry().register(
+                trained_path,
+                version=f"trained-{time.strftime('%Y%m%d%H%M%S')}",
+                description=f"Trained on {train_data_path} for {epochs} epochs",
+            )
 
             return True
 
@@ -210,15 +577,95 @@ class PlasticClassifier:
             return False
 
 
-if __name__ == "__main__":
-    # Example usage
+def list_images(source: Any) -> List[Path]:
+    """
+    Resolve an image file or directory to a sorted list of image paths.
+
+    Args:
+        source: Image file or directory of images
+
+    Returns:
+        Image paths
+    """
+    source = Path(source)
+    if not source.is_dir():
+        return [source]
+    return sorted(
+        p for p in source.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Classify images from the command line, optionally under a profiler.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv``
+    """
+    import argparse
+
+    from src.common.profiling import profile_call
+
+    parser = argparse.ArgumentParser(description="Classify plastic images")
+    parser.add_argument(
+        "images",
+        nargs="?",
+        default="test_plastic.jpg",
+        help="Image file or directory of images"
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "sampling"],
+        help="Run under cProfile or the sampling profiler"
+    )
+    parser.add_argument(
+        "--report",
+        default="profile_report.txt",
+        help="Profiler report path"
+    )
+    parser.add_argument(
+        "--trace",
+        help="Trace every frame and write Chrome trace-event JSON here"
+    )
+    args = parser.parse_args(argv)
+
+    paths = list_images(args.images)
+
+    if args.trace:
+        tracer.enabled = True
+        tracer.sample_rate = 1.0
+
+    metrics.start_metrics_server()
     classifier = PlasticClassifier()
 
-    # Test on sample image
-    test_image = cv2.imread("test_plastic.jpg")
-    if test_image is not None:
-        results = classifier.classify_plastic(test_image)
-        for detection in results:
-            print(
-                f"Found {detection['plastic_type']} with {detection['confidence']:.2f} confidence"
-            )
+    def run() -> None:
+        for path in paths:
+            with tracer.frame(path.name):
+                with tracer.span("decode"):
+                    image = cv2.imread(str(path))
+                if image is None:
+                    logger.warning(f"Could not read image: {path}")
+                    continue
+                for detection in classifier.classify_plastic(image):
+                    level = classifier.get_contamination_level(
+                        image, detection["bbox"]
+                    )
+                    print(
+                        f"{path.name}: found {detection['plastic_type']} with "
+                        f"{detection['confidence']:.2f} confidence, "
+                        f"contamination {level:.2f}"
+                    )
+
+    if args.profile:
+        profile_call(run, args.profile, Path(args.report))
+        print(f"Profile report written to {args.report}")
+    else:
+        run()
+
+    if args.trace:
+        tracer.export_chrome_trace(Path(args.trace))
+        print(f"Trace written to {args.trace}")
+
+
+if __name__ == "__main__":
+    main()
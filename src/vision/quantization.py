@@ -0,0 +1,389 @@
+"""
+INT8 quantized CPU inference for the plastic classifier.
+
+Two PyTorch quantization modes are supported:
+
+* ``dynamic``: weights of ``Linear``/recurrent layers are stored as INT8
+  and activations are quantized on the fly. No calibration is needed, but
+  convolutions stay in FP32.
+* ``static``: the network is traced with FX, observers are calibrated on a
+  folder of representative conveyor images and every supported layer,
+  convolutions included, runs in INT8.
+
+Only the tensor network inside the hub model (``settings.QUANTIZE_MODULE``)
+is quantized; pre- and post-processing around it are unchanged. Static
+models are produced once with the ``calibrate`` command and loaded from
+``settings.QUANTIZED_MODEL_PATH``. The ``evaluate`` command compares a
+quantized model with the FP32 one on latency, model size and detection
+agreement before it is adopted.
+
+Usage:
+    python -m src.vision.quantization calibrate --images data/calibration
+    python -m src.vision.quantization evaluate --images data/validation
+"""
+
+import argparse
+import copy
+import io
+import json
+import logging
+import resource
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import cv2
+import numpy as np
+import torch
+from torch import nn
+
+from src.common.config import settings
+from src.vision.evaluation import compare_detections
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("dynamic", "static")
+
+
+def get_submodule(model: nn.Module, path: str) -> nn.Module:
+    """Resolve a dotted attribute path inside a model."""
+    module = model
+    for name in path.split("."):
+        module = getattr(module, name)
+    return module
+
+
+def set_submodule(model: nn.Module, path: str, module: nn.Module) -> None:
+    """Replace the submodule at a dotted attribute path."""
+    parent, _, name = path.rpartition(".")
+    setattr(get_submodule(model, parent) if parent else model, name, module)
+
+
+def quantize_model(
+    model: nn.Module,
+    mode: str = "static",
+    calibration: Optional[Iterable[np.ndarray]] = None,
+    module_path: Optional[str] = None,
+    input_size: Optional[int] = None,
+    backend: Optional[str] = None
+) -> nn.Module:
+    """
+    Quantize the tensor network inside a detection model in place.
+
+    Args:
+        model: Detection model called as ``model(image, size=...)``
+        mode: ``"dynamic"`` or ``"static"``
+        calibration: BGR images run through the model to calibrate
+            activation ranges; required for static quantization
+        module_path: Dotted path of the submodule to quantize, defaults to
+            ``settings.QUANTIZE_MODULE``
+        input_size: Model input size used for tracing and calibration,
+            defaults to ``settings.MODEL_INPUT_SIZE``
+        backend: Quantized kernel backend, defaults to
+            ``settings.QUANTIZATION_BACKEND``
+
+    Returns:
+        The model, with the submodule replaced by its quantized version
+
+    Raises:
+        ValueError: For an unknown mode or missing calibration images
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping, quantize_dynamic
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization mode: {mode}")
+    path = module_path or settings.QUANTIZE_MODULE
+    input_size = input_size or settings.MODEL_INPUT_SIZE
+    backend = backend or settings.QUANTIZATION_BACKEND
+    torch.backends.quantized.engine = backend
+
+    target = get_submodule(model, path).eval()
+    if mode == "dynamic":
+        quantized = quantize_dynamic(
+            target, {nn.Linear, nn.LSTM, nn.GRU}, dtype=torch.qint8
+        )
+    else:
+        images = list(calibration or [])
+        if not images:
+            raise ValueError("Static quantization needs calibration images")
+        example = (torch.zeros(1, 3, input_size, input_size),)
+        prepared = prepare_fx(target, get_default_qconfig_mapping(backend), example)
+        set_submodule(model, path, prepared)
+        with torch.no_grad():
+            for image in images:
+                model(image, size=input_size)
+        quantized = convert_fx(prepared)
+        logger.info(f"Calibrated static quantization on {len(images)} images")
+
+    set_submodule(model, path, quantized)
+    return model
+
+
+def save_quantized(
+    model: nn.Module,
+    path: Path,
+    module_path: Optional[str] = None,
+    input_size: Optional[int] = None
+) -> Path:
+    """
+    Save the calibrated state of a statically quantized submodule.
+
+    Only tensors are stored (no pickled code), so the file loads with
+    ``weights_only=True``; the quantized graph is rebuilt on load.
+
+    Args:
+        model: Model returned by :func:`quantize_model`
+        path: Output file
+        module_path: Dotted submodule path, defaults to
+            ``settings.QUANTIZE_MODULE``
+        input_size: Input size the model was traced with, defaults to
+            ``settings.MODEL_INPUT_SIZE``
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    module = get_submodule(model, module_path or settings.QUANTIZE_MODULE)
+    torch.save({
+        "input_size": input_size or settings.MODEL_INPUT_SIZE,
+        "backend": torch.backends.quantized.engine,
+        "state_dict": module.state_dict(),
+    }, path)
+    return path
+
+
+def load_quantized(
+    model: nn.Module,
+    path: Path,
+    module_path: Optional[str] = None
+) -> nn.Module:
+    """
+    Swap a saved static INT8 submodule into an FP32 model.
+
+    The quantized graph is rebuilt from the FP32 submodule (calibrated on
+    a blank frame just to fix its structure), then the saved scales, zero
+    points and INT8 weights are loaded into it.
+
+    Args:
+        model: FP32 detection model
+        path: File written by :func:`save_quantized`
+        module_path: Dotted submodule path, defaults to
+            ``settings.QUANTIZE_MODULE``
+
+    Returns:
+        The model with the quantized submodule in place
+    """
+    state = torch.load(Path(path), map_location="cpu", weights_only=True)
+    path_in_model = module_path or settings.QUANTIZE_MODULE
+    size = state["input_size"]
+    blank = np.zeros((size, size, 3), dtype=np.uint8)
+    quantize_model(model, "static", [blank], path_in_model, size, state["backend"])
+    get_submodule(model, path_in_model).load_state_dict(state["state_dict"])
+    return model
+
+
+def apply_quantization(model: nn.Module, mode: str) -> nn.Module:
+    """
+    Apply the configured quantization mode to a freshly loaded model.
+
+    Args:
+        model: FP32 detection model
+        mode: ``"dynamic"`` or ``"static"``
+
+    Returns:
+        Quantized model
+
+    Raises:
+        FileNotFoundError: If the calibrated static model is missing
+    """
+    if mode == "static":
+        path = settings.QUANTIZED_MODEL_PATH
+        if not Path(path).exists():
+            raise FileNotFoundError(
+                f"Quantized model not found at {path}; create it with "
+                "'python -m src.vision.quantization calibrate'"
+            )
+        logger.info(f"Loading static INT8 model from {path}")
+        return load_quantized(model, path)
+    logger.info(f"Applying {mode} INT8 quantization")
+    return quantize_model(model, mode)
+
+
+def module_size_mb(module: nn.Module) -> float:
+    """Serialized size of a module's state in MB."""
+    buffer = io.BytesIO()
+    torch.save(module.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+
+def _run(classifier: Any, images: List[np.ndarray]) -> Dict[str, Any]:
+    """Classify every image, returning detections and latency."""
+    detections, times = [], []
+    for image in images:
+        start = time.perf_counter()
+        detections.append(classifier.classify_plastic(image))
+        times.append((time.perf_counter() - start) * 1000)
+    p50, p95 = np.percentile(times, [50, 95])
+    return {
+        "detections": detections,
+        "latency": {
+            "mean_ms": float(np.mean(times)),
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+        },
+    }
+
+
+def evaluate(
+    reference: Any,
+    candidate: Any,
+    images: List[np.ndarray],
+    module_path: Optional[str] = None,
+    warmup: int = 2
+) -> Dict[str, Any]:
+    """
+    Compare a quantized classifier with the FP32 one.
+
+    Args:
+        reference: FP32 ``PlasticClassifier``
+        candidate: Quantized ``PlasticClassifier``
+        images: Evaluation images
+        module_path: Dotted path of the quantized submodule, used for the
+            model size comparison
+        warmup: Untimed images run through each classifier first
+
+    Returns:
+        Latency and model size of both models, speed-up, detection
+        agreement and the process peak RSS
+    """
+    path = module_path or settings.QUANTIZE_MODULE
+    results = {}
+    runs = {}
+    for name, classifier in (("fp32", reference), ("int8", candidate)):
+        for image in images[:warmup]:
+            classifier.classify_plastic(image)
+        runs[name] = _run(classifier, images)
+        results[name] = {
+            "latency": runs[name]["latency"],
+            "size_mb": module_size_mb(get_submodule(classifier.model, path)),
+        }
+    results["speedup"] = (
+        results["fp32"]["latency"]["mean_ms"]
+        / results["int8"]["latency"]["mean_ms"]
+    )
+    results["size_ratio"] = results["int8"]["size_mb"] / results["fp32"]["size_mb"]
+    results["agreement"] = compare_detections(
+        runs["fp32"]["detections"], runs["int8"]["detections"]
+    )
+    results["images"] = len(images)
+    results["peak_rss_mb"] = (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+    return results
+
+
+def _read_images(source: Path, limit: Optional[int]) -> List[np.ndarray]:
+    """Read up to ``limit`` images from a packed store, file or directory."""
+    from src.vision.dataset import PackedFrameStore
+    from src.vision.plastic_classifier import list_images
+
+    if PackedFrameStore.is_store(source):
+        store = PackedFrameStore(source)
+        return [store[i] for i in range(min(len(store), limit or len(store)))]
+
+    images = []
+    for path in list_images(source)[:limit]:
+        image = cv2.imread(str(path))
+        if image is None:
+            logger.warning(f"Could not read image: {path}")
+            continue
+        images.append(image)
+    if not images:
+        raise ValueError(f"No readable images in {source}")
+    return images
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Calibrate a static INT8 model or evaluate a quantized model.
+
+    Args:
+        argv: Command line arguments, defaults to ``sys.argv``
+
+    Returns:
+        Calibration summary or evaluation results
+    """
+    from src.vision.plastic_classifier import PlasticClassifier
+
+    parser = argparse.ArgumentParser(description="INT8 quantization tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate = commands.add_parser(
+        "calibrate", help="Build a static INT8 model from calibration images"
+    )
+    calibrate.add_argument("--images", type=Path, required=True,
+                           help="Image file, folder or packed frame store")
+    calibrate.add_argument("--limit", type=int, default=200)
+    calibrate.add_argument("--input-size", type=int,
+                           default=settings.MODEL_INPUT_SIZE)
+    calibrate.add_argument("--output", type=Path,
+                           default=settings.QUANTIZED_MODEL_PATH)
+
+    evaluation = commands.add_parser(
+        "evaluate", help="Compare a quantized model with the FP32 model"
+    )
+    evaluation.add_argument("--images", type=Path, required=True,
+                            help="Image file, folder or packed frame store")
+    evaluation.add_argument("--limit", type=int, default=500)
+    evaluation.add_argument("--mode", choices=QUANTIZATION_MODES,
+                            default="static")
+    evaluation.add_argument("--quantized", type=Path,
+                            default=settings.QUANTIZED_MODEL_PATH,
+                            help="Static model written by 'calibrate'")
+    evaluation.add_argument("--report", type=Path,
+                            help="Write the results as JSON here")
+
+    for command in (calibrate, evaluation):
+        command.add_argument("--module", default=settings.QUANTIZE_MODULE,
+                             help="Submodule of the hub model to quantize")
+    args = parser.parse_args(argv)
+
+    # The reference must stay FP32 whatever the deployment setting is
+    mode, settings.QUANTIZATION_MODE = settings.QUANTIZATION_MODE, None
+    try:
+        reference = PlasticClassifier()
+    finally:
+        settings.QUANTIZATION_MODE = mode
+
+    if args.command == "calibrate":
+        images = _read_images(args.images, args.limit)
+        model = quantize_model(
+            copy.deepcopy(reference.model), "static", images, args.module,
+            args.input_size
+        )
+        path = save_quantized(model, args.output, args.module, args.input_size)
+        summary = {"output": str(path), "calibration_images": len(images)}
+        print(json.dumps(summary))
+        return summary
+
+    images = _read_images(args.images, args.limit)
+    model = copy.deepcopy(reference.model)
+    if args.mode == "static":
+        model = load_quantized(model, args.quantized, args.module)
+    else:
+        model = quantize_model(model, "dynamic", module_path=args.module)
+    candidate = PlasticClassifier(model=model)
+    results = evaluate(reference, candidate, images, args.module)
+    results["mode"] = args.mode
+
+    print(json.dumps(results, indent=2))
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        args.report.write_text(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Versioned model registry and hot-swapping of the served model.
+
+``ModelRegistry`` reads the model entries of ``models/model_config.yml``
+(file name, version, SHA256) and verifies checkpoints against them.
+``ModelManager`` serves one version at a time. A new version is loaded,
+verified and warmed up on a background thread while the current one keeps
+serving, then swapped in atomically: calls already running finish on the
+model they started with, and later calls use the new one. The previous
+versions stay loaded so a rollback is immediate. A candidate version can
+also run in shadow (see ``src.vision.shadow``) before it is promoted.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import yaml
+
+from src.common import metrics
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 16 * 1024 * 1024  # bytes hashed per read
+
+
+def file_sha256(path: Path) -> str:
+    """SHA256 of a file, read in large blocks."""
+    sha256_hash = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            sha256_hash.update(block)
+    return sha256_hash.hexdigest()
+
+
+class ModelVersion:
+    """One registered model checkpoint."""
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        version: Optional[str] = None,
+        sha256: Optional[str] = None,
+        description: Optional[str] = None
+    ):
+        """
+        Initialize the entry.
+
+        Args:
+            name: Checkpoint file name, the key in the registry file
+            path: Checkpoint location
+            version: Version string
+            sha256: Expected checkpoint hash; unverified when None
+            description: Free-form description
+        """
+        self.name = name
+        self.path = Path(path)
+        self.version = version
+        self.sha256 = sha256
+        self.description = description
+
+    @property
+    def label(self) -> str:
+        """Version string, or the file name for unversioned checkpoints."""
+        return self.version or self.name
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Fields reported by the API."""
+        return {
+            "name": self.name,
+            "version": self.version,
+            "sha256": self.sha256,
+            "description": self.description,
+            "available": self.path.exists(),
+        }
+
+
+class ModelRegistry:
+    """Model versions listed in the model config file."""
+
+    def __init__(self, config_path: Optional[Path] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            config_path: Registry YAML file, defaults to
+                ``settings.MODEL_REGISTRY_PATH``; checkpoints live next to it
+        """
+        self.config_path = Path(config_path or settings.MODEL_REGISTRY_PATH)
+        self.models_dir = self.config_path.parent
+        # Hashes of verified files, valid while size and mtime are unchanged
+        self._hashes: Dict[Path, Tuple[int, int, str]] = {}
+
+    def _read(self) -> Dict[str, Any]:
+        """Parsed registry file, empty if it does not exist."""
+        if not self.config_path.exists():
+            return {}
+        return yaml.safe_load(self.config_path.read_text()) or {}
+
+    def versions(self) -> List[ModelVersion]:
+        """All registered versions, in file order."""
+        return [
+            ModelVersion(
+                name=name,
+                path=self.models_dir / name,
+                version=str(info["version"]) if info.get("version") else None,
+                sha256=info.get("sha256"),
+                description=info.get("description"),
+            )
+            for name, info in (self._read().get("models") or {}).items()
+        ]
+
+    def get(self, version: str) -> ModelVersion:
+        """
+        Look up a version.
+
+        Args:
+            version: Version string or checkpoint file name
+
+        Returns:
+            The registered entry
+
+        Raises:
+            KeyError: If no entry matches
+        """
+        for entry in self.versions():
+            if version in (entry.version, entry.name):
+                return entry
+        raise KeyError(f"Unknown model version: {version}")
+
+    def verify(self, entry: ModelVersion) -> None:
+        """
+        Check that a checkpoint exists and matches its registered hash.
+
+        Args:
+            entry: Version to check
+
+        Raises:
+            ValueError: If the file is missing or its hash differs
+        """
+        if not entry.path.exists():
+            raise ValueError(f"Model file not found: {entry.path}")
+        if not entry.sha256:
+            logger.warning(f"No hash registered for {entry.name}, not verified")
+            return
+
+        stat = entry.path.stat()
+        cached = self._hashes.get(entry.path)
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            digest = cached[2]
+        else:
+            digest = file_sha256(entry.path)
+            self._hashes[entry.path] = (stat.st_size, stat.st_mtime_ns, digest)
+        if digest != entry.sha256:
+            raise ValueError(
+                f"Hash mismatch for {entry.name}: expected {entry.sha256}, "
+                f"got {digest}"
+            )
+
+    def register(
+        self,
+        path: Path,
+        version: str,
+        description: Optional[str] = None
+    ) -> ModelVersion:
+        """
+        Add or update a checkpoint's entry, recording its current hash.
+
+        Args:
+            path: Checkpoint in the registry's models directory
+            version: Version string
+            description: Free-form description
+
+        Returns:
+            The registered entry
+
+        Raises:
+            ValueError: If the file is missing or outside the models directory
+        """
+        path = Path(path)
+        if not path.exists():
+            raise ValueError(f"Model file not found: {path}")
+        if path.resolve().parent != self.models_dir.resolve():
+            raise ValueError(f"{path} is not in {self.models_dir}")
+
+        config = self._read()
+        models = config.setdefault("models", {}) or {}
+        config["models"] = models
+        info = models.setdefault(path.name, {})
+        info.update({"version": version, "sha256": file_sha256(path)})
+        if description:
+            info["description"] = description
+
+        fd, tmp = tempfile.mkstemp(dir=self.config_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                yaml.safe_dump(config, f, sort_keys=False)
+            os.replace(tmp, self.config_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        logger.info(f"Registered {path.name} as version {version}")
+        return self.get(path.name)
+
+
+def _build_classifier(entry: ModelVersion) -> Any:
+    """Load a ``PlasticClassifier`` for a registry entry."""
+    from src.vision.plastic_classifier import PlasticClassifier
+
+    return PlasticClassifier(model_path=entry.path)
+
+
+class _Slot:
+    """A loaded model version and the number of calls using it."""
+
+    def __init__(self, entry: ModelVersion, classifier: Any):
+        self.entry = entry
+        self.classifier = classifier
+        self.in_flight = 0
+
+
+class ModelManager:
+    """Serves the active model version and swaps versions under traffic."""
+
+    def __init__(
+        self,
+        registry: Optional[ModelRegistry] = None,
+        factory: Optional[Callable[[ModelVersion], Any]] = None,
+        rollback_depth: Optional[int] = None
+    ):
+        """
+        Initialize the manager with no model loaded.
+
+        Args:
+            registry: Registry to resolve versions in
+            factory: Builds a classifier for an entry, defaults to a
+                ``PlasticClassifier`` loading the entry's checkpoint
+            rollback_depth: Previous versions kept loaded, defaults to
+                ``settings.MODEL_ROLLBACK_DEPTH``
+        """
+        self.registry = registry or ModelRegistry()
+        self.factory = factory or _build_classifier
+        self.rollback_depth = (
+            settings.MODEL_ROLLBACK_DEPTH
+            if rollback_depth is None else rollback_depth
+        )
+        self._lock = threading.Condition()
+        self._active: Optional[_Slot] = None
+        self._previous: List[_Slot] = []  # oldest first
+        self._loader = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model-loader"
+        )
+        self.loading: Optional[str] = None
+        self.error: Optional[str] = None
+        self.swaps = 0
+        self.shadow: Optional[Any] = None
+
+    @classmethod
+    def from_settings(cls) -> "ModelManager":
+        """
+        Create a manager serving ``settings.MODEL_VERSION``.
+
+        Without a configured version ``settings.MODEL_PATH`` is served
+        unverified, as before the registry existed.
+        """
+        manager = cls()
+        manager.load(settings.MODEL_VERSION, warmup=False)
+        if settings.SHADOW_MODEL_VERSION:
+            manager.start_shadow(settings.SHADOW_MODEL_VERSION)
+        return manager
+
+    @property
+    def active(self) -> Optional[ModelVersion]:
+        """Version currently serving."""
+        slot = self._active
+        return slot.entry if slot else None
+
+    def _resolve(self, version: Optional[str]) -> ModelVersion:
+        """Registry entry for a version, or the default checkpoint."""
+        if version is None:
+            return ModelVersion(settings.MODEL_PATH.name, settings.MODEL_PATH)
+        entry = self.registry.get(version)
+        self.registry.verify(entry)
+        return entry
+
+    def load(self, version: Optional[str], warmup: bool = True) -> ModelVersion:
+        """
+        Load, verify and warm up a version, then make it active.
+
+        The current version keeps serving until the swap, so this is safe
+        to call under traffic; ``load_async`` runs it in the background.
+
+        Args:
+            version: Version string or file name; None loads
+                ``settings.MODEL_PATH``
+            warmup: Run ``warmup()`` on the new classifier before the swap
+
+        Returns:
+            The newly active version
+        """
+        try:
+            entry = self._resolve(version)
+            logger.info(f"Loading model {entry.label}")
+            classifier = self.factory(entry)
+            if warmup:
+                classifier.warmup()
+        except Exception as e:
+            self.error = str(e)
+            metrics.MODEL_SWAPS.labels(action="failed").inc()
+            logger.error(f"Failed to load model {version}: {e}")
+            raise
+
+        self.error = None
+        self._activate(_Slot(entry, classifier))
+        metrics.MODEL_SWAPS.labels(action="swap").inc()
+        return entry
+
+    def load_async(self, version: str, warmup: bool = True) -> "Future[ModelVersion]":
+        """
+        Load a version on the background loader thread.
+
+        Args:
+            version: Version string or file name
+            warmup: Warm up the new classifier before the swap
+
+        Returns:
+            Future resolving to the active version once swapped in
+
+        Raises:
+            KeyError: If the version is not registered
+            RuntimeError: If another version is already loading
+        """
+        self.registry.get(version)
+        with self._lock:
+            if self.loading is not None:
+                raise RuntimeError(f"Model {self.loading} is already loading")
+            self.loading = version
+
+        def run() -> ModelVersion:
+            try:
+                return self.load(version, warmup)
+            finally:
+                with self._lock:
+                    self.loading = None
+
+        return self._loader.submit(run)
+
+    def rollback(self) -> ModelVersion:
+        """
+        Return to the previously active version, which is still loaded.
+
+        Returns:
+            The restored version
+
+        Raises:
+            RuntimeError: If no previous version is loaded
+        """
+        with self._lock:
+            if not self._previous:
+                raise RuntimeError("No previous model version to roll back to")
+            slot = self._previous.pop()
+            retired, self._active = self._active, slot
+            self.swaps += 1
+        logger.info(
+            f"Rolled back model {retired.entry.label} -> {slot.entry.label}"
+        )
+        metrics.MODEL_SWAPS.labels(action="rollback").inc()
+        self._retire(retired)
+        return slot.entry
+
+    def _activate(self, slot: _Slot) -> None:
+        """Swap a loaded version in and retire versions beyond the history."""
+        with self._lock:
+            old, self._active = self._active, slot
+            if old is not None:
+                self._previous.append(old)
+                self.swaps += 1
+            keep = len(self._previous) - self.rollback_depth
+            evicted, self._previous = (
+                self._previous[:max(keep, 0)], self._previous[max(keep, 0):]
+            )
+        if old is not None:
+            logger.info(f"Swapped model {old.entry.label} -> {slot.entry.label}")
+        for retired in evicted:
+            self._retire(retired)
+
+    def _retire(self, slot: _Slot) -> None:
+        """Wait for the calls still using a version, then release it."""
+        with self._lock:
+            while slot.in_flight:
+                self._lock.wait()
+        logger.info(f"Released model {slot.entry.label}")
+
+    @contextmanager
+    def acquire(self) -> Iterator[Any]:
+        """
+        Hold the active classifier for the duration of a call.
+
+        A swap during the call does not affect it; the replaced version is
+        only released once every holder is done.
+
+        Raises:
+            RuntimeError: If no model is loaded
+        """
+        with self._lock:
+            slot = self._active
+            if slot is None:
+                raise RuntimeError("No model loaded")
+            slot.in_flight += 1
+        try:
+            yield slot.classifier
+        finally:
+            with self._lock:
+                slot.in_flight -= 1
+                if not slot.in_flight:
+                    self._lock.notify_all()
+
+    def classify_plastic(
+        self,
+        image: np.ndarray,
+        input_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Classify a frame with the active version, offering it to the shadow."""
+        with self.acquire() as classifier:
+            shadow = self.shadow
+            if shadow is None:
+                return classifier.classify_plastic(image, input_size)
+            start = time.perf_counter()
+            detections = classifier.classify_plastic(image, input_size)
+            latency_ms = (time.perf_counter() - start) * 1000
+        shadow.submit(image, detections, latency_ms)
+        return detections
+
+    def detect(
+        self,
+        image: np.ndarray,
+        input_size: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Run the active version's model alone; see ``PlasticClassifier.detect``."""
+        with self.acquire() as classifier:
+            return classifier.detect(image, input_size)
+
+    def start_shadow(self, version: str, **kwargs: Any) -> "Future[Any]":
+        """
+        Load a candidate version on the loader thread and shadow it.
+
+        Any running shadow evaluation is stopped once the new one starts.
+
+        Args:
+            version: Version string or file name of the candidate
+            **kwargs: ``ShadowEvaluator`` options
+
+        Returns:
+            Future resolving to the started ``ShadowEvaluator``
+
+        Raises:
+            KeyError: If the version is not registered
+        """
+        from src.vision.shadow import ShadowEvaluator
+
+        self.registry.get(version)
+
+        def run() -> Any:
+            entry = self._resolve(version)
+            candidate = self.factory(entry)
+            if getattr(candidate, "gate", None) is not None:
+                # Sampled frames cannot maintain a belt background model
+                candidate.gate = None
+            if getattr(candidate, "capture", None) is not None:
+                # Only the production model's near misses are worth labelling
+                candidate.capture = None
+            candidate.warmup()
+            shadow = ShadowEvaluator(candidate, entry.label, **kwargs).start()
+            previous, self.shadow = self.shadow, shadow
+            if previous is not None:
+                previous.stop()
+            return shadow
+
+        return self._loader.submit(run)
+
+    def stop_shadow(self) -> Optional[Dict[str, Any]]:
+        """
+        Stop shadow evaluation.
+
+        Returns:
+            Final shadow report, None if no shadow was running
+        """
+        shadow, self.shadow = self.shadow, None
+        return shadow.stop() if shadow is not None else None
+
+    def get_contamination_level(self, image: np.ndarray, bbox: List[float]) -> float:
+        """Estimate contamination with the active version."""
+        with self.acquire() as classifier:
+            return classifier.get_contamination_level(image, bbox)
+
+    def warmup(self, **kwargs: Any) -> Dict[str, Any]:
+        """Warm up the active version; see ``PlasticClassifier.warmup``."""
+        with self.acquire() as classifier:
+            return classifier.warmup(**kwargs)
+
+    def status(self) -> Dict[str, Any]:
+        """Active, loaded and loading versions."""
+        with self._lock:
+            active = self._active
+            previous = [slot.entry.label for slot in self._previous]
+        return {
+            "active": active.entry.label if active else None,
+            "previous": previous,
+            "loading": self.loading,
+            "error": self.error,
+            "swaps": self.swaps,
+            "shadow": self.shadow.label if self.shadow else None,
+        }
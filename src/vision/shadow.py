@@ -0,0 +1,259 @@
+"""
+Shadow evaluation of a candidate model on live frames.
+
+A ``ShadowEvaluator`` receives a sampled fraction of the frames the
+production model classifies, together with the production detections,
+and classifies them again with a candidate model on its own worker
+thread. Its detections never reach sorting; they are only compared with
+production (box match rate, class agreement, IoU) and timed.
+
+The production path only samples and enqueues: when the bounded queue is
+full the frame is dropped rather than waited for. The worker idles after
+each frame so that it infers at most ``cpu_budget`` of the time, which
+bounds the CPU the candidate takes from production.
+"""
+
+import logging
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from src.common import metrics
+from src.common.config import settings
+from src.vision.evaluation import box_agreement, detection_agreement
+
+logger = logging.getLogger(__name__)
+
+
+def _summary(values: List[float]) -> Dict[str, Optional[float]]:
+    """Mean and percentiles of recent values."""
+    if not values:
+        return {"mean": None, "p50": None, "p95": None}
+    array = np.asarray(values)
+    return {
+        "mean": float(array.mean()),
+        "p50": float(np.percentile(array, 50)),
+        "p95": float(np.percentile(array, 95)),
+    }
+
+
+class ShadowEvaluator:
+    """Classifies sampled frames with a candidate model and compares results."""
+
+    def __init__(
+        self,
+        candidate: Any,
+        label: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        cpu_budget: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        iou_threshold: float = 0.5,
+        window: int = 500,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the evaluator; call ``start`` to run the worker.
+
+        Args:
+            candidate: Classifier under evaluation, with ``classify_plastic``
+            label: Name of the candidate in reports
+            sample_rate: Fraction of frames evaluated, defaults to
+                ``settings.SHADOW_SAMPLE_RATE``
+            cpu_budget: Maximum fraction of time spent inferring, defaults
+                to ``settings.SHADOW_CPU_BUDGET``
+            queue_size: Sampled frames allowed to wait, defaults to
+                ``settings.SHADOW_QUEUE_SIZE``
+            iou_threshold: Minimum IoU for two detections to match
+            window: Recent frames kept for latency and agreement figures
+            seed: Seed for frame sampling
+        """
+        self.candidate = candidate
+        silence = getattr(candidate, "silence", None)
+        if silence is not None:
+            # Its latency and detections must not count as production's
+            silence()
+        self.label = label
+        self.sample_rate = (
+            settings.SHADOW_SAMPLE_RATE if sample_rate is None else sample_rate
+        )
+        self.cpu_budget = (
+            settings.SHADOW_CPU_BUDGET if cpu_budget is None else cpu_budget
+        )
+        self.iou_threshold = iou_threshold
+        self._queue: "queue.Queue" = queue.Queue(
+            maxsize=queue_size or settings.SHADOW_QUEUE_SIZE
+        )
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()  # guards sampling and frame counts
+        # Guards the worker's statistics, kept apart so that report() does
+        # not hold up submit() on the production path
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.offered = 0
+        self.sampled = 0
+        self.evaluated = 0
+        self.dropped = 0
+        self.failed = 0
+        self.busy_s = 0.0
+        self.started: Optional[float] = None
+        self.production_ms: Deque[float] = deque(maxlen=window)
+        self.shadow_ms: Deque[float] = deque(maxlen=window)
+        self.agreements: Deque[float] = deque(maxlen=window)
+        self.box_match_rates: Deque[float] = deque(maxlen=window)
+        self.class_agreements: Deque[float] = deque(maxlen=window)
+        self.ious: Deque[float] = deque(maxlen=window)
+
+    def start(self) -> "ShadowEvaluator":
+        """Start the worker thread."""
+        self._stop.clear()
+        self.started = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name="shadow-evaluator", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Shadow evaluation of {self.label} started "
+            f"(sample rate {self.sample_rate}, CPU budget {self.cpu_budget})"
+        )
+        return self
+
+    def stop(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """
+        Stop the worker; frames still queued are discarded.
+
+        Returns:
+            Final report
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        logger.info(f"Shadow evaluation of {self.label} stopped")
+        return self.report()
+
+    def submit(
+        self,
+        image: np.ndarray,
+        detections: List[Dict[str, Any]],
+        latency_ms: float
+    ) -> bool:
+        """
+        Offer a production frame for shadow evaluation; never blocks.
+
+        The frame is referenced, not copied, so it must not be modified
+        afterwards.
+
+        Args:
+            image: Frame classified by production
+            detections: Production detections for the frame
+            latency_ms: Production classification latency
+
+        Returns:
+            Whether the frame was queued
+        """
+        with self._lock:
+            self.offered += 1
+            if self._random.random() >= self.sample_rate:
+                return False
+            self.sampled += 1
+            try:
+                self._queue.put_nowait((image, list(detections), latency_ms))
+            except queue.Full:
+                self.dropped += 1
+                metrics.SHADOW_DROPPED.inc()
+                return False
+        return True
+
+    def _run(self) -> None:
+        """Worker loop: classify, compare, then idle to respect the budget."""
+        while not self._stop.is_set():
+            try:
+                image, production, production_ms = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            start = time.perf_counter()
+            try:
+                detections = self.candidate.classify_plastic(image)
+            except Exception as e:
+                with self._stats_lock:
+                    self.failed += 1
+                metrics.SHADOW_FAILED.inc()
+                logger.error(f"Shadow classification failed: {e}")
+                detections = None
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self.busy_s += elapsed
+
+            if detections is not None:
+                self._record(production, detections, production_ms, elapsed)
+            if self.cpu_budget < 1:
+                # Busy for `elapsed`, so idle long enough that the duty
+                # cycle stays at the budget
+                self._stop.wait(elapsed * (1 / self.cpu_budget - 1))
+
+    def _record(
+        self,
+        production: List[Dict[str, Any]],
+        detections: List[Dict[str, Any]],
+        production_ms: float,
+        elapsed: float
+    ) -> None:
+        """Compare one frame's detections and update the statistics."""
+        agreement = detection_agreement(detections, production, self.iou_threshold)
+        boxes = box_agreement(detections, production, self.iou_threshold)
+
+        with self._stats_lock:
+            self.evaluated += 1
+            self.production_ms.append(production_ms)
+            self.shadow_ms.append(elapsed * 1000)
+            self.agreements.append(agreement)
+            self.box_match_rates.append(boxes["box_match_rate"])
+            if boxes["class_agreement"] is not None:
+                self.class_agreements.append(boxes["class_agreement"])
+                self.ious.append(boxes["mean_iou"])
+        metrics.SHADOW_EVALUATED.inc()
+        metrics.SHADOW_LATENCY.observe(elapsed)
+        metrics.SHADOW_AGREEMENT.observe(agreement)
+
+    def report(self) -> Dict[str, Any]:
+        """Frame counts, latency of both models and agreement figures."""
+        running = time.monotonic() - self.started if self.started else 0.0
+        with self._lock:
+            offered, sampled, dropped = self.offered, self.sampled, self.dropped
+        # Copy under the lock, summarize outside it
+        with self._stats_lock:
+            evaluated, failed = self.evaluated, self.failed
+            busy_s = self.busy_s
+            production_ms = list(self.production_ms)
+            shadow_ms = list(self.shadow_ms)
+            agreements = list(self.agreements)
+            box_match_rates = list(self.box_match_rates)
+            class_agreements = list(self.class_agreements)
+            ious = list(self.ious)
+        return {
+            "candidate": self.label,
+            "frames": {
+                "offered": offered,
+                "sampled": sampled,
+                "evaluated": evaluated,
+                "dropped": dropped,
+                "failed": failed,
+            },
+            "latency_ms": {
+                "production": _summary(production_ms),
+                "shadow": _summary(shadow_ms),
+            },
+            "agreement": _summary(agreements)["mean"],
+            "box_match_rate": _summary(box_match_rates)["mean"],
+            "class_agreement": _summary(class_agreements)["mean"],
+            "mean_iou": _summary(ious)["mean"],
+            "busy_fraction": busy_s / running if running else 0.0,
+            "cpu_budget": self.cpu_budget,
+        }
@@ -0,0 +1,145 @@
+"""
+Tiled inference helpers for frames larger than the model input.
+
+A wide conveyor frame is cut into overlapping square tiles that run through
+the model as one batch. Tile detections are shifted back to frame
+coordinates and merged with a class-aware greedy non-maximum merge: boxes
+are compared by intersection over the smaller box, because an item cut by
+a tile edge yields a partial box that lies inside the full one. The kept
+box grows to cover the boxes it absorbs, so an item that was split between
+two tiles becomes one detection.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+
+def tile_origins(length: int, tile_size: int, overlap: int) -> List[int]:
+    """
+    Start offsets of tiles covering one axis.
+
+    Args:
+        length: Axis length in pixels
+        tile_size: Tile side in pixels
+        overlap: Minimum overlap between neighbouring tiles in pixels
+
+    Returns:
+        Sorted tile start offsets; the last tile ends at ``length``
+    """
+    if length <= tile_size:
+        return [0]
+    stride = tile_size - overlap
+    if stride <= 0:
+        raise ValueError("Tile overlap must be smaller than the tile size")
+    origins = list(range(0, length - tile_size, stride))
+    origins.append(length - tile_size)
+    return origins
+
+
+def make_tiles(
+    image: np.ndarray,
+    tile_size: int = 640,
+    overlap: int = 128
+) -> Tuple[List[np.ndarray], np.ndarray]:
+    """
+    Split a frame into overlapping square tiles.
+
+    Args:
+        image: Input frame
+        tile_size: Tile side in pixels
+        overlap: Minimum overlap between neighbouring tiles in pixels
+
+    Returns:
+        Tiles (views into ``image``) and their ``(x, y)`` offsets
+    """
+    height, width = image.shape[:2]
+    offsets = [
+        (x, y)
+        for y in tile_origins(height, tile_size, overlap)
+        for x in tile_origins(width, tile_size, overlap)
+    ]
+    tiles = [image[y:y + tile_size, x:x + tile_size] for x, y in offsets]
+    return tiles, np.array(offsets, dtype=np.float32).reshape(-1, 2)
+
+
+def pairwise_ios(boxes: np.ndarray) -> np.ndarray:
+    """
+    Intersection over the smaller box for every pair of boxes.
+
+    Args:
+        boxes: ``(N, 4)`` array of ``x1, y1, x2, y2``
+
+    Returns:
+        ``(N, N)`` overlap matrix
+    """
+    x1, y1, x2, y2 = boxes.T
+    iw = np.minimum(x2[:, None], x2) - np.maximum(x1[:, None], x1)
+    ih = np.minimum(y2[:, None], y2) - np.maximum(y1[:, None], y1)
+    inter = np.clip(iw, 0, None) * np.clip(ih, 0, None)
+    area = (x2 - x1) * (y2 - y1)
+    smaller = np.minimum(area[:, None], area)
+    return inter / np.maximum(smaller, 1e-9)
+
+
+def merge_detections(rows: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    Class-aware greedy non-maximum merge.
+
+    Args:
+        rows: ``(N, 6)`` array of ``x1, y1, x2, y2, conf, cls``
+        threshold: Overlap (intersection over smaller box) above which
+            boxes of the same class are merged
+
+    Returns:
+        Merged rows sorted by descending confidence
+    """
+    if len(rows) == 0:
+        return rows.reshape(0, 6)
+    rows = rows[np.argsort(-rows[:, 4], kind="stable")]
+    overlap = pairwise_ios(rows[:, :4])
+    overlap[rows[:, 5][:, None] != rows[:, 5]] = 0.0
+
+    suppressed = np.zeros(len(rows), dtype=bool)
+    kept = []
+    for i in range(len(rows)):
+        if suppressed[i]:
+            continue
+        group = ~suppressed & (overlap[i] > threshold)
+        group[i] = True
+        merged = rows[i].copy()
+        merged[:2] = rows[group, :2].min(axis=0)
+        merged[2:4] = rows[group, 2:4].max(axis=0)
+        kept.append(merged)
+        suppressed |= group
+    return np.stack(kept)
+
+
+def merge_tile_detections(
+    tile_rows: Sequence[np.ndarray],
+    offsets: np.ndarray,
+    confidence_threshold: float = 0.0,
+    threshold: float = 0.5
+) -> np.ndarray:
+    """
+    Map per-tile detections to frame coordinates and merge them.
+
+    Args:
+        tile_rows: Per-tile ``(N, 6)`` arrays of ``x1, y1, x2, y2, conf, cls``
+        offsets: ``(T, 2)`` tile offsets from :func:`make_tiles`
+        confidence_threshold: Detections below this are dropped first
+        threshold: Merge overlap threshold, see :func:`merge_detections`
+
+    Returns:
+        Merged ``(M, 6)`` detections in frame coordinates
+    """
+    shifted = []
+    for rows, (dx, dy) in zip(tile_rows, offsets):
+        rows = np.asarray(rows, dtype=np.float32).reshape(-1, 6)
+        rows = rows[rows[:, 4] >= confidence_threshold].copy()
+        rows[:, [0, 2]] += dx
+        rows[:, [1, 3]] += dy
+        shifted.append(rows)
+    if not shifted:
+        return np.zeros((0, 6), dtype=np.float32)
+    return merge_detections(np.concatenate(shifted), threshold)
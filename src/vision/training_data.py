@@ -0,0 +1,309 @@
+"""
+Training data pipeline.
+
+Decoding and resizing every image on every epoch bottlenecks CPU
+training. The pipeline decodes a YOLO-format image folder once into a
+pre-resized packed store (see ``src.vision.dataset``), with the labels
+kept in its index, then serves batches through a ``DataLoader`` whose
+worker processes read the memory-mapped frames, augment them and
+prefetch batches ahead of the training step.
+
+Labels are YOLO text files, one ``class cx cy w h`` line per object with
+coordinates normalized to the image size, either next to each image or
+in a ``labels`` folder beside an ``images`` folder.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from src.common.config import settings
+from src.vision.dataset import PackedFrameStore, pack_images
+from src.vision.plastic_classifier import list_images
+
+logger = logging.getLogger(__name__)
+
+
+def label_path(image_path: Path) -> Path:
+    """YOLO label file belonging to an image."""
+    image_path = Path(image_path)
+    if image_path.parent.name == "images":
+        return image_path.parent.parent / "labels" / f"{image_path.stem}.txt"
+    return image_path.with_suffix(".txt")
+
+
+def read_labels(image_path: Path) -> List[List[float]]:
+    """
+    Read an image's YOLO labels.
+
+    Args:
+        image_path: Image whose label file is read
+
+    Returns:
+        ``[class, cx, cy, w, h]`` rows, empty when there is no label file
+    """
+    path = label_path(image_path)
+    if not path.exists():
+        return []
+    rows = []
+    for line in path.read_text().splitlines():
+        values = line.split()
+        if len(values) == 5:
+            rows.append([float(v) for v in values])
+    return rows
+
+
+def cache_path(
+    source: Path,
+    image_size: int,
+    cache_dir: Optional[Path] = None
+) -> Path:
+    """
+    Packed cache location for a source folder at one image size.
+
+    The name includes a fingerprint of the source file names, sizes and
+    modification times, so any change to the images or labels selects a
+    new cache.
+    """
+    source = Path(source)
+    fingerprint = hashlib.sha1()
+    for image in list_images(source):
+        for path in (image, label_path(image)):
+            if path.exists():
+                stat = path.stat()
+                fingerprint.update(
+                    f"{path.name}:{stat.st_size}:{stat.st_mtime_ns};".encode()
+                )
+    cache_dir = Path(cache_dir or settings.TRAIN_CACHE_DIR)
+    return cache_dir / f"{source.name}-{image_size}-{fingerprint.hexdigest()[:12]}"
+
+
+def build_cache(
+    source: Path,
+    image_size: Optional[int] = None,
+    cache_dir: Optional[Path] = None
+) -> PackedFrameStore:
+    """
+    Decode and resize a labelled image folder into a packed store once.
+
+    Images are resized to a square without letterboxing, which keeps
+    normalized label coordinates valid. An up-to-date cache is reused.
+
+    Args:
+        source: Image folder
+        image_size: Side of the cached frames, defaults to
+            ``settings.TRAIN_IMAGE_SIZE``
+        cache_dir: Cache root, defaults to ``settings.TRAIN_CACHE_DIR``
+
+    Returns:
+        The packed store, with labels per frame
+    """
+    image_size = image_size or settings.TRAIN_IMAGE_SIZE
+    path = cache_path(source, image_size, cache_dir)
+    if PackedFrameStore.is_store(path):
+        logger.info(f"Using training cache {path}")
+        return PackedFrameStore(path)
+
+    images = list_images(source)
+    logger.info(f"Caching {len(images)} training images into {path}")
+    return pack_images(
+        images, path, image_size, image_size,
+        labels=[read_labels(image) for image in images],
+    )
+
+
+def augment_sample(
+    image: np.ndarray,
+    labels: np.ndarray,
+    rng: np.random.Generator,
+    flip: float = 0.5,
+    hsv_gain: Tuple[float, float, float] = (0.015, 0.7, 0.4)
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Random horizontal flip and HSV jitter.
+
+    Args:
+        image: BGR frame
+        labels: ``(N, 5)`` normalized ``class, cx, cy, w, h`` rows
+        rng: Random generator
+        flip: Probability of a horizontal flip
+        hsv_gain: Maximum relative hue, saturation and value change
+
+    Returns:
+        Augmented frame and labels (new arrays)
+    """
+    labels = labels.copy()
+    if rng.random() < flip:
+        image = np.ascontiguousarray(image[:, ::-1])
+        labels[:, 1] = 1.0 - labels[:, 1]
+
+    gains = 1 + rng.uniform(-1, 1, 3) * np.asarray(hsv_gain)
+    hue, saturation, value = cv2.split(cv2.cvtColor(image, cv2.COLOR_BGR2HSV))
+    lut = np.arange(256, dtype=np.float32)
+    hue = cv2.LUT(hue, ((lut * gains[0]) % 180).astype(np.uint8))
+    saturation = cv2.LUT(
+        saturation, np.clip(lut * gains[1], 0, 255).astype(np.uint8)
+    )
+    value = cv2.LUT(value, np.clip(lut * gains[2], 0, 255).astype(np.uint8))
+    image = cv2.cvtColor(cv2.merge((hue, saturation, value)), cv2.COLOR_HSV2BGR)
+    return image, labels
+
+
+class TrainingDataset(Dataset):
+    """Labelled training frames from a packed store or an image folder."""
+
+    def __init__(
+        self,
+        source: Path,
+        image_size: Optional[int] = None,
+        augment: bool = True,
+        seed: int = 0
+    ):
+        """
+        Initialize the dataset.
+
+        Args:
+            source: Packed store from :func:`build_cache`, or an image
+                folder decoded on every access
+            image_size: Side frames are resized to when read from a folder
+            augment: Apply random flip and HSV jitter
+            seed: Base seed; each worker derives its own generator
+        """
+        self.source = Path(source)
+        self.image_size = image_size or settings.TRAIN_IMAGE_SIZE
+        self.augment = augment
+        self.seed = seed
+        self.packed = PackedFrameStore.is_store(self.source)
+        if self.packed:
+            self._length = len(PackedFrameStore(self.source))
+            self.images: List[Path] = []
+        else:
+            self.images = list_images(self.source)
+            self._length = len(self.images)
+        # Opened lazily in each worker: a pickled memmap would be copied
+        self._store: Optional[PackedFrameStore] = None
+        self._rng: Optional[np.random.Generator] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _load(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Decoded, resized frame and its labels."""
+        if self.packed:
+            if self._store is None:
+                self._store = PackedFrameStore(self.source)
+            image, labels = self._store[i], self._store.label(i) or []
+        else:
+            image = cv2.imread(str(self.images[i]))
+            if image is None:
+                raise ValueError(f"Could not read image: {self.images[i]}")
+            image = cv2.resize(
+                image, (self.image_size, self.image_size),
+                interpolation=cv2.INTER_AREA
+            )
+            labels = read_labels(self.images[i])
+        return image, np.asarray(labels, dtype=np.float32).reshape(-1, 5)
+
+    def __getitem__(self, i: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        One training sample.
+
+        Returns:
+            ``(3, H, W)`` uint8 RGB tensor and ``(N, 5)`` label tensor
+        """
+        image, labels = self._load(i)
+        if self.augment:
+            if self._rng is None:
+                info = torch.utils.data.get_worker_info()
+                worker = info.id if info is not None else 0
+                self._rng = np.random.default_rng([self.seed, worker])
+            image, labels = augment_sample(image, labels, self._rng)
+        image = np.ascontiguousarray(image[:, :, ::-1].transpose(2, 0, 1))
+        return torch.from_numpy(image), torch.from_numpy(labels)
+
+
+def collate(
+    samples: Sequence[Tuple[torch.Tensor, torch.Tensor]]
+) -> Tuple[torch.Tensor, torch.Tensor]:
+    """
+    Stack samples into a batch.
+
+    Returns:
+        ``(B, 3, H, W)`` uint8 images and ``(N, 6)`` labels whose first
+        column is the sample's index in the batch
+    """
+    images = torch.stack([image for image, _ in samples])
+    labels = torch.cat([
+        torch.cat([torch.full((len(rows), 1), float(i)), rows], dim=1)
+        for i, (_, rows) in enumerate(samples)
+    ])
+    return images, labels
+
+
+def _init_worker(worker_id: int) -> None:
+    """Keep OpenCV single-threaded inside loader workers."""
+    cv2.setNumThreads(0)
+
+
+def make_loader(
+    source: Path,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    prefetch: Optional[int] = None,
+    image_size: Optional[int] = None,
+    cache: bool = True,
+    augment: bool = True,
+    shuffle: bool = True,
+    cache_dir: Optional[Path] = None,
+    seed: int = 0
+) -> DataLoader:
+    """
+    Build a training data loader for a labelled image folder.
+
+    Args:
+        source: Image folder, or an existing packed store
+        batch_size: Samples per batch, defaults to ``settings.TRAIN_BATCH_SIZE``
+        workers: Decode/augment processes, defaults to
+            ``settings.TRAIN_WORKERS``; 0 loads in the training process
+        prefetch: Batches each worker prepares ahead, defaults to
+            ``settings.TRAIN_PREFETCH``
+        image_size: Training image side, defaults to
+            ``settings.TRAIN_IMAGE_SIZE``
+        cache: Decode the folder once into a packed store and train from it
+        augment: Apply random flip and HSV jitter
+        shuffle: Shuffle samples every epoch
+        cache_dir: Cache root, defaults to ``settings.TRAIN_CACHE_DIR``
+        seed: Seed for shuffling and augmentation
+
+    Returns:
+        Loader yielding ``collate`` batches
+    """
+    image_size = image_size or settings.TRAIN_IMAGE_SIZE
+    workers = settings.TRAIN_WORKERS if workers is None else workers
+    if cache and not PackedFrameStore.is_store(source):
+        source = build_cache(source, image_size, cache_dir).path
+
+    generator = torch.Generator()
+    generator.manual_seed(seed)
+    options: Dict[str, Any] = {}
+    if workers > 0:
+        options = {
+            "prefetch_factor": prefetch or settings.TRAIN_PREFETCH,
+            "persistent_workers": True,
+            "worker_init_fn": _init_worker,
+        }
+    return DataLoader(
+        TrainingDataset(source, image_size, augment, seed),
+        batch_size=batch_size or settings.TRAIN_BATCH_SIZE,
+        shuffle=shuffle,
+        num_workers=workers,
+        collate_fn=collate,
+        generator=generator,
+        **options,
+    )
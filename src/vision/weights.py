@@ -0,0 +1,101 @@
+"""
+Memory-mapped model weights.
+
+Every worker normally unpickles its own private copy of the weights. With
+``MODEL_MMAP`` enabled the state dict is exported once to a tensors-only
+file and every worker maps it read-only, assigning the mapped tensors to
+the model's parameters. All workers on a host then share the same page
+cache pages instead of each holding a full copy.
+
+The mapping is copy-on-write, so it stays shared only while the weights
+are not modified: use it for CPU inference, not for training or for
+moving the model to another device or dtype.
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import torch
+from torch import nn
+
+from src.common.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def export_state_dict(model: nn.Module, path: Path) -> Path:
+    """
+    Write a model's state dict as a tensors-only file, atomically.
+
+    Several workers may start together, so the file is written under a
+    temporary name and renamed into place.
+
+    Args:
+        model: Model whose weights are exported
+        path: Output file
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(model.state_dict(), f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def load_state_dict_mmap(path: Path) -> Dict[str, torch.Tensor]:
+    """
+    Map a tensors-only state dict file without reading it into memory.
+
+    Args:
+        path: File written by :func:`export_state_dict`
+
+    Returns:
+        State dict whose tensors are backed by the mapped file
+    """
+    return torch.load(Path(path), mmap=True, weights_only=True, map_location="cpu")
+
+
+def mmap_weights(
+    model: nn.Module,
+    path: Optional[Path] = None,
+    source: Optional[Path] = None
+) -> nn.Module:
+    """
+    Replace a model's weights with memory-mapped ones.
+
+    The state dict is exported to ``path`` on first use, and again when
+    the ``source`` checkpoint is newer than the export. The model's
+    private copy of the weights is released once the mapped tensors are
+    assigned.
+
+    Args:
+        model: Loaded CPU model
+        path: Tensors-only weights file, defaults to
+            ``settings.MODEL_MMAP_PATH``
+        source: Checkpoint the model was loaded from
+
+    Returns:
+        The model, with parameters and buffers backed by the mapped file
+    """
+    path = Path(path or settings.MODEL_MMAP_PATH)
+    stale = (
+        path.exists() and source is not None and Path(source).exists()
+        and Path(source).stat().st_mtime > path.stat().st_mtime
+    )
+    if not path.exists() or stale:
+        logger.info(f"Exporting weights for memory mapping to {path}")
+        export_state_dict(model, path)
+    model.load_state_dict(load_state_dict_mmap(path), assign=True)
+    logger.info(f"Model weights memory-mapped from {path}")
+    return model
@@ -1,6 +1,6 @@
 import pytest
 import numpy as np
-from src.vision.plastic_classifier import PlasticClassifier
+from src.vision.plastic_classifier import PlasticClassifier, letterbox, unletterbox
 
 
 def test_plastic_classifier_initialization():
@@ -13,10 +13,12 @@ def test_plastic_classifier_initialization():
 
 
 def test_preprocess_image():
-    """Test image preprocessing"""
-    classifier = PlasticClassifier()
-    # Create a dummy image
-    test_image = np.zeros((100, 100, 3), dtype=np.uint8)
-    processed = classifier._preprocess_image(test_image)
+    """Test letterboxing to the model input and mapping boxes back"""
+    test_image = np.zeros((100, 200, 3), dtype=np.uint8)
+    processed, scale, pad = letterbox(test_image, 640)
     assert processed.shape == (640, 640, 3)  # Check resizing
-    assert processed.dtype == np.float32  # Check normalization
+    assert scale == 3.2 and pad == (0, 160)  # Aspect ratio kept
+
+    boxes = np.array([[0, 160, 320, 480, 0.9, 0]], dtype=np.float32)
+    restored = unletterbox(boxes, scale, pad, test_image.shape)
+    assert restored[0, :4].tolist() == [0, 0, 100, 100]
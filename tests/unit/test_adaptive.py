@@ -0,0 +1,183 @@
+"""
+Unit tests for the adaptive resolution controller.
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+import numpy as np
+
+from src.vision.adaptive import AdaptiveResolutionController, detection_agreement
+from src.vision.orchestrator import StreamOrchestrator
+from src.vision.plastic_classifier import PlasticClassifier
+
+IMAGE = np.zeros((64, 64, 3), dtype=np.uint8)
+ITEM = {"plastic_type": "PET", "confidence": 0.9, "bbox": [0, 0, 10, 10]}
+SMALL_ITEM = {"plastic_type": "PP", "confidence": 0.9, "bbox": [20, 20, 24, 24]}
+
+
+class FakeClassifier:
+    """Classifier stand-in that misses small items below 640."""
+
+    def __init__(self):
+        self.sizes = []
+
+    def classify_plastic(self, image, input_size=None):
+        self.sizes.append(input_size)
+        return self.detect(image, input_size)
+
+    def detect(self, image, input_size=None):
+        if input_size >= 640:
+            return [ITEM, SMALL_ITEM]
+        return [ITEM]
+
+
+def _controller(**kwargs):
+    options = {
+        "resolutions": [640, 320, 480],
+        "latency_slo_ms": 1000.0,
+        "queue_high": 5,
+        "queue_low": 1,
+        "hold_frames": 2,
+        "audit_interval": 0,
+    }
+    options.update(kwargs)
+    classifier = FakeClassifier()
+    return AdaptiveResolutionController(classifier, **options), classifier
+
+
+def test_starts_at_highest_resolution():
+    """Test the first frame is classified at the highest resolution."""
+    controller, classifier = _controller()
+    assert controller.resolutions == [320, 480, 640]
+    controller.classify(IMAGE)
+    assert classifier.sizes == [640]
+
+
+def test_steps_down_under_queue_pressure_with_hold():
+    """Test stepping down one rung at a time, no faster than hold_frames."""
+    controller, classifier = _controller()
+    for _ in range(8):
+        controller.classify(IMAGE, queue_depth=10)
+
+    assert classifier.sizes == [640, 640, 480, 480, 320, 320, 320, 320]
+    assert controller.switches == 2
+
+
+def test_hysteresis_between_thresholds():
+    """Test that a queue between the low and high marks keeps the resolution."""
+    controller, classifier = _controller()
+    for _ in range(3):
+        controller.classify(IMAGE, queue_depth=10)
+    assert controller.resolution == 480
+
+    for _ in range(10):
+        controller.classify(IMAGE, queue_depth=3)
+    assert controller.resolution == 480
+
+    for _ in range(3):
+        controller.classify(IMAGE, queue_depth=0)
+    assert controller.resolution == 640
+
+
+def test_latency_slo_breach_steps_down():
+    """Test that slow frames trigger a lower resolution with an empty queue."""
+    controller, _ = _controller(latency_slo_ms=1e-6, queue_low=-1)
+    for _ in range(3):
+        controller.classify(IMAGE, queue_depth=0)
+    assert controller.resolution == 480
+
+
+def test_no_step_up_when_higher_resolution_misses_slo():
+    """Test that a resolution known to break the SLO is not re-entered."""
+    controller, _ = _controller()
+    controller.stats[640].record(5000.0, 1)
+    for _ in range(3):
+        controller.classify(IMAGE, queue_depth=10)
+    assert controller.resolution == 480
+
+    for _ in range(5):
+        controller.classify(IMAGE, queue_depth=0)
+    assert controller.resolution == 480
+
+
+def test_audits_measure_agreement_per_resolution():
+    """Test full-resolution audits and the per-resolution report."""
+    controller, classifier = _controller(hold_frames=100, audit_interval=2)
+    controller.level = 0
+    for _ in range(4):
+        controller.classify(IMAGE, queue_depth=0)
+
+    report = controller.report()["resolutions"]
+    assert report[320]["frames"] == 4
+    assert report[320]["audits"] == 2
+    assert report[320]["agreement"] == pytest.approx(0.5)
+    assert report[320]["detections_per_frame"] == 1
+    assert report[640]["frames"] == 0
+    # Audits bypass classify_plastic, so they are not served frames
+    assert classifier.sizes == [320] * 4
+
+
+def test_detection_agreement():
+    """Test recall against reference detections."""
+    shifted = dict(ITEM, bbox=[1, 1, 11, 11])
+    other = dict(ITEM, plastic_type="HDPE")
+    assert detection_agreement([shifted], [ITEM]) == 1.0
+    assert detection_agreement([other], [ITEM]) == 0.0
+    assert detection_agreement([ITEM], [ITEM, SMALL_ITEM]) == 0.5
+    assert detection_agreement([], []) == 1.0
+
+
+def test_concurrent_frames_keep_consistent_statistics():
+    """Test that worker threads sharing the controller lose no frames."""
+    controller, _ = _controller(hold_frames=0)
+
+    def run():
+        for i in range(200):
+            controller.classify(IMAGE, queue_depth=i % 12)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    report = controller.report()["resolutions"]
+    assert controller.frames == 800
+    assert sum(stats["frames"] for stats in report.values()) == 800
+
+
+def test_classifier_detect_skips_gate_capture_and_metrics():
+    """Test that an audit pass leaves the serving path untouched."""
+    model = Mock()
+    model.return_value.xyxy = [np.array([[1, 1, 9, 9, 0.9, 0]])]
+    classifier = PlasticClassifier(model=model)
+    classifier.class_names = ["PET"]
+    classifier.gate = Mock()
+    classifier.capture = Mock()
+    classifier.metrics = Mock()
+
+    detections = classifier.detect(IMAGE, 640)
+
+    assert [d["plastic_type"] for d in detections] == ["PET"]
+    assert model.call_args.kwargs["size"] == 640
+    classifier.gate.active_regions.assert_not_called()
+    classifier.capture.offer.assert_not_called()
+    assert not classifier.metrics.mock_calls
+
+
+def test_orchestrator_classifies_through_controller():
+    """Test that the orchestrator passes its queue depth to the controller."""
+    controller, classifier = _controller()
+    orchestrator = StreamOrchestrator(
+        classifier, workers=1, adaptive=controller
+    ).start()
+    orchestrator.add_stream("line-1/cam-1", "facility_001", queue_size=10)
+    futures = [orchestrator.submit("line-1/cam-1", IMAGE) for _ in range(3)]
+    for future in futures:
+        future.result(timeout=5)
+    orchestrator.stop()
+
+    assert controller.frames == 3
+    assert orchestrator.stats()["resolution"]["resolution"] in (480, 640)
@@ -0,0 +1,210 @@
+"""
+Unit tests for live per-facility aggregation.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.common import events
+from src.common.aggregation import FacilityAggregator, SlidingWindow
+from src.common.config import settings
+from src.database.models import Base, Facility, ProcessingMetrics
+
+T0 = 1_790_000_000.0
+
+
+def _batch(facility_id, at, types=("PET", "HDPE"), confidence=0.9):
+    detections = [
+        {"plastic_type": t, "confidence": confidence, "bbox": [0, 0, 1, 1]}
+        for t in types
+    ]
+    return events.Event(
+        events.DETECTIONS,
+        {"batch_id": f"b{at}", "facility_id": facility_id, "detections": detections},
+        timestamp=at,
+    )
+
+
+def _sort(facility_id, at, ok=True, latency_ms=20.0):
+    return events.Event(
+        events.SORT_RESULTS,
+        {"ok": ok, "latency_ms": latency_ms, "facility_id": facility_id},
+        timestamp=at,
+    )
+
+
+def test_window_expires_old_buckets():
+    """Test that counts leave the window as it slides."""
+    window = SlidingWindow(window_s=10, bucket_s=1)
+    for i in range(10):
+        window.add(T0 + i, 1, float(i))
+    assert (window.count, window.total, window.active) == (10, 45.0, 10)
+
+    window.advance(window.bucket(T0 + 14))
+    assert (window.count, window.total, window.active) == (5, 35.0, 5)
+    assert window.mean == pytest.approx(7.0)
+
+    window.advance(window.bucket(T0 + 1000))
+    assert (window.count, window.total, window.active) == (0, 0.0, 0)
+    assert window.mean is None
+
+
+def test_window_accepts_late_events_within_window():
+    """Test out-of-order events inside the window and too-old ones."""
+    window = SlidingWindow(window_s=10, bucket_s=1)
+    window.add(T0 + 20)
+    assert window.add(T0 + 15)
+    assert not window.add(T0 + 5)
+    assert window.count == 2
+
+    window.advance(window.bucket(T0 + 26))
+    assert window.count == 1
+
+
+def test_facility_snapshot():
+    """Test throughput, type counts, accuracy, uptime and sort outcomes."""
+    aggregator = FacilityAggregator(window_s=60, bucket_s=1)
+    for i in range(30):
+        aggregator.handle(_batch("facility_001", T0 + 2 * i))
+    for i in range(4):
+        aggregator.handle(_sort("facility_001", T0 + i, ok=i != 0))
+    aggregator.handle(_batch("facility_002", T0, types=("PP",)))
+
+    stats, = aggregator.snapshot("facility_001", now=T0 + 59.5)
+    assert stats["batches"] == 30
+    assert stats["items"] == 60
+    assert stats["plastic_types"] == {"HDPE": 30, "PET": 30}
+    assert stats["throughput"] == pytest.approx(60.0)
+    assert stats["accuracy"] == pytest.approx(0.9)
+    assert stats["uptime"] == pytest.approx(0.5)
+    assert stats["sorts"] == 4
+    assert stats["sort_success_rate"] == pytest.approx(0.75)
+    assert stats["sort_latency_ms"] == pytest.approx(20.0)
+    assert [s["facility_id"] for s in aggregator.snapshot(now=T0)] == [
+        "facility_001", "facility_002"
+    ]
+
+    stats, = aggregator.snapshot("facility_001", now=T0 + 90)
+    assert stats["items"] == 28
+    assert stats["plastic_types"] == {"HDPE": 14, "PET": 14}
+    assert stats["sorts"] == 0
+    assert stats["sort_success_rate"] is None
+
+
+def test_events_without_facility_are_ignored():
+    """Test that only facility-tagged detections and sort results count."""
+    aggregator = FacilityAggregator(window_s=60, bucket_s=1)
+    aggregator.handle(_sort(None, T0))
+    aggregator.handle(events.Event(events.METRICS, {"facility_id": "f"}))
+    assert aggregator.snapshot("f", now=T0) == []
+    assert aggregator.snapshot(now=T0) == []
+
+
+def test_persist_writes_processing_metrics():
+    """Test that active facilities with a database id get a metrics row."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(Facility(name="Plant", location="Here"))
+        db.commit()
+
+    aggregator = FacilityAggregator(window_s=60, bucket_s=1)
+    for i in range(10):
+        aggregator.handle(_batch("1", T0 + i))
+    aggregator.handle(_batch("facility_002", T0))
+    assert aggregator.persist(factory, now=T0 + 9.5) == 1
+    assert aggregator.persist(factory, now=T0 + 1000) == 0
+
+    with factory() as db:
+        row, = db.query(ProcessingMetrics).all()
+        assert row.facility_id == 1
+        assert row.throughput == pytest.approx(120.0)
+        assert row.accuracy == pytest.approx(0.9)
+        assert row.uptime == pytest.approx(1.0)
+        assert row.maintenance_status == "operational"
+    engine.dispose()
+
+
+def test_aggregator_consumes_the_event_bus():
+    """Test the background consumer and the persist loop."""
+    bus = events.LocalEventBus(partitions=2, linger_ms=0)
+    persisted = []
+    aggregator = FacilityAggregator(window_s=60, bucket_s=1)
+    aggregator.persist = lambda factory, now=None: persisted.append(factory)
+    aggregator.start(bus, session_factory="factory", interval=0.05)
+
+    producer = bus.producer()
+    now = time.time()
+    for _ in range(5):
+        producer.send(events.DETECTIONS, _batch("7", now).payload, key="7")
+    producer.send(events.SORT_RESULTS, _sort("7", now).payload, key="7")
+    producer.close()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = aggregator.snapshot("7")
+        done = stats and stats[0]["batches"] == 5 and stats[0]["sorts"] == 1
+        if done and persisted:
+            break
+        time.sleep(0.01)
+    aggregator.stop()
+
+    assert stats[0]["items"] == 10
+    assert persisted and persisted[0] == "factory"
+
+
+def test_replicas_each_see_every_facility():
+    """Test that aggregators on different hosts do not split partitions."""
+    bus = events.LocalEventBus(partitions=4, linger_ms=0)
+    replicas = []
+    for host in ("api-0", "api-1"):
+        with patch("src.common.aggregation.socket.gethostname", return_value=host):
+            replicas.append(FacilityAggregator(window_s=60, bucket_s=1).start(
+                bus, session_factory="factory", interval=0
+            ))
+    assert set(bus._members) == {"aggregation-api-0", "aggregation-api-1"}
+
+    producer = bus.producer()
+    now = time.time()
+    for i in range(8):
+        facility = str(i)
+        producer.send(events.DETECTIONS, _batch(facility, now).payload, key=facility)
+    producer.close()
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if all(len(r.snapshot()) == 8 for r in replicas):
+            break
+        time.sleep(0.01)
+    for replica in replicas:
+        replica.stop()
+    assert [len(r.snapshot()) for r in replicas] == [8, 8]
+
+
+def test_restarted_replica_resumes_without_replay():
+    """Test a replica group starting at the latest events and its stable id."""
+    bus = events.LocalEventBus(partitions=2, linger_ms=0)
+    producer = bus.producer()
+    now = time.time()
+    for _ in range(4):
+        producer.send(events.DETECTIONS, _batch("7", now).payload, key="7")
+    producer.flush()
+
+    with patch.object(settings, "AGGREGATION_REPLICA_ID", "aggregator-0"):
+        aggregator = FacilityAggregator(window_s=60, bucket_s=1).start(
+            bus, session_factory="factory", interval=0
+        )
+        assert set(bus._members) == {"aggregation-aggregator-0"}
+        producer.send(events.DETECTIONS, _batch("7", now).payload, key="7")
+        producer.close()
+
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and not aggregator.snapshot("7"):
+            time.sleep(0.01)
+        aggregator.stop()
+    # Only the batch sent after the replica joined was counted
+    assert aggregator.snapshot("7")[0]["batches"] == 1
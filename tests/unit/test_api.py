@@ -0,0 +1,392 @@
+"""
+Unit tests for the API.
+"""
+
+import base64
+import csv
+import io
+import json
+import pytest
+import cv2
+import numpy as np
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api import responses
+from src.api.main import app
+from src.api.routes import (
+    get_aggregator,
+    get_classifier,
+    get_response_cache,
+    get_session_factory,
+)
+from src.api.schemas import ProcessBatchResponse
+from src.common import cache, events
+from src.common.aggregation import FacilityAggregator
+from src.common.cache import MemoryCache
+from src.common.config import settings
+from src.database.models import (
+    Base,
+    Batch,
+    Facility,
+    PlasticDetection,
+    ProcessingMetrics,
+)
+from src.database.partitioning import PartitionManager
+from src.database.persistence import save_detections, save_processing_metrics
+
+PREFIX = settings.API_V1_PREFIX
+
+
+@pytest.fixture(scope="function")
+def session_factory():
+    """Create an in-memory database shared across threads."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    with factory() as session:
+        facility = Facility(name="Test Facility", location="Test Location")
+        session.add(facility)
+        session.commit()
+        start = datetime(2026, 10, 1)
+        for b in range(3):
+            batch = Batch(batch_id=f"BATCH{b:03d}", facility_id=facility.id)
+            session.add(batch)
+            session.commit()
+            session.add_all([
+                PlasticDetection(
+                    batch_id=batch.id,
+                    plastic_type="PET" if i % 2 else "HDPE",
+                    confidence=0.9,
+                    bbox=[i, i, i + 10, i + 10],
+                    timestamp=start + timedelta(minutes=10 * b + i),
+                )
+                for i in range(10)
+            ])
+        session.commit()
+
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def client(session_factory, monkeypatch):
+    """Create a test client bound to the test database and a fresh cache."""
+    monkeypatch.setattr(cache, "_cache", MemoryCache())
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_health(client):
+    """Test the health endpoint."""
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "healthy"
+
+
+def test_list_batches_pagination(client):
+    """Test walking all batch pages with cursors."""
+    response = client.get(f"{PREFIX}/batches", params={"limit": 2})
+    page = response.json()
+    assert [b["batch_id"] for b in page["items"]] == ["BATCH000", "BATCH001"]
+    assert page["next_cursor"]
+
+    response = client.get(
+        f"{PREFIX}/batches",
+        params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    page = response.json()
+    assert [b["batch_id"] for b in page["items"]] == ["BATCH002"]
+    assert page["next_cursor"] is None
+
+
+def test_list_detections_pagination(client):
+    """Test that cursor pages cover every detection exactly once."""
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 7}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"{PREFIX}/detections", params=params).json()
+        seen.extend(d["id"] for d in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(1, 31))
+
+
+def test_list_detections_filters(client):
+    """Test detection filters."""
+    page = client.get(
+        f"{PREFIX}/detections",
+        params={"batch_id": 2, "plastic_type": "PET"}
+    ).json()
+    assert len(page["items"]) == 5
+    assert all(d["plastic_type"] == "PET" for d in page["items"])
+    assert page["items"][0]["bbox"] == [1.0, 1.0, 11.0, 11.0]
+
+
+def test_invalid_cursor(client):
+    """Test that malformed cursors are rejected."""
+    response = client.get(f"{PREFIX}/detections", params={"cursor": "nope"})
+    assert response.status_code == 400
+
+
+def test_read_responses_are_cached_until_a_batch_is_written(
+    client, session_factory
+):
+    """Test that polls are served from the cache until invalidated."""
+    first = client.get(f"{PREFIX}/batches")
+    with session_factory() as db:
+        db.add(Batch(batch_id="UNTRACKED", facility_id=1))
+        db.commit()
+    second = client.get(f"{PREFIX}/batches")
+    assert second.json() == first.json()
+    assert second.headers["etag"] == first.headers["etag"]
+
+    with session_factory() as db:
+        save_detections(db, "BATCH003", [], facility_id=1)
+    third = client.get(f"{PREFIX}/batches").json()
+    assert [b["batch_id"] for b in third["items"]][-2:] == ["UNTRACKED", "BATCH003"]
+
+
+def test_conditional_requests(client, session_factory):
+    """Test ETag revalidation with 304 Not Modified."""
+    response = client.get(f"{PREFIX}/detections", params={"limit": 5})
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = client.get(
+        f"{PREFIX}/detections", params={"limit": 5},
+        headers={"If-None-Match": f'W/{etag}, "other"'},
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    # Another page has its own ETag
+    response = client.get(
+        f"{PREFIX}/detections", params={"limit": 6},
+        headers={"If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 6
+
+
+def test_processing_metrics(client, session_factory):
+    """Test listing a facility's metrics and their invalidation."""
+    url = f"{PREFIX}/facilities/1/metrics"
+    assert client.get(url).json() == []
+
+    snapshot = {
+        "facility_id": "1", "throughput": 120.0, "accuracy": 0.9,
+        "uptime": 1.0, "batches": 10,
+    }
+    with session_factory() as db:
+        save_processing_metrics(db, [snapshot], datetime(2026, 10, 1))
+        save_processing_metrics(db, [snapshot], datetime(2026, 10, 2))
+        assert db.query(ProcessingMetrics).count() == 2
+
+    rows = client.get(url).json()
+    assert [row["timestamp"] for row in rows] == [
+        "2026-10-02T00:00:00", "2026-10-01T00:00:00"
+    ]
+    assert rows[0]["throughput"] == 120.0
+    assert rows[0]["energy_consumption"] is None
+    assert len(client.get(url, params={"since": "2026-10-02"}).json()) == 1
+
+
+def test_caching_disabled(client):
+    """Test that ETags work without a cache backend."""
+    app.dependency_overrides[get_response_cache] = lambda: None
+    first = client.get(f"{PREFIX}/batches")
+    response = client.get(
+        f"{PREFIX}/batches", headers={"If-None-Match": first.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_export_ndjson(client):
+    """Test streaming NDJSON export."""
+    response = client.get(
+        f"{PREFIX}/detections/export",
+        params={"facility_id": 1}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert len(records) == 30
+    assert records[0]["timestamp"] == "2026-10-01T00:00:00"
+
+
+def test_export_csv(client):
+    """Test streaming CSV export."""
+    response = client.get(
+        f"{PREFIX}/detections/export",
+        params={"format": "csv", "batch_id": 1}
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 10
+    assert rows[0]["bbox_x2"] == "10.0"
+
+
+class FakeClassifier:
+    """Classifier stand-in returning fixed detections."""
+
+    def classify_plastic(self, image):
+        return [
+            {
+                "plastic_type": "PET",
+                "confidence": np.float32(0.95),
+                "bbox": [1.0, 2.0, 30.0, 40.0],
+            }
+        ]
+
+    def get_contamination_level(self, image, bbox):
+        return 0.25
+
+
+def _encode_image() -> str:
+    """Encode a small test image as a data URL."""
+    image = np.zeros((32, 32, 3), dtype=np.uint8)
+    ok, buffer = cv2.imencode(".png", image)
+    return "data:image/png;base64," + base64.b64encode(buffer).decode()
+
+
+def test_rotated_detections_are_listed_and_exported(
+    client, session_factory, tmp_path
+):
+    """Test that detections rotated into period tables stay readable."""
+    engine = session_factory.kw["bind"]
+    manager = PartitionManager(engine, interval="month", archive_dir=tmp_path)
+    assert manager.rotate(datetime(2026, 11, 1)) == 30
+    with session_factory() as db:
+        db.add(PlasticDetection(
+            batch_id=1, plastic_type="PP", confidence=0.9,
+            timestamp=datetime(2026, 11, 2),
+        ))
+        db.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 7, "facility_id": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"{PREFIX}/detections", params=params).json()
+        seen.extend(d["id"] for d in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(1, 32))
+
+    response = client.get(
+        f"{PREFIX}/detections/export", params={"format": "csv", "batch_id": 1}
+    )
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [str(i) for i in range(1, 11)] + ["31"]
+
+    response = client.get(
+        f"{PREFIX}/detections/export", params={"since": "2026-11-01T00:00:00"}
+    )
+    record, = [json.loads(line) for line in response.text.splitlines()]
+    assert record["plastic_type"] == "PP"
+
+
+def test_process_batch(client):
+    """Test classifying an uploaded image."""
+    app.dependency_overrides[get_classifier] = FakeClassifier
+    response = client.post(
+        f"{PREFIX}/process-batch",
+        json={
+            "image_data": _encode_image(),
+            "facility_id": "facility_001",
+            "batch_id": "batch_001",
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["batch_id"] == "batch_001"
+    assert body["message"] == "Processing 1 plastic items"
+    assert body["detections"][0]["confidence"] == pytest.approx(0.95)
+    assert body["detections"][0]["contamination_level"] == 0.25
+    ProcessBatchResponse(**body)
+
+
+def test_process_batch_publishes_detections(client, monkeypatch):
+    """Test that processed batches are published when enabled."""
+    bus = events.LocalEventBus(partitions=1, linger_ms=0)
+    monkeypatch.setattr(events, "_bus", bus)
+    monkeypatch.setattr(events, "_producer", None)
+    monkeypatch.setattr(settings, "PUBLISH_EVENTS", True)
+    app.dependency_overrides[get_classifier] = FakeClassifier
+    client.post(
+        f"{PREFIX}/process-batch",
+        json={"image_data": _encode_image(), "facility_id": "facility_001"},
+    )
+    events._producer.close()
+
+    event, = bus.consumer([events.DETECTIONS], "storage").poll(1.0)
+    assert event.key == "facility_001"
+    assert event.payload["detections"][0]["contamination_level"] == 0.25
+    ProcessBatchResponse(**event.payload)
+
+
+def test_live_stats(client):
+    """Test that live facility stats are served from the aggregator."""
+    aggregator = FacilityAggregator(window_s=60, bucket_s=1)
+    aggregator.handle(events.Event(
+        events.DETECTIONS,
+        {"facility_id": "facility_001", "detections": [
+            {"plastic_type": "PET", "confidence": 0.8, "bbox": [0, 0, 1, 1]},
+        ]},
+    ))
+    app.dependency_overrides[get_aggregator] = lambda: aggregator
+
+    response = client.get(f"{PREFIX}/facilities/facility_001/stats/live")
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["items"] == 1
+    assert stats["plastic_types"] == {"PET": 1}
+    assert stats["accuracy"] == pytest.approx(0.8)
+
+    assert len(client.get(f"{PREFIX}/stats/live").json()) == 1
+    response = client.get(f"{PREFIX}/facilities/facility_009/stats/live")
+    assert response.status_code == 404
+
+
+def test_process_batch_invalid_image(client):
+    """Test that undecodable images are rejected."""
+    app.dependency_overrides[get_classifier] = FakeClassifier
+    response = client.post(
+        f"{PREFIX}/process-batch",
+        json={"image_data": "bm90IGFuIGltYWdl", "facility_id": "f"},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_json_encoding(monkeypatch, use_orjson):
+    """Test that both encoders produce the same payload."""
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    payload = responses.build_batch_response(
+        FakeClassifier().classify_plastic(None),
+        batch_id="b",
+        facility_id="f",
+        timestamp=datetime(2026, 10, 19, 12, 0),
+    )
+    decoded = json.loads(responses.dumps(payload))
+    assert decoded["timestamp"] == "2026-10-19T12:00:00"
+    assert decoded["detections"][0]["confidence"] == pytest.approx(0.95)
@@ -0,0 +1,196 @@
+"""
+Smoke tests for the benchmark suite.
+"""
+
+import json
+import numpy as np
+
+from benchmarks import (
+    bench_adaptive,
+    bench_events,
+    bench_gating,
+    bench_loading,
+    bench_orchestrator,
+    bench_pipeline,
+    bench_response_cache,
+    bench_robot_control,
+    bench_tiling,
+    bench_training_data,
+)
+from benchmarks.synthetic import TinyDetector, synthetic_frame
+from src.vision.plastic_classifier import PlasticClassifier
+
+
+def _iou(a, b):
+    """Intersection over union of two boxes."""
+    w = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    h = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = w * h
+    area = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1])
+    return inter / (area - inter)
+
+
+def test_tiny_detector_finds_synthetic_items():
+    """Test that the stand-in model recovers the ground truth."""
+    classifier = PlasticClassifier(model=TinyDetector())
+    image, truth = synthetic_frame(np.random.default_rng(1), items=6)
+
+    detections = classifier.classify_plastic(image)
+    assert len(detections) == len(truth)
+    for item in truth:
+        match = max(detections, key=lambda d: _iou(d["bbox"], item["bbox"]))
+        assert _iou(match["bbox"], item["bbox"]) > 0.9
+        assert match["plastic_type"] == item["plastic_type"]
+
+
+def test_pipeline_benchmark_runs(tmp_path):
+    """Test a short pipeline benchmark run."""
+    output = tmp_path / "results.json"
+    bench_pipeline.main([
+        "--frames", "5", "--warmup", "1", "--memory-frames", "2",
+        "--width", "320", "--height", "240", "--items", "3",
+        "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    assert results["frame"]["count"] == 5
+    assert set(results["stages"]) == set(bench_pipeline.STAGES)
+    for stage in results["stages"].values():
+        assert stage["p99_ms"] >= stage["p50_ms"]
+        assert "peak_alloc_kb" in stage
+
+
+def test_tiling_benchmark_runs(tmp_path):
+    """Test a short tiling benchmark run."""
+    output = tmp_path / "results.json"
+    bench_tiling.main([
+        "--frames", "2", "--width", "1280", "--height", "640",
+        "--items", "10", "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    for mode in bench_tiling.MODES:
+        assert results[mode]["items"] > 0
+        assert 0.0 <= results[mode]["small_recall"] <= 1.0
+    assert results["tiled"]["recall"] >= results["resize"]["recall"]
+
+
+def test_gating_benchmark_runs(tmp_path):
+    """Test a short gating benchmark run."""
+    output = tmp_path / "results.json"
+    bench_gating.main([
+        "--frames", "6", "--width", "320", "--height", "240",
+        "--items", "3", "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    assert results["ungated"]["skipped_fraction"] == 0.0
+    assert 0.0 < results["gated"]["skipped_fraction"] < 1.0
+    assert results["gated"]["recall"] == results["ungated"]["recall"]
+
+
+def test_adaptive_benchmark_runs(tmp_path):
+    """Test a short adaptive resolution benchmark run."""
+    output = tmp_path / "results.json"
+    bench_adaptive.main([
+        "--frames", "12", "--width", "320", "--height", "240", "--items", "3",
+        "--hold-frames", "2", "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    for mode in bench_adaptive.MODES:
+        assert sum(results[mode]["frames_per_resolution"].values()) == 12
+    assert list(results["fixed"]["frames_per_resolution"]) == ["640"]
+    assert "controller" in results["adaptive"]
+
+
+def test_loading_benchmark_runs(tmp_path):
+    """Test a short weights and frame loading benchmark run."""
+    output = tmp_path / "results.json"
+    bench_loading.main([
+        "--workers", "1", "--model-mb", "4", "--frames", "4",
+        "--width", "160", "--height", "120", "--size", "64",
+        "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    for mode in ("private", "mmap"):
+        assert results["weights"][mode]["workers"] == 1
+        assert results["weights"][mode]["load_s_mean"] > 0
+    assert results["frames"]["packed"]["frames_per_s"] > 0
+
+
+def test_training_data_benchmark_runs(tmp_path):
+    """Test a short training data loading benchmark run."""
+    output = tmp_path / "results.json"
+    bench_training_data.main([
+        "--images", "6", "--width", "160", "--height", "120", "--size", "64",
+        "--batch-size", "4", "--workers", "1", "--epochs", "1",
+        "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    for mode in bench_training_data.MODES:
+        assert results[mode]["samples_per_s"] > 0
+    assert results["cache_build_s"] > 0
+
+
+def test_events_benchmark_runs(tmp_path):
+    """Test a short event bus benchmark run."""
+    output = tmp_path / "results.json"
+    bench_events.main([
+        "--events", "200", "--consumers", "2", "--batch-sizes", "1", "50",
+        "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    for run in results["runs"].values():
+        assert run["handled"] == 200
+        assert run["end_to_end_events_per_s"] > 0
+
+
+def test_robot_control_benchmark_runs(tmp_path):
+    """Test a short robot control load test run."""
+    output = tmp_path / "results.json"
+    bench_robot_control.main([
+        "--commands", "50", "--connect-commands", "3", "--windows", "1", "8",
+        "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    assert set(results["modes"]) == {"connect-per-command", "window-1", "window-8"}
+    for run in results["modes"].values():
+        assert run["commands_per_s"] > 0
+
+
+def test_orchestrator_benchmark_runs(tmp_path):
+    """Test a short multi-camera serving benchmark run."""
+    output = tmp_path / "results.json"
+    bench_orchestrator.main([
+        "--fps", "10", "5", "--weights", "2", "1", "--seconds", "0.5",
+        "--width", "160", "--height", "120", "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    assert results["per-line"]["model_copies"] == 2
+    assert results["shared"]["model_copies"] == 1
+    for setup in bench_orchestrator.SETUPS:
+        assert set(results[setup]["streams"]) == {"line-0", "line-1"}
+
+
+def test_response_cache_benchmark_runs(tmp_path):
+    """Test a short dashboard polling run."""
+    output = tmp_path / "results.json"
+    bench_response_cache.main([
+        "--dashboards", "2", "--interval", "0.05", "--seconds", "0.5",
+        "--write-interval", "0.2", "--batches", "20", "--items", "2",
+        "--setups", "uncached", "memory", "--output", str(output),
+    ])
+
+    results = json.loads(output.read_text())
+    memory = results["setups"]["memory"]
+    assert memory["errors"] == 0
+    assert memory["hit_rate"] > 0
+    assert memory["db_queries_per_poll"] < results["setups"]["uncached"][
+        "db_queries_per_poll"
+    ]
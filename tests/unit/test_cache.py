@@ -0,0 +1,126 @@
+"""
+Unit tests for the response cache backends.
+"""
+
+import time
+import pytest
+
+from src.common import cache
+from src.common.cache import MemoryCache, RedisCache, etag_for
+
+
+class FakeRedis:
+    """The subset of the Redis client used by ``RedisCache``."""
+
+    def __init__(self):
+        self.data = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis is down")
+
+    def mget(self, keys):
+        self._check()
+        now = time.monotonic()
+        return [
+            value if value is not None and expires > now else None
+            for value, expires in (self.data.get(k, (None, 0)) for k in keys)
+        ]
+
+    def set(self, key, value, px):
+        self._check()
+        self.data[key] = (value, time.monotonic() + px / 1000)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def incr(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        self.client._check()
+        for key in self.keys:
+            value, _ = self.client.data.get(key, (b"0", 0))
+            self.client.data[key] = (str(int(value) + 1).encode(), float("inf"))
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return MemoryCache(maxsize=8)
+    return RedisCache(FakeRedis())
+
+
+def _entry(body=b'{"items":[]}'):
+    return etag_for(body), body
+
+
+def test_store_and_lookup(backend):
+    """Test that a stored response is served until it expires."""
+    entry, generations = backend.lookup("/batches", ["batches"])
+    assert entry is None
+    backend.store("/batches", generations, _entry(), ttl=0.05)
+
+    assert backend.lookup("/batches", ["batches"])[0] == _entry()
+    time.sleep(0.06)
+    assert backend.lookup("/batches", ["batches"])[0] is None
+
+
+def test_invalidation_is_per_namespace(backend):
+    """Test that bumping a generation makes only its namespace stale."""
+    for key, namespace in (("/batches", "batches"), ("/metrics", "metrics")):
+        _, generations = backend.lookup(key, [namespace])
+        backend.store(key, generations, _entry(), ttl=60)
+
+    backend.invalidate("batches")
+    assert backend.lookup("/batches", ["batches"])[0] is None
+    assert backend.lookup("/metrics", ["metrics"])[0] == _entry()
+
+
+def test_write_during_build_invalidates_the_entry(backend):
+    """Test that an entry built before a racing write is never served."""
+    _, generations = backend.lookup("/batches", ["batches"])
+    backend.invalidate("batches")  # written while the response was built
+    backend.store("/batches", generations, _entry(), ttl=60)
+    assert backend.lookup("/batches", ["batches"])[0] is None
+
+
+def test_memory_cache_is_bounded():
+    """Test LRU eviction of the in-memory backend."""
+    backend = MemoryCache(maxsize=2)
+    for key in ("a", "b", "c"):
+        backend.store(key, [], _entry(), ttl=60)
+    assert backend.lookup("a", [])[0] is None
+    assert backend.lookup("c", [])[0] == _entry()
+
+
+def test_redis_errors_degrade_to_misses():
+    """Test that an unreachable Redis server does not fail requests."""
+    client = FakeRedis()
+    backend = RedisCache(client)
+    _, generations = backend.lookup("/batches", ["batches"])
+    backend.store("/batches", generations, _entry(), ttl=60)
+
+    client.down = True
+    assert backend.lookup("/batches", ["batches"]) == (None, None)
+    backend.store("/batches", [0], _entry(), ttl=60)
+    backend.invalidate("batches")
+
+
+def test_unreachable_redis_falls_back_to_memory(monkeypatch):
+    """Test the in-memory fallback and disabling the cache."""
+    monkeypatch.setattr(cache, "_cache", None)
+    monkeypatch.setattr(cache.settings, "RESPONSE_CACHE_BACKEND", "redis")
+    monkeypatch.setattr(cache.settings, "REDIS_URL", "redis://localhost:1/0")
+    assert isinstance(cache.response_cache(), MemoryCache)
+
+    monkeypatch.setattr(cache.settings, "RESPONSE_CACHE_BACKEND", None)
+    assert cache.response_cache() is None
+    cache.invalidate(cache.BATCHES)
@@ -0,0 +1,159 @@
+"""
+Unit tests for active-learning capture of near-miss frames.
+"""
+
+import json
+import time
+import pytest
+import numpy as np
+from unittest.mock import Mock
+
+from src.vision.capture import SampleCapture, frame_hash
+from src.vision.plastic_classifier import PlasticClassifier
+
+CLASSES = ["PET", "HDPE"]
+
+
+def _frame(seed):
+    """Random textured frame; different seeds give unrelated hashes."""
+    return np.random.default_rng(seed).integers(
+        0, 256, (64, 64, 3), dtype=np.uint8
+    )
+
+
+def _rows(*confidences):
+    """One prediction per confidence, class 1."""
+    return np.array(
+        [[4, 4, 20, 20, conf, 1] for conf in confidences], dtype=np.float32
+    ).reshape(-1, 6)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    capture = SampleCapture(
+        tmp_path, min_confidence=0.5, confidence_threshold=0.85,
+        max_bytes=10**7, queue_size=8,
+    ).start()
+    yield capture
+    capture.stop()
+
+
+@pytest.mark.parametrize("confidences, queued", [
+    ((0.6,), True),
+    ((0.9, 0.7), True),
+    ((0.9,), False),
+    ((0.3,), False),
+    ((), False),
+])
+def test_offer_selects_near_misses(capture, confidences, queued):
+    """Test that only frames with a prediction in the band are captured."""
+    assert capture.offer(_frame(0), _rows(*confidences), CLASSES) is queued
+
+
+def test_capture_writes_frame_and_predictions(capture, tmp_path):
+    """Test the stored image and its prediction sidecar."""
+    capture.offer(_frame(0), _rows(0.7, 0.9, 0.2), CLASSES)
+    _wait_for(lambda: capture.counts["captured"] == 1)
+
+    image, = tmp_path.glob("*.jpg")
+    sidecar = json.loads(image.with_suffix(".json").read_text())
+    assert sidecar["shape"] == [64, 64, 3]
+    assert sidecar["confidence_threshold"] == 0.85
+    # Everything from the capture floor up, not only the near miss
+    assert [p["confidence"] for p in sidecar["predictions"]] == pytest.approx(
+        [0.7, 0.9]
+    )
+    assert sidecar["predictions"][0]["plastic_type"] == "HDPE"
+    assert capture.report()["store_bytes"] == sum(
+        path.stat().st_size for path in tmp_path.iterdir()
+    )
+
+
+def test_near_duplicate_frames_are_skipped(capture):
+    """Test that a slightly changed frame is not stored again."""
+    frame = _frame(0)
+    brighter = np.clip(frame.astype(np.int16) + 3, 0, 255).astype(np.uint8)
+    assert frame_hash(frame) != frame_hash(_frame(1))
+
+    for image in (frame, brighter, _frame(1)):
+        capture.offer(image, _rows(0.7), CLASSES)
+    _wait_for(lambda: capture.counts["captured"] + capture.counts["duplicate"] == 3)
+    assert capture.counts["captured"] == 2
+    assert capture.counts["duplicate"] == 1
+
+
+def test_store_stays_within_bound(tmp_path):
+    """Test that the oldest captures are evicted past the size bound."""
+    capture = SampleCapture(tmp_path, max_bytes=30_000, queue_size=64).start()
+    for seed in range(10):
+        capture.offer(_frame(seed), _rows(0.7), CLASSES)
+    capture.stop()
+
+    report = capture.report()
+    assert report["captured"] == 10
+    assert report["evicted"] > 0
+    assert report["store_bytes"] <= 30_000
+    stems = sorted(path.stem for path in tmp_path.glob("*.jpg"))
+    assert stems == [stem for stem, _ in capture.files]
+    assert len(list(tmp_path.glob("*.json"))) == len(stems)
+
+
+def test_restart_keeps_index(tmp_path):
+    """Test that a restarted store accounts for and dedupes old captures."""
+    first = SampleCapture(tmp_path).start()
+    first.offer(_frame(0), _rows(0.7), CLASSES)
+    first.stop()
+
+    second = SampleCapture(tmp_path).start()
+    assert second.total_bytes == first.total_bytes
+    second.offer(_frame(0), _rows(0.7), CLASSES)
+    second.stop()
+    assert second.counts["duplicate"] == 1
+
+
+def test_foreign_files_are_ignored(tmp_path, caplog):
+    """Test that JPEGs not written by the capture store are left alone."""
+    first = SampleCapture(tmp_path).start()
+    first.offer(_frame(0), _rows(0.7), CLASSES)
+    first.stop()
+    (tmp_path / "IMG_0001.jpg").write_bytes(b"jpeg")
+    (tmp_path / "20260101T000000000000_nothex.jpg").write_bytes(b"jpeg")
+
+    second = SampleCapture(tmp_path)
+    assert second.total_bytes == first.total_bytes
+    assert len(second.files) == 1
+    assert "IMG_0001.jpg" in caplog.text
+
+
+def test_offer_drops_instead_of_blocking(tmp_path):
+    """Test that a full queue never slows down classification."""
+    capture = SampleCapture(tmp_path, queue_size=2)  # writer not started
+    start = time.perf_counter()
+    queued = [capture.offer(_frame(0), _rows(0.7), CLASSES) for _ in range(100)]
+    assert time.perf_counter() - start < 0.05
+    assert sum(queued) == 2
+    assert capture.counts["dropped"] == 98
+
+
+def test_classifier_offers_near_misses(capture):
+    """Test that the classifier keeps near misses for capture only."""
+    predictions = Mock()
+    predictions.xyxy = [_rows(0.95, 0.6)]
+    model = Mock(return_value=predictions)
+    model.names = CLASSES
+    classifier = PlasticClassifier(model=model)
+    classifier.confidence_threshold = 0.85
+    assert classifier.min_confidence == 0.85
+
+    classifier.capture = capture
+    assert classifier.min_confidence == 0.5
+    detections = classifier.classify_plastic(_frame(0))
+    assert [d["confidence"] for d in detections] == pytest.approx([0.95])
+    _wait_for(lambda: capture.counts["captured"] == 1)
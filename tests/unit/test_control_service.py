@@ -0,0 +1,111 @@
+"""
+Unit tests for the gRPC robot control service.
+"""
+
+import threading
+import pytest
+
+from src.common.config import settings
+from src.robotics.control_service import (
+    RobotControlClient,
+    RobotControlServer,
+    SortError,
+)
+from src.robotics.robot_controller import MultiArmController
+
+DETECTION = {"plastic_type": "PET", "confidence": 0.95, "bbox": [0, 0, 10, 10]}
+
+
+class GatedController(MultiArmController):
+    """Controller whose picks wait until released."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def _sort_item(self, detection):
+        assert self.release.wait(5)
+
+
+@pytest.fixture
+def fast_picks(monkeypatch):
+    monkeypatch.setattr(settings, "ROBOT_PICK_DURATION", 0.0)
+
+
+@pytest.fixture
+def server(fast_picks):
+    server = RobotControlServer(port=0).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server):
+    with RobotControlClient(f"localhost:{server.port}", window=4) as client:
+        yield client
+
+
+def test_sort_acknowledges_every_command(client):
+    """Test that all commands on one stream are acknowledged in order."""
+    acks = client.sort([DETECTION] * 50)
+    assert [ack["id"] for ack in acks] == list(range(50))
+    assert all(ack["ok"] for ack in acks)
+    assert all(ack["latency_ms"] >= 0 for ack in acks)
+
+
+def test_failed_pick_is_reported(server, client):
+    """Test that a pick failing on the server fails only its command."""
+    server.controller.stop()
+    with pytest.raises(SortError, match="Emergency stop"):
+        client.submit(DETECTION).result(timeout=5)
+
+    server.controller.reset()
+    assert client.submit(DETECTION).result(timeout=5)["ok"]
+
+
+def test_invalid_command_is_rejected(server, client):
+    """Test that a command without a detection is acknowledged as failed."""
+    with pytest.raises(SortError, match="no detection"):
+        client.submit(None).result(timeout=5)
+
+
+def test_window_limits_unacknowledged_commands(fast_picks):
+    """Test that the client waits once the window is full."""
+    controller = GatedController()
+    server = RobotControlServer(controller, port=0).start()
+    try:
+        with RobotControlClient(f"localhost:{server.port}", window=3) as client:
+            futures = [client.submit(DETECTION) for _ in range(3)]
+            with pytest.raises(TimeoutError):
+                client.submit(DETECTION, timeout=0.2)
+            assert not any(future.done() for future in futures)
+
+            controller.release.set()
+            assert all(future.result(timeout=5)["ok"] for future in futures)
+            assert client.submit(DETECTION, timeout=5).result(timeout=5)["ok"]
+    finally:
+        controller.release.set()
+        server.stop()
+
+
+def test_lost_server_fails_pending_commands(fast_picks):
+    """Test that commands in flight fail when the server goes away."""
+    controller = GatedController()
+    server = RobotControlServer(controller, port=0).start()
+    client = RobotControlClient(f"localhost:{server.port}", window=2)
+    future = client.submit(DETECTION)
+    server.stop(grace=0)
+    controller.release.set()
+
+    with pytest.raises(ConnectionError):
+        future.result(timeout=5)
+    with pytest.raises(ConnectionError):
+        client.submit(DETECTION, timeout=1)
+    client.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_pick_and_sort(client):
+    """Test the drop-in replacement for the in-process controller."""
+    assert await client.pick_and_sort([DETECTION, DETECTION])
+    assert not await client.pick_and_sort([])
@@ -0,0 +1,196 @@
+"""
+Unit tests for the model download script, against a local HTTP server.
+"""
+
+import hashlib
+import importlib.util
+import json
+import threading
+import pytest
+import yaml
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT = Path(__file__).parents[2] / "models" / "download_models.py"
+
+
+@pytest.fixture
+def downloader(monkeypatch):
+    """The download script, loaded as a module, without retry delays."""
+    spec = importlib.util.spec_from_file_location("download_models", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "RETRY_DELAY", 0)
+    return module
+
+
+class ModelServer(ThreadingHTTPServer):
+    """Serves in-memory files with Range support and injectable failures."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.files = {}
+        self.drop_after = {}  # path -> bytes sent before dropping, once
+        self.requests = []  # (path, Range header)
+
+    def url(self, name):
+        return f"http://127.0.0.1:{self.server_address[1]}/{name}"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    """GET handler honouring ``Range: bytes=<start>-``."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        name = self.path.lstrip("/")
+        server.requests.append((name, self.headers.get("Range")))
+        if name not in server.files:
+            self.send_error(404)
+            return
+
+        data = server.files[name]
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+
+        drop = server.drop_after.pop(name, None)
+        if drop is not None:
+            self.wfile.write(body[:drop])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """A running local model server."""
+    server = ModelServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_config(path, server, names):
+    config = {"models": {
+        name: {"url": server.url(name), "sha256": _sha256(server.files[name])}
+        for name in names
+    }}
+    path.write_text(yaml.safe_dump(config))
+    return path
+
+
+def test_parallel_download_and_hash_cache(downloader, server, tmp_path):
+    """Test downloading several models and reusing cached hashes."""
+    server.files = {f"model{i}.pt": bytes([i]) * 300_000 for i in range(3)}
+    config = _write_config(tmp_path / "config.yml", server, server.files)
+    models = tmp_path / "models"
+
+    downloader.main(["--config", str(config), "--models-dir", str(models),
+                     "--workers", "3"])
+    for name, data in server.files.items():
+        assert (models / name).read_bytes() == data
+    cache = json.loads((models / downloader.HASH_CACHE_FILE).read_text())
+    assert cache["model1.pt"]["sha256"] == _sha256(server.files["model1.pt"])
+    assert not list(models.glob("*.part"))
+
+    # Unchanged files are verified from the cache, without hashing or fetching
+    server.requests.clear()
+    calls = []
+    original = downloader.calculate_sha256
+    downloader.calculate_sha256 = lambda path: calls.append(path) or original(path)
+    downloader.main(["--config", str(config), "--models-dir", str(models)])
+    assert calls == [] and server.requests == []
+
+
+def test_changed_file_is_rehashed_and_replaced(downloader, server, tmp_path):
+    """Test that a modified model invalidates its cache entry."""
+    server.files = {"model.pt": b"weights" * 10_000}
+    config = _write_config(tmp_path / "config.yml", server, server.files)
+    models = tmp_path / "models"
+    downloader.main(["--config", str(config), "--models-dir", str(models)])
+
+    (models / "model.pt").write_bytes(b"corrupted")
+    downloader.main(["--config", str(config), "--models-dir", str(models)])
+    assert (models / "model.pt").read_bytes() == server.files["model.pt"]
+
+
+def test_interrupted_download_resumes_with_range(downloader, server, tmp_path):
+    """Test that a dropped connection is resumed rather than restarted."""
+    data = bytes(range(256)) * 4000
+    server.files = {"model.pt": data}
+    server.drop_after = {"model.pt": 300_000}
+    target = tmp_path / "model.pt"
+
+    assert downloader.download_file(server.url("model.pt"), target, _sha256(data))
+    assert target.read_bytes() == data
+    # Only the bytes after the last complete chunk are requested again
+    (first, first_range), (second, second_range) = server.requests
+    assert first_range is None
+    resumed = int(second_range.split("=")[1].rstrip("-"))
+    assert 0 < resumed <= 300_000
+
+
+def test_partial_file_from_earlier_run_is_resumed(downloader, server, tmp_path):
+    """Test resuming, and completing, a .part file left behind."""
+    data = b"abcdefgh" * 50_000
+    server.files = {"model.pt": data}
+    target = tmp_path / "model.pt"
+
+    (tmp_path / "model.pt.part").write_bytes(data[:123_456])
+    assert downloader.download_file(server.url("model.pt"), target, _sha256(data))
+    assert target.read_bytes() == data
+    assert server.requests[-1] == ("model.pt", "bytes=123456-")
+
+    # A complete .part file is finished without downloading anything
+    target.unlink()
+    (tmp_path / "model.pt.part").write_bytes(data)
+    assert downloader.download_file(server.url("model.pt"), target, _sha256(data))
+    assert target.read_bytes() == data
+
+
+def test_hash_mismatch_discards_download(downloader, server, tmp_path):
+    """Test that a download with the wrong hash is not kept."""
+    server.files = {"model.pt": b"tampered"}
+    target = tmp_path / "model.pt"
+
+    assert not downloader.download_file(
+        server.url("model.pt"), target, _sha256(b"expected")
+    )
+    assert not target.exists()
+    assert not (tmp_path / "model.pt.part").exists()
+
+
+def test_sha256_matches_hashlib(downloader, tmp_path):
+    """Test the memory-mapped hash, including empty and multi-block files."""
+    downloader.HASH_BLOCK_SIZE = 1000
+    for size in (0, 999, 1000, 12_345):
+        path = tmp_path / f"file{size}"
+        path.write_bytes(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+        assert downloader.calculate_sha256(path) == _sha256(path.read_bytes())
@@ -0,0 +1,240 @@
+"""
+Unit tests for the event bus.
+"""
+
+import threading
+import time
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from src.common import events
+from src.common.events import (
+    Deduplicator,
+    LocalEventBus,
+    handle_events,
+    run_consumer,
+)
+from src.database.models import Base, Batch, PlasticDetection
+from src.database.persistence import save_detection_event
+
+
+@pytest.fixture
+def bus():
+    return LocalEventBus(partitions=4, batch_size=50, linger_ms=2)
+
+
+def _publish(bus, n, topic=events.DETECTIONS):
+    producer = bus.producer()
+    ids = [producer.send(topic, {"n": i}, key=f"facility-{i % 8}") for i in range(n)]
+    producer.close()
+    return ids
+
+
+def _drain(consumer, timeout=0.2):
+    received = []
+    while True:
+        batch = consumer.poll(timeout)
+        if not batch:
+            return received
+        received.extend(batch)
+
+
+def test_produce_is_batched_and_keyed(bus):
+    """Test that events are delivered in order per key."""
+    ids = _publish(bus, 200)
+    assert sum(bus.end_offsets(events.DETECTIONS)) == 200
+
+    received = _drain(bus.consumer([events.DETECTIONS], "robots"))
+    assert sorted(e.id for e in received) == sorted(ids)
+    by_key = {}
+    for event in received:
+        by_key.setdefault(event.key, []).append(event.payload["n"])
+    for numbers in by_key.values():
+        assert numbers == sorted(numbers)
+    assert len({e.partition for e in received if e.key == "facility-3"}) == 1
+
+
+def test_flush_does_not_wait_for_linger():
+    """Test that flush sends a partial batch right away."""
+    bus = LocalEventBus(partitions=1, batch_size=1000, linger_ms=10_000)
+    producer = bus.producer()
+    producer.send(events.METRICS, {"fps": 30})
+    start = time.perf_counter()
+    producer.flush()
+    assert time.perf_counter() - start < 1.0
+    assert bus.end_offsets(events.METRICS) == [1]
+    producer.close()
+
+
+def test_group_members_share_partitions(bus):
+    """Test that a consumer group splits a topic between its members."""
+    first = bus.consumer([events.DETECTIONS], "storage")
+    second = bus.consumer([events.DETECTIONS], "storage")
+    other_group = bus.consumer([events.DETECTIONS], "robots")
+    assert len(first.positions) == len(second.positions) == 2
+    assert not set(first.positions) & set(second.positions)
+
+    _publish(bus, 100)
+    a, b = _drain(first), _drain(second)
+    assert len(a) + len(b) == 100
+    assert {e.id for e in a}.isdisjoint(e.id for e in b)
+    # Every group receives every event
+    assert len(_drain(other_group)) == 100
+
+
+def test_uncommitted_events_are_redelivered(bus):
+    """Test at-least-once delivery when a member leaves without committing."""
+    _publish(bus, 40)
+    first = bus.consumer([events.DETECTIONS], "storage")
+    assert len(_drain(first)) == 40
+    first.close()
+
+    second = bus.consumer([events.DETECTIONS], "storage")
+    assert len(second.poll(0.2)) > 0
+    second.commit()
+    _drain(second)
+    second.commit()
+    second.close()
+
+    third = bus.consumer([events.DETECTIONS], "storage")
+    assert third.poll(0.1) == []
+    assert bus.committed("storage", events.DETECTIONS) == bus.end_offsets(
+        events.DETECTIONS
+    )
+
+
+def test_handler_failure_rewinds_and_skips_handled(bus):
+    """Test that events handled before a failure are not handled twice."""
+    _publish(bus, 20)
+    consumer = bus.consumer([events.DETECTIONS], "storage")
+    handled = []
+    failures = iter([True])
+
+    def handler(event):
+        if len(handled) == 5 and next(failures, False):
+            raise RuntimeError("database unavailable")
+        handled.append(event.payload["n"])
+
+    dedup = Deduplicator()
+    with pytest.raises(RuntimeError):
+        handle_events(consumer, handler, dedup, timeout=0.1)
+    assert bus.committed("storage", events.DETECTIONS) == [0, 0, 0, 0]
+
+    while handle_events(consumer, handler, dedup, timeout=0.1):
+        pass
+    assert sorted(handled) == list(range(20))
+
+
+def test_committed_events_are_dropped(bus):
+    """Test that logs only keep events some group has not committed."""
+    storage = bus.consumer([events.DETECTIONS], "storage")
+    dashboard = bus.consumer([events.DETECTIONS], "dashboard")
+    for _ in range(5):
+        _publish(bus, 200)
+        assert len(_drain(storage, timeout=0.05)) == 200
+        storage.commit()
+    # The dashboard group has not committed, so nothing is dropped yet
+    assert sum(bus.retained(events.DETECTIONS)) == 1000
+
+    assert len(_drain(dashboard, timeout=0.05)) == 1000
+    dashboard.commit()
+    assert bus.retained(events.DETECTIONS) == [0, 0, 0, 0]
+    assert sum(bus.end_offsets(events.DETECTIONS)) == 1000
+
+    # Offsets keep counting after the trim
+    _publish(bus, 8)
+    received = _drain(storage, timeout=0.05)
+    assert len(received) == 8
+    assert min(e.offset for e in received) > 0
+    storage.commit()
+    assert sum(bus.retained(events.DETECTIONS)) == 8
+
+
+def test_retention_caps_lagging_groups():
+    """Test that a group too far behind loses its oldest events."""
+    bus = LocalEventBus(partitions=1, linger_ms=0, retention=100)
+    _publish(bus, 1000)  # no consumer yet
+    assert bus.retained(events.DETECTIONS)[0] <= 110
+
+    consumer = bus.consumer([events.DETECTIONS], "late")
+    received = _drain(consumer, timeout=0.05)
+    assert [e.payload["n"] for e in received] == list(range(1000 - len(received), 1000))
+    consumer.commit()
+    assert bus.committed("late", events.DETECTIONS) == [1000]
+    assert bus.retained(events.DETECTIONS) == [0]
+
+
+def test_latest_offset_reset_skips_retained_events(bus):
+    """Test that a new group can start after the events already produced."""
+    _publish(bus, 20)
+    consumer = bus.consumer([events.DETECTIONS], "live", offset_reset="latest")
+    assert _drain(consumer, timeout=0.05) == []
+
+    _publish(bus, 5)
+    received = _drain(consumer)
+    assert sorted(e.payload["n"] for e in received) == list(range(5))
+    # Before any commit a rewind returns to where the group started
+    consumer.rewind()
+    assert len(_drain(consumer)) == 5
+
+    with pytest.raises(ValueError):
+        bus.consumer([events.DETECTIONS], "live", offset_reset="newest")
+
+def test_dedup_window_is_bounded():
+    """Test that only the most recent ids are remembered."""
+    dedup = Deduplicator(window=2)
+    for event_id in ("a", "b", "c"):
+        dedup.add(event_id)
+    assert "a" not in dedup
+    assert "b" in dedup and "c" in dedup
+
+
+def test_run_consumer_stops(bus):
+    """Test the consumer loop handles events until stopped."""
+    received = []
+    stop = threading.Event()
+    consumer = bus.consumer([events.SORT_RESULTS], "dashboard")
+    worker = threading.Thread(
+        target=run_consumer, args=(consumer, received.append, stop)
+    )
+    worker.start()
+    _publish(bus, 10, events.SORT_RESULTS)
+    deadline = time.monotonic() + 5
+    while len(received) < 10 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    worker.join(5)
+    assert len(received) == 10
+    assert bus.committed("dashboard", events.SORT_RESULTS) == bus.end_offsets(
+        events.SORT_RESULTS
+    )
+
+
+def test_detection_events_are_stored_once():
+    """Test that a redelivered detections event is not stored twice."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    payload = {
+        "batch_id": "BATCH001",
+        "facility_id": "7",
+        "timestamp": datetime(2026, 10, 1).isoformat(),
+        "detections": [{
+            "plastic_type": "PET", "confidence": 0.9,
+            "bbox": [0, 0, 10, 10], "contamination_level": 0.1,
+        }],
+    }
+    with Session(engine) as db:
+        assert save_detection_event(db, payload).facility_id == 7
+        assert save_detection_event(db, payload) is None
+        assert db.query(Batch).count() == 1
+        assert db.query(PlasticDetection).count() == 1
+
+
+def test_unknown_backend(monkeypatch):
+    """Test that an unknown backend is rejected."""
+    monkeypatch.setattr(events, "_bus", None)
+    monkeypatch.setattr(events.settings, "EVENT_BUS_BACKEND", "carrier-pigeon")
+    with pytest.raises(ValueError):
+        events.get_event_bus()
@@ -0,0 +1,102 @@
+"""
+Unit tests for the motion gate.
+"""
+
+import numpy as np
+from unittest.mock import Mock
+
+from benchmarks.synthetic import TinyDetector, box_iou
+from src.vision.gating import MotionGate
+from src.vision.plastic_classifier import PlasticClassifier
+
+
+def _belt(width: int = 640, height: int = 480) -> np.ndarray:
+    """Empty grey belt."""
+    return np.full((height, width, 3), 90, dtype=np.uint8)
+
+
+def _with_item(x: int, y: int, size: int = 40) -> np.ndarray:
+    """Belt with one saturated item."""
+    image = _belt()
+    image[y:y + size, x:x + size] = (20, 20, 200)
+    return image
+
+
+def test_first_frame_is_fully_active():
+    """Test that an uncalibrated gate lets the first frame through."""
+    gate = MotionGate()
+    assert gate.active_regions(_belt()) == [(0, 0, 640, 480)]
+    assert gate.active_regions(_belt()) == []
+
+
+def test_gate_detects_items_against_background():
+    """Test occupancy against a calibrated empty belt."""
+    gate = MotionGate()
+    gate.set_background(_belt())
+
+    assert gate.active_regions(_belt()) == []
+    assert gate.active_regions(_with_item(300, 200)) == [(0, 0, 640, 480)]
+
+
+def test_gate_ignores_changes_below_min_area():
+    """Test that specks smaller than min_area do not wake the gate."""
+    gate = MotionGate(min_area=400)
+    gate.set_background(_belt())
+
+    assert gate.active_regions(_with_item(300, 200, size=8)) == []
+    assert gate.active_regions(_with_item(300, 200, size=32)) != []
+
+
+def test_gate_reports_only_occupied_rois():
+    """Test ROI restriction."""
+    left, right = (0, 0, 320, 480), (320, 0, 640, 480)
+    gate = MotionGate(rois=[left, right])
+    gate.set_background(_belt())
+
+    assert gate.active_regions(_with_item(400, 100)) == [right]
+    assert gate.active_regions(_with_item(50, 100)) == [left]
+
+
+def test_background_follows_slow_changes():
+    """Test that the running background absorbs lighting drift."""
+    gate = MotionGate(alpha=0.5)
+    gate.set_background(_belt())
+    brighter = np.full((480, 640, 3), 120, dtype=np.uint8)
+
+    assert gate.active_regions(brighter) != []
+    for _ in range(5):
+        gate.active_regions(brighter)
+    assert gate.active_regions(brighter) == []
+
+
+def test_classifier_skips_empty_frames():
+    """Test that gated frames never reach the model."""
+    model = Mock()
+    model.names = ["PET"]
+    classifier = PlasticClassifier(model=model)
+    classifier.gate = MotionGate()
+    classifier.gate.set_background(_belt())
+
+    assert classifier.classify_plastic(_belt()) == []
+    model.assert_not_called()
+
+
+def test_classifier_maps_roi_detections_to_frame():
+    """Test inference on an ROI crop reports frame coordinates."""
+    classifier = PlasticClassifier(model=TinyDetector(min_area=16))
+    classifier.gate = MotionGate(rois=[(0, 0, 320, 480), (320, 0, 640, 480)])
+    classifier.gate.set_background(_belt())
+
+    detections = classifier.classify_plastic(_with_item(400, 100))
+    assert len(detections) == 1
+    assert box_iou(detections[0]["bbox"], [400, 100, 440, 140]) > 0.9
+
+
+def test_roi_regions_are_merged():
+    """Test that items inside overlapping ROIs are reported once."""
+    classifier = PlasticClassifier(model=TinyDetector(min_area=16))
+    classifier.gate = MotionGate(rois=[(0, 0, 480, 480), (160, 0, 640, 480)])
+    classifier.gate.set_background(_belt())
+
+    detections = classifier.classify_plastic(_with_item(300, 100))
+    assert len(detections) == 1
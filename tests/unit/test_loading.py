@@ -0,0 +1,105 @@
+"""
+Unit tests for memory-mapped weights and the packed frame store.
+"""
+
+import os
+import json
+import sys
+import pytest
+import cv2
+import numpy as np
+import torch
+from torch import nn
+
+from src.vision import quantization
+from src.vision.dataset import PackedFrameStore, main, pack_images
+from src.vision.weights import export_state_dict, mmap_weights
+
+
+def _mapped_files():
+    """Files mapped into this process, from ``/proc/self/maps``."""
+    with open("/proc/self/maps") as f:
+        return {line.split()[-1] for line in f if "/" in line}
+
+
+@pytest.fixture
+def images(tmp_path):
+    """A folder of small images of different sizes plus one corrupt file."""
+    folder = tmp_path / "images"
+    folder.mkdir()
+    for i, (width, height) in enumerate([(64, 48), (32, 32), (80, 60)]):
+        cv2.imwrite(
+            str(folder / f"frame{i}.png"),
+            np.full((height, width, 3), 40 * (i + 1), dtype=np.uint8),
+        )
+    (folder / "frame9.png").write_bytes(b"not an image")
+    return folder
+
+
+def test_mmap_weights_exports_and_maps(tmp_path):
+    """Test that weights are exported once and served from the mapped file."""
+    model = nn.Sequential(nn.Linear(64, 64), nn.ReLU(), nn.Linear(64, 8))
+    example = torch.rand(2, 64)
+    with torch.no_grad():
+        expected = model(example)
+
+    path = tmp_path / "weights.pt"
+    mmap_weights(model, path)
+    assert path.exists()
+    with torch.no_grad():
+        assert torch.equal(model(example), expected)
+    if sys.platform.startswith("linux"):
+        assert str(path) in _mapped_files()
+
+
+def test_mmap_weights_reexports_stale_file(tmp_path):
+    """Test that a checkpoint newer than the export triggers a new export."""
+    path = export_state_dict(nn.Linear(4, 4), tmp_path / "weights.pt")
+    source = tmp_path / "model.pt"
+    source.write_bytes(b"checkpoint")
+    old = path.stat().st_mtime - 10
+    os.utime(path, (old, old))
+
+    model = nn.Linear(4, 4)
+    fresh = model.weight.detach().clone()
+    mmap_weights(model, path, source=source)
+    assert torch.equal(model.weight, fresh)
+
+    # An up-to-date export is used as is
+    other = nn.Linear(4, 4)
+    mmap_weights(other, path, source=source)
+    assert torch.equal(other.weight, fresh)
+
+
+def test_pack_images_round_trip(images, tmp_path):
+    """Test packing, skipping unreadable files, labels and batches."""
+    paths = sorted(images.iterdir())
+    store = pack_images(
+        paths, tmp_path / "packed", width=32, height=24,
+        labels=["a", "b", "c", "broken"],
+    )
+
+    assert len(store) == 3
+    assert tuple(store.shape) == (24, 32, 3)
+    assert [store.label(i) for i in range(3)] == ["a", "b", "c"]
+    assert int(store[1][0, 0, 0]) == 80
+    assert not store[0].flags.writeable
+    assert [len(batch) for batch in store.batches(2)] == [2, 1]
+
+    reopened = PackedFrameStore(tmp_path / "packed")
+    assert np.array_equal(np.stack(list(reopened)), np.stack(list(store)))
+    index = json.loads((tmp_path / "packed" / "index.json").read_text())
+    assert index["files"] == ["frame0.png", "frame1.png", "frame2.png"]
+
+
+def test_pack_cli_and_calibration_images(images, tmp_path):
+    """Test the pack command and reading calibration frames from a store."""
+    output = tmp_path / "packed"
+    main(["pack", "--images", str(images), "--output", str(output),
+          "--width", "16", "--height", "16"])
+
+    assert PackedFrameStore.is_store(output)
+    assert not PackedFrameStore.is_store(images)
+    frames = quantization._read_images(output, limit=2)
+    assert len(frames) == 2
+    assert frames[0].shape == (16, 16, 3)
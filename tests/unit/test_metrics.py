@@ -0,0 +1,150 @@
+"""
+Unit tests for Prometheus instrumentation.
+"""
+
+import time
+import pytest
+import numpy as np
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.api.main import app
+from src.robotics.robot_controller import MultiArmController
+from src.vision.plastic_classifier import PlasticClassifier
+from src.vision.shadow import ShadowEvaluator
+
+
+def _sample(name, **labels):
+    """Read a metric sample, treating missing samples as zero."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def classifier():
+    """Create a classifier with a mocked model."""
+    model = Mock()
+    model.names = ["PET", "HDPE"]
+    predictions = Mock()
+    predictions.xyxy = [np.array([
+        [10, 10, 50, 50, 0.95, 0],
+        [60, 60, 90, 90, 0.90, 1],
+    ])]
+    model.return_value = predictions
+    with patch.object(PlasticClassifier, "_load_model", return_value=model):
+        return PlasticClassifier()
+
+
+def test_classifier_stage_metrics(classifier):
+    """Test that each vision stage is timed."""
+    stages = ("preprocess", "inference", "postprocess", "contamination")
+    before = {
+        s: _sample("vision_stage_latency_seconds_count", stage=s)
+        for s in stages
+    }
+    frames_before = _sample("vision_detections_per_frame_count")
+    sum_before = _sample("vision_detections_per_frame_sum")
+
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    detections = classifier.classify_plastic(image)
+    classifier.get_contamination_level(image, detections[0]["bbox"])
+
+    for stage in stages:
+        count = _sample("vision_stage_latency_seconds_count", stage=stage)
+        assert count == before[stage] + 1
+    assert _sample("vision_detections_per_frame_count") == frames_before + 1
+    assert _sample("vision_detections_per_frame_sum") == sum_before + 2
+
+
+def test_preprocess_timed_on_classify_path(classifier):
+    """Test that one classify call times the real preprocessing once."""
+    classifier.tiled = True
+    classifier.tile_size = 64
+    classifier.tile_overlap = 28
+    before = _sample("vision_stage_latency_seconds_count", stage="preprocess")
+
+    classifier.classify_plastic(np.zeros((100, 100, 3), dtype=np.uint8))
+
+    after = _sample("vision_stage_latency_seconds_count", stage="preprocess")
+    assert after == before + 1
+    tiles, = classifier.model.call_args.args
+    assert len(tiles) == 4
+
+
+def test_shadow_candidate_is_not_recorded(classifier):
+    """Test that a shadowed model leaves the production metrics alone."""
+    before = _sample("vision_stage_latency_seconds_count", stage="inference")
+    frames_before = _sample("vision_detections_per_frame_count")
+
+    shadow = ShadowEvaluator(classifier, sample_rate=1.0, cpu_budget=1.0).start()
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    shadow.submit(image, [], 1.0)
+    deadline = time.monotonic() + 5
+    while shadow.evaluated < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    shadow.stop()
+
+    assert shadow.evaluated == 1
+    assert _sample("vision_stage_latency_seconds_count", stage="inference") == before
+    assert _sample("vision_detections_per_frame_count") == frames_before
+
+
+@pytest.mark.asyncio
+async def test_robot_metrics():
+    """Test pick latency, busy time and queue depth."""
+    controller = MultiArmController()
+    picks_before = _sample("robot_pick_latency_seconds_count")
+
+    with patch("src.robotics.robot_controller.time.sleep"):
+        assert await controller.pick_and_sort([
+            {"plastic_type": "PET", "confidence": 0.95, "bbox": [0, 0, 1, 1]},
+            {"plastic_type": "PP", "confidence": 0.90, "bbox": [0, 0, 1, 1]},
+        ])
+
+    assert _sample("robot_pick_latency_seconds_count") == picks_before + 2
+    assert _sample("robot_queue_depth") == 0
+    busy = [
+        s for s in REGISTRY.collect()
+        if s.name == "robot_arm_busy_seconds"
+    ][0].samples
+    assert any(s.labels["arm"].startswith("arm") for s in busy)
+
+
+
+def test_robot_busy_time_excludes_lock_wait():
+    """Test that arms waiting for the shared lock are not counted as busy."""
+    with patch("src.robotics.robot_controller.settings.MAX_WORKERS", 3):
+        controller = MultiArmController()
+    controller.pick_duration = 0.05
+
+    def busy_total():
+        busy = [
+            s for s in REGISTRY.collect()
+            if s.name == "robot_arm_busy_seconds"
+        ][0].samples
+        return sum(s.value for s in busy if s.name.endswith("_total"))
+
+    before = busy_total()
+    futures = [
+        controller.submit({"plastic_type": "PET", "confidence": 0.9})
+        for _ in range(3)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    controller.executor.shutdown()
+
+    # Picks run one at a time; with the wait included this would be ~0.3 s
+    assert busy_total() - before == pytest.approx(0.15, abs=0.07)
+
+def test_api_metrics_endpoint():
+    """Test per-route latency exposed on /metrics."""
+    client = TestClient(app)
+    client.get("/health")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "text/plain" in response.headers["content-type"]
+    assert (
+        'api_request_latency_seconds_count{method="GET",route="/health",'
+        'status="200"}'
+    ) in response.text
@@ -4,10 +4,18 @@ Unit tests for database models.
 
 import pytest
 from datetime import datetime
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session
 
-from src.database.models import Base, Facility, Batch, PlasticDetection, ProcessingMetrics
+from src.database.migrations import migrate_bbox_columns
+from src.database.models import (
+    Base,
+    Facility,
+    Batch,
+    PlasticDetection,
+    ProcessingMetrics,
+)
+from src.database.persistence import save_detections
 
 
 @pytest.fixture(scope="function")
@@ -89,7 +97,7 @@ def test_plastic_detection_creation(session):
     saved_detection = session.query(PlasticDetection).first()
     assert saved_detection.plastic_type == "PET"
     assert saved_detection.confidence == 0.95
-    assert saved_detection.bbox == {"x1": 100, "y1": 100, "x2": 200, "y2": 200}
+    assert saved_detection.bbox == [100.0, 100.0, 200.0, 200.0]
     assert saved_detection.contamination_level == 0.1
     assert isinstance(saved_detection.timestamp, datetime)
 
@@ -164,4 +172,74 @@ def test_batch_detection_relationship(session):
     saved_batch = session.query(Batch).first()
     assert len(saved_batch.detections) == 2
     assert saved_batch.detections[0].plastic_type == "PET"
-    assert saved_batch.detections[1].plastic_type == "HDPE" 
\ No newline at end of file
+    assert saved_batch.detections[1].plastic_type == "HDPE"
+
+
+def test_bbox_overlap_query(session):
+    """Test querying detections by bounding box region."""
+    session.add_all([
+        PlasticDetection(plastic_type="PET", confidence=0.9,
+                         bbox=[0, 0, 50, 50]),
+        PlasticDetection(plastic_type="HDPE", confidence=0.9,
+                         bbox=[300, 300, 400, 400]),
+    ])
+    session.commit()
+
+    hits = session.query(PlasticDetection).filter(
+        PlasticDetection.bbox_overlaps(250, 250, 350, 350)
+    ).all()
+    assert [d.plastic_type for d in hits] == ["HDPE"]
+
+
+def test_migrate_bbox_columns(engine):
+    """Test migrating legacy JSON bboxes into float columns."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE plastic_detections (id INTEGER PRIMARY KEY, "
+            "batch_id INTEGER, plastic_type VARCHAR NOT NULL, "
+            "confidence FLOAT NOT NULL, bbox JSON, "
+            "contamination_level FLOAT, timestamp DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO plastic_detections (plastic_type, confidence, bbox) "
+            "VALUES ('PET', 0.9, '[1, 2, 3, 4]'), "
+            "('PP', 0.9, '{\"x1\": 5, \"y1\": 6, \"x2\": 7, \"y2\": 8}'), "
+            "('PS', 0.9, NULL)"
+        ))
+
+    assert migrate_bbox_columns(engine, chunk_size=2) == 2
+    assert migrate_bbox_columns(engine) == 0
+
+    session = Session(engine)
+    detections = session.query(PlasticDetection).order_by(PlasticDetection.id)
+    assert [d.bbox for d in detections] == [
+        [1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0], None
+    ]
+    session.close()
+
+
+def test_save_detections(session):
+    """Test persisting a processed batch."""
+    facility = Facility(name="Test Facility", location="Test Location")
+    session.add(facility)
+    session.commit()
+
+    batch = save_detections(
+        session,
+        "BATCH001",
+        [
+            {"plastic_type": "PET", "confidence": 0.95,
+             "bbox": [1, 2, 3, 4], "contamination_level": 0.2},
+            {"plastic_type": "PP", "confidence": 0.9, "bbox": [5, 6, 7, 8]},
+        ],
+        facility_id=facility.id,
+    )
+
+    saved = session.query(Batch).filter_by(batch_id="BATCH001").one()
+    assert saved.id == batch.id
+    assert saved.total_items == 2
+    assert [d.bbox for d in saved.detections] == [
+        [1.0, 2.0, 3.0, 4.0], [5.0, 6.0, 7.0, 8.0]
+    ]
+    assert saved.detections[0].contamination_level == 0.2
+    assert saved.detections[1].contamination_level is None
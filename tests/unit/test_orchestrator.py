@@ -0,0 +1,160 @@
+"""
+Unit tests for multi-camera stream orchestration.
+"""
+
+import time
+import pytest
+import numpy as np
+
+from benchmarks.synthetic import TinyDetector, synthetic_frame
+from src.vision.orchestrator import StreamOrchestrator
+from src.vision.plastic_classifier import PlasticClassifier
+
+
+class SlowClassifier:
+    """Classifier taking a fixed time per frame and echoing the frame value."""
+
+    def __init__(self, delay=0.002):
+        self.delay = delay
+        self.calls = 0
+
+    def classify_plastic(self, image):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [{"frame": int(image[0, 0])}]
+
+
+def _frame(value=0):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+def _saturate(orchestrator, stream_ids, seconds):
+    """Keep every stream's queue full for a while."""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for stream_id in stream_ids:
+            orchestrator.submit(stream_id, _frame())
+        time.sleep(0.0005)
+
+
+def test_results_reach_futures_and_callbacks():
+    """Test that every classified frame is delivered to its stream."""
+    delivered = []
+    orchestrator = StreamOrchestrator(SlowClassifier(0), workers=2).start()
+    orchestrator.add_stream(
+        "line-1/cam-1", "facility_001", queue_size=100,
+        on_result=lambda *result: delivered.append(result),
+    )
+    futures = [
+        orchestrator.submit("line-1/cam-1", _frame(i), frame_id=i) for i in range(20)
+    ]
+    results = [future.result(timeout=5) for future in futures]
+    orchestrator.stop()
+
+    assert [r[0]["frame"] for r in results] == list(range(20))
+    assert sorted(frame_id for _, frame_id, _ in delivered) == list(range(20))
+    stats = orchestrator.stats()["streams"][0]
+    assert stats["facility_id"] == "facility_001"
+    assert stats["processed"] == 20
+    assert stats["latency_ms"]["p99"] is not None
+
+
+def test_full_queue_drops_oldest_frame():
+    """Test that a stream keeps only its freshest frames."""
+    orchestrator = StreamOrchestrator(SlowClassifier(0))  # workers not started
+    orchestrator.add_stream("cam", "facility_001", queue_size=2)
+    futures = [orchestrator.submit("cam", _frame(i)) for i in range(5)]
+
+    assert [future.cancelled() for future in futures] == [True] * 3 + [False] * 2
+    orchestrator.start()
+    assert futures[-1].result(timeout=5)[0]["frame"] == 4
+    orchestrator.stop()
+    assert orchestrator.stats()["streams"][0]["dropped"] == 3
+
+
+@pytest.mark.parametrize("weights", [(1, 1), (3, 1)])
+def test_model_time_is_shared_by_weight(weights):
+    """Test that saturated streams share the model in proportion to weights."""
+    orchestrator = StreamOrchestrator(SlowClassifier(0.002), workers=1).start()
+    for i, weight in enumerate(weights):
+        orchestrator.add_stream(f"cam-{i}", "facility_001", weight=weight)
+    _saturate(orchestrator, ["cam-0", "cam-1"], 0.6)
+    orchestrator.stop()
+
+    streams = orchestrator.stats()["streams"]
+    share = streams[0]["model_share"]
+    expected = weights[0] / sum(weights)
+    assert share == pytest.approx(expected, abs=0.08)
+
+
+def test_idle_stream_does_not_bank_credit():
+    """Test that a stream returning from idle gets only its fair share."""
+    orchestrator = StreamOrchestrator(SlowClassifier(0.002), workers=1).start()
+    orchestrator.add_stream("busy", "facility_001")
+    orchestrator.add_stream("late", "facility_002")
+    _saturate(orchestrator, ["busy"], 0.3)
+
+    before = orchestrator.streams["busy"].processed
+    _saturate(orchestrator, ["busy", "late"], 0.3)
+    orchestrator.stop()
+
+    busy = orchestrator.streams["busy"].processed - before
+    late = orchestrator.streams["late"].processed
+    assert late / (busy + late) == pytest.approx(0.5, abs=0.1)
+
+
+def test_slo_violations_are_counted():
+    """Test SLO attainment per stream."""
+    orchestrator = StreamOrchestrator(SlowClassifier(0.02), workers=1).start()
+    orchestrator.add_stream("strict", "facility_001", slo_ms=1, queue_size=10)
+    orchestrator.add_stream("relaxed", "facility_001", slo_ms=10_000, queue_size=10)
+    futures = [
+        orchestrator.submit(stream, _frame())
+        for stream in ("strict", "relaxed") for _ in range(3)
+    ]
+    for future in futures:
+        future.result(timeout=5)
+    orchestrator.stop()
+
+    stats = {s["stream_id"]: s for s in orchestrator.stats()["streams"]}
+    assert stats["strict"]["slo_attainment"] == 0.0
+    assert stats["relaxed"]["slo_attainment"] == 1.0
+    assert len(orchestrator.stats("facility_002")["streams"]) == 0
+
+
+def test_failures_and_registration():
+    """Test classifier errors and duplicate or removed streams."""
+    class Failing:
+        def classify_plastic(self, image):
+            raise RuntimeError("model unavailable")
+
+    orchestrator = StreamOrchestrator(Failing()).start()
+    orchestrator.add_stream("cam", "facility_001")
+    with pytest.raises(ValueError):
+        orchestrator.add_stream("cam", "facility_001")
+    with pytest.raises(ValueError):
+        orchestrator.add_stream("zero", "facility_001", weight=0)
+
+    with pytest.raises(RuntimeError):
+        orchestrator.submit("cam", _frame()).result(timeout=5)
+    assert orchestrator.stats()["streams"][0]["failed"] == 1
+    orchestrator.remove_stream("cam")
+    with pytest.raises(KeyError):
+        orchestrator.submit("cam", _frame())
+    orchestrator.stop()
+
+
+def test_streams_share_one_classifier():
+    """Test several streams served by a single real classifier."""
+    classifier = PlasticClassifier(model=TinyDetector(min_area=16))
+    orchestrator = StreamOrchestrator(classifier, workers=2).start()
+    rng = np.random.default_rng(0)
+    futures = []
+    for line in range(3):
+        orchestrator.add_stream(f"line-{line}", f"facility_00{line}", queue_size=4)
+        image, truth = synthetic_frame(rng, 320, 240, items=2)
+        futures.append((orchestrator.submit(f"line-{line}", image), truth))
+
+    for future, truth in futures:
+        assert len(future.result(timeout=10)) == len(truth)
+    orchestrator.stop()
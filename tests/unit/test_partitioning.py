@@ -0,0 +1,268 @@
+"""
+Unit tests for time partitioning and archival.
+"""
+
+import json
+import pytest
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import Mock, patch
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from src.database.migrations import migrate_bbox_columns
+from src.database.models import Batch, Facility, PlasticDetection
+from src.database.partitioning import (
+    ArchiveReader,
+    PartitionManager,
+    next_period,
+    partition_name,
+    period_start,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path):
+    """Create a file-backed SQLite engine."""
+    return create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+
+@pytest.fixture(scope="function")
+def manager(engine, tmp_path):
+    """Create a monthly partition manager with a 60 day retention."""
+    manager = PartitionManager(
+        engine,
+        interval="month",
+        retention_days=60,
+        archive_dir=tmp_path / "archive",
+    )
+    manager.install()
+    return manager
+
+
+@pytest.fixture(scope="function")
+def batch(engine, manager):
+    """Create a batch with detections spread over several months."""
+    with Session(engine) as session:
+        facility = Facility(name="Test Facility", location="Test Location")
+        session.add(facility)
+        session.commit()
+        batch = Batch(batch_id="BATCH001", facility_id=facility.id)
+        session.add(batch)
+        session.commit()
+        for month in (6, 7, 9, 10):
+            session.add(PlasticDetection(
+                batch_id=batch.id,
+                plastic_type="PET",
+                confidence=0.9,
+                bbox=[1.0, 2.0, 3.0, 4.0],
+                contamination_level=0.1,
+                timestamp=datetime(2026, month, 5),
+            ))
+        session.commit()
+        return batch.id
+
+
+def test_period_helpers():
+    """Test period boundaries and partition names."""
+    assert period_start(NOW, "month") == datetime(2026, 10, 1)
+    assert period_start(NOW, "day") == datetime(2026, 10, 19)
+    assert next_period(datetime(2026, 12, 1), "month") == datetime(2027, 1, 1)
+    assert partition_name("t", datetime(2026, 10, 1), "month") == "t_p2026_10"
+    assert partition_name("t", datetime(2026, 10, 19), "day") == "t_p2026_10_19"
+
+
+def test_rotate_moves_past_periods(engine, manager, batch):
+    """Test that past rows move into per-period tables."""
+    moved = manager.rotate(NOW)
+    assert moved == 3
+
+    tables = inspect(engine).get_table_names()
+    assert "plastic_detections_p2026_06" in tables
+    assert "plastic_detections_p2026_09" in tables
+    with Session(engine) as session:
+        remaining = session.query(PlasticDetection).all()
+        assert [d.timestamp.month for d in remaining] == [10]
+
+
+def test_ids_stay_unique_after_full_rotation(engine, manager, batch):
+    """Test that rows inserted after rotation emptied the table get new ids."""
+    manager.rotate(datetime(2026, 12, 1))
+    with Session(engine) as session:
+        assert session.query(PlasticDetection).count() == 0
+        session.add(PlasticDetection(
+            batch_id=batch, plastic_type="PP", confidence=0.8,
+            timestamp=datetime(2026, 12, 2),
+        ))
+        session.commit()
+
+    rows = ArchiveReader(manager).query(
+        "plastic_detections", datetime(2026, 1, 1), datetime(2027, 1, 1)
+    )
+    ids = [row["id"] for row in rows]
+    assert len(ids) == 5
+    assert len(set(ids)) == 5
+
+
+def test_retention_archives_and_drops(engine, manager, batch, tmp_path):
+    """Test that expired partitions are archived and dropped."""
+    archived = manager.apply_retention(NOW)
+
+    names = sorted(p.stem for p in archived)
+    assert names == ["plastic_detections_p2026_06", "plastic_detections_p2026_07"]
+    assert all(p.exists() for p in archived)
+    tables = inspect(engine).get_table_names()
+    assert "plastic_detections_p2026_06" not in tables
+    assert "plastic_detections_p2026_09" in tables
+
+
+def test_late_rows_merge_into_existing_archive(engine, manager, batch):
+    """Test that archiving a period again keeps its earlier archived rows."""
+    first, _ = manager.apply_retention(NOW)
+    with Session(engine) as session:
+        session.add(PlasticDetection(
+            batch_id=batch, plastic_type="PP", confidence=0.8,
+            timestamp=datetime(2026, 6, 20),
+        ))
+        session.commit()
+
+    archived = manager.apply_retention(NOW)
+    assert archived == [first]
+    rows = ArchiveReader(manager).query(
+        "plastic_detections", datetime(2026, 6, 1), datetime(2026, 7, 1)
+    )
+    assert [row["plastic_type"] for row in rows] == ["PET", "PP"]
+    files = sorted(p.stem for p in first.parent.glob("*_p*"))
+    assert files == ["plastic_detections_p2026_06", "plastic_detections_p2026_07"]
+
+
+def test_retention_premakes_partitions(manager):
+    """Test that a retention run also creates the upcoming partitions."""
+    with patch.object(manager, "ensure_partitions") as ensure:
+        manager.apply_retention(NOW)
+    ensure.assert_called_once_with(NOW)
+
+
+def test_postgres_partition_takes_rows_from_default(tmp_path):
+    """Test that rows stuck in the DEFAULT partition move to a new one."""
+    statements = []
+
+    def execute(statement, params=None):
+        sql = str(statement)
+        statements.append(sql)
+        result = Mock(rowcount=3)
+        if "to_regclass" in sql:
+            # Only the DEFAULT partition exists
+            result.scalar.return_value = params["name"].endswith("_default")
+        else:
+            result.scalar.return_value = True  # it holds rows of the period
+        return result
+
+    @contextmanager
+    def begin():
+        yield Mock(execute=execute)
+
+    engine = Mock(dialect=postgresql.dialect(), begin=begin)
+    manager = PartitionManager(engine, interval="month", archive_dir=tmp_path)
+    name = manager._create_postgres_partition(
+        "plastic_detections", datetime(2026, 10, 1), datetime(2026, 11, 1)
+    )
+
+    assert name == "plastic_detections_p2026_10"
+    create, move, attach = statements[3:]
+    assert create.startswith(
+        "CREATE TABLE plastic_detections_p2026_10 (LIKE plastic_detections"
+    )
+    assert "DELETE FROM plastic_detections_default" in move
+    assert "INSERT INTO plastic_detections_p2026_10" in move
+    assert attach.startswith(
+        "ALTER TABLE plastic_detections ATTACH PARTITION "
+        "plastic_detections_p2026_10 FOR VALUES FROM ('2026-10-01T00:00:00')"
+    )
+
+
+def test_reader_spans_live_and_archived(manager, batch):
+    """Test that the reader merges archived and live periods."""
+    manager.apply_retention(NOW)
+    reader = ArchiveReader(manager)
+
+    rows = reader.query(
+        "plastic_detections",
+        datetime(2026, 1, 1),
+        datetime(2027, 1, 1),
+        batch_id=batch,
+    )
+    assert [r["timestamp"].month for r in rows] == [6, 7, 9, 10]
+    assert [rows[0][f"bbox_{c}"] for c in ("x1", "y1", "x2", "y2")] == [
+        1.0, 2.0, 3.0, 4.0
+    ]
+    assert rows[0]["plastic_type"] == "PET"
+
+    assert reader.query(
+        "plastic_detections",
+        datetime(2026, 7, 1),
+        datetime(2026, 8, 1),
+    )[0]["timestamp"] == datetime(2026, 7, 5)
+    assert reader.query(
+        "plastic_detections",
+        datetime(2026, 1, 1),
+        datetime(2027, 1, 1),
+        batch_id=batch + 1,
+    ) == []
+
+
+def test_migration_covers_period_tables(engine, manager, batch):
+    """Test that rotation still works into a pre-migration period table."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE plastic_detections_p2026_09 (id INTEGER PRIMARY KEY, "
+            "batch_id INTEGER, plastic_type VARCHAR NOT NULL, "
+            "confidence FLOAT NOT NULL, bbox JSON, "
+            "contamination_level FLOAT, timestamp DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO plastic_detections_p2026_09 "
+            "(id, plastic_type, confidence, bbox, timestamp) "
+            "VALUES (100, 'PP', 0.8, '[5, 6, 7, 8]', '2026-09-01 00:00:00.000000')"
+        ))
+
+    assert migrate_bbox_columns(engine) == 1
+    columns = {
+        c["name"]
+        for c in inspect(engine).get_columns("plastic_detections_p2026_09")
+    }
+    assert "bbox" not in columns and "bbox_x1" in columns
+
+    assert manager.rotate(NOW) == 3
+    rows = ArchiveReader(manager).query(
+        "plastic_detections", datetime(2026, 9, 1), datetime(2026, 10, 1)
+    )
+    assert [r["bbox_x1"] for r in rows] == [5.0, 1.0]
+
+
+def test_reader_maps_legacy_bbox_archives(manager, tmp_path):
+    """Test reading an archive written before the bbox migration."""
+    directory = tmp_path / "archive" / "plastic_detections"
+    directory.mkdir(parents=True)
+    np.savez_compressed(
+        directory / "plastic_detections_p2026_05.npz",
+        id=np.array([1, 2]),
+        batch_id=np.array([1, 1]),
+        plastic_type=np.array(["PET", "PS"]),
+        confidence=np.array([0.9, 0.7]),
+        bbox=np.array([json.dumps([1, 2, 3, 4]), ""]),
+        contamination_level=np.array([0.1, np.nan]),
+        timestamp=np.array(
+            [datetime(2026, 5, 2), datetime(2026, 5, 3)], dtype="datetime64[us]"
+        ),
+    )
+
+    rows = ArchiveReader(manager).query(
+        "plastic_detections", datetime(2026, 5, 1), datetime(2026, 6, 1)
+    )
+    assert [(r["bbox_x1"], r["bbox_y2"]) for r in rows] == [(1.0, 4.0), (None, None)]
+    assert "bbox" not in rows[0]
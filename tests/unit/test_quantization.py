@@ -0,0 +1,134 @@
+"""
+Unit tests for INT8 quantization and the evaluation harness.
+"""
+
+import json
+import pytest
+import cv2
+import numpy as np
+import torch
+from torch import nn
+from unittest.mock import patch
+
+from benchmarks.synthetic import TinyDetector, synthetic_frame
+from src.common.config import settings
+from src.vision import quantization
+from src.vision.evaluation import compare_detections
+from src.vision.plastic_classifier import PlasticClassifier
+
+
+@pytest.fixture
+def frames():
+    """Synthetic calibration frames."""
+    rng = np.random.default_rng(0)
+    return [synthetic_frame(rng, 320, 240, items=3)[0] for _ in range(4)]
+
+
+def _is_quantized(module: nn.Module) -> bool:
+    """Whether any layer of a module runs quantized kernels."""
+    return any(
+        ".quantized" in type(layer).__module__ for layer in module.modules()
+    )
+
+
+def test_static_quantization_of_backbone(frames):
+    """Test FX static quantization with calibration."""
+    model = TinyDetector(input_size=64)
+    example = torch.rand(1, 3, 64, 64)
+    with torch.no_grad():
+        expected = model.backbone(example)
+
+    quantization.quantize_model(
+        model, "static", frames, module_path="backbone", input_size=64
+    )
+    assert _is_quantized(model.backbone)
+    with torch.no_grad():
+        actual = model.backbone(example)
+    assert torch.allclose(actual, expected, atol=0.1)
+    assert len(model(frames[0]).xyxy[0]) > 0
+
+
+def test_static_quantization_requires_calibration():
+    """Test that static mode refuses to run uncalibrated."""
+    with pytest.raises(ValueError):
+        quantization.quantize_model(TinyDetector(), "static", [], "backbone")
+    with pytest.raises(ValueError):
+        quantization.quantize_model(TinyDetector(), "fp16", module_path="backbone")
+
+
+def test_dynamic_quantization_of_linear_layers():
+    """Test dynamic quantization of a network with linear layers."""
+    model = nn.Module()
+    model.net = nn.Sequential(nn.Linear(8, 4), nn.ReLU(), nn.Linear(4, 2))
+    quantization.quantize_model(model, "dynamic", module_path="net")
+    assert _is_quantized(model.net)
+    assert model.net(torch.rand(3, 8)).shape == (3, 2)
+
+
+def test_save_and_load_quantized(tmp_path, frames):
+    """Test that a calibrated submodule round-trips through a file."""
+    model = quantization.quantize_model(
+        TinyDetector(input_size=64), "static", frames, "backbone", 64
+    )
+    path = quantization.save_quantized(model, tmp_path / "int8.pt", "backbone", 64)
+
+    fresh = quantization.load_quantized(TinyDetector(input_size=64), path, "backbone")
+    example = torch.rand(1, 3, 64, 64)
+    assert torch.equal(fresh.backbone(example), model.backbone(example))
+
+
+def test_static_mode_needs_calibrated_file(tmp_path):
+    """Test a clear error when the static model was never calibrated."""
+    with patch.object(settings, "QUANTIZED_MODEL_PATH", tmp_path / "missing.pt"):
+        with pytest.raises(FileNotFoundError, match="calibrate"):
+            quantization.apply_quantization(TinyDetector(), "static")
+
+
+def test_compare_detections():
+    """Test match rate, precision, IoU and mAP against a reference."""
+    pet = {"plastic_type": "PET", "confidence": 0.9, "bbox": [0, 0, 10, 10]}
+    pp = {"plastic_type": "PP", "confidence": 0.9, "bbox": [20, 20, 30, 30]}
+    shifted = dict(pet, bbox=[1, 0, 11, 10])
+    stray = {"plastic_type": "PP", "confidence": 0.95, "bbox": [50, 50, 60, 60]}
+
+    same = compare_detections([[pet, pp]], [[pet, pp]])
+    assert same == {
+        "iou_match_rate": 1.0, "precision": 1.0, "mean_iou": 1.0, "map50": 1.0
+    }
+
+    scores = compare_detections([[pet, pp]], [[shifted, stray]])
+    assert scores["iou_match_rate"] == 0.5
+    assert scores["precision"] == 0.5
+    assert scores["mean_iou"] == pytest.approx(90 / 110)
+    # PET found with AP 1, PP missed with AP 0
+    assert scores["map50"] == pytest.approx(0.5)
+
+
+def test_cli_calibrates_and_evaluates(tmp_path, frames):
+    """Test the calibrate and evaluate commands on an image folder."""
+    images = tmp_path / "images"
+    images.mkdir()
+    for i, frame in enumerate(frames):
+        cv2.imwrite(str(images / f"frame{i}.png"), frame)
+    output = tmp_path / "int8.pt"
+    report = tmp_path / "report.json"
+
+    with patch.object(
+        PlasticClassifier, "_load_model", side_effect=lambda: TinyDetector()
+    ):
+        summary = quantization.main([
+            "calibrate", "--images", str(images),
+            "--output", str(output), "--module", "backbone",
+        ])
+        results = quantization.main([
+            "evaluate", "--images", str(images), "--quantized", str(output),
+            "--module", "backbone", "--report", str(report),
+        ])
+
+    assert summary["calibration_images"] == len(frames)
+    assert json.loads(report.read_text())["mode"] == "static"
+    assert results["images"] == len(frames)
+    assert results["int8"]["size_mb"] < results["fp32"]["size_mb"]
+    assert results["agreement"]["iou_match_rate"] == 1.0
+    assert results["fp32"]["latency"]["p95_ms"] > 0
+    assert settings.QUANTIZATION_MODE is None
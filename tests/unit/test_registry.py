@@ -0,0 +1,230 @@
+"""
+Unit tests for the model registry and hot-swapping.
+"""
+
+import hashlib
+import threading
+import time
+import pytest
+import numpy as np
+import yaml
+from fastapi.testclient import TestClient
+
+from src.api.main import app
+from src.api.routes import get_model_manager
+from src.common.config import settings
+from src.common.security import create_access_token
+from src.vision.registry import ModelManager, ModelRegistry
+
+
+class FakeClassifier:
+    """Classifier tagging its detections with the version that made them."""
+
+    def __init__(self, entry, warmup_s=0.0, call_s=0.002):
+        self.version = entry.label
+        self.warmup_s = warmup_s
+        self.call_s = call_s
+        self.warmed_up = False
+
+    def warmup(self):
+        time.sleep(self.warmup_s)
+        self.warmed_up = True
+        return {"warmup_ms": self.warmup_s * 1000}
+
+    def classify_plastic(self, image, input_size=None):
+        assert self.warmed_up or self.version == "1.0.0"
+        time.sleep(self.call_s)
+        return [{"version": self.version, "frame": int(image[0, 0, 0])}]
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry with two versions and one missing checkpoint."""
+    checkpoints = {"v1.pt": b"model one", "v2.pt": b"model two"}
+    for name, data in checkpoints.items():
+        (tmp_path / name).write_bytes(data)
+    config = {"models": {
+        "v1.pt": {"version": "1.0.0",
+                  "sha256": hashlib.sha256(b"model one").hexdigest()},
+        "v2.pt": {"version": "2.0.0",
+                  "sha256": hashlib.sha256(b"model two").hexdigest()},
+        "v3.pt": {"version": "3.0.0", "sha256": "0" * 64},
+    }}
+    (tmp_path / "model_config.yml").write_text(yaml.safe_dump(config))
+    return ModelRegistry(tmp_path / "model_config.yml")
+
+
+@pytest.fixture
+def manager(registry):
+    """Manager serving version 1.0.0 with fake classifiers."""
+    manager = ModelManager(
+        registry, factory=lambda entry: FakeClassifier(entry, warmup_s=0.05)
+    )
+    manager.load("1.0.0", warmup=False)
+    return manager
+
+
+def test_registry_lookup_and_verification(registry, tmp_path):
+    """Test looking up versions and verifying checkpoint hashes."""
+    assert [entry.version for entry in registry.versions()] == [
+        "1.0.0", "2.0.0", "3.0.0"
+    ]
+    assert registry.get("v2.pt").version == "2.0.0"
+    registry.verify(registry.get("2.0.0"))
+    with pytest.raises(KeyError):
+        registry.get("9.9.9")
+    with pytest.raises(ValueError, match="not found"):
+        registry.verify(registry.get("3.0.0"))
+
+    (tmp_path / "v2.pt").write_bytes(b"tampered")
+    with pytest.raises(ValueError, match="Hash mismatch"):
+        registry.verify(registry.get("2.0.0"))
+
+
+def test_register_records_hash(registry, tmp_path):
+    """Test registering a new checkpoint."""
+    (tmp_path / "trained.pt").write_bytes(b"trained weights")
+    entry = registry.register(tmp_path / "trained.pt", "4.0.0", "retrained")
+
+    assert entry.sha256 == hashlib.sha256(b"trained weights").hexdigest()
+    assert ModelRegistry(registry.config_path).get("4.0.0").description == "retrained"
+    with pytest.raises(ValueError):
+        registry.register(tmp_path / "missing.pt", "5.0.0")
+
+
+def test_swap_under_traffic_loses_no_frames(manager):
+    """Stream frames through a swap and a rollback; every frame is answered."""
+    results = []
+    errors = []
+    stop = threading.Event()
+
+    def stream():
+        frame_id = 0
+        while not stop.is_set():
+            image = np.full((4, 4, 3), frame_id % 256, dtype=np.uint8)
+            try:
+                results.append((frame_id, manager.classify_plastic(image)))
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+            frame_id += 1
+
+    streamer = threading.Thread(target=stream)
+    streamer.start()
+    time.sleep(0.02)
+    assert manager.load_async("2.0.0").result(timeout=5).version == "2.0.0"
+    time.sleep(0.02)
+    assert manager.rollback().version == "1.0.0"
+    time.sleep(0.02)
+    stop.set()
+    streamer.join()
+
+    assert errors == []
+    assert [frame_id for frame_id, _ in results] == list(range(len(results)))
+    versions = [detections[0]["version"] for _, detections in results]
+    # Old version until the swap, new version until the rollback, old again
+    changes = [v for i, v in enumerate(versions) if i == 0 or v != versions[i - 1]]
+    assert changes == ["1.0.0", "2.0.0", "1.0.0"]
+    assert manager.status()["swaps"] == 2
+
+
+def test_in_flight_call_finishes_on_old_model(registry):
+    """Test that a swap waits for calls still running on the old version."""
+    started, release = threading.Event(), threading.Event()
+
+    class BlockingClassifier(FakeClassifier):
+        def classify_plastic(self, image, input_size=None):
+            started.set()
+            release.wait(5)
+            return [{"version": self.version}]
+
+    manager = ModelManager(
+        registry, factory=lambda entry: BlockingClassifier(entry),
+        rollback_depth=0,
+    )
+    manager.load("1.0.0", warmup=False)
+    result = []
+    caller = threading.Thread(
+        target=lambda: result.extend(manager.classify_plastic(None))
+    )
+    caller.start()
+    started.wait(5)
+
+    future = manager.load_async("2.0.0")
+    time.sleep(0.1)
+    # Swapped in, but the old version is held until the call returns
+    assert manager.active.version == "2.0.0"
+    assert not future.done()
+    release.set()
+    caller.join()
+    assert future.result(timeout=5).version == "2.0.0"
+    assert result == [{"version": "1.0.0"}]
+    with pytest.raises(RuntimeError):
+        manager.rollback()
+
+
+def test_failed_load_keeps_serving(manager):
+    """Test that a version failing verification is never swapped in."""
+    with pytest.raises(ValueError):
+        manager.load_async("3.0.0").result(timeout=5)
+    with pytest.raises(KeyError):
+        manager.load_async("9.9.9")
+
+    status = manager.status()
+    assert status["active"] == "1.0.0"
+    assert "not found" in status["error"]
+    assert status["loading"] is None
+
+
+def test_model_endpoints(manager):
+    """Test inspecting, activating and rolling back versions over the API."""
+    app.dependency_overrides[get_model_manager] = lambda: manager
+    client = TestClient(app)
+    prefix = settings.API_V1_PREFIX
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': 'operator'})}"
+    }
+    try:
+        assert client.get(f"{prefix}/models").status_code == 401
+
+        body = client.get(f"{prefix}/models", headers=headers).json()
+        assert body["active"] == "1.0.0"
+        assert [v["available"] for v in body["versions"]] == [True, True, False]
+
+        response = client.post(
+            f"{prefix}/models/activate", json={"version": "2.0.0"},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        assert client.post(
+            f"{prefix}/models/activate", json={"version": "9.9.9"},
+            headers=headers,
+        ).status_code == 404
+
+        for _ in range(100):
+            if manager.status()["active"] == "2.0.0":
+                break
+            time.sleep(0.01)
+        response = client.post(f"{prefix}/models/rollback", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["active"] == "1.0.0"
+        assert client.post(
+            f"{prefix}/models/rollback", headers=headers
+        ).status_code == 409
+
+        assert client.get(
+            f"{prefix}/models/shadow", headers=headers
+        ).status_code == 404
+        response = client.post(
+            f"{prefix}/models/shadow", json={"version": "2.0.0"},
+            headers=headers,
+        )
+        assert response.status_code == 202
+        # The loader runs jobs in order: this returns once the shadow started
+        manager._loader.submit(lambda: None).result(timeout=5)
+        assert client.get(
+            f"{prefix}/models/shadow", headers=headers
+        ).json()["candidate"] == "2.0.0"
+        response = client.delete(f"{prefix}/models/shadow", headers=headers)
+        assert response.json()["candidate"] == "2.0.0"
+    finally:
+        app.dependency_overrides.clear()
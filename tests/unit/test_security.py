@@ -0,0 +1,92 @@
+"""
+Unit tests for security helpers.
+"""
+
+import asyncio
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from fastapi import HTTPException
+
+from src.common import security
+from src.common.security import (
+    TokenCache,
+    create_access_token,
+    get_current_user,
+    get_password_hash_async,
+    token_cache,
+    verify_password_async,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty token cache."""
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_claims():
+    """Test that repeated requests verify the token only once."""
+    token = create_access_token({"sub": "operator"})
+    with patch.object(
+        security.jwt, "decode", wraps=security.jwt.decode
+    ) as decode:
+        for _ in range(5):
+            user = await get_current_user(token)
+            assert user == {"username": "operator"}
+    assert decode.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_expired_token():
+    """Test that expired tokens are rejected."""
+    token = create_access_token(
+        {"sub": "operator"}, expires_delta=timedelta(seconds=-1)
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token)
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_rejects_invalid_token():
+    """Test that tampered tokens are rejected."""
+    with pytest.raises(HTTPException):
+        await get_current_user("not-a-token")
+    assert len(token_cache) == 0
+
+
+def test_token_cache_honors_exp():
+    """Test that cached claims expire with the token."""
+    cache = TokenCache(maxsize=10, ttl=60)
+    with patch.object(security.time, "time", return_value=1000.0):
+        cache.put("token", {"sub": "operator", "exp": 1010})
+        assert cache.get("token") == {"sub": "operator", "exp": 1010}
+    with patch.object(security.time, "time", return_value=1010.0):
+        assert cache.get("token") is None
+
+
+def test_token_cache_is_bounded():
+    """Test that the least recently used entries are evicted."""
+    cache = TokenCache(maxsize=2, ttl=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"}
+
+
+@pytest.mark.asyncio
+async def test_password_hashing_offloaded():
+    """Test hashing and verification in the password executor."""
+    hashed = await get_password_hash_async("secret")
+    results = await asyncio.gather(
+        verify_password_async("secret", hashed),
+        verify_password_async("wrong", hashed),
+    )
+    assert results == [True, False]
@@ -0,0 +1,171 @@
+"""
+Unit tests for shadow evaluation of candidate models.
+"""
+
+import time
+import pytest
+import numpy as np
+import yaml
+
+from src.vision.evaluation import box_agreement
+from src.vision.registry import ModelManager, ModelRegistry
+from src.vision.shadow import ShadowEvaluator
+
+DETECTIONS = [
+    {"plastic_type": "PET", "confidence": 0.9, "bbox": [0, 0, 10, 10]},
+    {"plastic_type": "HDPE", "confidence": 0.9, "bbox": [20, 20, 40, 40]},
+]
+
+
+class FakeCandidate:
+    """Candidate returning fixed detections after a fixed delay."""
+
+    def __init__(self, detections=DETECTIONS, delay=0.0):
+        self.detections = detections
+        self.delay = delay
+        self.calls = 0
+
+    def warmup(self):
+        return {}
+
+    def classify_plastic(self, image, input_size=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [dict(d) for d in self.detections]
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_box_agreement_separates_boxes_from_classes():
+    """Test matching boxes regardless of plastic type."""
+    relabelled = [dict(DETECTIONS[0], plastic_type="PP"), DETECTIONS[1]]
+    result = box_agreement(relabelled, DETECTIONS)
+    assert result["box_match_rate"] == 1.0
+    assert result["class_agreement"] == 0.5
+    assert result["mean_iou"] == 1.0
+
+    assert box_agreement([], DETECTIONS)["box_match_rate"] == 0.0
+    assert box_agreement([], [])["class_agreement"] is None
+
+
+@pytest.mark.parametrize("candidate_types, expected", [
+    (("PET", "HDPE"), 1.0),
+    (("PS", "PS"), 0.0),
+])
+def test_shadow_compares_with_production(candidate_types, expected):
+    """Test agreement figures for identical and relabelled candidates."""
+    candidate = FakeCandidate([
+        dict(d, plastic_type=t) for d, t in zip(DETECTIONS, candidate_types)
+    ])
+    shadow = ShadowEvaluator(
+        candidate, "candidate", sample_rate=1.0, cpu_budget=1.0, queue_size=8
+    ).start()
+    image = np.zeros((48, 48, 3), dtype=np.uint8)
+    for _ in range(5):
+        assert shadow.submit(image, DETECTIONS, latency_ms=12.0)
+    _wait_for(lambda: shadow.evaluated == 5)
+    report = shadow.stop()
+
+    assert report["frames"]["evaluated"] == 5
+    assert report["agreement"] == expected
+    assert report["class_agreement"] == expected
+    assert report["box_match_rate"] == 1.0
+    assert report["latency_ms"]["production"]["p50"] == 12.0
+    assert report["latency_ms"]["shadow"]["p95"] is not None
+
+
+def test_submit_drops_instead_of_blocking():
+    """Test that a slow candidate never slows down the production path."""
+    shadow = ShadowEvaluator(
+        FakeCandidate(delay=0.2), sample_rate=1.0, cpu_budget=1.0, queue_size=1
+    ).start()
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+
+    start = time.perf_counter()
+    queued = [shadow.submit(image, DETECTIONS, 1.0) for _ in range(50)]
+    elapsed = time.perf_counter() - start
+    report = shadow.stop()
+
+    assert elapsed < 0.05
+    assert sum(queued) <= 2
+    assert report["frames"]["dropped"] == 50 - sum(queued)
+
+
+def test_sampling_and_cpu_budget():
+    """Test the sample rate and that the worker stays within its budget."""
+    unsampled = ShadowEvaluator(FakeCandidate(), sample_rate=0.0)
+    assert not unsampled.submit(None, [], 1.0)
+    assert unsampled.sampled == 0
+
+    candidate = FakeCandidate(delay=0.01)
+    shadow = ShadowEvaluator(
+        candidate, sample_rate=1.0, cpu_budget=0.25, queue_size=1000
+    ).start()
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    for _ in range(200):
+        shadow.submit(image, DETECTIONS, 1.0)
+    time.sleep(0.5)
+    report = shadow.stop()
+
+    # Each 10 ms call is followed by 30 ms idle: at most ~13 calls in 0.5 s
+    assert 3 <= candidate.calls <= 16
+    assert report["busy_fraction"] <= 0.35
+
+
+def test_manager_shadows_candidate_version(tmp_path):
+    """Test shadowing a registered version behind the live model."""
+    config = {"models": {}}
+    for version in ("1.0.0", "2.0.0"):
+        (tmp_path / f"{version}.pt").write_bytes(b"weights")
+        config["models"][f"{version}.pt"] = {"version": version}
+    (tmp_path / "model_config.yml").write_text(yaml.safe_dump(config))
+
+    def factory(entry):
+        candidate = FakeCandidate([dict(DETECTIONS[0], version=entry.version)])
+        candidate.gate = object()
+        return candidate
+
+    manager = ModelManager(ModelRegistry(tmp_path / "model_config.yml"), factory)
+    manager.load("1.0.0", warmup=False)
+    shadow = manager.start_shadow(
+        "2.0.0", sample_rate=1.0, cpu_budget=1.0
+    ).result(timeout=5)
+    assert manager.status()["shadow"] == "2.0.0"
+    assert shadow.candidate.gate is None
+
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    for _ in range(3):
+        # Production results are never replaced by the candidate's
+        assert manager.classify_plastic(image)[0]["version"] == "1.0.0"
+    _wait_for(lambda: shadow.evaluated == 3)
+
+    report = manager.stop_shadow()
+    assert report["candidate"] == "2.0.0"
+    assert report["frames"]["evaluated"] == 3
+    assert manager.stop_shadow() is None
+    assert manager.status()["shadow"] is None
+
+
+def test_report_while_worker_records():
+    """Test that reports taken during evaluation see consistent windows."""
+    shadow = ShadowEvaluator(
+        FakeCandidate(), sample_rate=1.0, cpu_budget=1.0, queue_size=1000,
+        window=50,
+    ).start()
+    image = np.zeros((4, 4, 3), dtype=np.uint8)
+    for _ in range(500):
+        shadow.submit(image, DETECTIONS, 1.0)
+
+    reports = []
+    while shadow.evaluated < 500 and len(reports) < 10_000:
+        reports.append(shadow.report())
+    report = shadow.stop()
+
+    assert report["frames"]["evaluated"] == 500
+    assert report["agreement"] == 1.0
+    assert all(r["agreement"] in (None, 1.0) for r in reports)
@@ -0,0 +1,149 @@
+"""
+Unit tests for service start-up cost.
+"""
+
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+import pytest
+import numpy as np
+from unittest.mock import Mock, patch
+from fastapi.testclient import TestClient
+
+from src.api import main, routes
+from src.api.main import app
+from src.common.config import settings
+from src.vision.plastic_classifier import PlasticClassifier
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# Importing torch alone costs ~500 MB RSS, so these bounds catch regressions
+MAX_IMPORT_SECONDS = 10.0
+MAX_IMPORT_RSS_MB = 250
+
+# ru_maxrss survives fork/exec on Linux, so the child's own high-water
+# mark is read from /proc instead
+PROBE = """
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+with open("/proc/self/status") as status:
+    hwm = next(line for line in status if line.startswith("VmHWM"))
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "rss_mb": int(hwm.split()[1]) / 1024,
+    "modules": sorted(m for m in ("torch", "cv2") if m in sys.modules),
+}))
+"""
+
+
+def _measure_import(module: str) -> dict:
+    """Import a module in a fresh interpreter and report its cost."""
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE, module],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module,forbidden", [
+    ("src.api.main", {"torch", "cv2"}),
+    ("src.robotics.robot_controller", {"torch", "cv2"}),
+    ("src.vision.plastic_classifier", {"torch"}),
+])
+@pytest.mark.skipif(
+    not Path("/proc/self/status").exists(), reason="requires Linux /proc"
+)
+def test_entry_point_imports_are_light(module, forbidden):
+    """Test that service entry points start without the heavy vision stack."""
+    cost = _measure_import(module)
+    assert not forbidden & set(cost["modules"])
+    assert cost["seconds"] < MAX_IMPORT_SECONDS
+    assert cost["rss_mb"] < MAX_IMPORT_RSS_MB
+
+
+def _wait_until_ready(client: TestClient, timeout: float = 5.0):
+    """Poll /ready until it stops reporting "starting"."""
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.json()["status"] != "starting" or time.monotonic() > deadline:
+            return response
+        time.sleep(0.01)
+
+
+def test_readiness_waits_for_warmup():
+    """Test that /ready reports 503 until warm-up finishes."""
+    release = threading.Event()
+
+    def slow_warmup():
+        release.wait(5)
+        return {"warmup_ms": 12.0, "steady_state_ms": 3.0}
+
+    classifier = Mock()
+    classifier.warmup.side_effect = slow_warmup
+    with patch.object(settings, "PRELOAD_MODEL", True), \
+            patch.object(routes, "_model_manager", classifier):
+        with TestClient(app) as client:
+            starting = client.get("/ready")
+            assert starting.status_code == 503
+            assert starting.json()["status"] == "starting"
+            assert client.get("/health").status_code == 200
+
+            release.set()
+            ready = _wait_until_ready(client)
+            health = client.get("/health").json()
+
+    assert ready.status_code == 200
+    assert ready.json()["warmup"]["steady_state_ms"] == 3.0
+    assert health["ready"] is True
+    assert health["warmup"]["warmup_ms"] == 12.0
+    classifier.warmup.assert_called_once()
+
+
+def test_readiness_reports_failed_warmup():
+    """Test that a failed warm-up keeps the service unready."""
+    classifier = Mock()
+    classifier.warmup.side_effect = RuntimeError("no weights")
+    with patch.object(settings, "PRELOAD_MODEL", True), \
+            patch.object(routes, "_model_manager", classifier):
+        with TestClient(app) as client:
+            response = _wait_until_ready(client)
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"] == "no weights"
+
+
+def test_lifespan_skips_classifier_by_default():
+    """Test that the classifier is built lazily unless preloading is on."""
+    with patch.object(main, "load_classifier") as load_classifier:
+        with TestClient(app) as client:
+            assert client.get("/ready").status_code == 200
+    load_classifier.assert_not_called()
+
+
+def test_classifier_warmup_covers_each_shape():
+    """Test warm-up inferences at every input and batch size."""
+    model = Mock()
+    model.names = ["PET"]
+    classifier = PlasticClassifier(model=model)
+    stats = classifier.warmup(input_sizes=[320, 640], batch_sizes=[1, 4], runs=2)
+
+    # A cold first call plus two steady-state calls per shape
+    assert model.call_count == 2 * 2 * 3
+    shapes = [(s["input_size"], s["batch_size"]) for s in stats["shapes"]]
+    assert shapes == [(320, 1), (320, 4), (640, 1), (640, 4)]
+    assert stats["steady_state_ms"] == stats["shapes"][0]["steady_ms"]
+    assert stats["warmup_ms"] >= stats["first_inference_ms"]
+
+    batch = model.call_args[0][0]
+    assert len(batch) == 4
+    assert batch[0].shape == (640, 640, 3)
+    assert not np.any(batch[0])
@@ -0,0 +1,110 @@
+"""
+Unit tests for tiled inference.
+"""
+
+import pytest
+import numpy as np
+
+from benchmarks.synthetic import TinyDetector, match_truth, synthetic_frame
+from src.vision.plastic_classifier import PlasticClassifier
+from src.vision.tiling import (
+    make_tiles,
+    merge_detections,
+    merge_tile_detections,
+    tile_origins,
+)
+
+
+@pytest.mark.parametrize("length,expected", [
+    (500, [0]),
+    (640, [0]),
+    (1000, [0, 360]),
+    (1920, [0, 512, 1024, 1280]),
+])
+def test_tile_origins_cover_axis(length, expected):
+    """Test that tiles overlap and end exactly at the frame edge."""
+    origins = tile_origins(length, 640, 128)
+    assert origins == expected
+    assert origins[-1] + 640 >= length
+
+
+def test_tile_overlap_must_be_smaller_than_tile():
+    """Test that a non-positive stride is rejected."""
+    with pytest.raises(ValueError):
+        tile_origins(2000, 640, 640)
+
+
+def test_make_tiles_returns_views_and_offsets():
+    """Test tile extraction from a wide frame."""
+    image = np.arange(1080 * 1920 * 3, dtype=np.uint32).reshape(1080, 1920, 3)
+    tiles, offsets = make_tiles(image, 640, 128)
+
+    assert len(tiles) == 4 * 2
+    assert offsets.shape == (8, 2)
+    for tile, (x, y) in zip(tiles, offsets.astype(int)):
+        assert tile.shape == (640, 640, 3)
+        assert tile[0, 0, 0] == image[y, x, 0]
+
+
+def test_merge_detections_joins_split_item():
+    """Test that partial boxes of one item merge into the full box."""
+    rows = np.array([
+        [100, 100, 140, 150, 0.95, 1],   # part cut by a tile edge
+        [100, 100, 160, 150, 0.90, 1],   # whole item from the next tile
+        [110, 110, 150, 140, 0.90, 2],   # overlapping item of another class
+        [400, 400, 450, 450, 0.97, 1],   # separate item
+    ], dtype=np.float32)
+    merged = merge_detections(rows, threshold=0.5)
+
+    assert len(merged) == 3
+    assert merged[0].tolist() == pytest.approx([400, 400, 450, 450, 0.97, 1])
+    assert merged[1].tolist() == pytest.approx([100, 100, 160, 150, 0.95, 1])
+    assert merged[2][5] == 2
+
+
+def test_merge_tile_detections_maps_to_frame():
+    """Test that tile coordinates are shifted and low confidences dropped."""
+    offsets = np.array([[0, 0], [512, 0]], dtype=np.float32)
+    tile_rows = [
+        np.array([[10, 20, 30, 40, 0.9, 0]]),
+        np.array([[10, 20, 30, 40, 0.9, 0], [50, 50, 60, 60, 0.1, 0]]),
+    ]
+    merged = merge_tile_detections(tile_rows, offsets, confidence_threshold=0.5)
+
+    boxes = sorted(row[:4].tolist() for row in merged)
+    assert boxes == [[10, 20, 30, 40], [522, 20, 542, 40]]
+
+
+def test_merge_tile_detections_empty():
+    """Test merging when no tile found anything."""
+    merged = merge_tile_detections(
+        [np.zeros((0, 6))], np.zeros((1, 2), dtype=np.float32)
+    )
+    assert merged.shape == (0, 6)
+
+
+def test_tiled_inference_finds_small_items():
+    """Test that tiling recovers small items the resize path misses."""
+    image, truth = synthetic_frame(
+        np.random.default_rng(3), 3840, 1080, items=30, min_size=12, max_size=24
+    )
+    classifier = PlasticClassifier(model=TinyDetector())
+
+    classifier.tiled = False
+    resized, _ = match_truth(classifier.classify_plastic(image), truth)
+    classifier.tiled = True
+    tiled, false_positives = match_truth(classifier.classify_plastic(image), truth)
+
+    assert sum(tiled) > sum(resized)
+    assert sum(tiled) == len(truth)
+    assert false_positives == 0
+
+
+def test_small_frames_are_not_tiled():
+    """Test that frames within the model input skip tiling."""
+    image, truth = synthetic_frame(np.random.default_rng(0), 640, 480, items=4)
+    classifier = PlasticClassifier(model=TinyDetector())
+    classifier.tiled = True
+
+    found, _ = match_truth(classifier.classify_plastic(image), truth)
+    assert all(found)
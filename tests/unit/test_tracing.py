@@ -0,0 +1,152 @@
+"""
+Unit tests for frame tracing and profiling.
+"""
+
+import json
+import time
+import pytest
+import cv2
+import numpy as np
+from unittest.mock import Mock, patch
+
+from src.common.profiling import SamplingProfiler, profile_call
+from src.common.tracing import Tracer, tracer
+from src.vision import plastic_classifier
+from src.vision.gating import MotionGate
+from src.vision.plastic_classifier import PlasticClassifier
+
+
+def _busy(seconds: float) -> int:
+    """Spin the CPU for a while."""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+def test_spans_recorded_in_frame():
+    """Test that spans inside a frame are recorded."""
+    t = Tracer(enabled=True, sample_rate=1.0)
+    with t.frame("f1") as trace:
+        with t.span("inference"):
+            _busy(0.002)
+        with t.span("contamination"):
+            pass
+        with t.span("contamination"):
+            pass
+
+    assert trace is not None
+    record = t.records()[0]
+    assert record["frame_id"] == "f1"
+    assert set(record["stages"]) == {"inference", "contamination"}
+    assert record["stages"]["inference"] >= 2.0
+    assert record["total_ms"] >= record["stages"]["inference"]
+    assert len(trace.spans) == 3
+
+
+def test_spans_are_noops_outside_frames():
+    """Test that untraced work records nothing."""
+    t = Tracer(enabled=True, sample_rate=0.0)
+    with t.frame("f1") as trace:
+        with t.span("inference"):
+            pass
+    with t.span("inference"):
+        pass
+    assert trace is None
+    assert t.records() == []
+
+
+def test_classifier_frame_has_stage_spans():
+    """Test that a traced classify call spans every stage it runs."""
+    model = Mock()
+    model.names = ["PET"]
+    predictions = Mock()
+    predictions.xyxy = [np.array([[5, 5, 40, 40, 0.95, 0]])]
+    model.return_value = predictions
+    classifier = PlasticClassifier(model=model)
+    classifier.gate = MotionGate()
+
+    t = Tracer(enabled=True, sample_rate=1.0)
+    classifier.tracer = t
+    with t.frame("f1"):
+        classifier.classify_plastic(np.zeros((64, 64, 3), dtype=np.uint8))
+
+    stages = t.records()[0]["stages"]
+    assert set(stages) == {"gate", "preprocess", "inference", "postprocess"}
+
+
+def test_trace_buffer_is_bounded():
+    """Test that only the newest traces are kept."""
+    t = Tracer(enabled=True, sample_rate=1.0, buffer_size=2)
+    for i in range(5):
+        with t.frame(i):
+            pass
+    assert [r["frame_id"] for r in t.records()] == [3, 4]
+
+
+def test_export_chrome_trace(tmp_path):
+    """Test Chrome trace-event export."""
+    t = Tracer(enabled=True, sample_rate=1.0)
+    with t.frame("f1"):
+        with t.span("decode"):
+            pass
+
+    path = t.export_chrome_trace(tmp_path / "trace.json")
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["frame f1", "decode"]
+    assert all(e["ph"] == "X" for e in events)
+    assert events[1]["ts"] >= events[0]["ts"]
+
+
+def test_sampling_profiler_finds_hot_function():
+    """Test that the sampler attributes time to the busy function."""
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy(0.2)
+    profiler.stop()
+
+    report = profiler.report()
+    assert sum(profiler.samples.values()) > 0
+    assert "_busy" in report
+
+
+@pytest.mark.parametrize("mode", ["cprofile", "sampling"])
+def test_profile_call_writes_report(tmp_path, mode):
+    """Test both profiling modes."""
+    report = tmp_path / "report.txt"
+    result = profile_call(lambda: _busy(0.05), mode, report, interval=0.001)
+    assert result > 0
+    assert "_busy" in report.read_text()
+
+
+def test_cli_profiles_image_directory(tmp_path):
+    """Test the classifier CLI over a directory of images."""
+    for i in range(3):
+        cv2.imwrite(
+            str(tmp_path / f"frame{i}.png"),
+            np.zeros((64, 64, 3), dtype=np.uint8)
+        )
+    model = Mock()
+    model.names = ["PET"]
+    predictions = Mock()
+    predictions.xyxy = [np.array([[5, 5, 40, 40, 0.95, 0]])]
+    model.return_value = predictions
+
+    report = tmp_path / "out" / "report.txt"
+    trace = tmp_path / "out" / "trace.json"
+    with patch.object(PlasticClassifier, "_load_model", return_value=model), \
+            patch.object(plastic_classifier.metrics, "start_metrics_server"):
+        plastic_classifier.main([
+            str(tmp_path), "--profile", "cprofile",
+            "--report", str(report), "--trace", str(trace),
+        ])
+    tracer.enabled = False
+    tracer.traces.clear()
+
+    assert report.exists()
+    names = {e["name"] for e in json.loads(trace.read_text())["traceEvents"]}
+    assert {
+        "decode", "preprocess", "inference", "postprocess", "contamination"
+    } <= names
+    assert "frame frame0.png" in names
@@ -0,0 +1,114 @@
+"""
+Unit tests for the training data pipeline.
+"""
+
+import pytest
+import cv2
+import numpy as np
+import torch
+
+from src.vision.dataset import PackedFrameStore
+from src.vision.training_data import (
+    TrainingDataset,
+    augment_sample,
+    build_cache,
+    cache_path,
+    collate,
+    label_path,
+    make_loader,
+    read_labels,
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """YOLO-layout folder of four images; the last one is unlabelled."""
+    images, labels = tmp_path / "data" / "images", tmp_path / "data" / "labels"
+    images.mkdir(parents=True)
+    labels.mkdir()
+    for i in range(4):
+        image = np.zeros((60, 80, 3), dtype=np.uint8)
+        image[:, :40] = (0, 0, 50 * (i + 1))
+        cv2.imwrite(str(images / f"img{i}.png"), image)
+        if i < 3:
+            (labels / f"img{i}.txt").write_text(
+                f"{i} 0.25 0.5 0.5 1.0\n1 0.75 0.5 0.1 0.1\n"
+            )
+    return images
+
+
+def test_labels_are_read_from_sibling_folder(dataset):
+    """Test resolving and parsing YOLO label files."""
+    assert label_path(dataset / "img0.png") == dataset.parent / "labels/img0.txt"
+    assert read_labels(dataset / "img2.png") == [
+        [2.0, 0.25, 0.5, 0.5, 1.0], [1.0, 0.75, 0.5, 0.1, 0.1]
+    ]
+    assert read_labels(dataset / "img3.png") == []
+
+
+def test_cache_is_built_once_and_invalidated(dataset, tmp_path):
+    """Test that the packed cache is reused until the source changes."""
+    store = build_cache(dataset, 32, tmp_path / "cache")
+    assert len(store) == 4 and tuple(store.shape) == (32, 32, 3)
+    assert store.label(1)[0] == [1.0, 0.25, 0.5, 0.5, 1.0]
+
+    assert build_cache(dataset, 32, tmp_path / "cache").path == store.path
+    (dataset.parent / "labels" / "img3.txt").write_text("0 0.5 0.5 0.2 0.2\n")
+    assert cache_path(dataset, 32, tmp_path / "cache") != store.path
+
+
+def test_flip_mirrors_labels():
+    """Test that a horizontal flip mirrors the box centres."""
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    image[:, :5] = 255
+    labels = np.array([[0, 0.125, 0.5, 0.25, 1.0]], dtype=np.float32)
+
+    flipped, new_labels = augment_sample(
+        image, labels, np.random.default_rng(0), flip=1.0, hsv_gain=(0, 0, 0)
+    )
+    assert np.array_equal(flipped, image[:, ::-1])
+    assert new_labels[0, 1] == pytest.approx(0.875)
+    assert labels[0, 1] == pytest.approx(0.125)
+
+
+def test_folder_and_cache_give_the_same_samples(dataset, tmp_path):
+    """Test that cached samples match decoding the folder directly."""
+    store = build_cache(dataset, 32, tmp_path / "cache")
+    from_folder = TrainingDataset(dataset, 32, augment=False)
+    from_cache = TrainingDataset(store.path, augment=False)
+
+    assert len(from_folder) == len(from_cache) == 4
+    for i in range(4):
+        (image_a, labels_a), (image_b, labels_b) = from_folder[i], from_cache[i]
+        assert image_a.shape == (3, 32, 32) and image_a.dtype == torch.uint8
+        assert torch.equal(image_a, image_b)
+        assert torch.equal(labels_a, labels_b)
+    assert from_cache[3][1].shape == (0, 5)
+
+
+def test_collate_adds_batch_index():
+    """Test stacking images and tagging labels with their sample."""
+    samples = [
+        (torch.zeros(3, 4, 4, dtype=torch.uint8), torch.ones(2, 5)),
+        (torch.zeros(3, 4, 4, dtype=torch.uint8), torch.ones(0, 5)),
+        (torch.zeros(3, 4, 4, dtype=torch.uint8), torch.ones(1, 5)),
+    ]
+    images, labels = collate(samples)
+    assert images.shape == (3, 3, 4, 4)
+    assert labels.shape == (3, 6)
+    assert labels[:, 0].tolist() == [0.0, 0.0, 2.0]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_loader_yields_every_sample(dataset, tmp_path, workers):
+    """Test batching from the cache with and without worker processes."""
+    loader = make_loader(
+        dataset, batch_size=3, workers=workers, prefetch=2, image_size=32,
+        cache_dir=tmp_path / "cache",
+    )
+    assert PackedFrameStore.is_store(loader.dataset.source)
+
+    for _ in range(2):
+        batches = list(loader)
+        assert [len(images) for images, _ in batches] == [3, 1]
+        assert sum(len(labels) for _, labels in batches) == 6